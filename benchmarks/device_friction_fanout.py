@@ -0,0 +1,157 @@
+"""mart_device_friction 조인 팬아웃 회귀 벤치마크 (BigQuery / DuckDB)
+
+기기별 마찰 마트를 두 방식으로 실행해 셔플 바이트를 비교한다.
+- legacy : stg_events (이벤트 x 상품) 를 세션 테이블 두 개와 조인한 뒤 집계하던 기존 형태
+- session: models/marts/mart_device_friction.sql (fct_sessions x int_engage_lift_score, 세션 1:1 조인)
+
+측정 기준
+- BigQuery: 잡 쿼리 플랜 단계별 shuffle_output_bytes 합계 (+ 처리 바이트, 슬롯 시간)
+- DuckDB  : 프로파일링에서 HASH_JOIN / HASH_GROUP_BY 로 들어간 행 바이트 합계
+            (분산 엔진이라면 재분배되는 입력, 단일 노드에서의 셔플 대용 지표)
+
+두 방식 모두 dbt 로 빌드된 테이블(stg_events, fct_sessions, int_engage_lift_score, int_session_paths)을 읽는다.
+
+사용 예:
+    python benchmarks/device_friction_fanout.py --project my-project --dataset ga4_dbt
+    python benchmarks/device_friction_fanout.py --duckdb local.duckdb
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import jinja2
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 세션 단위로 바꾸기 전 mart_device_friction 의 집계 부분 (이후 SELECT 는 두 방식이 같음)
+LEGACY_SQL = """
+SELECT
+    e.device_category,
+    COUNT(DISTINCT e.session_unique_id) AS total_sessions,
+    COUNTIF(s.engagement_grade = 'High Intent') AS high_intent_users,
+    COUNTIF(s.engagement_grade = 'High Intent' AND p.is_converted = 1) AS high_intent_converters
+FROM {{ ref('stg_events') }} e
+JOIN {{ ref('int_engage_lift_score') }} s ON e.session_unique_id = s.session_unique_id
+JOIN {{ ref('int_session_paths') }} p ON e.session_unique_id = p.session_unique_id
+GROUP BY 1
+"""
+
+
+def render(sql, relation):
+    env = jinja2.Environment()
+    env.globals.update(ref=relation, config=lambda **kwargs: "")
+    return env.from_string(sql).render()
+
+
+def build_queries(relation):
+    with open(os.path.join(PROJECT_DIR, "models", "marts", "mart_device_friction.sql"), encoding="utf-8") as f:
+        session = f.read()
+    return {"legacy": render(LEGACY_SQL, relation), "session": render(session, relation)}
+
+
+# ===== BigQuery =====
+def run_bigquery(client, sql):
+    from google.cloud import bigquery
+
+    started = time.perf_counter()
+    job = client.query(sql, job_config=bigquery.QueryJobConfig(use_query_cache=False))
+    rows = [dict(row) for row in job.result()]
+    return {
+        "shuffle_bytes": sum(stage.shuffle_output_bytes or 0 for stage in job.query_plan),
+        "bytes": job.total_bytes_processed,
+        "slot_ms": job.slot_millis,
+        "elapsed": time.perf_counter() - started,
+        "rows": rows,
+    }
+
+
+# ===== DuckDB =====
+def _shuffle_bytes(node):
+    """조인/집계 연산자로 들어간 자식 출력 바이트 합계"""
+    total = 0
+    if node.get("operator_type") in ("HASH_JOIN", "HASH_GROUP_BY"):
+        total += sum(child.get("result_set_size", 0) for child in node.get("children", []))
+    return total + sum(_shuffle_bytes(child) for child in node.get("children", []))
+
+
+def run_duckdb(con, sql):
+    from ga4_engine.bq_compat import translate
+
+    with tempfile.TemporaryDirectory() as tmp:
+        profile = os.path.join(tmp, "profile.json")
+        con.execute("PRAGMA enable_profiling='json'")
+        con.execute(f"PRAGMA profiling_output='{profile}'")
+        started = time.perf_counter()
+        result = con.execute(translate(sql))
+        columns = [d[0] for d in result.description]
+        rows = [dict(zip(columns, row)) for row in result.fetchall()]
+        elapsed = time.perf_counter() - started
+        con.execute("PRAGMA disable_profiling")
+        with open(profile, encoding="utf-8") as f:
+            plan = json.load(f)
+    return {"shuffle_bytes": _shuffle_bytes(plan), "bytes": None, "slot_ms": None, "elapsed": elapsed, "rows": rows}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="mart_device_friction 이벤트 조인 vs 세션 조인 셔플 바이트 비교")
+    parser.add_argument("--project", default=None, help="BigQuery: 쿼리 비용을 청구할 GCP 프로젝트")
+    parser.add_argument("--dataset", default=None, help="BigQuery: dbt 모델이 빌드된 데이터셋 (project.dataset 또는 dataset)")
+    parser.add_argument("--duckdb", default=None, help="로컬: duckdb_runner 결과 DB 파일")
+    parser.add_argument("--repeat", type=int, default=3, help="방식별 반복 실행 횟수 (중앙값 보고)")
+    parser.add_argument("--print-sql", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.duckdb:
+        import duckdb
+
+        sys.path.insert(0, PROJECT_DIR)
+        con = duckdb.connect(args.duckdb, read_only=True)
+        queries = build_queries(lambda name: f'"{name}"')
+
+        def run(sql):
+            return run_duckdb(con, sql)
+    elif args.dataset:
+        try:
+            from google.cloud import bigquery
+        except ImportError:
+            raise SystemExit("google-cloud-bigquery 가 필요합니다: pip install google-cloud-bigquery")
+        client = bigquery.Client(project=args.project)
+        dataset = args.dataset if "." in args.dataset else f"{client.project}.{args.dataset}"
+        queries = build_queries(lambda name: f"`{dataset}.{name}`")
+
+        def run(sql):
+            return run_bigquery(client, sql)
+    else:
+        raise SystemExit("--dataset (BigQuery) 또는 --duckdb (로컬) 중 하나가 필요합니다")
+
+    if args.print_sql:
+        for name, sql in queries.items():
+            print(f"-- {name}\n{sql}\n")
+        return
+
+    results = {}
+    for name, sql in queries.items():
+        runs = sorted((run(sql) for _ in range(args.repeat)), key=lambda r: r["elapsed"])
+        results[name] = runs[len(runs) // 2]
+
+    print(f"{'방식':<8} {'셔플 바이트':>16} {'처리 바이트':>16} {'슬롯(ms)':>12} {'경과(s)':>8}")
+    for name, r in results.items():
+        processed = "-" if r["bytes"] is None else f"{r['bytes']:,}"
+        slot = "-" if r["slot_ms"] is None else f"{r['slot_ms']:,}"
+        print(f"{name:<8} {r['shuffle_bytes']:>16,} {processed:>16} {slot:>12} {r['elapsed']:>8.2f}")
+    if results["legacy"]["shuffle_bytes"]:
+        saved = 1 - results["session"]["shuffle_bytes"] / results["legacy"]["shuffle_bytes"]
+        print(f"셔플 바이트 절감: {saved:.1%}")
+
+    # 세션 수는 두 방식이 같아야 하고, High Intent 는 세션 단위 쪽만 total_sessions 이하
+    for name, r in results.items():
+        for row in sorted(r["rows"], key=lambda row: str(row["device_category"])):
+            print(f"  {name:<8} {str(row['device_category']):<10} sessions={row['total_sessions']:>10,} "
+                  f"high_intent={row['high_intent_users']:>10,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""세션 distinct count 벤치마크: COUNT(DISTINCT) vs 일별 HLL 스케치 병합 (BigQuery / DuckDB)
+
+mart_open_funnel / mart_promo_quality 를 distinct_count_method 만 바꿔 렌더링해 비교한다.
+- exact: stg_events 이벤트 행에서 COUNT(DISTINCT session_unique_id) (mart_promo_quality 는 fct_sessions 의 클릭 세션 행 수)
+- hll  : int_daily_session_sketch 의 일별 스케치를 HLL_COUNT.MERGE (스케치 테이블은 증분으로 미리 빌드되어 있어야 함)
+
+측정 기준
+- 경과 시간 (+ BigQuery 는 슬롯 시간, 처리 바이트)
+- 행별 세션 수와 exact 대비 상대 오차 (기대 상대 표준 오차 1.04 / sqrt(2^distinct_count_precision))
+
+사용 예:
+    python benchmarks/distinct_count_sketch.py --project my-project --dataset ga4_dbt
+    python benchmarks/distinct_count_sketch.py --duckdb local.duckdb
+"""
+import argparse
+import math
+import os
+import sys
+import time
+
+import jinja2
+import yaml
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 모델 → (키 컬럼, 세션 수 컬럼)
+MODELS = {
+    "mart_open_funnel": ("step_name", "user_count"),
+    "mart_promo_quality": ("promotion_name", "click_sessions"),
+}
+
+
+def project_vars():
+    with open(os.path.join(PROJECT_DIR, "dbt_project.yml"), encoding="utf-8") as f:
+        return yaml.safe_load(f).get("vars") or {}
+
+
+def render(model, relation, **overrides):
+    with open(os.path.join(PROJECT_DIR, "models", "marts", f"{model}.sql"), encoding="utf-8") as f:
+        sql = f.read()
+    values = {**project_vars(), **overrides}
+    env = jinja2.Environment()
+    env.globals.update(ref=relation, config=lambda **kwargs: "", var=lambda name, default=None: values.get(name, default))
+    return env.from_string(sql).render()
+
+
+def build_queries(relation):
+    queries = {}
+    for model, (key, count) in MODELS.items():
+        for method in ("exact", "hll"):
+            sql = render(model, relation, distinct_count_method=method)
+            # 결과 정렬(ORDER BY)은 모델 그대로 두고 키 / 세션 수만 받음
+            queries[(model, method)] = f"SELECT {key}, {count} FROM (\n{sql}\n)"
+    return queries
+
+
+# ===== BigQuery =====
+def run_bigquery(client, sql):
+    from google.cloud import bigquery
+
+    started = time.perf_counter()
+    job = client.query(sql, job_config=bigquery.QueryJobConfig(use_query_cache=False))
+    rows = [tuple(row.values()) for row in job.result()]
+    return {"elapsed": time.perf_counter() - started, "slot_ms": job.slot_millis, "bytes": job.total_bytes_processed, "rows": rows}
+
+
+# ===== DuckDB =====
+def run_duckdb(con, sql):
+    from ga4_engine.bq_compat import translate
+
+    started = time.perf_counter()
+    rows = con.execute(translate(sql)).fetchall()
+    return {"elapsed": time.perf_counter() - started, "slot_ms": None, "bytes": None, "rows": rows}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="mart_open_funnel / mart_promo_quality COUNT(DISTINCT) vs HLL 스케치 병합 비교")
+    parser.add_argument("--project", default=None, help="BigQuery: 쿼리 비용을 청구할 GCP 프로젝트")
+    parser.add_argument("--dataset", default=None, help="BigQuery: dbt 모델이 빌드된 데이터셋 (project.dataset 또는 dataset)")
+    parser.add_argument("--duckdb", default=None, help="로컬: duckdb_runner 결과 DB 파일 (distinct_count_method: hll 로 빌드)")
+    parser.add_argument("--repeat", type=int, default=3, help="방식별 반복 실행 횟수 (중앙값 보고)")
+    parser.add_argument("--print-sql", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.duckdb:
+        import duckdb
+
+        sys.path.insert(0, PROJECT_DIR)
+        from ga4_engine.bq_compat import install_macros
+
+        # HLL_COUNT 등 호환 매크로는 메모리 DB 에 두고, 빌드 결과는 읽기 전용으로 붙임
+        con = duckdb.connect()
+        install_macros(con)
+        con.execute(f"ATTACH '{args.duckdb}' AS build (READ_ONLY)")
+        con.execute("SET search_path = 'build,memory'")
+        queries = build_queries(lambda name: f'"{name}"')
+
+        def run(sql):
+            return run_duckdb(con, sql)
+    elif args.dataset:
+        try:
+            from google.cloud import bigquery
+        except ImportError:
+            raise SystemExit("google-cloud-bigquery 가 필요합니다: pip install google-cloud-bigquery")
+        client = bigquery.Client(project=args.project)
+        dataset = args.dataset if "." in args.dataset else f"{client.project}.{args.dataset}"
+        queries = build_queries(lambda name: f"`{dataset}.{name}`")
+
+        def run(sql):
+            return run_bigquery(client, sql)
+    else:
+        raise SystemExit("--dataset (BigQuery) 또는 --duckdb (로컬) 중 하나가 필요합니다")
+
+    if args.print_sql:
+        for (model, method), sql in queries.items():
+            print(f"-- {model} ({method})\n{sql}\n")
+        return
+
+    results = {}
+    for name, sql in queries.items():
+        runs = sorted((run(sql) for _ in range(args.repeat)), key=lambda r: r["elapsed"])
+        results[name] = runs[len(runs) // 2]
+
+    precision = project_vars().get("distinct_count_precision", 15)
+    print(f"기대 상대 표준 오차 (precision {precision}): {1.04 / math.sqrt(2 ** precision):.2%}\n")
+    print(f"{'모델':<20} {'방식':<6} {'경과(s)':>8} {'슬롯(ms)':>12} {'처리 바이트':>16}")
+    for (model, method), r in results.items():
+        slot = "-" if r["slot_ms"] is None else f"{r['slot_ms']:,}"
+        processed = "-" if r["bytes"] is None else f"{r['bytes']:,}"
+        print(f"{model:<20} {method:<6} {r['elapsed']:>8.2f} {slot:>12} {processed:>16}")
+
+    for model in MODELS:
+        exact = dict(results[(model, "exact")]["rows"])
+        approx = dict(results[(model, "hll")]["rows"])
+        print(f"\n{model}")
+        print(f"  {'키':<32} {'exact':>12} {'hll':>12} {'상대 오차':>10}")
+        for key, count in exact.items():
+            estimate = approx.get(key)
+            error = "-" if estimate is None or not count else f"{estimate / count - 1:+.2%}"
+            print(f"  {str(key):<32} {count:>12,} {estimate if estimate is None else f'{estimate:,}':>12} {error:>10}")
+
+
+if __name__ == "__main__":
+    main()
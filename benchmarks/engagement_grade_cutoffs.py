@@ -0,0 +1,154 @@
+"""int_engage_lift_score 등급 경계 벤치마크: PERCENT_RANK 전체 정렬 vs 분위수 스케치 (BigQuery / DuckDB)
+
+같은 모델을 engagement_grade_method 만 바꿔 렌더링해 비교한다.
+- exact : PERCENT_RANK() OVER (ORDER BY engagement_score DESC) (파티션 없는 전체 정렬)
+- approx: APPROX_QUANTILES 로 상위 20% / 50% 경계만 구한 뒤 비교 (--rank-error 로 경계 순위 오차 한도 지정,
+          넘으면 쿼리가 ERROR 로 실패)
+
+측정 기준
+- 경과 시간 (+ BigQuery 는 슬롯 시간, 처리 바이트)
+- 등급 일치율: 두 방식의 세션별 등급을 조인한 혼동 행렬
+
+두 방식 모두 dbt 로 빌드된 테이블(fct_sessions, int_lift_weight)을 읽는다.
+
+사용 예:
+    python benchmarks/engagement_grade_cutoffs.py --project my-project --dataset ga4_dbt
+    python benchmarks/engagement_grade_cutoffs.py --duckdb local.duckdb --rank-error 0.001 0.01
+"""
+import argparse
+import os
+import sys
+import time
+
+import jinja2
+import yaml
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GRADES = ["High Intent", "Medium Intent", "Low Intent"]
+
+
+def project_vars():
+    with open(os.path.join(PROJECT_DIR, "dbt_project.yml"), encoding="utf-8") as f:
+        return yaml.safe_load(f).get("vars") or {}
+
+
+class Exceptions:
+    @staticmethod
+    def raise_compiler_error(msg):
+        raise SystemExit(msg)
+
+
+def render(relation, **overrides):
+    with open(os.path.join(PROJECT_DIR, "models", "intermediate", "int_engage_lift_score.sql"), encoding="utf-8") as f:
+        sql = f.read()
+    values = {**project_vars(), **overrides}
+    env = jinja2.Environment()
+    env.globals.update(ref=relation, config=lambda **kwargs: "", exceptions=Exceptions(),
+                       var=lambda name, default=None: values.get(name, default))
+    return env.from_string(sql).render()
+
+
+def build_queries(relation, rank_errors):
+    models = {"exact": render(relation, engagement_grade_method="exact")}
+    for error in rank_errors:
+        models[f"approx({error:g})"] = render(relation, engagement_grade_method="approx", engagement_grade_rank_error=error)
+    # 시간 측정: 모델 전체를 계산하되 결과는 등급별 건수만 받음
+    timed = {name: f"SELECT engagement_grade, COUNT(*) AS sessions FROM (\n{sql}\n) GROUP BY 1" for name, sql in models.items()}
+    # 일치율: exact 와 세션 단위로 조인
+    agreement = {
+        name: (f"WITH exact AS (\n{models['exact']}\n),\napprox AS (\n{sql}\n)\n"
+               "SELECT e.engagement_grade AS exact_grade, a.engagement_grade AS approx_grade, COUNT(*) AS sessions\n"
+               "FROM exact e JOIN approx a ON e.session_unique_id = a.session_unique_id\nGROUP BY 1, 2")
+        for name, sql in models.items() if name != "exact"
+    }
+    return timed, agreement
+
+
+# ===== BigQuery =====
+def run_bigquery(client, sql):
+    from google.cloud import bigquery
+
+    started = time.perf_counter()
+    job = client.query(sql, job_config=bigquery.QueryJobConfig(use_query_cache=False))
+    rows = [tuple(row.values()) for row in job.result()]
+    return {"elapsed": time.perf_counter() - started, "slot_ms": job.slot_millis, "bytes": job.total_bytes_processed, "rows": rows}
+
+
+# ===== DuckDB =====
+def run_duckdb(con, sql):
+    from ga4_engine.bq_compat import translate
+
+    started = time.perf_counter()
+    rows = con.execute(translate(sql)).fetchall()
+    return {"elapsed": time.perf_counter() - started, "slot_ms": None, "bytes": None, "rows": rows}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="int_engage_lift_score PERCENT_RANK vs 분위수 스케치 등급 경계 비교")
+    parser.add_argument("--project", default=None, help="BigQuery: 쿼리 비용을 청구할 GCP 프로젝트")
+    parser.add_argument("--dataset", default=None, help="BigQuery: dbt 모델이 빌드된 데이터셋 (project.dataset 또는 dataset)")
+    parser.add_argument("--duckdb", default=None, help="로컬: duckdb_runner 결과 DB 파일")
+    parser.add_argument("--rank-error", type=float, nargs="+", default=[0.001], help="approx 모드 경계 순위 오차 한도 (여러 개 가능)")
+    parser.add_argument("--repeat", type=int, default=3, help="방식별 반복 실행 횟수 (중앙값 보고)")
+    parser.add_argument("--print-sql", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.duckdb:
+        import duckdb
+
+        sys.path.insert(0, PROJECT_DIR)
+        from ga4_engine.bq_compat import install_macros
+
+        # APPROX_QUANTILES 등 호환 매크로는 메모리 DB 에 두고, 빌드 결과는 읽기 전용으로 붙임
+        con = duckdb.connect()
+        install_macros(con)
+        con.execute(f"ATTACH '{args.duckdb}' AS build (READ_ONLY)")
+        con.execute("SET search_path = 'build,memory'")
+        timed, agreement = build_queries(lambda name: f'"{name}"', args.rank_error)
+
+        def run(sql):
+            return run_duckdb(con, sql)
+    elif args.dataset:
+        try:
+            from google.cloud import bigquery
+        except ImportError:
+            raise SystemExit("google-cloud-bigquery 가 필요합니다: pip install google-cloud-bigquery")
+        client = bigquery.Client(project=args.project)
+        dataset = args.dataset if "." in args.dataset else f"{client.project}.{args.dataset}"
+        timed, agreement = build_queries(lambda name: f"`{dataset}.{name}`", args.rank_error)
+
+        def run(sql):
+            return run_bigquery(client, sql)
+    else:
+        raise SystemExit("--dataset (BigQuery) 또는 --duckdb (로컬) 중 하나가 필요합니다")
+
+    if args.print_sql:
+        for name, sql in timed.items():
+            print(f"-- {name}\n{sql}\n")
+        return
+
+    results = {}
+    for name, sql in timed.items():
+        runs = sorted((run(sql) for _ in range(args.repeat)), key=lambda r: r["elapsed"])
+        results[name] = runs[len(runs) // 2]
+
+    print(f"{'방식':<14} {'경과(s)':>8} {'슬롯(ms)':>12} {'처리 바이트':>16}   등급별 세션")
+    for name, r in results.items():
+        slot = "-" if r["slot_ms"] is None else f"{r['slot_ms']:,}"
+        processed = "-" if r["bytes"] is None else f"{r['bytes']:,}"
+        counts = dict(r["rows"])
+        grades = " ".join(f"{grade.split()[0]}={counts.get(grade, 0):,}" for grade in GRADES)
+        print(f"{name:<14} {r['elapsed']:>8.2f} {slot:>12} {processed:>16}   {grades}")
+
+    for name, sql in agreement.items():
+        matrix = {(exact, approx): sessions for exact, approx, sessions in run(sql)["rows"]}
+        total = sum(matrix.values())
+        agreed = sum(sessions for (exact, approx), sessions in matrix.items() if exact == approx)
+        print(f"\n{name} 등급 일치율: {agreed / max(total, 1):.4%} ({total - agreed:,} / {total:,} 세션 불일치)")
+        print(f"  {'exact / approx':<16}" + "".join(f"{grade:>15}" for grade in GRADES))
+        for exact in GRADES:
+            print(f"  {exact:<16}" + "".join(f"{matrix.get((exact, approx), 0):>15,}" for approx in GRADES))
+
+
+if __name__ == "__main__":
+    main()
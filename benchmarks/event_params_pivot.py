@@ -0,0 +1,142 @@
+"""event_params 추출 방식 비교 벤치마크 (BigQuery)
+
+stg_events 의 event_params 추출을 두 방식으로 같은 기간에 실행해
+처리 바이트(total_bytes_processed)와 슬롯 시간(slot_millis)을 비교한다.
+- legacy: 키마다 (SELECT value.x FROM UNNEST(event_params) WHERE key = ...) 상관 서브쿼리
+          (+ session_unique_id 에서 ga_session_id 를 한 번 더 조회하던 기존 형태)
+- pivot : macros/extract_event_params.sql 의 단일 패스 피벗 (default__ 구현)
+
+추출 키 목록은 stg_events.sql 의 {% set event_params = [...] %} 를 그대로 읽는다.
+결과 컬럼을 모두 COUNTIF 로 집계해 추출식이 최적화로 생략되지 않게 한다.
+
+사용 예 (google-cloud-bigquery 와 GCP 인증 필요):
+    python benchmarks/event_params_pivot.py --project my-project --start 20201201 --end 20201231
+    python benchmarks/event_params_pivot.py --project my-project --dry-run   # 바이트만 확인
+"""
+import argparse
+import ast
+import os
+import re
+import time
+
+import jinja2
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TABLE = "bigquery-public-data.ga4_obfuscated_sample_ecommerce.events_*"
+VALUE_FIELDS = {"string": "string_value", "int": "int_value", "float": "float_value", "double": "double_value"}
+
+
+def load_params():
+    """stg_events.sql 에 선언된 (key, type, alias) 목록"""
+    with open(os.path.join(PROJECT_DIR, "models", "staging", "stg_events.sql"), encoding="utf-8") as f:
+        sql = f.read()
+    m = re.search(r"{%\s*set\s+event_params\s*=\s*(\[.*?\])\s*%}", sql, re.DOTALL)
+    if m is None:
+        raise SystemExit("stg_events.sql 에서 event_params 목록을 찾을 수 없습니다")
+    return ast.literal_eval(m.group(1))
+
+
+def pivot_expression(params):
+    """extract_event_params 매크로의 BigQuery(default__) 렌더링 결과"""
+    with open(os.path.join(PROJECT_DIR, "macros", "extract_event_params.sql"), encoding="utf-8") as f:
+        module = jinja2.Environment().from_string(f.read()).make_module()
+    return str(module.default__extract_event_params(params, "event_params"))
+
+
+def build_queries(params, table, start, end):
+    where = f"_TABLE_SUFFIX BETWEEN '{start}' AND '{end}'"
+    aliases = [alias for _, _, alias in params]
+    checks = ",\n  ".join(f"COUNTIF({a} IS NOT NULL) AS {a}" for a in aliases + ["session_unique_id"])
+
+    def subquery(key, type_):
+        return f"(SELECT value.{VALUE_FIELDS[type_]} FROM UNNEST(event_params) WHERE key = '{key}')"
+
+    session_key = next((k, t) for k, t, _ in params if k == "ga_session_id")
+    legacy_cols = ",\n    ".join(f"{subquery(k, t)} AS {a}" for k, t, a in params)
+    legacy = f"""
+SELECT
+  {checks}
+FROM (
+  SELECT
+    CONCAT(user_pseudo_id, '-', {subquery(*session_key)}) AS session_unique_id,
+    {legacy_cols}
+  FROM `{table}`
+  WHERE {where}
+)"""
+
+    pivot_cols = ", ".join(f"params.{a}" for a in aliases)
+    session_alias = next(a for k, _, a in params if k == "ga_session_id")
+    pivot = f"""
+SELECT
+  {checks}
+FROM (
+  SELECT
+    CONCAT(user_pseudo_id, '-', params.{session_alias}) AS session_unique_id,
+    {pivot_cols}
+  FROM (
+    SELECT user_pseudo_id, {pivot_expression(params)} AS params
+    FROM `{table}`
+    WHERE {where}
+  )
+)"""
+    return {"legacy": legacy, "pivot": pivot}
+
+
+def run_query(client, sql, dry_run):
+    from google.cloud import bigquery
+
+    config = bigquery.QueryJobConfig(dry_run=dry_run, use_query_cache=False)
+    started = time.perf_counter()
+    job = client.query(sql, job_config=config)
+    rows = None if dry_run else list(job.result())
+    return {
+        "bytes": job.total_bytes_processed,
+        "slot_ms": None if dry_run else job.slot_millis,
+        "elapsed": time.perf_counter() - started,
+        "row": None if dry_run else dict(rows[0]),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="event_params 상관 서브쿼리 vs 단일 패스 피벗 비교")
+    parser.add_argument("--project", default=None, help="쿼리 비용을 청구할 GCP 프로젝트")
+    parser.add_argument("--table", default=DEFAULT_TABLE)
+    parser.add_argument("--start", default="20201201")
+    parser.add_argument("--end", default="20201231")
+    parser.add_argument("--repeat", type=int, default=3, help="방식별 반복 실행 횟수 (중앙값 보고)")
+    parser.add_argument("--dry-run", action="store_true", help="실행 없이 처리 바이트만 확인")
+    parser.add_argument("--print-sql", action="store_true")
+    args = parser.parse_args(argv)
+
+    queries = build_queries(load_params(), args.table, args.start, args.end)
+    if args.print_sql:
+        for name, sql in queries.items():
+            print(f"-- {name}{sql}\n")
+        return
+
+    try:
+        from google.cloud import bigquery
+    except ImportError:
+        raise SystemExit("google-cloud-bigquery 가 필요합니다: pip install google-cloud-bigquery")
+    client = bigquery.Client(project=args.project)
+
+    results = {}
+    for name, sql in queries.items():
+        runs = [run_query(client, sql, args.dry_run) for _ in range(1 if args.dry_run else args.repeat)]
+        runs.sort(key=lambda r: r["slot_ms"] or 0)
+        results[name] = runs[len(runs) // 2]
+
+    if not args.dry_run and results["legacy"]["row"] != results["pivot"]["row"]:
+        print("⚠️ 두 방식의 추출 결과 건수가 다릅니다:", results["legacy"]["row"], results["pivot"]["row"])
+
+    print(f"{'방식':<8} {'처리 바이트':>16} {'슬롯(ms)':>12} {'경과(s)':>8}")
+    for name, r in results.items():
+        slot = "-" if r["slot_ms"] is None else f"{r['slot_ms']:,}"
+        print(f"{name:<8} {r['bytes']:>16,} {slot:>12} {r['elapsed']:>8.2f}")
+    if not args.dry_run and results["legacy"]["slot_ms"]:
+        saved = 1 - results["pivot"]["slot_ms"] / results["legacy"]["slot_ms"]
+        print(f"슬롯 시간 절감: {saved:.1%}")
+
+
+if __name__ == "__main__":
+    main()
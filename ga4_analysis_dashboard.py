@@ -4,9 +4,18 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from scipy import stats
 import os
 
+from ga4_engine import segment_stats
+from ga4_engine.funnel_cube import FunnelCube
+from ga4_engine.live_source import LiveMartStore, open_source
+from ga4_engine.mart_store import MartStore
+from ga4_engine.path_flow import sankey
+from ga4_engine.quantile_sketch import QuantileSketch
+from ga4_engine.segment_scan import SegmentScanner
+from ga4_engine.session_index import SessionIndex
+from ga4_engine.uncertainty import UncertaintyEngine, beta_lift_interval
+
 # ===== 페이지 설정 =====
 st.set_page_config(
     page_title="김동윤: GA4 로그 분석",
@@ -107,10 +116,20 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ===== 데이터 로드 =====
-@st.cache_data
+# 마트 파일은 MartStore 가 마트별 스키마로 필요할 때 하나씩 읽는다 (Arrow IPC → Parquet → CSV)
+# 실제로 읽는 마트는 페이지별 PAGE_MARTS 로 한정
+# GA4_MART_SOURCE 가 있으면 스냅샷 대신 라이브 소스에서 읽음 (예: bigquery://my-project/ga4_marts,
+# duckdb:///local.duckdb), GA4_MART_TTL 초(기본 600)가 지나면 마트별로 다시 읽는다
+# 읽은 마트는 모든 세션이 공유하고, GA4_MART_CACHE_MB(기본 1024)를 넘으면 오래 안 쓴 마트부터 해제
+@st.cache_resource
 def load_data():
-    data = {}
-    
+    cache_bytes = int(float(os.environ.get("GA4_MART_CACHE_MB", 1024)) * 2**20)
+    live_source = os.environ.get("GA4_MART_SOURCE")
+    if live_source:
+        store = LiveMartStore(open_source(live_source), ttl=float(os.environ.get("GA4_MART_TTL", 600)),
+                              cache_bytes=cache_bytes)
+        return store, store.root
+
     # 여러 경로 시도
     possible_paths = [
         "./mart_tables",
@@ -119,82 +138,199 @@ def load_data():
         "./data",
         "../data"
     ]
-    
-    files = {
-        'browsing_style': 'mart_browsing_style.csv',
-        'deep_specialists': 'mart_deep_specialists.csv',
-        'variety_seekers': 'mart_variety_seekers.csv',
-        'device_friction': 'mart_device_friction.csv',
-        'cart_abandon': 'mart_cart_abandon.csv',
-        'promo_quality': 'mart_promo_quality.csv',
-        'time_conversion': 'mart_time_to_conversion.csv',
-        'bundle_strategy': 'mart_bundle_strategy.csv',
-        'core_sessions': 'mart_core_sessions.csv',
-        # 퍼널 분석 데이터
-        'funnel_overall': 'mart_funnel_overall.csv',
-        'funnel_dropoff': 'mart_funnel_dropoff.csv',
-        'funnel_device': 'mart_funnel_device.csv',
-        'funnel_day': 'mart_funnel_daycsv.csv',
-        'funnel_hour': 'mart_funnel_hour.csv'
-    }
-    
-    working_path = None
-    for path in possible_paths:
-        test_file = os.path.join(path, 'mart_browsing_style.csv')
-        if os.path.exists(test_file):
-            working_path = path
-            break
-    
-    if working_path is None:
-        return data, None
-    
-    for key, filename in files.items():
-        try:
-            filepath = os.path.join(working_path, filename)
-            data[key] = pd.read_csv(filepath)
-        except:
-            pass
-    
-    return data, working_path
+
+    store = MartStore.discover(possible_paths, cache_bytes=cache_bytes)
+    if store is None:
+        return {}, None
+    return store, store.root
 
 data, data_path = load_data()
 
+# 퍼널 큐브 롤업 엔진: 차원 인코딩은 큐브 마트가 바뀔 때만 (TTL 갱신 등) 다시 수행
+# 아래 load_* 의 캐시 키는 data.version(마트) - 파일이면 (경로, 수정 시각, 크기), 라이브면 읽은 횟수
+@st.cache_resource(max_entries=1)
+def load_funnel_cube(_df_cube, version):
+    return FunnelCube(_df_cube)
+
+CUBE_DIMENSIONS = {
+    'device_category': '기기',
+    'session_hour': '시간대',
+    'session_day_of_week': '요일',
+    'session_source': '유입 소스',
+    'session_medium': '유입 매체',
+    'session_campaign': '캠페인',
+    'is_member': '회원 여부',
+    'session_date': '날짜',
+    'browsing_style': '브라우징 스타일',
+}
+# 세그먼트 자동 탐색 차원 (segment_scan.DIMENSIONS) 라벨, 큐브에 없는 차원이 있어 슬라이서와 따로 둠
+SEGMENT_DIMENSIONS = {
+    'device_category': '기기',
+    'session_source': '유입 소스',
+    'session_hour': '시간대',
+    'browsing_style': '브라우징 스타일',
+    'engagement_grade': '참여 등급',
+}
+
+def segment_label(segment):
+    """'device_category=mobile · engagement_grade=High Intent' → '기기=mobile · 참여 등급=High Intent'"""
+    parts = (part.split('=', 1) for part in segment.split(' · '))
+    return ' · '.join(f"{SEGMENT_DIMENSIONS.get(dim, dim)}={value}" for dim, value in parts)
+
+# 세션 단위 교차 필터 인덱스: Arrow 테이블에서 바로 비트맵을 만들고 테이블이 바뀔 때만 재생성
+@st.cache_resource(max_entries=1)
+def load_session_index(_table, version):
+    return SessionIndex(_table)
+
+# 세그먼트 자동 탐색: 세션 → 차원 조합 셀 집계는 테이블이 바뀔 때만, 조합 스캔은 위젯 변경마다
+@st.cache_resource(max_entries=1)
+def load_segment_scanner(_table, version):
+    return SegmentScanner(_table)
+
+# KPI 신뢰구간 (ga4_engine.uncertainty): 세션 배열 압축 + 재표본은 테이블이 바뀔 때만, 지표끼리는 프로세스 풀에서 병렬
+LIFT_SIGNALS = {
+    'view_item': 'has_view_item',
+    'view_search_results': 'has_search',
+    'add_to_cart': 'has_add_to_cart',
+    'begin_checkout': 'has_begin_checkout',
+    'add_payment_info': 'has_add_payment_info',
+}
+# mart_time_to_conversion 과 같은 구간
+TIME_BUCKET_EDGES = [0, 5, 15, 30, 60, np.inf]
+TIME_BUCKETS = ['0-5분 (즉시 구매)', '5-15분 (단기 탐색)', '15-30분 (중기 탐색)', '30-60분 (장기 고민)', '60분 이상']
+
+@st.cache_resource(max_entries=1)
+def load_session_intervals(_table, version):
+    df = _table.select(['has_purchase', 'purchase_revenue', 'minutes_to_buy', *LIFT_SIGNALS.values()]).to_pandas()
+    engine = UncertaintyEngine()
+    engine.add_lift('lift', df['has_purchase'], {event: df[flag] for event, flag in LIFT_SIGNALS.items()})
+    engine.add_ratio('aov', df['purchase_revenue'],
+                     groups=pd.cut(df['minutes_to_buy'], TIME_BUCKET_EDGES, right=False, labels=TIME_BUCKETS))
+    intervals = engine.run()
+
+    # 같은 Lift 의 베이지안 (Beta-Binomial) 구간
+    purchase = df['has_purchase'].to_numpy()
+    flags = np.column_stack([df[flag].to_numpy() for flag in LIFT_SIGNALS.values()])
+    _, low, high = beta_lift_interval(len(df), flags.sum(axis=0), (flags * purchase[:, None]).sum(axis=0), purchase.sum())
+    intervals['lift'] = intervals['lift'].assign(bayes_low=low, bayes_high=high)
+    return intervals
+
+@st.cache_resource(max_entries=1)
+def load_cart_intervals(_table, version):
+    df = _table.select(['session_unique_id', 'item_name', 'potential_revenue']).to_pandas()
+    engine = UncertaintyEngine()
+    # 한 이탈 세션의 상품 행들은 같은 가중치로 재표본 (세션 단위 부트스트랩)
+    engine.add_ratio('lost_value', df['potential_revenue'], groups=df['item_name'], clusters=df['session_unique_id'])
+    return engine.run()['lost_value']
+
+def render_cross_filter(index, dims, key):
+    """막대를 클릭하면 나머지 차트가 그 값으로 필터링되는 교차 필터 차트 묶음
+
+    필터는 st.session_state['cross_filters'] 에 두어 퍼널/세그먼트 페이지가 같은 선택을 공유한다.
+    """
+    filters = st.session_state.setdefault('cross_filters', {})
+    chart_keys = [f"{key}_{dim}" for dim in dims]
+
+    # 차트 선택이 바뀐 경우에만 해당 차원 필터를 갱신 (다른 페이지에서 건 필터는 유지)
+    for dim, chart_key in zip(dims, chart_keys):
+        state = st.session_state.get(chart_key)
+        if not state:
+            continue
+        picked = sorted({str(p['x']) for p in state['selection']['points']})
+        if picked != st.session_state.get(f"{chart_key}_seen"):
+            st.session_state[f"{chart_key}_seen"] = picked
+            by_label = {str(level): level for level in index.levels(dim)}
+            filters[dim] = [by_label[x] for x in picked if x in by_label]
+
+    active = {dim: values for dim, values in filters.items() if values}
+    if active:
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            st.info("🔎 " + " · ".join(
+                f"{CUBE_DIMENSIONS.get(dim, dim)}: {', '.join(map(str, values))}" for dim, values in active.items()
+            ))
+        with col2:
+            if st.button("필터 초기화", key=f"{key}_reset"):
+                filters.clear()
+                for chart_key in chart_keys:
+                    st.session_state.pop(chart_key, None)
+                    st.session_state.pop(f"{chart_key}_seen", None)
+                st.rerun()
+
+    df_total = index.total(active, flags=['viewed', 'carted', 'purchased'])
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("세션", f"{int(df_total['sessions'][0]):,}")
+    col2.metric("상품 조회", f"{int(df_total['viewed'][0]):,}")
+    col3.metric("장바구니", f"{int(df_total['carted'][0]):,}")
+    col4.metric("구매 전환율", f"{df_total['cvr'][0]:.2f}%")
+
+    results = index.crossfilter(dims, active)
+    cols = st.columns(2)
+    for i, (dim, chart_key) in enumerate(zip(dims, chart_keys)):
+        df_dim = results[dim].assign(label=lambda d: d[dim].astype(str))
+        chosen = {str(v) for v in active.get(dim, [])}
+        df_dim['선택'] = np.where(df_dim['label'].isin(chosen) | (not chosen), '선택', '제외')
+        fig = px.bar(
+            df_dim,
+            x='label',
+            y='sessions',
+            color='선택',
+            color_discrete_map={'선택': '#1a73e8', '제외': '#c5cae9'},
+            custom_data=['cvr']
+        )
+        fig.update_traces(hovertemplate='%{x}<br>세션: %{y:,}<br>CVR: %{customdata[0]:.2f}%<extra></extra>')
+        fig.update_layout(
+            title=f"{CUBE_DIMENSIONS.get(dim, dim)}별 세션",
+            xaxis_title='',
+            yaxis_title='세션 수',
+            xaxis={'type': 'category'},
+            showlegend=False,
+            height=320,
+            margin=dict(l=10, r=10, t=50, b=30)
+        )
+        with cols[i % 2]:
+            st.plotly_chart(fig, use_container_width=True, on_select="rerun", selection_mode="points", key=chart_key)
+
 # ===== 통계 함수 =====
+# 계산은 ga4_engine.segment_stats (배열 단위), 여기는 스칼라 한 쌍용 래퍼
 def chi_square_test(group1_success, group1_total, group2_success, group2_total):
     """두 그룹의 전환율 차이에 대한 카이제곱 검정"""
-    contingency_table = np.array([
-        [group1_success, group1_total - group1_success],
-        [group2_success, group2_total - group2_success]
-    ])
-    chi2, p_value, dof, expected = stats.chi2_contingency(contingency_table)
-    return chi2, p_value
+    chi2, p_value = segment_stats.chi2_2x2(group1_success, group1_total, group2_success, group2_total)
+    return float(chi2), float(p_value)
 
 def calculate_confidence_interval(successes, total, confidence=0.95):
     """전환율의 신뢰구간 계산 (Wilson Score Interval)"""
     if total == 0:
         return 0, 0, 0
-    
-    p = successes / total
-    z = stats.norm.ppf((1 + confidence) / 2)
-    
-    denominator = 1 + z**2 / total
-    center = (p + z**2 / (2 * total)) / denominator
-    margin = z * np.sqrt((p * (1 - p) + z**2 / (4 * total)) / total) / denominator
-    
-    return p * 100, max(0, (center - margin) * 100), min(100, (center + margin) * 100)
+    rate, low, high = segment_stats.wilson_interval(successes, total, confidence)
+    return float(rate) * 100, float(low) * 100, float(high) * 100
+
+def segment_conversions(df):
+    """session_count / conversion_rate(%) 컬럼 → 세그먼트별 (전환 수, 세션 수) 배열"""
+    sessions = df['session_count'].to_numpy()
+    return (sessions * df['conversion_rate'].to_numpy() / 100).astype(int), sessions
+
+def segment_error_bars(df, confidence=0.95):
+    """세그먼트별 Wilson 신뢰구간 → 막대 그래프 error_y (아래, 위) 길이"""
+    conversions, sessions = segment_conversions(df)
+    _, low, high = segment_stats.wilson_interval(conversions, sessions, confidence)
+    cvr = df['conversion_rate'].to_numpy()
+    return cvr - low * 100, high * 100 - cvr
 
 def effect_size_cohens_h(p1, p2):
     """Cohen's h 효과 크기 계산"""
-    phi1 = 2 * np.arcsin(np.sqrt(p1))
-    phi2 = 2 * np.arcsin(np.sqrt(p2))
-    return abs(phi1 - phi2)
+    return float(abs(segment_stats.cohens_h(p1, p2)))
 
 # ===== 사이드바 =====
 st.sidebar.markdown("## 김동윤의 GA4 행동 로그 분석")
 st.sidebar.markdown("GA4 e-Commerce 분석 대시보드")
 st.sidebar.markdown("---")
 
-if data_path:
+if isinstance(data, LiveMartStore):
+    st.sidebar.success(f"✅ 라이브 데이터: {data_path}")
+    if st.sidebar.button("🔄 새로고침"):
+        data.refresh()
+elif data_path:
     st.sidebar.success(f"✅ 데이터 로드 완료")
 else:
     st.sidebar.error("❌ 데이터 폴더 없음")
@@ -210,6 +346,20 @@ page = st.sidebar.radio(
      "📐 방법론 & 한계점"]
 )
 
+# 페이지별로 사용하는 마트 (선택한 페이지의 마트만 읽음, 공유 캐시 해제는 MartStore 의 LRU 가 담당)
+PAGE_MARTS = {
+    "🏠 Executive Summary": ['funnel_overall', 'browsing_style', 'deep_specialists', 'cart_abandon'],
+    "📊 데이터 개요": ['funnel_overall', 'funnel_cube', 'session_funnel', 'conversion_sketch', 'path_flow'],
+    "🎯 진성 유저 식별": ['funnel_overall', 'session_funnel', 'engagement_weights', 'markov_attribution', 'user_journey'],
+    "🔍 세그먼트 분석": ['browsing_style', 'funnel_overall', 'deep_specialists', 'variety_seekers', 'session_funnel'],
+    "🛒 장바구니 & 프로모션": ['cart_abandon', 'cart_abandon_lines', 'promo_quality'],
+    "📋 액션 플랜": ['cart_abandon', 'promo_quality', 'deep_specialists', 'browsing_style'],
+    "📐 방법론 & 한계점": ['browsing_style'],
+}
+
+if data_path:
+    data = data.view(PAGE_MARTS[page])
+
 st.sidebar.markdown("---")
 st.sidebar.info("""
 **데이터 소스**  
@@ -506,6 +656,186 @@ elif page == "📊 데이터 개요":
         | 프로모션 | CTR vs 품질 분석 |
         """)
 
+    # 퍼널 슬라이서: mart_funnel_cube 를 원하는 차원으로 바로 롤업
+    if 'funnel_cube' in data:
+        df_cube = data['funnel_cube']
+        cube = load_funnel_cube(df_cube, data.version('funnel_cube'))
+
+        st.markdown("---")
+        st.markdown("### 🧊 퍼널 슬라이서")
+        st.caption("날짜·시간·요일·기기·유입·회원 단위로 미리 합산한 퍼널 큐브를 필터/그룹 기준에 맞춰 즉시 다시 집계합니다.")
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            # 라벨 표에는 세션 단위 차원(브라우징 스타일 등)도 있으므로 큐브에 있는 차원만 그룹 기준으로
+            cube_dims = [dim for dim in CUBE_DIMENSIONS if dim in cube.dimensions]
+            cube_group_by = st.multiselect(
+                "그룹 기준", cube_dims, default=[dim for dim in ['device_category'] if dim in cube_dims],
+                format_func=CUBE_DIMENSIONS.get
+            )
+        with col2:
+            cube_devices = st.multiselect("기기 필터", cube.levels('device_category'))
+        with col3:
+            cube_sources = st.multiselect("유입 소스 필터", cube.levels('session_source'))
+
+        df_slice = cube.rollup(cube_group_by, filters={
+            'device_category': cube_devices or None,
+            'session_source': cube_sources or None,
+        }).sort_values('sessions', ascending=False)
+
+        if cube_group_by:
+            fig_slice = px.bar(
+                df_slice.head(20).assign(segment=lambda d: d[cube_group_by].astype(object).fillna('(null)').astype(str).agg(' / '.join, axis=1)),
+                x='segment',
+                y='cvr',
+                color='sessions',
+                color_continuous_scale='Blues'
+            )
+            fig_slice.update_layout(
+                title='세그먼트별 구매 전환율 (세션 수 상위 20)',
+                xaxis_title='',
+                yaxis_title='CVR (%)',
+                height=400,
+                coloraxis_colorbar_title='세션 수',
+                margin=dict(l=10, r=10, t=50, b=50)
+            )
+            st.plotly_chart(fig_slice, use_container_width=True)
+
+        st.dataframe(
+            df_slice.rename(columns=CUBE_DIMENSIONS),
+            use_container_width=True, hide_index=True
+        )
+
+    # 교차 필터: 막대를 클릭하면 다른 차원의 분포가 그 값 기준으로 바뀜
+    if 'session_funnel' in data:
+        session_table = data.table('session_funnel')
+        session_index = load_session_index(session_table, data.version('session_funnel'))
+
+        st.markdown("---")
+        st.markdown("### 🔗 교차 필터")
+        st.caption("막대를 클릭(Shift+클릭으로 여러 개)하면 나머지 차트와 지표가 선택한 세션 기준으로 다시 집계됩니다. 세그먼트 분석 페이지와 필터를 공유합니다.")
+        render_cross_filter(
+            session_index,
+            ['device_category', 'session_hour', 'session_day_of_week', 'session_source'],
+            key='overview_xf'
+        )
+
+        # 구매 소요 시간별 객단가 + 부트스트랩 95% 신뢰구간 (mart_time_to_conversion 과 같은 구간)
+        df_aov = load_session_intervals(session_table, data.version('session_funnel'))['aov']
+        if len(df_aov):
+            st.markdown("---")
+            st.markdown("### ⏱️ 구매 소요 시간별 객단가")
+            fig_aov = go.Figure(go.Bar(
+                x=df_aov['group'].astype(str),
+                y=df_aov['estimate'],
+                error_y=dict(
+                    type='data', symmetric=False,
+                    array=df_aov['ci_high'] - df_aov['estimate'],
+                    arrayminus=df_aov['estimate'] - df_aov['ci_low'],
+                ),
+                customdata=np.column_stack([df_aov['n'], df_aov['ci_low'], df_aov['ci_high']]),
+                hovertemplate='%{x}<br>객단가: $%{y:,.0f}<br>95% CI: $%{customdata[1]:,.0f} ~ $%{customdata[2]:,.0f}<br>구매 세션: %{customdata[0]:,}<extra></extra>',
+                marker_color='#3498db',
+            ))
+            fig_aov.update_layout(
+                xaxis_title='구매 소요 시간', yaxis_title='객단가 ($)',
+                height=400, margin=dict(l=10, r=10, t=30, b=50)
+            )
+            st.plotly_chart(fig_aov, use_container_width=True)
+            st.caption("📌 오차 막대: 세션 단위 Poisson 부트스트랩 95% 신뢰구간 (구매 세션이 적은 구간일수록 넓음)")
+
+    # 구매 소요 시간 / 주문 금액 분포: ga4_engine.quantile_sketch 의 일자 x 기기 x 유입 소스별 스케치를 합쳐 계산
+    if 'conversion_sketch' in data:
+        df_sketch = data['conversion_sketch']
+        dates = pd.to_datetime(df_sketch['session_date']).dt.date
+
+        st.markdown("---")
+        st.markdown("### 📏 구매 소요 시간 · 주문 금액 분포")
+        st.caption("일자·기기·유입 소스별로 저장한 분포 스케치를 선택한 기간/필터만 합쳐서 분위수와 구간 분포를 계산합니다 (이벤트 재집계 없음).")
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            sketch_dates = st.date_input("기간", (dates.min(), dates.max()), min_value=dates.min(), max_value=dates.max(), key='sketch_dates')
+        with col2:
+            sketch_devices = st.multiselect("기기 필터", sorted(df_sketch['device_category'].unique()), key='sketch_devices')
+        with col3:
+            sketch_sources = st.multiselect("유입 소스 필터", sorted(df_sketch['session_source'].unique()), key='sketch_sources')
+
+        start, end = (sketch_dates[0], sketch_dates[-1]) if len(sketch_dates) else (dates.min(), dates.max())
+        selected = df_sketch[(dates >= start) & (dates <= end)]
+        if sketch_devices:
+            selected = selected[selected['device_category'].isin(sketch_devices)]
+        if sketch_sources:
+            selected = selected[selected['session_source'].isin(sketch_sources)]
+        minutes = QuantileSketch.from_rows(selected[selected['metric'] == 'minutes_to_buy'])
+        order_value = QuantileSketch.from_rows(selected[selected['metric'] == 'order_value'])
+
+        if minutes.count:
+            percentiles = [10, 25, 50, 75, 90, 95, 99]
+            col1, col2 = st.columns(2)
+            with col1:
+                st.dataframe(pd.DataFrame({
+                    '분위': [f"p{p}" for p in percentiles],
+                    '구매 소요 시간 (분)': minutes.quantile(np.array(percentiles) / 100),
+                    '주문 금액 ($)': order_value.quantile(np.array(percentiles) / 100).round(1),
+                }), use_container_width=True, hide_index=True)
+                st.caption(f"구매 세션 {minutes.count:,}개 · 평균 소요 {minutes.mean:.1f}분 · 객단가 ${order_value.mean:,.0f} "
+                           f"· 순위 오차 최대 ±{minutes.max_error:,.0f}건")
+            with col2:
+                edges_text = st.text_input("소요 시간 구간 경계 (분)", "0, 5, 15, 30, 60", key='sketch_edges')
+                try:
+                    edges = sorted({float(edge) for edge in edges_text.split(',') if edge.strip()})
+                except ValueError:
+                    edges = [0, 5, 15, 30, 60]
+                    st.warning("숫자를 쉼표로 구분해 입력하세요. 기본 구간으로 표시합니다.")
+                edges = edges + [np.inf]
+                counts = minutes.histogram(edges)
+                labels = [f"{lo:g}-{hi:g}분" if np.isfinite(hi) else f"{lo:g}분 이상" for lo, hi in zip(edges[:-1], edges[1:])]
+                fig_hist = go.Figure(go.Bar(x=labels, y=counts, marker_color='#3498db', text=counts, textposition='outside'))
+                fig_hist.update_layout(
+                    xaxis_title='구매 소요 시간', yaxis_title='구매 세션 수',
+                    height=350, margin=dict(l=10, r=10, t=30, b=50)
+                )
+                st.plotly_chart(fig_hist, use_container_width=True)
+        else:
+            st.info("선택한 기간/필터에 구매 세션이 없습니다.")
+
+    # 경로 흐름 Sankey: ga4_engine.path_flow 가 만든 상위 경로 + 첫 이벤트별 기타 경로
+    if 'path_flow' in data:
+        df_flow = data['path_flow']
+        max_rank = int(df_flow['path_rank'].max())
+
+        st.markdown("---")
+        st.markdown("### 🔀 세션 경로 흐름")
+        st.caption("scroll / user_engagement 를 빼고 연속 반복 이벤트를 하나로 합친 경로입니다. 상위 N 개 외의 경로는 첫 이벤트 뒤 '기타 경로'로 묶입니다.")
+
+        if max_rank > 0:
+            flow_top_n = st.slider("표시할 상위 경로 수", 1, max_rank, min(15, max_rank), key='flow_top_n')
+            df_nodes, df_links = sankey(df_flow, top_n=flow_top_n)
+            fig_flow = go.Figure(go.Sankey(
+                arrangement='snap',
+                node=dict(
+                    label=df_nodes['label'],
+                    hovertemplate='%{label}<br>세션: %{value:,}<extra></extra>',
+                    pad=12, thickness=14,
+                ),
+                link=dict(
+                    source=df_links['source'],
+                    target=df_links['target'],
+                    value=df_links['sessions'],
+                    hovertemplate='%{source.label} → %{target.label}<br>세션: %{value:,}<extra></extra>',
+                ),
+            ))
+            fig_flow.update_layout(height=520, margin=dict(l=10, r=10, t=30, b=30))
+            st.plotly_chart(fig_flow, use_container_width=True)
+
+            st.dataframe(
+                df_flow[~df_flow['is_other'] & (df_flow['path_rank'] <= flow_top_n)]
+                    [['path_rank', 'path', 'sessions', 'session_share']]
+                    .rename(columns={'path_rank': '순위', 'path': '경로', 'sessions': '세션 수', 'session_share': '비중 (%)'}),
+                use_container_width=True, hide_index=True
+            )
+
 # ----- 3. 진성 유저 식별 -----
 elif page == "🎯 진성 유저 식별":
     st.header("🎯 진성 유저 식별: Engagement Scoring")
@@ -546,12 +876,36 @@ elif page == "🎯 진성 유저 식별":
         - **Lift = 11.8배** → 장바구니 담으면 구매 확률 11.8배
         """)
         
-        lift_data = {
-            '행동': ['view_item', 'add_to_cart', 'begin_checkout', 'add_payment_info'],
-            'Lift': ['4.6x', '11.8x', '30.6x', '46.5x'],
-            '점수': ['5점', '12점', '31점', '47점']
-        }
+        if 'session_funnel' in data:
+            # 세션 단위로 다시 계산한 Lift + 95% 신뢰구간 (부트스트랩 / 베이지안)
+            session_table = data.table('session_funnel')
+            df_lift = load_session_intervals(session_table, data.version('session_funnel'))['lift']
+            lift_data = {
+                '행동': df_lift['signal'],
+                'Lift': df_lift['estimate'].map('{:.1f}x'.format),
+                '95% CI (부트스트랩)': [f"{lo:.1f} ~ {hi:.1f}" for lo, hi in zip(df_lift['ci_low'], df_lift['ci_high'])],
+                '95% CI (베이지안)': [f"{lo:.1f} ~ {hi:.1f}" for lo, hi in zip(df_lift['bayes_low'], df_lift['bayes_high'])],
+            }
+            if 'engagement_weights' in data:
+                # 점수는 위 추정치를 반올림하지 않고, 참여 점수 모델이 실제로 곱한 가중치를 그대로 표시
+                df_weights = data['engagement_weights']
+                weekly = df_weights['weight_week'].notna().any()
+                scores = {
+                    signal: f"{w.iloc[-1]}점" + (f" (주별 {w.min()}~{w.max()})" if weekly else "")
+                    for signal, w in df_weights.sort_values('weight_week').groupby('signal')['weight']
+                }
+                lift_data['점수'] = df_lift['signal'].map(scores).fillna('-')
+            lift_data['세션 수'] = df_lift['n'].astype(int)
+        else:
+            lift_data = {
+                '행동': ['view_item', 'add_to_cart', 'begin_checkout', 'add_payment_info'],
+                'Lift': ['4.6x', '11.8x', '30.6x', '46.5x'],
+                '점수': ['5점', '12점', '31점', '47점']
+            }
         st.dataframe(pd.DataFrame(lift_data), use_container_width=True, hide_index=True)
+        if 'engagement_weights' in data:
+            st.caption("점수: 참여 점수(int_engage_lift_score)에 실제로 곱해진 가중치 (mart_engagement_weights). "
+                       "주별 재보정이면 가장 최근 주 값과 주별 범위입니다.")
         
         # SQL Expander 추가
         with st.expander("📐 SQL: Lift 계산 쿼리 (int_lift_weight.sql)"):
@@ -619,17 +973,17 @@ ORDER BY lift DESC
         
         st.code("""
 -- int_engage_lift_score.sql
+-- 가중치 = 같은 빌드의 int_lift_weight Lift 반올림 (그 외 이벤트 1점)
 SELECT
-    session_unique_id,
-    SUM(CASE 
-        WHEN event_name = 'view_item' THEN 5
-        WHEN event_name = 'add_to_cart' THEN 12
-        WHEN event_name = 'begin_checkout' THEN 31
-        WHEN event_name = 'add_payment_info' THEN 47
-        ELSE 1
-    END) AS engagement_score
-FROM stg_events
-GROUP BY 1
+    f.session_unique_id,
+    f.view_item_events * w.w_view
+        + f.search_events * w.w_search
+        + f.add_to_cart_events * w.w_cart
+        + f.begin_checkout_events * w.w_checkout
+        + f.add_payment_info_events * w.w_payment
+        + other_events AS engagement_score
+FROM fct_sessions f
+CROSS JOIN weights w  -- engagement_weight_grain: week 이면 주별 가중치와 조인
         """, language="sql")
     
     with col2:
@@ -651,6 +1005,78 @@ GROUP BY 1
         </div>
         """, unsafe_allow_html=True)
 
+    # 마르코프 체인 기여도: ga4_engine.markov_attribution 이 만든 제거 효과 (이벤트 경로 / 사용자 채널 경로)
+    if 'markov_attribution' in data:
+        df_markov = data['markov_attribution']
+        models = {'event': '이벤트 (세션 경로)', 'channel': '유입 채널 (사용자 세션 경로)'}
+        available = [model for model in models if (df_markov['model'] == model).any()]
+
+        st.markdown("---")
+        st.markdown("### 🔗 마르코프 체인 기여도")
+        st.caption("경로 전체의 전이 확률로 계산한 제거 효과(그 단계를 지우면 전환 확률이 얼마나 줄어드는가)를 전체 전환 수에 배분했습니다. last-touch 는 전환 직전 상태에 전환을 모두 줍니다.")
+
+        if available:
+            markov_model = st.radio("경로 기준", available, format_func=models.get, horizontal=True, key='markov_model')
+            df_model = df_markov[df_markov['model'] == markov_model].head(15)
+            fig_markov = go.Figure([
+                go.Bar(name='마르코프 (제거 효과)', x=df_model['state'], y=df_model['attributed_conversions'], marker_color='#1a73e8'),
+                go.Bar(name='Last-touch', x=df_model['state'], y=df_model['last_touch_conversions'], marker_color='#c5cae9'),
+            ])
+            fig_markov.update_layout(
+                barmode='group', xaxis_title='', yaxis_title='기여 전환 수',
+                height=400, margin=dict(l=10, r=10, t=30, b=50), legend=dict(orientation='h', y=1.1)
+            )
+            st.plotly_chart(fig_markov, use_container_width=True)
+            st.dataframe(
+                df_model[['state', 'visits', 'removal_effect', 'attribution_share', 'attributed_conversions', 'last_touch_conversions']]
+                    .assign(removal_effect=lambda d: (d['removal_effect'] * 100).round(1),
+                            attribution_share=lambda d: (d['attribution_share'] * 100).round(1),
+                            attributed_conversions=lambda d: d['attributed_conversions'].round(1))
+                    .rename(columns={'state': '상태', 'visits': '방문 수', 'removal_effect': '제거 효과 (%)',
+                                     'attribution_share': '기여 비중 (%)', 'attributed_conversions': '기여 전환 수',
+                                     'last_touch_conversions': 'Last-touch 전환 수'}),
+                use_container_width=True, hide_index=True
+            )
+
+    # 사용자 여정: mart_user_journey (master_id 단위로 세션을 이어 본 첫 구매까지의 세션 수 / 일수)
+    if 'user_journey' in data:
+        df_journey = data['user_journey']
+        buyers = df_journey[df_journey['sessions_to_purchase'].notna()]
+
+        st.markdown("---")
+        st.markdown("### 👣 사용자 여정 (세션 간)")
+        st.caption("같은 사용자(로그인 ID, 없으면 기기 ID)의 세션을 이어서, 첫 구매까지 몇 번 방문하고 며칠이 걸렸는지 봅니다.")
+
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("사용자 수", f"{len(df_journey):,}")
+        col2.metric("재방문 사용자 비율", f"{(df_journey['sessions'] > 1).mean() * 100:.1f}%")
+        col3.metric("첫 구매까지 세션 (중앙값)", f"{buyers['sessions_to_purchase'].median():.0f}회" if len(buyers) else "-")
+        col4.metric("첫 구매까지 일수 (중앙값)", f"{buyers['days_to_purchase'].median():.1f}일" if len(buyers) else "-")
+
+        if len(buyers):
+            col1, col2 = st.columns(2)
+            with col1:
+                visits = buyers['sessions_to_purchase'].clip(upper=5).value_counts().sort_index()
+                fig_visits = go.Figure(go.Bar(
+                    x=[f"{int(n)}회" if n < 5 else "5회 이상" for n in visits.index], y=visits.values,
+                    marker_color='#1a73e8', text=visits.values, textposition='outside'
+                ))
+                fig_visits.update_layout(
+                    title='첫 구매 세션 번호', yaxis_title='구매 사용자 수',
+                    height=350, margin=dict(l=10, r=10, t=40, b=30)
+                )
+                st.plotly_chart(fig_visits, use_container_width=True)
+            with col2:
+                touch = (buyers.groupby(['first_touch_source', 'purchase_touch_source'], observed=True)
+                         .size().rename('buyers').reset_index()
+                         .sort_values('buyers', ascending=False).head(10))
+                st.markdown("**첫 유입 → 구매 세션 유입 (상위 10)**")
+                st.dataframe(
+                    touch.rename(columns={'first_touch_source': '첫 유입', 'purchase_touch_source': '구매 세션 유입',
+                                          'buyers': '구매 사용자 수'}),
+                    use_container_width=True, hide_index=True
+                )
+
 # ----- 4. 세그먼트 분석 -----
 elif page == "🔍 세그먼트 분석":
     st.header("🔍 세그먼트 분석")
@@ -674,7 +1100,7 @@ elif page == "🔍 세그먼트 분석":
     (전체 {total_all_sessions:,} 세션 중 {segment_total_sessions:,} 세션 = {segment_pct:.1f}%)
     """)
     
-    tab1, tab2, tab3 = st.tabs(["📊 세그먼트 분류", "🔴 Deep Specialist 분석", "🟢 Variety Seeker 분석"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 세그먼트 분류", "🔴 Deep Specialist 분석", "🟢 Variety Seeker 분석", "🔗 교차 필터", "🧭 자동 탐색"])
     
     with tab1:
         col1, col2 = st.columns([1, 1.2])
@@ -811,12 +1237,9 @@ elif page == "🔍 세그먼트 분석":
                 fig = go.Figure()
                 colors = ['#27ae60', '#e74c3c', '#95a5a6']
                 
+                ci_minus, ci_plus = segment_error_bars(df)
                 for i, row in df.iterrows():
-                    sessions = row['session_count']
                     cvr = row['conversion_rate']
-                    conversions = int(sessions * cvr / 100)
-                    
-                    rate, ci_low, ci_high = calculate_confidence_interval(conversions, sessions)
                     
                     fig.add_trace(go.Bar(
                         name=row['browsing_style'],
@@ -826,8 +1249,8 @@ elif page == "🔍 세그먼트 분석":
                         error_y=dict(
                             type='data',
                             symmetric=False,
-                            array=[ci_high - cvr],
-                            arrayminus=[cvr - ci_low],
+                            array=[ci_plus[i]],
+                            arrayminus=[ci_minus[i]],
                             color='black',
                             thickness=2,
                             width=6
@@ -934,18 +1357,12 @@ elif page == "🔍 세그먼트 분석":
             fig = go.Figure()
             
             # 각 세그먼트별 신뢰구간 계산
-            ci_lows = []
-            ci_highs = []
-            for _, row in df_deep.iterrows():
-                sessions = row['session_count']
-                cvr = row['conversion_rate']
-                conversions = int(sessions * cvr / 100)
-                _, ci_low, ci_high = calculate_confidence_interval(conversions, sessions)
-                ci_lows.append(cvr - ci_low)
-                ci_highs.append(ci_high - cvr)
-            
-            colors = ['#27ae60' if r['conversion_rate'] > 4 else '#f39c12' if r['conversion_rate'] > 2 else '#e74c3c' 
-                      for _, r in df_deep.iterrows()]
+            ci_lows, ci_highs = segment_error_bars(df_deep)
+            
+            colors = np.select(
+                [df_deep['conversion_rate'] > 4, df_deep['conversion_rate'] > 2],
+                ['#27ae60', '#f39c12'], default='#e74c3c'
+            ).tolist()
             
             fig.add_trace(go.Bar(
                 x=df_deep['depth_segment'],
@@ -984,18 +1401,8 @@ elif page == "🔍 세그먼트 분석":
                 focus_cvr = focus_row['conversion_rate'].values[0]
                 focus_share = focus_row['share_percent'].values[0]
                 
-                # 4x2 분할표 생성
-                contingency_table = []
-                for _, row in df_deep.iterrows():
-                    sessions = row['session_count']
-                    cvr = row['conversion_rate']
-                    conversions = int(sessions * cvr / 100)
-                    non_conversions = sessions - conversions
-                    contingency_table.append([conversions, non_conversions])
-                
                 # χ² 검정 (4x2 분할표)
-                contingency_array = np.array(contingency_table)
-                chi2_deep, p_value_deep, dof, expected = stats.chi2_contingency(contingency_array)
+                chi2_deep, p_value_deep, dof = segment_stats.chi2_2xk(*segment_conversions(df_deep))
                 p_display_deep = "0.001 미만" if p_value_deep < 0.001 else f"{p_value_deep:.4f}"
                 
                 st.markdown(f"""
@@ -1070,15 +1477,7 @@ elif page == "🔍 세그먼트 분석":
             fig = go.Figure()
             
             # 각 세그먼트별 신뢰구간 계산
-            ci_lows_v = []
-            ci_highs_v = []
-            for _, row in df_variety.iterrows():
-                sessions = row['session_count']
-                cvr = row['conversion_rate']
-                conversions = int(sessions * cvr / 100)
-                _, ci_low, ci_high = calculate_confidence_interval(conversions, sessions)
-                ci_lows_v.append(cvr - ci_low)
-                ci_highs_v.append(ci_high - cvr)
+            ci_lows_v, ci_highs_v = segment_error_bars(df_variety)
             
             fig.add_trace(go.Bar(
                 x=df_variety['intensity_segment'],
@@ -1158,15 +1557,7 @@ elif page == "🔍 세그먼트 분석":
                 """, unsafe_allow_html=True)
                 
                 # 4개 구간 전체 χ² 검정 (4x2 분할표)
-                contingency_table_v = []
-                for _, row in df_variety.iterrows():
-                    sessions = row['session_count']
-                    cvr = row['conversion_rate']
-                    conversions = int(sessions * cvr / 100)
-                    non_conversions = sessions - conversions
-                    contingency_table_v.append([conversions, non_conversions])
-                
-                chi2_all, p_all, dof_all, _ = stats.chi2_contingency(np.array(contingency_table_v))
+                chi2_all, p_all, dof_all = segment_stats.chi2_2xk(*segment_conversions(df_variety))
                 p_display_all = "0.001 미만" if p_all < 0.001 else f"{p_all:.4f}"
                 
                 st.markdown(f"""
@@ -1197,6 +1588,79 @@ elif page == "🔍 세그먼트 분석":
             </div>
             """, unsafe_allow_html=True)
 
+    with tab4:
+        st.subheader("🔗 세그먼트 교차 필터")
+
+        if 'session_funnel' in data:
+            session_table = data.table('session_funnel')
+            session_index = load_session_index(session_table, data.version('session_funnel'))
+
+            st.caption("브라우징 스타일·기기·회원 여부·시간대를 클릭으로 조합해 세그먼트별 세션 수와 전환율을 바로 비교합니다. 데이터 개요 페이지와 필터를 공유합니다.")
+            render_cross_filter(
+                session_index,
+                ['browsing_style', 'device_category', 'is_member', 'session_hour'],
+                key='segment_xf'
+            )
+        else:
+            st.info("mart_session_funnel 마트가 있어야 교차 필터를 사용할 수 있습니다.")
+
+    with tab5:
+        st.subheader("🧭 세그먼트 자동 탐색")
+
+        if 'session_funnel' in data:
+            session_table = data.table('session_funnel')
+            scanner = load_segment_scanner(session_table, data.version('session_funnel'))
+
+            st.caption(f"{'·'.join(SEGMENT_DIMENSIONS.get(dim, dim) for dim in scanner.dimensions)}의 모든 조합을 전체 평균과 비교해, 다중 비교 보정 후에도 유의하고 효과 크기가 큰 세그먼트를 찾습니다.")
+            targets = {
+                'has_purchase': '구매',
+                'has_add_to_cart': '장바구니',
+                'has_begin_checkout': '결제 시작',
+                'has_view_item': '상품 조회',
+            }
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                target = st.selectbox("목표 단계", [t for t in targets if t in scanner.flags], format_func=targets.get, key='scan_target')
+            with col2:
+                max_depth = st.slider("최대 조합 깊이", 1, len(scanner.dimensions), min(3, len(scanner.dimensions)), key='scan_depth')
+            with col3:
+                min_sessions = st.number_input("최소 세션 수", min_value=10, value=max(30, scanner.n_sessions // 200), step=10, key='scan_min_sessions')
+            with col4:
+                top_k = st.slider("상위 세그먼트 수", 5, 50, 15, key='scan_top_k')
+
+            result = scanner.scan(target, max_depth=max_depth, min_sessions=int(min_sessions), top_k=top_k)
+            result = result[result['significant']].assign(segment=lambda d: d['segment'].map(segment_label))
+
+            if len(result):
+                baseline = result['baseline'].iloc[0]
+                chart_df = result.assign(
+                    label=result['segment'].str.replace(' · ', '<br>'),
+                    direction=np.where(result['cohens_h'] > 0, '평균 이상', '평균 이하'),
+                ).iloc[::-1]
+                fig = px.bar(
+                    chart_df, x='rate', y='label', orientation='h', color='direction',
+                    color_discrete_map={'평균 이상': '#2ecc71', '평균 이하': '#e74c3c'},
+                    error_x=chart_df['ci_high'] - chart_df['rate'],
+                    error_x_minus=chart_df['rate'] - chart_df['ci_low'],
+                    hover_data={'sessions': ':,', 'lift': ':.2f', 'q_value': ':.2e', 'label': False},
+                    labels={'rate': f"{targets[target]} 전환율 (%)", 'label': '', 'direction': ''},
+                )
+                fig.add_vline(x=baseline, line_dash='dash', line_color='gray', annotation_text=f"전체 {baseline:.2f}%")
+                fig.update_layout(height=max(400, 40 * len(chart_df)), margin=dict(l=10, r=10, t=30, b=10))
+                st.plotly_chart(fig, use_container_width=True)
+
+                st.dataframe(
+                    result[['segment', 'sessions', 'conversions', 'rate', 'lift', 'cohens_h', 'q_value']].rename(columns={
+                        'segment': '세그먼트', 'sessions': '세션', 'conversions': '전환',
+                        'rate': '전환율 (%)', 'lift': '향상도', 'cohens_h': "Cohen's h", 'q_value': 'q (BH)',
+                    }),
+                    use_container_width=True, hide_index=True,
+                )
+            else:
+                st.info("조건을 만족하는 유의한 세그먼트가 없습니다. 최소 세션 수를 낮추거나 조합 깊이를 늘려 보세요.")
+        else:
+            st.info("mart_session_funnel 마트가 있어야 자동 탐색을 사용할 수 있습니다.")
+
 # ----- 6. 이탈 & 기회 분석 -----
 elif page == "🛒 장바구니 & 프로모션":
     st.header("🛒 장바구니 & 프로모션 분석")
@@ -1536,6 +2000,35 @@ GROUP BY 1
                     
                     st.plotly_chart(fig2, use_container_width=True)
                     st.caption("📌 건당 손실 높음 = 고가 상품 결제 허들")
+
+            if 'cart_abandon_lines' in data:
+                # 총 손실 TOP 10 상품의 건당 손실 금액 + 부트스트랩 95% 신뢰구간
+                lines_table = data.table('cart_abandon_lines')
+                df_lost_ci = load_cart_intervals(lines_table, data.version('cart_abandon_lines'))
+                df_lost_ci = df_lost_ci.set_index('group').reindex(df_top['item_name']).dropna(subset=['estimate'])
+                if len(df_lost_ci):
+                    fig3 = go.Figure(go.Bar(
+                        x=df_lost_ci['estimate'],
+                        y=df_lost_ci.index,
+                        orientation='h',
+                        error_x=dict(
+                            type='data', symmetric=False,
+                            array=df_lost_ci['ci_high'] - df_lost_ci['estimate'],
+                            arrayminus=df_lost_ci['estimate'] - df_lost_ci['ci_low'],
+                        ),
+                        customdata=np.column_stack([df_lost_ci['n'], df_lost_ci['ci_low'], df_lost_ci['ci_high']]),
+                        hovertemplate='%{y}<br>건당 손실: $%{x:,.0f}<br>95% CI: $%{customdata[1]:,.0f} ~ $%{customdata[2]:,.0f}<br>이탈 건수: %{customdata[0]:,}<extra></extra>',
+                        marker_color='#e67e22',
+                    ))
+                    fig3.update_layout(
+                        title='💵 총 손실 TOP 10 상품의 건당 손실 (95% 신뢰구간)',
+                        xaxis_title='건당 손실 ($)',
+                        yaxis={'categoryorder': 'array', 'categoryarray': list(df_lost_ci.index[::-1])},
+                        height=450,
+                        margin=dict(l=10, r=80, t=50, b=50)
+                    )
+                    st.plotly_chart(fig3, use_container_width=True)
+                    st.caption("📌 이탈 건수가 적은 상품은 구간이 넓어 건당 손실 순위를 그대로 믿기 어려움")
             
             st.markdown("---")
             
@@ -2038,6 +2531,7 @@ models/
     ├── mart_core_sessions.sql
     ├── mart_deep_specialists.sql
     ├── mart_device_friction.sql
+    ├── mart_engagement_weights.sql
     ├── mart_funnel_*.sql (7개)
     ├── mart_promo_quality.sql
     ├── mart_time_to_conversion.sql
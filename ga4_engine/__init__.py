@@ -0,0 +1,5 @@
+"""GA4 dbt 프로젝트 로컬 실행/분석 도구 모음
+
+각 모듈은 `python -m ga4_engine.<module>` 으로 단독 실행할 수 있도록 패키지 import 시점에는
+하위 모듈을 불러오지 않는다.
+"""
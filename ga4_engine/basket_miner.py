@@ -0,0 +1,402 @@
+"""장바구니 빈발 조합 / 연관 규칙 채굴기 (FP-Growth, 메모리 상한 + 프로세스 풀)
+
+stg_events 의 구매 행 (event_name, transaction_id, item_name) 모양 Parquet 를 청크 단위로 읽어
+2개 이상 상품 조합(itemset)과 연관 규칙(A + B → C)을 찾는다. SQL 의 int_product_association 은
+2~3개 조합까지만 다루므로, 그보다 긴 번들은 여기서 계산해 mart_bundle_itemsets / mart_bundle_rules 로 내보낸다.
+
+처리 단계 (한 번에 메모리에 올리는 양은 memory_budget 기준으로 나눈 조각 하나):
+1. 스필: 배치마다 상품명 → 정수 코드, transaction_id 해시로 파티션을 나눠 임시 파일에 기록
+   (같은 거래는 항상 같은 파티션이므로 파티션 단위로 장바구니를 완성할 수 있음)
+2. 파티션별 (거래, 상품) 중복 제거 후 상품별 거래 수 → min_support 이상 상품만 빈도순 순위 부여
+3. 샤딩 (PFP): 상품을 n_groups 개 그룹으로 나누고, 각 거래를 순위순으로 정렬해 그룹마다
+   "그 그룹 상품이 마지막으로 나오는 위치까지의 접두사"만 그룹 샤드에 기록
+   → 그룹 g 상품의 조건부 패턴 베이스(conditional pattern base)는 샤드 g 만으로 완결된다
+4. 채굴: 프로세스 풀에서 샤드마다 FP-tree 를 만들고 그룹 상품별 조건부 트리로 재귀 채굴
+
+FP-tree 는 노드 배열(parent, item, count)로 두고, 깊이별로 (부모 노드, 상품) 키를 np.unique 해서
+만든다 (거래를 하나씩 삽입하는 파이썬 루프 없음). 같은 접두사를 가진 거래는 노드 하나로 합쳐진다.
+
+사용 예:
+    python -m ga4_engine.basket_miner --baskets "exports/stg_events/*.parquet" \\
+        --min-support 20 --max-len 4 --min-confidence 0.2 --out mart_tables
+"""
+import argparse
+import glob
+import math
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.ipc as ipc
+
+from .mart_store import MartStore
+
+COLUMNS = ["transaction_id", "item_name"]
+# 파티션/샤드 크기 추정용 행당 바이트 (거래 ID 문자열 + 상품 코드 + 정렬·중복 제거 작업 공간)
+ROW_BYTES = 96
+
+
+# ===== FP-tree =====
+class FPTree:
+    """노드 배열 FP-tree (0번 노드가 root, item 은 빈도 순위)"""
+
+    def __init__(self, parent, item, count):
+        self.parent = parent
+        self.item = item
+        self.count = count
+        # 상품별 노드 목록 (node-link 대신 상품순 정렬 인덱스, root(-1)는 맨 앞)
+        self._order = np.argsort(item, kind="stable")
+        self._bounds = np.searchsorted(item[self._order], np.arange(int(item.max()) + 2))
+
+    @classmethod
+    def build(cls, offsets, items, weights):
+        """CSR 거래 목록 (각 거래 내 상품은 순위 오름차순) → FP-tree"""
+        lengths = np.diff(offsets)
+        by_length = np.argsort(-lengths, kind="stable")
+        starts = offsets[:-1][by_length]
+        lengths = lengths[by_length]
+        weights = weights[by_length]
+        radix = int(items.max()) + 1 if len(items) else 1
+
+        parents, node_items, counts = [np.array([-1])], [np.array([-1])], [np.array([0.0])]
+        n_nodes = 1
+        node = np.zeros(len(lengths), dtype=np.int64)
+        for depth in range(int(lengths[0]) if len(lengths) else 0):
+            # 길이 내림차순이므로 깊이 depth 까지 살아있는 거래는 앞쪽 alive 개
+            alive = int(np.searchsorted(-lengths, -depth, side="left"))
+            key = node[:alive] * radix + items[starts[:alive] + depth]
+            unique, inverse = np.unique(key, return_inverse=True)
+            parents.append(unique // radix)
+            node_items.append(unique % radix)
+            counts.append(np.bincount(inverse, weights=weights[:alive], minlength=len(unique)))
+            node[:alive] = n_nodes + inverse
+            n_nodes += len(unique)
+        return cls(np.concatenate(parents), np.concatenate(node_items), np.concatenate(counts))
+
+    def nodes(self, item):
+        if not 0 <= item < len(self._bounds) - 1:
+            return np.empty(0, dtype=np.int64)
+        return self._order[self._bounds[item]:self._bounds[item + 1]]
+
+    def support(self, item):
+        return float(self.count[self.nodes(item)].sum())
+
+    def prefix_paths(self, item):
+        """item 노드들의 root 까지 경로 (조건부 패턴 베이스) → CSR (offsets, items, weights)"""
+        nodes = self.nodes(item)
+        weights = self.count[nodes]
+        path_ids, path_items = [], []
+        path = np.arange(len(nodes))
+        current = self.parent[nodes]
+        while len(current):
+            keep = current > 0
+            current, path = current[keep], path[keep]
+            path_ids.append(path)
+            path_items.append(self.item[current])
+            current = self.parent[current]
+        path_ids = np.concatenate(path_ids) if path_ids else np.empty(0, dtype=np.int64)
+        path_items = np.concatenate(path_items) if path_items else np.empty(0, dtype=np.int64)
+        order = np.lexsort((path_items, path_ids))
+        offsets = np.zeros(len(nodes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(path_ids, minlength=len(nodes)), out=offsets[1:])
+        return offsets, path_items[order], weights
+
+
+def _filter_infrequent(offsets, items, weights, min_count):
+    """조건부 베이스에서 지지도 미달 상품 제거 → (offsets, items, weights, 상품별 지지도)"""
+    lengths = np.diff(offsets)
+    owner = np.repeat(np.arange(len(lengths)), lengths)
+    support = np.bincount(items, weights=weights[owner]) if len(items) else np.zeros(0)
+    keep = support[items] >= min_count
+    if not keep.all():
+        items = items[keep]
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(owner[keep], minlength=len(lengths)), out=offsets[1:])
+    return offsets, items, weights, support
+
+
+def _mine(tree, items, suffix, min_count, max_len, out):
+    """tree 에서 items 각각을 접미사에 붙인 빈발 조합을 재귀로 수집"""
+    for item in items:
+        support = tree.support(item)
+        itemset = (item,) + suffix
+        out.append((itemset, support))
+        if len(itemset) >= max_len:
+            continue
+        offsets, path_items, weights, local = _filter_infrequent(*tree.prefix_paths(item), min_count)
+        frequent = np.flatnonzero(local >= min_count)
+        if len(itemset) + 1 >= max_len:
+            # 마지막 단계는 조건부 베이스의 상품별 지지도가 곧 결과 (트리를 만들 필요 없음)
+            out.extend(((f,) + itemset, local[f]) for f in frequent)
+        elif len(frequent):
+            _mine(FPTree.build(offsets, path_items, weights), frequent, itemset, min_count, max_len, out)
+
+
+def _mine_shard(path, group, n_groups, min_count, max_len):
+    """프로세스 풀 작업: 샤드 하나 → 그룹 상품을 마지막 원소로 하는 빈발 조합 목록"""
+    with pa.memory_map(path) as source:
+        table = ipc.open_file(source).read_all()
+    baskets = table.column("items").combine_chunks()
+    offsets = baskets.offsets.to_numpy().astype(np.int64)
+    items = baskets.values.to_numpy().astype(np.int64)
+    offsets, items = offsets - offsets[0], items[offsets[0]:offsets[-1]]
+    weights = table.column("weight").to_numpy().astype(np.float64)
+
+    offsets, items, weights, support = _filter_infrequent(offsets, items, weights, min_count)
+    owned = np.flatnonzero(support >= min_count)
+    owned = owned[owned % n_groups == group]
+    out = []
+    if len(owned):
+        _mine(FPTree.build(offsets, items, weights), owned, (), min_count, max_len, out)
+    return out
+
+
+# ===== 스필 / 샤딩 =====
+def _scan(paths, batch_rows):
+    dataset = ds.dataset(paths, format="parquet")
+    condition = pc.field("transaction_id").is_valid() & pc.field("item_name").is_valid()
+    if "event_name" in dataset.schema.names:
+        condition = condition & (pc.field("event_name") == "purchase")
+    return dataset, dataset.scanner(columns=COLUMNS, filter=condition, batch_size=batch_rows)
+
+
+def _dedupe_partition(path):
+    """스필 파티션 → (거래 번호, 상품 코드) 중복 제거 후 거래 번호순 정렬 (거래 번호는 파티션 내 0..n-1)"""
+    with pa.memory_map(path) as source:
+        table = ipc.open_stream(source).read_all()
+    if not table.num_rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), 0
+    txn = pc.dictionary_encode(table.column("transaction_id").combine_chunks())
+    radix = int(pc.max(table.column("item")).as_py()) + 1
+    pairs = txn.indices.to_numpy().astype(np.int64) * radix + table.column("item").to_numpy()
+    pairs.sort()
+    pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]]
+    return pairs // radix, pairs % radix, len(txn.dictionary)
+
+
+class BasketMiner:
+    """Parquet 구매 행 → 빈발 조합 / 연관 규칙
+
+    min_support 가 1 이상이면 거래 수, 1 미만이면 전체 거래 대비 비율.
+    memory_budget(바이트)은 스필 파티션과 그룹 샤드 하나의 목표 크기이며, 워커마다 샤드 하나씩 올라간다.
+    """
+
+    def __init__(self, min_support=20, max_len=4, memory_budget=512 << 20, workers=None, batch_rows=1 << 20, tmp_dir=None):
+        self.min_support = min_support
+        self.max_len = max_len
+        self.memory_budget = memory_budget
+        self.workers = workers or os.cpu_count()
+        self.batch_rows = batch_rows
+        self.tmp_dir = tmp_dir
+
+    def _spill(self, paths, work_dir):
+        dataset, scanner = _scan(paths, self.batch_rows)
+        n_partitions = max(1, math.ceil(dataset.count_rows() * ROW_BYTES / self.memory_budget))
+        schema = pa.schema([("transaction_id", pa.string()), ("item", pa.int32())])
+        files = [os.path.join(work_dir, f"part-{p:04d}.arrow") for p in range(n_partitions)]
+        writers = [ipc.new_stream(path, schema) for path in files]
+        vocabulary = {}
+        try:
+            for batch in scanner.to_batches():
+                if not batch.num_rows:
+                    continue
+                names = pc.dictionary_encode(batch.column("item_name"))
+                mapping = np.array([vocabulary.setdefault(name, len(vocabulary)) for name in names.dictionary.to_pylist()], dtype=np.int32)
+                codes = mapping[names.indices.to_numpy()]
+                txn = batch.column("transaction_id").cast(pa.string())
+                partition = pd.util.hash_array(txn.to_numpy(zero_copy_only=False)) % n_partitions
+                for p in np.unique(partition):
+                    mask = partition == p
+                    writers[p].write_table(pa.table({"transaction_id": txn.filter(mask), "item": codes[mask]}, schema=schema))
+        finally:
+            for writer in writers:
+                writer.close()
+        return files, list(vocabulary)
+
+    def _count(self, files, n_items):
+        """파티션별 중복 제거 + 상품별 거래 수. 중복 제거 결과는 정수 배열로 다시 기록 (문자열 ID 는 버림)"""
+        support = np.zeros(n_items, dtype=np.int64)
+        n_transactions = rows = 0
+        deduped = []
+        for path in files:
+            txn, items, n = _dedupe_partition(path)
+            support += np.bincount(items, minlength=n_items)
+            n_transactions += n
+            rows += len(items)
+            os.remove(path)
+            np.save(path + ".npy", np.stack([txn, items]).astype(np.int32))
+            deduped.append(path + ".npy")
+        return deduped, support, n_transactions, rows
+
+    def _shard(self, files, rank, n_groups, work_dir):
+        """파티션별 거래를 순위순으로 정렬 → 그룹 g 마다 마지막 g 상품까지의 접두사를 샤드 g 에 기록"""
+        shard_files = [os.path.join(work_dir, f"shard-{g:04d}.arrow") for g in range(n_groups)]
+        schema = pa.schema([("items", pa.list_(pa.int32())), ("weight", pa.int32())])
+        writers = [ipc.new_file(path, schema) for path in shard_files]
+        try:
+            for path in files:
+                txn, items = np.load(path)
+                ranks = rank[items]
+                keep = ranks >= 0
+                txn, ranks = txn[keep], ranks[keep]
+                # 거래 번호순은 이미 정렬되어 있으므로 거래 안에서 순위순으로만 다시 정렬
+                order = np.lexsort((ranks, txn))
+                txn, ranks = txn[order], ranks[order]
+                if not len(ranks):
+                    continue
+                starts = np.flatnonzero(np.r_[True, txn[1:] != txn[:-1]])
+                owner = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(txn)]))
+                # (거래, 그룹) 별 마지막 위치: 뒤집은 배열에서 키가 처음 나오는 곳
+                key = owner * n_groups + ranks % n_groups
+                keys, first = np.unique(key[::-1], return_index=True)
+                owners, groups, last = keys // n_groups, keys % n_groups, len(key) - 1 - first
+                by_group = np.argsort(groups, kind="stable")
+                bounds = np.searchsorted(groups[by_group], np.arange(n_groups + 1))
+                for g in range(n_groups):
+                    picked = by_group[bounds[g]:bounds[g + 1]]
+                    if not len(picked):
+                        continue
+                    begin, end = starts[owners[picked]], last[picked] + 1
+                    offsets = np.zeros(len(picked) + 1, dtype=np.int32)
+                    np.cumsum(end - begin, out=offsets[1:])
+                    index = np.repeat(begin - offsets[:-1], end - begin) + np.arange(offsets[-1])
+                    values = pa.array(ranks[index].astype(np.int32))
+                    writers[g].write_table(pa.table({
+                        "items": pa.ListArray.from_arrays(pa.array(offsets), values),
+                        "weight": np.ones(len(picked), dtype=np.int32),
+                    }, schema=schema))
+        finally:
+            for writer in writers:
+                writer.close()
+        return shard_files
+
+    def mine(self, paths):
+        """빈발 조합 DataFrame (itemset 튜플, size, transactions, support) 과 메타 정보"""
+        paths = sorted(glob.glob(paths)) if isinstance(paths, str) else list(paths)
+        if not paths:
+            raise FileNotFoundError("장바구니 Parquet 파일이 없습니다")
+        work_dir = tempfile.mkdtemp(prefix="basket_miner_", dir=self.tmp_dir)
+        try:
+            files, names = self._spill(paths, work_dir)
+            files, support, n_transactions, rows = self._count(files, len(names))
+            min_count = self.min_support if self.min_support >= 1 else math.ceil(self.min_support * n_transactions)
+            frequent = np.flatnonzero(support >= min_count)
+            frequent = frequent[np.argsort(-support[frequent], kind="stable")]
+            rank = np.full(len(names), -1, dtype=np.int64)
+            rank[frequent] = np.arange(len(frequent))
+
+            n_groups = max(self.workers * 4, math.ceil(rows * ROW_BYTES / self.memory_budget))
+            n_groups = max(1, min(n_groups, len(frequent)))
+            shards = self._shard(files, rank, n_groups, work_dir)
+            results = []
+            if self.workers > 1 and n_groups > 1:
+                with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                    futures = [pool.submit(_mine_shard, path, g, n_groups, min_count, self.max_len) for g, path in enumerate(shards)]
+                    for future in futures:
+                        results.extend(future.result())
+            else:
+                for g, path in enumerate(shards):
+                    results.extend(_mine_shard(path, g, n_groups, min_count, self.max_len))
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        item_names = np.array(names, dtype=object)[frequent]
+        itemsets = pd.DataFrame({
+            "itemset": [tuple(item_names[list(itemset)]) for itemset, _ in results],
+            "transactions": np.array([count for _, count in results], dtype=np.int64),
+        })
+        itemsets["size"] = itemsets["itemset"].map(len)
+        itemsets["support"] = itemsets["transactions"] / max(n_transactions, 1)
+        itemsets = itemsets.sort_values(["size", "transactions"], ascending=[True, False], ignore_index=True)
+        return itemsets, {"n_transactions": n_transactions, "min_count": min_count, "n_groups": n_groups}
+
+
+def association_rules(itemsets, n_transactions, min_confidence=0.0, min_lift=0.0):
+    """빈발 조합 → 단일 결과 상품 규칙 (A [+ B ...] → C)
+
+    빈발 조합의 부분집합은 모두 빈발이므로 전건(antecedent) 지지도는 itemsets 안에서 바로 찾는다.
+    """
+    support = {frozenset(itemset): count for itemset, count in zip(itemsets["itemset"], itemsets["transactions"])}
+    rows = []
+    for itemset, count in zip(itemsets["itemset"], itemsets["transactions"]):
+        if len(itemset) < 2:
+            continue
+        for consequent in itemset:
+            antecedent = tuple(item for item in itemset if item != consequent)
+            antecedent_count = support[frozenset(antecedent)]
+            consequent_count = support[frozenset((consequent,))]
+            confidence = count / antecedent_count
+            lift = confidence * n_transactions / consequent_count
+            if confidence >= min_confidence and lift >= min_lift:
+                rows.append((antecedent, consequent, len(antecedent), count, antecedent_count, consequent_count, confidence, lift))
+    rules = pd.DataFrame(rows, columns=[
+        "antecedent", "consequent", "antecedent_size", "rule_transactions",
+        "antecedent_transactions", "consequent_transactions", "confidence", "lift",
+    ])
+    rules["support"] = rules["rule_transactions"] / max(n_transactions, 1)
+    return rules.sort_values(["lift", "rule_transactions"], ascending=False, ignore_index=True)
+
+
+def to_marts(itemsets, rules):
+    """mart_bundle_itemsets / mart_bundle_rules 형태의 Arrow 테이블 (상품 목록은 ' + ' 로 연결)"""
+    multi = itemsets[itemsets["size"] >= 2]
+    itemset_table = pa.table({
+        "itemset": [" + ".join(itemset) for itemset in multi["itemset"]],
+        "itemset_size": multi["size"].to_numpy(),
+        "transactions": multi["transactions"].to_numpy(),
+        "support_pct": np.round(multi["support"].to_numpy() * 100, 3),
+    })
+    rule_table = pa.table({
+        "antecedent": [" + ".join(items) for items in rules["antecedent"]],
+        "consequent": rules["consequent"].to_numpy(dtype=object),
+        "antecedent_size": rules["antecedent_size"].to_numpy(),
+        "rule_transactions": rules["rule_transactions"].to_numpy(),
+        "antecedent_transactions": rules["antecedent_transactions"].to_numpy(),
+        "consequent_transactions": rules["consequent_transactions"].to_numpy(),
+        "support_pct": np.round(rules["support"].to_numpy() * 100, 3),
+        "confidence_pct": np.round(rules["confidence"].to_numpy() * 100, 1),
+        "lift": np.round(rules["lift"].to_numpy(), 2),
+    })
+    return itemset_table, rule_table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="구매 장바구니 FP-Growth 빈발 조합 / 연관 규칙 채굴")
+    parser.add_argument("--baskets", required=True, help="stg_events 구매 행 모양 Parquet (glob)")
+    parser.add_argument("--min-support", type=float, default=20, help="최소 거래 수 (1 미만이면 비율)")
+    parser.add_argument("--max-len", type=int, default=4, help="최대 조합 크기")
+    parser.add_argument("--min-confidence", type=float, default=0.0)
+    parser.add_argument("--min-lift", type=float, default=1.0)
+    parser.add_argument("--memory-budget-mb", type=int, default=512, help="파티션/샤드 하나의 목표 크기")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--out", default="mart_tables")
+    parser.add_argument("--format", choices=["arrow", "parquet"], default="arrow")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    miner = BasketMiner(
+        min_support=args.min_support if args.min_support < 1 else int(args.min_support),
+        max_len=args.max_len,
+        memory_budget=args.memory_budget_mb << 20,
+        workers=args.workers,
+    )
+    itemsets, info = miner.mine(args.baskets)
+    rules = association_rules(itemsets, info["n_transactions"], args.min_confidence, args.min_lift)
+    itemset_table, rule_table = to_marts(itemsets, rules)
+
+    store = MartStore(args.out)
+    for key, table in (("bundle_itemsets", itemset_table), ("bundle_rules", rule_table)):
+        print(f"{key}: {store.save(key, table, fmt=args.format)} [{table.num_rows:,} rows]")
+    print(f"거래 {info['n_transactions']:,}건, 최소 {info['min_count']:,}건, 샤드 {info['n_groups']}개, "
+          f"{time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
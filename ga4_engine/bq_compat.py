@@ -0,0 +1,230 @@
+"""BigQuery SQL → DuckDB SQL 호환 레이어
+
+dbt 모델은 BigQuery 문법 그대로 두고, 로컬 실행 시에만 아래 두 단계로 맞춰준다.
+1. 인자 순서/문법이 다른 구문은 문자열 재작성 (translate)
+2. 이름만 다른 함수는 DuckDB 매크로로 등록 (install_macros)
+"""
+import re
+
+# ===== DuckDB 매크로 (이름/인자만 다른 함수) =====
+MACROS = [
+    "CREATE OR REPLACE MACRO safe_divide(a, b) AS CASE WHEN b = 0 THEN NULL ELSE a / b END",
+    "CREATE OR REPLACE MACRO timestamp_micros(us) AS make_timestamp(us::BIGINT)",
+    "CREATE OR REPLACE MACRO regexp_contains(s, pattern) AS regexp_matches(s, pattern)",
+    "CREATE OR REPLACE MACRO parse_date(fmt, s) AS strptime(s, fmt)::DATE",
+    "CREATE OR REPLACE MACRO format_date(fmt, d) AS strftime(d, fmt)",
+    # APPROX_QUANTILES(x, n) → n+1개 분위수 배열 (t-digest 기반 근사)
+    """CREATE OR REPLACE MACRO approx_quantiles(x, n) AS
+        approx_quantile(x, list_transform(range(n + 1), lambda i: (i / n)::FLOAT))""",
+    # HLL_COUNT.* (HyperLogLog): 스케치 = {precision p, registers}, registers 원소는 레지스터 번호 * 64 + 값(rho)
+    # 레지스터 번호는 hash 상위 p 비트, 값은 나머지 비트의 선행 0 개수 + 1 (레지스터마다 최댓값만 유지)
+    # 추정은 Ertl(2017)의 개선 추정식 (작은 값 구간의 linear counting 전환·편향 보정 표 없이 전 구간 사용)
+    """CREATE OR REPLACE MACRO hll_code(h, p) AS
+        (h >> (64 - p)) * 64 + CASE WHEN h & ((1::UBIGINT << (64 - p)) - 1) = 0 THEN 65 - p
+            ELSE 64 - p - floor(log2((h & ((1::UBIGINT << (64 - p)) - 1))::DOUBLE))::INT END""",
+    """CREATE OR REPLACE MACRO hll_compact(codes) AS list_transform(list_filter(
+        list_zip(list_sort(list_distinct(codes), 'DESC'), list_prepend(NULL, list_sort(list_distinct(codes), 'DESC'))),
+        lambda pair: pair[1] IS NOT NULL AND (pair[2] IS NULL OR pair[1] // 64 != pair[2] // 64)), lambda pair: pair[1])""",
+    # σ(x) = x + Σ x^(2^k) 2^(k-1): x 를 람다 안에서 참조하면 원소마다 다시 계산되므로 리스트로 넘김
+    """CREATE OR REPLACE MACRO hll_sigma(x) AS x + list_sum(list_transform(
+        list_zip(range(1, 48), list_resize([x], 47, x)), lambda t: t[2] ** (2 ** t[1]) * 2 ** (t[1] - 1)))""",
+    """CREATE OR REPLACE MACRO hll_estimate_raw(m, empty, z) AS
+        CASE WHEN empty = m THEN 0 ELSE round(m * m / (2 * ln(2)) / (m * hll_sigma(empty / m) + z))::BIGINT END""",
+    """CREATE OR REPLACE MACRO hll_estimate(registers, p) AS hll_estimate_raw(
+        (1::BIGINT << p)::DOUBLE, (1::BIGINT << p) - IFNULL(len(registers), 0),
+        IFNULL(list_sum(list_transform(registers, lambda v: 2.0 ** -(v % 64)::DOUBLE)), 0))""",
+    """CREATE OR REPLACE MACRO hll_count_init(x, p) AS {'precision': p,
+        'registers': hll_compact(list(hll_code(hash(x), p)) FILTER (WHERE x IS NOT NULL))}""",
+    """CREATE OR REPLACE MACRO hll_count_merge_partial(sketch) AS {'precision': max(sketch.precision),
+        'registers': hll_compact(flatten(list(sketch.registers)))}""",
+    """CREATE OR REPLACE MACRO hll_count_merge(sketch) AS
+        hll_estimate(hll_compact(flatten(list(sketch.registers))), max(sketch.precision))""",
+    "CREATE OR REPLACE MACRO hll_count_extract(sketch) AS hll_estimate(sketch.registers, sketch.precision)",
+    # BigQuery TIMESTAMP_DIFF 는 경계 횟수가 아니라 경과 시간을 0 방향으로 절사
+    """CREATE OR REPLACE MACRO timestamp_diff(a, b, part) AS
+        trunc((epoch_us(a) - epoch_us(b)) / CASE upper(part)
+            WHEN 'MICROSECOND' THEN 1
+            WHEN 'MILLISECOND' THEN 1000
+            WHEN 'SECOND' THEN 1000000
+            WHEN 'MINUTE' THEN 60000000
+            WHEN 'HOUR' THEN 3600000000
+            WHEN 'DAY' THEN 86400000000
+        END)::BIGINT""",
+]
+
+DATE_PARTS = ("MICROSECOND", "MILLISECOND", "SECOND", "MINUTE", "HOUR", "DAY")
+
+
+def install_macros(con):
+    """DuckDB 커넥션에 BigQuery 호환 매크로 등록"""
+    for statement in MACROS:
+        con.execute(statement)
+
+
+# ===== 괄호 균형 파서 =====
+def _matching_paren(sql, open_idx):
+    """open_idx 위치의 '(' 와 짝이 되는 ')' 위치 (문자열 리터럴 내부는 무시)"""
+    depth = 0
+    quote = None
+    i = open_idx
+    while i < len(sql):
+        ch = sql[i]
+        if quote:
+            if ch == "\\":
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif ch in ("'", '"', "`"):
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    raise ValueError(f"괄호 짝이 맞지 않습니다: {sql[open_idx:open_idx + 60]!r}")
+
+
+def _split_args(body):
+    """최상위 콤마 기준으로 인자 분리"""
+    args, depth, quote, start = [], 0, None, 0
+    for i, ch in enumerate(body):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in ("'", '"', "`"):
+            quote = ch
+        elif ch in "([":
+            depth += 1
+        elif ch in ")]":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            args.append(body[start:i].strip())
+            start = i + 1
+    args.append(body[start:].strip())
+    return args
+
+
+def rewrite_calls(sql, name, fn):
+    """NAME(...) 호출을 찾아 fn(args) 결과로 치환 (fn 이 None 을 돌려주면 원문 유지)"""
+    pattern = re.compile(r"\b" + name + r"\s*\(", re.IGNORECASE)
+    out, pos = [], 0
+    while True:
+        m = pattern.search(sql, pos)
+        if m is None:
+            break
+        open_idx = m.end() - 1
+        close_idx = _matching_paren(sql, open_idx)
+        args = _split_args(sql[open_idx + 1:close_idx])
+        # 인자 안의 중첩 호출도 같은 규칙으로 재작성
+        args = [rewrite_calls(a, name, fn) for a in args]
+        replacement = fn(args)
+        out.append(sql[pos:m.start()])
+        if replacement is None:
+            out.append(m.group(0) + ", ".join(args) + ")")
+        else:
+            out.append(replacement)
+        pos = close_idx + 1
+    out.append(sql[pos:])
+    return "".join(out)
+
+
+# ===== 개별 구문 재작성 =====
+_PARAM_SUBSELECT = re.compile(
+    r"\(\s*SELECT\s+value\.(\w+)\s+FROM\s+UNNEST\(\s*([\w.]+)\s*\)\s+WHERE\s+key\s*=\s*'([^']+)'\s*\)",
+    re.IGNORECASE,
+)
+_JOIN_UNNEST = re.compile(
+    r"\b(LEFT\s+JOIN|CROSS\s+JOIN|JOIN|,)\s*UNNEST\(\s*([\w.]+)\s*\)\s+(?:AS\s+)?(\w+)"
+    r"(?:\s+WITH\s+OFFSET(?:\s+AS)?\s+(\w+))?",
+    re.IGNORECASE,
+)
+_OFFSET_INDEX = re.compile(r"\[\s*(SAFE_)?OFFSET\(\s*([^\]]+?)\s*\)\s*\]", re.IGNORECASE)
+_ORDINAL_INDEX = re.compile(r"\[\s*(SAFE_)?ORDINAL\(\s*([^\]]+?)\s*\)\s*\]", re.IGNORECASE)
+_RAW_STRING = re.compile(r"\br'", re.IGNORECASE)
+_HLL_COUNT = re.compile(r"\bHLL_COUNT\.(INIT|MERGE_PARTIAL|MERGE|EXTRACT)\s*\(", re.IGNORECASE)
+_IGNORE_NULLS = re.compile(r"\s+IGNORE\s+NULLS\b", re.IGNORECASE)
+
+
+def _param_subselect(m):
+    # (SELECT value.x FROM UNNEST(event_params) WHERE key = 'k') → 리스트 필터 1회
+    field, array, key = m.group(1), m.group(2), m.group(3)
+    return f"(list_filter({array}, lambda p: p.key = '{key}')[1].value.{field})"
+
+
+def _join_unnest(m):
+    # BigQuery 의 암묵적 correlated UNNEST → DuckDB LATERAL 서브쿼리
+    join, array, alias, offset = m.group(1), m.group(2), m.group(3), m.group(4)
+    select = f"UNNEST({array}) AS {alias}"
+    if offset:
+        select += f", UNNEST(range(len({array}))) AS {offset}"
+    lateral = f"LATERAL (SELECT {select}) AS _unnest_{alias}"
+    join = join.upper()
+    if join.startswith("LEFT"):
+        return f"LEFT JOIN {lateral} ON TRUE"
+    if join == ",":
+        return f", {lateral}"
+    return f"CROSS JOIN {lateral}"
+
+
+def _array_agg(args):
+    # ARRAY_AGG(x IGNORE NULLS): DuckDB 는 집계 함수의 IGNORE NULLS 가 없으므로 결과 리스트에서 NULL 제거
+    body = ", ".join(args)
+    if not _IGNORE_NULLS.search(body):
+        return None
+    return f"list_filter(array_agg({_IGNORE_NULLS.sub('', body)}), lambda x: x IS NOT NULL)"
+
+
+def _timestamp_diff(args):
+    if len(args) == 3 and args[2].upper() in DATE_PARTS:
+        return f"timestamp_diff({args[0]}, {args[1]}, '{args[2].upper()}')"
+    return None
+
+
+def _extract(args):
+    # EXTRACT(DAYOFWEEK FROM x): BigQuery 는 일요일=1, DuckDB dayofweek 는 일요일=0
+    m = re.match(r"DAYOFWEEK\s+FROM\s+(.+)$", args[0], re.IGNORECASE | re.DOTALL)
+    if len(args) == 1 and m:
+        return f"(dayofweek({m.group(1)}) + 1)"
+    return None
+
+
+def _date_sub(args):
+    # DuckDB date_sub 는 '차이'를 구하는 함수라 의미가 다름 → 산술식으로 변환
+    if len(args) == 2 and args[1].upper().startswith("INTERVAL"):
+        return f"CAST(({args[0]}) - {args[1]} AS DATE)"
+    return None
+
+
+def _date_add(args):
+    if len(args) == 2 and args[1].upper().startswith("INTERVAL"):
+        return f"CAST(({args[0]}) + {args[1]} AS DATE)"
+    return None
+
+
+# DATE_TRUNC(date, part): BigQuery 의 주 단위는 ISOWEEK (월요일 시작) 만 DuckDB 'week' 와 같다
+TRUNC_PARTS = {"DAY": "day", "ISOWEEK": "week", "MONTH": "month", "QUARTER": "quarter", "YEAR": "year"}
+
+
+def _date_trunc(args):
+    if len(args) == 2 and args[1].upper() in TRUNC_PARTS:
+        return f"CAST(date_trunc('{TRUNC_PARTS[args[1].upper()]}', {args[0]}) AS DATE)"
+    return None
+
+
+def translate(sql):
+    """BigQuery 방언으로 렌더링된 모델 SQL 을 DuckDB 에서 실행 가능하게 변환"""
+    sql = _RAW_STRING.sub("'", sql)
+    sql = _HLL_COUNT.sub(lambda m: f"hll_count_{m.group(1).lower()}(", sql)
+    sql = _PARAM_SUBSELECT.sub(_param_subselect, sql)
+    sql = _JOIN_UNNEST.sub(_join_unnest, sql)
+    sql = _OFFSET_INDEX.sub(lambda m: f"[({m.group(2)}) + 1]", sql)
+    sql = _ORDINAL_INDEX.sub(lambda m: f"[{m.group(2)}]", sql)
+    sql = rewrite_calls(sql, "ARRAY_AGG", _array_agg)
+    sql = rewrite_calls(sql, "TIMESTAMP_DIFF", _timestamp_diff)
+    sql = rewrite_calls(sql, "EXTRACT", _extract)
+    sql = rewrite_calls(sql, "DATE_SUB", _date_sub)
+    sql = rewrite_calls(sql, "DATE_ADD", _date_add)
+    sql = rewrite_calls(sql, "DATE_TRUNC", _date_trunc)
+    return sql
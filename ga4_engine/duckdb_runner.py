@@ -0,0 +1,334 @@
+"""dbt 모델 그래프 로컬 실행기 (DuckDB)
+
+models/ 아래 staging → intermediate → marts 모델을 그대로 읽어 Jinja 렌더링 후
+bq_compat 으로 방언을 맞춰 DuckDB 에서 순서대로 materialize 한다.
+BigQuery 슬롯 비용 없이 GA4 Parquet export 만으로 모든 마트를 재계산하는 용도.
+
+사용 예:
+    python -m ga4_engine.duckdb_runner --events "data/events_*.parquet" \
+        --database local.duckdb --export-dir mart_tables_local
+"""
+import argparse
+import glob
+import os
+import time
+from graphlib import TopologicalSorter
+
+import duckdb
+import jinja2
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import yaml
+
+from . import bq_compat
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ModelError(RuntimeError):
+    """모델 렌더링/실행 실패 (어느 모델인지 메시지에 포함)"""
+
+
+class Relation:
+    """{{ this }} 로 렌더링되는 테이블 참조"""
+
+    def __init__(self, name):
+        self.name = name
+        self.identifier = name
+        self.schema = "main"
+
+    def __str__(self):
+        return f'"{self.name}"'
+
+
+class _CurrentRelation(Relation):
+    """렌더링 중인 모델을 가리키는 {{ this }} (매크로 안에서도 같은 값)"""
+
+    def __init__(self, runner):
+        self.runner = runner
+        self.schema = "main"
+
+    @property
+    def name(self):
+        return self.runner._rendering[0].name
+
+    identifier = name
+
+
+class Target:
+    type = "duckdb"
+    name = "local"
+    schema = "main"
+
+
+class Adapter:
+    """adapter.dispatch 최소 구현: duckdb__<macro> → default__<macro> 순서로 탐색"""
+
+    def __init__(self, env):
+        self.env = env
+
+    def dispatch(self, macro_name, macro_namespace=None):
+        for prefix in ("duckdb__", "default__"):
+            macro = self.env.globals.get(prefix + macro_name)
+            if macro is not None:
+                return macro
+        raise ModelError(f"dispatch 대상 매크로를 찾을 수 없습니다: {macro_name}")
+
+
+class Exceptions:
+    """dbt exceptions 네임스페이스 중 매크로에서 쓰는 부분"""
+
+    @staticmethod
+    def raise_compiler_error(msg):
+        raise ModelError(msg)
+
+
+class Model:
+    def __init__(self, path, models_dir):
+        self.path = path
+        self.name = os.path.splitext(os.path.basename(path))[0]
+        # staging / intermediate / marts
+        self.layer = os.path.relpath(os.path.dirname(path), models_dir).split(os.sep)[0]
+        with open(path, encoding="utf-8") as f:
+            self.raw_sql = f.read()
+        self.config = {}
+        self.refs = set()
+
+    @property
+    def materialized(self):
+        return self.config.get("materialized", "view")
+
+    @property
+    def enabled(self):
+        return self.config.get("enabled", True)
+
+
+class DuckDBRunner:
+    def __init__(self, events_path, database=":memory:", project_dir=PROJECT_DIR, vars=None):
+        self.project_dir = project_dir
+        self.events_path = events_path
+        self.con = duckdb.connect(database)
+        bq_compat.install_macros(self.con)
+
+        with open(os.path.join(project_dir, "dbt_project.yml"), encoding="utf-8") as f:
+            self.project = yaml.safe_load(f) or {}
+        self.vars = dict(self.project.get("vars") or {})
+        self.vars.update(vars or {})
+
+        self.env = jinja2.Environment(undefined=jinja2.StrictUndefined)
+        self.env.globals.update(
+            target=Target(), adapter=Adapter(self.env), exceptions=Exceptions(), execute=True
+        )
+        self._rendering = (None, False)
+        self._install_context()
+        self._load_macros()
+        self.sources = self._load_sources()
+        self.models = self._load_models()
+
+    # ===== 프로젝트 로드 =====
+    def _load_macros(self):
+        macro_dir = os.path.join(self.project_dir, self.project.get("macro-paths", ["macros"])[0])
+        for path in sorted(glob.glob(os.path.join(macro_dir, "**", "*.sql"), recursive=True)):
+            with open(path, encoding="utf-8") as f:
+                module = self.env.from_string(f.read()).make_module()
+            for name in dir(module):
+                if not name.startswith("_"):
+                    self.env.globals[name] = getattr(module, name)
+
+    def _load_sources(self):
+        sources = {}
+        models_dir = os.path.join(self.project_dir, "models")
+        for path in glob.glob(os.path.join(models_dir, "**", "*.yml"), recursive=True):
+            with open(path, encoding="utf-8") as f:
+                spec = yaml.safe_load(f) or {}
+            for source in spec.get("sources", []):
+                for table in source.get("tables", []):
+                    sources[(source["name"], table["name"])] = f"{source['name']}__{table['name']}"
+        return sources
+
+    def _load_models(self):
+        models_dir = os.path.join(self.project_dir, "models")
+        models = {}
+        for path in sorted(glob.glob(os.path.join(models_dir, "**", "*.sql"), recursive=True)):
+            model = Model(path, models_dir)
+            models[model.name] = model
+        # 1차 렌더링: config 와 ref 의존성만 수집
+        for model in models.values():
+            self.render(model, incremental=False)
+        return models
+
+    # ===== 렌더링 =====
+    def _var(self, name, default=None):
+        if name in self.vars:
+            return self.vars[name]
+        if default is None:
+            raise ModelError(f"정의되지 않은 var 입니다: {name}")
+        return default
+
+    def render(self, model, incremental):
+        # 매크로 모듈은 로드 시점의 globals 를 복사해 두므로
+        # 모델별 컨텍스트는 고정된 함수가 현재 렌더링 상태를 참조하는 방식으로 제공
+        self._rendering = (model, incremental)
+        try:
+            return self.env.from_string(model.raw_sql).render()
+        except jinja2.TemplateError as e:
+            raise ModelError(f"{model.name}: 렌더링 실패 - {e}") from e
+
+    def _install_context(self):
+        def ref(name):
+            model = self._rendering[0]
+            model.refs.add(name)
+            return f'"{name}"'
+
+        def source(source_name, table_name):
+            try:
+                return f'"{self.sources[(source_name, table_name)]}"'
+            except KeyError:
+                raise ModelError(f"{self._rendering[0].name}: 정의되지 않은 source {source_name}.{table_name}")
+
+        def config(**kwargs):
+            self._rendering[0].config.update(kwargs)
+            return ""
+
+        self.env.globals.update(
+            ref=ref,
+            source=source,
+            config=config,
+            var=self._var,
+            this=_CurrentRelation(self),
+            is_incremental=lambda: self._rendering[1],
+        )
+
+    # ===== 실행 =====
+    def register_events(self):
+        """GA4 export Parquet (events_YYYYMMDD.parquet) 를 source 뷰로 등록"""
+        for view in self.sources.values():
+            self.con.execute(f"""
+                CREATE OR REPLACE VIEW "{view}" AS
+                SELECT
+                    * EXCLUDE (filename),
+                    regexp_extract(filename, 'events_(?:intraday_)?(\\d{{8}})', 1) AS _TABLE_SUFFIX
+                FROM read_parquet('{self.events_path}', filename = true, union_by_name = true)
+            """)
+
+    def execution_order(self, select=None):
+        graph = {name: model.refs for name, model in self.models.items() if model.enabled}
+        order = [name for name in TopologicalSorter(graph).static_order() if name in graph]
+        if not select:
+            return order
+        # "model+" 는 해당 모델과 모든 하위 모델
+        chosen = set()
+        for token in select:
+            name = token.rstrip("+")
+            if name not in graph:
+                raise ModelError(f"존재하지 않는 모델입니다: {name}")
+            frontier = {name}
+            chosen.add(name)
+            while token.endswith("+") and frontier:
+                frontier = {n for n, refs in graph.items() if refs & frontier} - chosen
+                chosen |= frontier
+        return [name for name in order if name in chosen]
+
+    def relation_exists(self, name):
+        return bool(self.con.execute(
+            "SELECT 1 FROM information_schema.tables WHERE table_name = ?", [name]
+        ).fetchall())
+
+    def materialize(self, model, full_refresh=False):
+        incremental = (
+            model.materialized == "incremental"
+            and not full_refresh
+            and self.relation_exists(model.name)
+        )
+        sql = bq_compat.translate(self.render(model, incremental=incremental))
+        try:
+            if incremental:
+                self._merge_incremental(model, sql)
+            elif model.materialized in ("table", "incremental"):
+                self.con.execute(f'CREATE OR REPLACE TABLE "{model.name}" AS (\n{sql}\n)')
+            else:
+                self.con.execute(f'CREATE OR REPLACE VIEW "{model.name}" AS (\n{sql}\n)')
+        except duckdb.Error as e:
+            raise ModelError(f"{model.name}: 실행 실패 - {e}") from e
+
+    def _merge_incremental(self, model, sql):
+        """dbt-bigquery 증분 전략 재현 (insert_overwrite: 파티션 교체 / merge: unique_key 교체)"""
+        target = f'"{model.name}"'
+        strategy = model.config.get("incremental_strategy", "merge")
+        if strategy == "insert_overwrite":
+            partition = model.config["partition_by"]["field"]
+            # dbt-bigquery 가 DECLARE 하는 스크립트 변수와 같은 값
+            sql = sql.replace("_dbt_max_partition", f"(SELECT MAX({partition}) FROM {target})")
+            key = partition
+        else:
+            key = model.config["unique_key"]
+        self.con.execute(f'CREATE OR REPLACE TEMP TABLE "__dbt_tmp" AS (\n{sql}\n)')
+        self.con.execute(f'DELETE FROM {target} WHERE {key} IN (SELECT {key} FROM "__dbt_tmp")')
+        self.con.execute(f'INSERT INTO {target} BY NAME SELECT * FROM "__dbt_tmp"')
+        self.con.execute('DROP TABLE "__dbt_tmp"')
+
+    def run(self, select=None, full_refresh=False):
+        self.register_events()
+        order = self.execution_order(select)
+        results = []
+        for i, name in enumerate(order, 1):
+            model = self.models[name]
+            started = time.perf_counter()
+            self.materialize(model, full_refresh=full_refresh)
+            elapsed = time.perf_counter() - started
+            rows = self.con.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+            print(f"{i:>2} of {len(order)} OK {model.materialized} {name} [{rows:,} rows in {elapsed:.2f}s]")
+            results.append((name, rows, elapsed))
+        return results
+
+    def export(self, out_dir, layer="marts", fmt="parquet"):
+        """materialize 된 마트를 파일로 내보내기 (대시보드 mart_tables 와 같은 파일명)"""
+        os.makedirs(out_dir, exist_ok=True)
+        options = "FORMAT parquet" if fmt == "parquet" else "FORMAT csv, HEADER"
+        paths = []
+        for name, model in self.models.items():
+            if model.layer != layer or not model.enabled or not self.relation_exists(name):
+                continue
+            path = os.path.join(out_dir, f"{name}.{fmt}")
+            if fmt == "arrow":
+                # Arrow IPC 파일: 대시보드 MartStore 가 memory-map 으로 바로 읽는 형식
+                # .arrow() 반환형이 DuckDB 버전마다 달라 (Table / RecordBatchReader) C stream 으로 통일
+                reader = pa.RecordBatchReader.from_stream(self.con.execute(f'SELECT * FROM "{name}"').arrow())
+                with ipc.new_file(path, reader.schema) as writer:
+                    for batch in reader:
+                        writer.write_batch(batch)
+            else:
+                self.con.execute(f"COPY (SELECT * FROM \"{name}\") TO '{path}' ({options})")
+            paths.append(path)
+        return paths
+
+    def table(self, name):
+        return self.con.execute(f'SELECT * FROM "{name}"').df()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="dbt 모델을 DuckDB 로 로컬 실행")
+    parser.add_argument("--events", required=True, help="GA4 events_* Parquet glob")
+    parser.add_argument("--database", default=":memory:", help="DuckDB 파일 경로")
+    parser.add_argument("--select", nargs="*", help="실행할 모델 (model+ 는 하위 모델 포함)")
+    parser.add_argument("--vars", default=None, help="dbt --vars 와 같은 YAML/JSON 문자열")
+    parser.add_argument("--full-refresh", action="store_true", help="증분 모델도 전체 재생성")
+    parser.add_argument("--export-dir", default=None)
+    parser.add_argument("--export-format", choices=["parquet", "arrow", "csv"], default="parquet")
+    args = parser.parse_args(argv)
+
+    runner = DuckDBRunner(
+        args.events,
+        database=args.database,
+        vars=yaml.safe_load(args.vars) if args.vars else None,
+    )
+    started = time.perf_counter()
+    runner.run(select=args.select, full_refresh=args.full_refresh)
+    print(f"완료: {time.perf_counter() - started:.2f}s")
+    if args.export_dir:
+        for path in runner.export(args.export_dir, fmt=args.export_format):
+            print(f"export → {path}")
+
+
+if __name__ == "__main__":
+    main()
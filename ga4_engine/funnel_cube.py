@@ -0,0 +1,142 @@
+"""퍼널 큐브 롤업 엔진 (대시보드 in-process)
+
+mart_funnel_cube (날짜 x 시간 x 요일 x 기기 x 유입 x 회원 단위의 합산 가능한 단계별 세션 수)를 받아
+임의의 필터 + group by 조합을 메모리에서 바로 계산한다. 슬라이스마다 마트를 새로 만들지 않기 위한 용도.
+
+차원은 생성 시 한 번 정수 코드로 바꿔 두고 (pd.factorize), 질의 시에는
+- 필터: 코드 → bool 룩업 테이블로 마스크
+- 그룹: 코드를 혼합 진법으로 합쳐 하나의 정수 키 → np.bincount 로 지표별 합계
+만 수행하므로 정렬 없이 큐브 행 수에 선형이다.
+
+사용 예:
+    cube = FunnelCube(store['funnel_cube'])
+    cube.rollup(['device_category'], filters={'session_hour': range(18, 24)})
+"""
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = [
+    "session_date", "session_hour", "session_day_of_week", "device_category",
+    "session_source", "session_medium", "session_campaign", "is_member",
+]
+MEASURES = ["sessions", "session_started", "viewed", "carted", "checkout", "payment", "purchased", "revenue"]
+
+# 비율 지표: 이름 → (분자, 분모), 퍼센트 (소수 2자리, 마트와 같은 기준)
+RATES = {
+    "view_rate": ("viewed", "sessions"),
+    "cart_rate": ("carted", "sessions"),
+    "cvr": ("purchased", "sessions"),
+    "view_to_cart": ("carted", "viewed"),
+    "cart_to_checkout": ("checkout", "carted"),
+    "checkout_to_purchase": ("purchased", "checkout"),
+}
+
+# 차원 조합 수가 이 값(또는 큐브 행 수)보다 크면 혼합 진법 대신 np.unique(axis=0) 로 그룹 번호 부여
+_DENSE_KEYS = 1 << 20
+
+
+def rate_columns(columns):
+    """합계 배열(dict 또는 DataFrame)로 RATES 비율 배열 계산 (분모 0 이면 NaN)"""
+    rates = {}
+    for name, (numerator, denominator) in RATES.items():
+        if numerator in columns and denominator in columns:
+            den = np.asarray(columns[denominator], dtype=np.float64)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rate = np.where(den > 0, np.asarray(columns[numerator]) / den * 100, np.nan)
+            rates[name] = np.round(rate, 2)
+    return rates
+
+
+class FunnelCube:
+    def __init__(self, df, dimensions=DIMENSIONS, measures=MEASURES):
+        self.dimensions = [d for d in dimensions if d in df.columns]
+        self.measures = [m for m in measures if m in df.columns]
+        self._codes = {}
+        self._levels = {}
+        for dim in self.dimensions:
+            # NULL 도 하나의 값으로 취급 (마트의 GROUP BY 와 동일)
+            codes, levels = pd.factorize(df[dim], use_na_sentinel=False)
+            self._codes[dim] = codes.astype(np.int64)
+            self._levels[dim] = pd.Index(levels)
+        # 지표는 컬럼별 연속 배열로 (bincount weights 로 바로 전달)
+        self._values = {m: df[m].to_numpy(dtype=np.float64, na_value=0.0) for m in self.measures}
+
+    def __len__(self):
+        return len(next(iter(self._codes.values()), ()))
+
+    def levels(self, dim):
+        """차원 값 목록 (필터 위젯 옵션용, NULL 제외 후 정렬)"""
+        return sorted(v for v in self._levels[dim] if not pd.isna(v))
+
+    def mask(self, filters=None):
+        """filters {차원: 값 또는 값 목록} 을 모두 만족하는 큐브 행 마스크"""
+        mask = np.ones(len(self), dtype=bool)
+        for dim, values in (filters or {}).items():
+            if dim not in self._codes:
+                raise KeyError(f"큐브에 없는 차원입니다: {dim}")
+            if values is None:
+                continue
+            if isinstance(values, (str, bytes)) or not np.iterable(values):
+                values = [values]
+            lookup = self._levels[dim].isin(list(values))
+            mask &= lookup[self._codes[dim]]
+        return mask
+
+    def _group_keys(self, group_by, mask):
+        """group_by 차원 조합 → (행별 그룹 키, 키 개수, 키 → 차원별 코드 함수)
+
+        필터에서 빠진 행은 복사하지 않고 마지막 여분 키(n_keys)로 보내 bincount 에서 버린다.
+        """
+        sizes = [max(len(self._levels[dim]), 1) for dim in group_by]
+        radix = int(np.prod(sizes, dtype=object))
+        if radix <= max(_DENSE_KEYS, len(self)):
+            # 혼합 진법 키: 조합 수가 작으면 정렬 없이 bincount 한 번으로 끝
+            key = np.zeros(len(self), dtype=np.int64)
+            for dim, size in zip(group_by, sizes):
+                key *= size
+                key += self._codes[dim]
+            n_keys = radix
+
+            def decode(keys):
+                codes = []
+                for size in reversed(sizes):
+                    codes.append(keys % size)
+                    keys = keys // size
+                return codes[::-1]
+        else:
+            stacked = np.stack([self._codes[dim] for dim in group_by], axis=1)
+            uniques, key = np.unique(stacked, axis=0, return_inverse=True)
+            key = key.ravel()
+            n_keys = len(uniques)
+
+            def decode(keys):
+                return [uniques[keys, i] for i in range(len(group_by))]
+
+        key = np.where(mask, key, n_keys)
+        return key, n_keys, decode
+
+    def rollup(self, group_by=(), filters=None, rates=True):
+        """필터 후 group_by 차원별 지표 합계 (group_by 가 비면 전체 1행)"""
+        group_by = list(group_by)
+        unknown = [dim for dim in group_by if dim not in self._codes]
+        if unknown:
+            raise KeyError(f"큐브에 없는 차원입니다: {unknown}")
+        mask = self.mask(filters)
+
+        if not group_by:
+            weights = mask.astype(np.float64)
+            columns = {m: np.array([self._values[m] @ weights]) for m in self.measures}
+        else:
+            key, n_keys, decode = self._group_keys(group_by, mask)
+            present = np.flatnonzero(np.bincount(key, minlength=n_keys + 1)[:n_keys])
+            columns = {dim: self._levels[dim].take(codes) for dim, codes in zip(group_by, decode(present))}
+            for measure in self.measures:
+                columns[measure] = np.bincount(key, weights=self._values[measure], minlength=n_keys + 1)[present]
+
+        # 금액 외 지표는 세션 수이므로 정수로
+        for measure in self.measures:
+            if measure != "revenue":
+                columns[measure] = columns[measure].astype(np.int64)
+        if rates:
+            columns.update(rate_columns(columns))
+        return pd.DataFrame(columns)
@@ -0,0 +1,193 @@
+"""대시보드 라이브 데이터 소스 (BigQuery Storage Read API / DuckDB)
+
+손으로 export 한 mart_tables/ 스냅샷 대신 dbt 가 만든 마트 테이블을 직접 읽는다.
+- BigQueryStorageSource: Storage Read API 로 Arrow 스트림을 병렬로 받음 (REST 행 단위 조회 없음)
+  gRPC 클라이언트는 풀에 두고 스트림마다 빌려 쓰며, Streamlit 재실행 간에도 재사용
+- DuckDBSource: duckdb_runner 결과 DB 또는 Parquet 디렉토리를 같은 방식으로 읽는 로컬 대체 소스
+- LiveMartStore: MartStore 와 같은 키 → DataFrame 계약에 마트별 TTL 캐시를 더함
+
+소스 URL:
+    bigquery://<project>/<dataset>[?billing_project=...&pool_size=4&max_streams=8]
+    duckdb:///<path/to/local.duckdb>
+    parquet:///<path/to/mart_dir>
+"""
+import glob
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import parse_qs, urlparse
+
+import pyarrow as pa
+
+from .mart_store import MARTS, MartStore
+
+
+class BigQueryStorageSource:
+    """BigQuery Storage Read API 로 마트 테이블을 Arrow 로 읽기
+
+    google-cloud-bigquery / google-cloud-bigquery-storage 와 GCP 인증이 필요하다 (import 는 사용 시점).
+    """
+
+    def __init__(self, project, dataset, billing_project=None, pool_size=4, max_streams=8):
+        self.project = project
+        self.dataset = dataset
+        self.billing_project = billing_project or project
+        self.name = f"bigquery://{project}/{dataset}"
+        self.max_streams = max_streams
+        self._pool = queue.LifoQueue()
+        self._pool_size = pool_size
+        self._created = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=pool_size)
+
+    @contextmanager
+    def _client(self):
+        """풀에서 BigQueryReadClient 를 빌림 (최대 pool_size 개까지만 생성)"""
+        try:
+            client = self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self._pool_size
+                if create:
+                    self._created += 1
+            if create:
+                from google.cloud import bigquery_storage
+                client = bigquery_storage.BigQueryReadClient()
+            else:
+                client = self._pool.get()
+        try:
+            yield client
+        finally:
+            self._pool.put(client)
+
+    def tables(self):
+        """데이터셋의 테이블 이름 (메타데이터 조회만, 행은 읽지 않음)"""
+        from google.cloud import bigquery
+
+        client = bigquery.Client(project=self.billing_project)
+        return {table.table_id for table in client.list_tables(f"{self.project}.{self.dataset}")}
+
+    def read(self, name, columns):
+        from google.cloud.bigquery_storage import types
+
+        read_session = types.ReadSession(
+            table=f"projects/{self.project}/datasets/{self.dataset}/tables/{name}",
+            data_format=types.DataFormat.ARROW,
+            read_options=types.ReadSession.TableReadOptions(selected_fields=list(columns)),
+        )
+        with self._client() as client:
+            session = client.create_read_session(
+                parent=f"projects/{self.billing_project}",
+                read_session=read_session,
+                max_stream_count=self.max_streams,
+            )
+        schema = pa.ipc.read_schema(pa.py_buffer(session.arrow_schema.serialized_schema))
+
+        def read_stream(stream):
+            with self._client() as client:
+                return client.read_rows(stream.name).to_arrow(session)
+
+        tables = list(self._executor.map(read_stream, session.streams))
+        return pa.concat_tables(tables) if tables else schema.empty_table()
+
+
+class DuckDBSource:
+    """로컬 대체 소스: duckdb_runner 가 만든 DB 파일, 또는 마트 Parquet 디렉토리"""
+
+    def __init__(self, database=None, parquet_dir=None):
+        import duckdb
+
+        if parquet_dir is not None:
+            self.name = f"parquet://{parquet_dir}"
+            self.con = duckdb.connect()
+            for path in sorted(glob.glob(os.path.join(parquet_dir, "*.parquet"))):
+                name = os.path.splitext(os.path.basename(path))[0]
+                self.con.execute(f"CREATE VIEW \"{name}\" AS SELECT * FROM read_parquet('{path}')")
+        else:
+            self.name = f"duckdb://{database}"
+            self.con = duckdb.connect(database, read_only=True)
+
+    def tables(self):
+        return {row[0] for row in self.con.execute("SELECT table_name FROM information_schema.tables").fetchall()}
+
+    def read(self, name, columns):
+        # 커넥션은 스레드 간 공유가 안 되므로 읽기마다 cursor 를 새로 연다
+        select = ", ".join(f'"{c}"' for c in columns)
+        result = self.con.cursor().execute(f'SELECT {select} FROM "{name}"').arrow()
+        return pa.RecordBatchReader.from_stream(result).read_all()
+
+
+def open_source(url):
+    """소스 URL → 소스 객체"""
+    parsed = urlparse(url)
+    options = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+    if parsed.scheme == "bigquery":
+        return BigQueryStorageSource(
+            parsed.netloc,
+            parsed.path.strip("/"),
+            billing_project=options.get("billing_project"),
+            pool_size=int(options.get("pool_size", 4)),
+            max_streams=int(options.get("max_streams", 8)),
+        )
+    if parsed.scheme == "duckdb":
+        return DuckDBSource(database=parsed.netloc + parsed.path)
+    if parsed.scheme == "parquet":
+        return DuckDBSource(parquet_dir=parsed.netloc + parsed.path)
+    raise ValueError(f"지원하지 않는 소스입니다: {url}")
+
+
+class LiveMartStore(MartStore):
+    """라이브 소스에서 읽는 MartStore (마트별로 ttl 초가 지나면 다음 접근 때 다시 읽음)"""
+
+    def __init__(self, source, ttl=600, marts=MARTS, cache_bytes=None):
+        self.source = source
+        self.ttl = ttl
+        self._available = source.tables()
+        self._loaded_at = {}
+        self._generation = {}
+        super().__init__(source.name, marts, cache_bytes)
+
+    def _locate(self, key):
+        names, _ = self.marts[key]
+        return next((name for name in names if name in self._available), None)
+
+    def _read(self, path, schema):
+        return self.source.read(path, schema.names)
+
+    def _drop(self, key):
+        super()._drop(key)
+        self._loaded_at.pop(key, None)
+
+    def _expire(self, key):
+        with self._lock:
+            loaded_at = self._loaded_at.get(key)
+            if loaded_at is not None and time.monotonic() - loaded_at > self.ttl:
+                self._drop(key)
+
+    def table(self, key):
+        self._expire(key)
+        table = super().table(key)
+        with self._lock:
+            if key not in self._loaded_at:
+                self._loaded_at[key] = time.monotonic()
+                self._generation[key] = self._generation.get(key, 0) + 1
+        return table
+
+    def version(self, key):
+        """테이블 이름 + 읽은 횟수 (TTL 만료·새로고침·LRU 해제 뒤 다시 읽을 때마다 달라짐)"""
+        with self._lock:
+            return self._paths.get(key), self._generation.get(key, 0)
+
+    def __getitem__(self, key):
+        self._expire(key)
+        return super().__getitem__(key)
+
+    def refresh(self):
+        """테이블 목록과 캐시를 모두 새로 (dbt 재실행 직후 등)"""
+        self._available = self.source.tables()
+        with self._lock:
+            self._paths = {key: self._locate(key) for key in self.marts}
+            self.release()
@@ -0,0 +1,245 @@
+"""마르코프 체인 기여도 (removal effect)
+
+last-touch(mart_funnel_source) 나 고정 Lift 가중치 대신, 경로 전체의 전이 확률로 상태(채널 / 이벤트)별 기여도를 계산한다.
+
+1. 경로 → 전이 건수: (시작) → s1 → ... → sk → (전환 | 이탈) 을 희소 행렬(scipy.sparse)로 합산
+   - 이벤트 경로: sessionizer 의 path (첫 purchase 직전까지, purchase 가 있으면 전환)
+   - 채널 경로: 사용자(master_id) 의 세션을 시간순으로 이은 session_source (첫 구매 세션까지)
+   건수 행렬은 더할 수 있으므로 파티션(일자 등)별로 저장해 두고 합쳐서 다시 계산할 수 있다 (save / load / merge).
+2. 흡수 확률: 전이 확률 P 의 일시 상태 블록 Q, 전환 열 r 에 대해 (I - Q) x = r, 기준 전환 확률은 x[시작]
+3. 제거 효과: 상태 k 를 지우는 것은 Q 의 k 열을 0 으로 만드는 rank-1 변경이므로
+   Z = (I - Q)^-1 Q 를 LU 한 번으로 구한 뒤 Sherman-Morrison 으로 모든 k 를 한 번에 계산
+       p_k = x[시작] - Z[시작, k] * x[k] / (1 + Z[k, k])
+   removal_effect_k = 1 - p_k / p, 기여 전환 수 = 전체 전환 x removal_effect_k / sum(removal_effect)
+
+사용 예:
+    python -m ga4_engine.markov_attribution --paths exports/session_paths.parquet \\
+        --sessions exports/fct_sessions.parquet --out mart_tables --cache markov_cache
+"""
+import argparse
+import glob
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from scipy import sparse
+from scipy.sparse.linalg import splu
+
+from .mart_store import MartStore
+from .sessionizer import EVENTS
+
+# 이벤트 경로에서 빼는 이벤트 (거의 모든 세션에 있어 제거 효과가 의미 없거나, 이동이 아닌 반응)
+IGNORED_EVENTS = ("session_start", "first_visit", "page_view", "user_engagement", "scroll")
+DIRECT = "(direct)"
+
+
+class MarkovAttribution:
+    """상태 labels 의 1차 마르코프 체인 (행렬 인덱스: 상태 0..n-1, 시작 n, 전환 n+1, 이탈 n+2)"""
+
+    def __init__(self, labels, counts=None):
+        self.labels = list(labels)
+        n = len(self.labels) + 3
+        self.counts = sparse.csr_matrix((n, n), dtype=np.int64) if counts is None else counts.tocsr()
+
+    @property
+    def n_states(self):
+        return len(self.labels)
+
+    # ===== 건수 =====
+    def add(self, offsets, states, converted, collapse_repeats=True):
+        """CSR 경로 묶음 (offsets, 상태 번호, 경로별 전환 여부) 의 전이 건수를 더함"""
+        states = np.asarray(states, dtype=np.int64)
+        offsets = np.asarray(offsets, dtype=np.int64)
+        lengths = np.diff(offsets)
+        path = np.repeat(np.arange(len(lengths)), lengths)
+        if collapse_repeats and len(states):
+            keep = np.ones(len(states), dtype=bool)
+            keep[1:] = (states[1:] != states[:-1]) | (path[1:] != path[:-1])
+            states, path = states[keep], path[keep]
+            lengths = np.bincount(path, minlength=len(lengths))
+            offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=offsets[1:])
+
+        n, m = self.n_states, len(lengths)
+        source = np.full(len(states) + m, n, dtype=np.int64)
+        target = np.where(np.asarray(converted, dtype=bool), n + 1, n + 2).astype(np.int64)
+        target = np.repeat(target, lengths + 1)
+        at = offsets[path] + path + (np.arange(len(states)) - offsets[path])  # 경로마다 (길이 + 1) 칸
+        target[at] = states
+        source[at + 1] = states
+        size = n + 3
+        self.counts = self.counts + sparse.csr_matrix(
+            (np.ones(len(source), dtype=np.int64), (source, target)), shape=(size, size))
+        return self
+
+    def merge(self, other):
+        if other.labels != self.labels:
+            raise ValueError("상태 목록이 다른 체인은 합칠 수 없습니다")
+        self.counts = self.counts + other.counts
+        return self
+
+    def save(self, path):
+        """전이 건수 행렬 캐시 (.npz)"""
+        counts = self.counts.tocsr()
+        np.savez_compressed(path, labels=np.array(self.labels, dtype=object), data=counts.data,
+                            indices=counts.indices, indptr=counts.indptr, shape=counts.shape)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=True) as f:
+            counts = sparse.csr_matrix((f["data"], f["indices"], f["indptr"]), shape=tuple(f["shape"]))
+            return cls(f["labels"].tolist(), counts)
+
+    # ===== 흡수 확률 / 제거 효과 =====
+    def transition_matrix(self):
+        counts = self.counts.astype(np.float64)
+        totals = np.asarray(counts.sum(axis=1)).ravel()
+        scale = np.divide(1.0, totals, out=np.zeros_like(totals), where=totals > 0)
+        return sparse.diags(scale) @ counts
+
+    def removal_effects(self):
+        """상태별 제거 효과 / 기여 전환 수 / last-touch 전환 수"""
+        n = self.n_states
+        start, conversion = n, n + 1
+        P = self.transition_matrix().tocsc()
+        Q = P[:n + 1, :n + 1]
+        r = P[:n + 1, conversion].toarray().ravel()
+        lu = splu((sparse.identity(n + 1, format="csc") - Q).tocsc())
+        x = lu.solve(r)
+        base = x[start]
+
+        Z = lu.solve(Q[:, :n].toarray()) if n else np.zeros((n + 1, 0))
+        diag = Z[np.arange(n), np.arange(n)]
+        removed = base - Z[start, :n] * x[:n] / (1.0 + diag)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            effect = np.clip(1.0 - removed / base, 0.0, None) if base > 0 else np.zeros(n)
+
+        counts = self.counts.tocsc()
+        conversions = int(counts[:, conversion].sum())
+        total_effect = effect.sum()
+        share = effect / total_effect if total_effect > 0 else np.zeros(n)
+        return pd.DataFrame({
+            "state": self.labels,
+            "visits": np.asarray(counts[:, :n].sum(axis=0)).ravel().astype(np.int64),
+            "last_touch_conversions": counts[:n, conversion].toarray().ravel().astype(np.int64),
+            "removal_effect": effect,
+            "attribution_share": share,
+            "attributed_conversions": share * conversions,
+        }).sort_values("attributed_conversions", ascending=False, ignore_index=True).assign(
+            conversion_probability=base
+        )
+
+
+# ===== 경로 만들기 =====
+def event_paths(paths, ignore=IGNORED_EVENTS, events=EVENTS):
+    """sessionizer path (list<uint8>) → 첫 purchase 직전까지의 이벤트 경로 (offsets, 상태, 전환 여부, 라벨)"""
+    if isinstance(paths, pa.ChunkedArray):
+        paths = paths.combine_chunks()
+    purchase = events.index("purchase")
+    labels = [name for code, name in enumerate(events) if name not in ignore and code != purchase]
+    state_of = np.full(256, -1, dtype=np.int64)
+    state_of[[events.index(name) for name in labels]] = np.arange(len(labels))
+
+    lengths = pc.fill_null(pc.list_value_length(paths), 0).to_numpy(zero_copy_only=False).astype(np.int64)
+    codes = pc.list_flatten(paths).to_numpy(zero_copy_only=False).astype(np.int64)
+    path = np.repeat(np.arange(len(lengths)), lengths)
+
+    # 첫 purchase 이후 이벤트는 버림
+    is_purchase = codes == purchase
+    first_purchase = np.full(len(lengths), np.iinfo(np.int64).max)
+    np.minimum.at(first_purchase, path[is_purchase], np.flatnonzero(is_purchase))
+    converted = first_purchase < np.iinfo(np.int64).max
+    states = state_of[codes]
+    keep = (np.arange(len(codes)) < first_purchase[path]) & (states >= 0)
+    return _csr(path[keep], states[keep], len(lengths)) + (converted, labels)
+
+
+def channel_paths(sessions, user="master_id", channel="session_source", time="session_start_at",
+                  converted="has_purchase", max_states=200):
+    """세션 표 → 사용자별 채널 경로 (첫 구매 세션까지, 구매가 없으면 전체) (offsets, 상태, 전환 여부, 라벨)
+
+    채널이 max_states 개를 넘으면 세션 수가 적은 채널을 '(other)' 로 합친다.
+    """
+    df = sessions[[user, channel, time, converted]]
+    df = df.sort_values([user, time], kind="stable")
+    users, _ = pd.factorize(df[user], sort=False)
+    channels = df[channel].fillna(DIRECT).astype(str)
+    volume = channels.value_counts()
+    if len(volume) > max_states:
+        channels = channels.where(channels.isin(volume.index[:max_states - 1]), "(other)")
+    states, labels = pd.factorize(channels, sort=True)
+
+    purchased = df[converted].fillna(0).to_numpy() > 0
+    # 사용자 안에서 첫 구매 세션 다음부터는 버림
+    bought_before = pd.Series(purchased).groupby(users).cumsum().to_numpy() - purchased
+    keep = bought_before == 0
+    user_converted = np.bincount(users, weights=purchased, minlength=users.max() + 1 if len(users) else 0) > 0
+    return _csr(users[keep], states[keep], len(user_converted)) + (user_converted, list(labels))
+
+
+def _csr(path, states, n_paths):
+    """(경로 번호 오름차순, 상태) → (offsets, 상태)"""
+    offsets = np.zeros(n_paths + 1, dtype=np.int64)
+    np.cumsum(np.bincount(path, minlength=n_paths), out=offsets[1:])
+    return offsets, states
+
+
+def fit(offsets, states, converted, labels, collapse_repeats=True):
+    return MarkovAttribution(labels).add(offsets, states, converted, collapse_repeats)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="마르코프 체인 제거 효과 기여도 → mart_markov_attribution")
+    parser.add_argument("--paths", default=None, help="이벤트 경로: sessionizer 출력 Parquet (glob 가능)")
+    parser.add_argument("--sessions", default=None,
+                        help="채널 경로: master_id, session_source, session_start_at, has_purchase 가 있는 세션 Parquet (glob 가능)")
+    parser.add_argument("--cache", default=None, help="전이 건수 행렬 캐시 디렉토리 (있으면 입력 대신 캐시로 계산)")
+    parser.add_argument("--batch-size", type=int, default=1 << 18)
+    parser.add_argument("--out", default="mart_tables")
+    parser.add_argument("--format", choices=["arrow", "parquet"], default="arrow")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    chains = {}
+    for model, source in (("event", args.paths), ("channel", args.sessions)):
+        cached = os.path.join(args.cache, f"markov_{model}.npz") if args.cache else None
+        if source is None:
+            if cached and os.path.exists(cached):
+                chains[model] = MarkovAttribution.load(cached)
+            continue
+        files = sorted(glob.glob(source))
+        if not files:
+            raise FileNotFoundError(f"입력 파일이 없습니다: {source}")
+        dataset = ds.dataset(files, format="parquet")
+        if model == "event":
+            chain = None
+            for batch in dataset.to_batches(columns=["path"], batch_size=args.batch_size):
+                part = fit(*event_paths(batch.column("path")))
+                chain = part if chain is None else chain.merge(part)
+        else:
+            user = "master_id" if "master_id" in dataset.schema.names else "user_pseudo_id"
+            sessions = dataset.to_table(columns=[user, "session_source", "session_start_at", "has_purchase"]).to_pandas()
+            chain = fit(*channel_paths(sessions, user=user))
+        if chain is None:
+            continue
+        chains[model] = chain
+        if cached:
+            os.makedirs(args.cache, exist_ok=True)
+            chain.save(cached)
+
+    if not chains:
+        raise SystemExit("--paths / --sessions 또는 캐시가 필요합니다")
+    frames = [chain.removal_effects().assign(model=model) for model, chain in chains.items()]
+    table = pa.Table.from_pandas(pd.concat(frames, ignore_index=True), preserve_index=False)
+    path = MartStore(args.out).save("markov_attribution", table, fmt=args.format)
+    print(f"markov_attribution: {path} [{table.num_rows:,} rows] "
+          + ", ".join(f"{frame['model'].iloc[0]} 전환 확률 {frame['conversion_probability'].iloc[0]:.4f}" for frame in frames)
+          + f", {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
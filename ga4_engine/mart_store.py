@@ -0,0 +1,412 @@
+"""대시보드용 마트 저장소 (Arrow IPC / Parquet)
+
+mart_tables/ 의 마트 파일을 마트별 고정 스키마로 읽는다.
+- 파일은 처음 접근할 때 하나씩 읽고 (lazy), Arrow IPC 는 memory-map 으로 열어 복사 없이 사용
+- 읽은 마트는 여러 세션/스레드가 공유하며, cache_bytes 를 넘으면 가장 오래 안 쓴 마트부터 해제 (LRU)
+- 같은 마트가 여러 형식으로 있으면 arrow → parquet → csv 순서로 선택 (csv 는 기존 export 호환용)
+- 스키마와 맞지 않는 파일은 조용히 건너뛰지 않고 MartSchemaError 로 알린다
+
+CSV 스냅샷을 Arrow IPC 로 변환:
+    python -m ga4_engine.mart_store --src mart_tables --out mart_tables --format arrow
+"""
+import argparse
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+FORMATS = ("arrow", "parquet", "csv")
+
+
+class MartSchemaError(ValueError):
+    """마트 파일이 선언된 스키마와 맞지 않음 (어느 파일인지 메시지에 포함)"""
+
+
+def _schema(*columns):
+    return pa.schema([pa.field(name, dtype) for name, dtype in columns])
+
+
+STRING, INT, FLOAT, BOOL, DATE = pa.string(), pa.int64(), pa.float64(), pa.bool_(), pa.date32()
+# 세션 단위처럼 큰 마트용: 0/1 플래그·시간대는 int8, 반복되는 문자열 차원은 dictionary 인코딩
+TINY, CATEGORY = pa.int8(), pa.dictionary(pa.int32(), pa.string())
+
+# 대시보드 키 → (파일명 후보, 스키마)
+# 파일명 후보: dbt 모델명이 먼저, 이전에 손으로 export 하던 이름은 뒤에
+MARTS = {
+    'browsing_style': (("mart_browsing_style",), _schema(
+        ("browsing_style", STRING), ("session_count", INT), ("session_share_percent", FLOAT),
+        ("avg_items_viewed", FLOAT), ("item_viewed_p25", INT), ("item_viewed_p50", INT),
+        ("item_viewed_p75", INT), ("item_viewed_p90", INT), ("item_viewed_p100", INT),
+        ("conversion_rate", FLOAT),
+    )),
+    'deep_specialists': (("mart_deep_specialists",), _schema(
+        ("depth_segment", STRING), ("session_count", INT), ("share_percent", FLOAT),
+        ("avg_views", FLOAT), ("conversion_rate", FLOAT),
+    )),
+    'variety_seekers': (("mart_variety_seekers",), _schema(
+        ("intensity_segment", STRING), ("session_count", INT), ("share_percent", FLOAT),
+        ("avg_total_views", FLOAT), ("avg_categories", FLOAT), ("conversion_rate", FLOAT),
+    )),
+    'device_friction': (("mart_device_friction",), _schema(
+        ("device_category", STRING), ("total_sessions", INT), ("high_intent_users", INT),
+        ("high_intent_ratio", FLOAT), ("high_intent_cvr_percent", FLOAT),
+        ("efficiency_index_vs_pc", FLOAT),
+    )),
+    'cart_abandon': (("mart_cart_abandon",), _schema(
+        ("item_name", STRING), ("item_category", STRING), ("abandoned_session_count", INT),
+        ("total_lost_revenue", FLOAT), ("avg_lost_value", FLOAT),
+    )),
+    'cart_abandon_lines': (("mart_cart_abandon_lines",), _schema(
+        ("session_unique_id", STRING), ("item_name", STRING), ("item_category", STRING), ("potential_revenue", FLOAT),
+    )),
+    'promo_quality': (("mart_promo_quality",), _schema(
+        ("promotion_name", STRING), ("ctr_percent", FLOAT), ("click_sessions", INT),
+        ("avg_session_score", FLOAT), ("high_intent_session_count", INT),
+        ("promo_cvr", FLOAT), ("promo_status", STRING),
+    )),
+    'time_conversion': (("mart_time_to_conversion",), _schema(
+        ("minutes_to_buy", INT), ("time_bucket", STRING), ("session_count", INT),
+        ("avg_order_value", FLOAT),
+    )),
+    # 참여 점수에 곱해진 행동별 가중치 (weight_week 는 engagement_weight_grain=week 일 때만 값이 있음)
+    'engagement_weights': (("mart_engagement_weights",), _schema(
+        ("weight_week", DATE), ("signal", STRING), ("lift", FLOAT), ("weight", INT),
+    )),
+    # ga4_engine.quantile_sketch 결과 (그룹별 가중 표본, items 오름차순 / weights 는 표본 하나가 대표하는 건수)
+    'conversion_sketch': (("mart_conversion_sketch",), _schema(
+        ("session_date", DATE), ("device_category", CATEGORY), ("session_source", CATEGORY),
+        ("metric", CATEGORY), ("n", INT), ("total", FLOAT), ("min", FLOAT), ("max", FLOAT),
+        ("max_error", INT), ("items", pa.list_(FLOAT)), ("weights", pa.list_(INT)),
+    )),
+    'bundle_strategy': (("mart_bundle_strategy",), _schema(
+        ("product_A", STRING), ("price_A", FLOAT), ("tier_A", STRING),
+        ("product_B", STRING), ("price_B", FLOAT), ("tier_B", STRING),
+        ("pair_sales_count", INT), ("avg_buyer_score", FLOAT), ("high_intent_ratio", FLOAT),
+        ("bundle_strategy_type", STRING),
+    )),
+    # ga4_engine.basket_miner 결과 (상품 목록은 ' + ' 로 연결)
+    'bundle_itemsets': (("mart_bundle_itemsets",), _schema(
+        ("itemset", STRING), ("itemset_size", INT), ("transactions", INT), ("support_pct", FLOAT),
+    )),
+    'bundle_rules': (("mart_bundle_rules",), _schema(
+        ("antecedent", STRING), ("consequent", STRING), ("antecedent_size", INT),
+        ("rule_transactions", INT), ("antecedent_transactions", INT), ("consequent_transactions", INT),
+        ("support_pct", FLOAT), ("confidence_pct", FLOAT), ("lift", FLOAT),
+    )),
+    # ga4_engine.path_flow 결과 (상위 경로 + 첫 이벤트별 기타 경로, 단계는 ' > ' 로 연결)
+    'path_flow': (("mart_path_flow",), _schema(
+        ("path", STRING), ("steps", INT), ("sessions", INT), ("path_rank", INT),
+        ("is_other", BOOL), ("session_share", FLOAT),
+    )),
+    # ga4_engine.markov_attribution 결과 (model: event / channel)
+    'markov_attribution': (("mart_markov_attribution",), _schema(
+        ("model", STRING), ("state", STRING), ("visits", INT), ("last_touch_conversions", INT),
+        ("removal_effect", FLOAT), ("attribution_share", FLOAT), ("attributed_conversions", FLOAT),
+        ("conversion_probability", FLOAT),
+    )),
+    # 사용자(master_id) 단위 여정 (세션 간 간격은 분, 구매 전 사용자는 구매 관련 컬럼이 비어 있음)
+    'user_journey': (("mart_user_journey",), _schema(
+        ("master_id", STRING), ("is_member", TINY), ("sessions", INT),
+        ("first_session_date", DATE), ("last_session_date", DATE),
+        ("avg_gap_minutes", FLOAT), ("max_gap_minutes", INT),
+        ("first_touch_source", CATEGORY), ("last_touch_source", CATEGORY), ("purchase_touch_source", CATEGORY),
+        ("purchase_sessions", INT), ("sessions_to_purchase", INT), ("days_to_purchase", FLOAT),
+        ("total_revenue", FLOAT),
+    )),
+    'core_sessions': (("mart_core_sessions",), _schema(
+        ("session_unique_id", STRING), ("user_pseudo_id", STRING), ("engagement_grade", STRING),
+        ("engagement_score", INT), ("full_path", STRING), ("path_length", INT),
+        ("is_converted", INT), ("is_missed_opportunity", BOOL),
+    )),
+    # 퍼널 분석 데이터
+    'funnel_overall': (("mart_funnel_overall",), _schema(
+        ("total_sessions", INT), ("step1_view_item", INT), ("step2_add_to_cart", INT),
+        ("step3_begin_checkout", INT), ("step4_add_payment_info", INT), ("step5_purchase", INT),
+        ("pct_view", FLOAT), ("pct_cart", FLOAT), ("pct_purchase", FLOAT),
+    )),
+    'funnel_dropoff': (("mart_funnel_dropoff",), _schema(
+        ("step_order", INT), ("step", STRING), ("from_count", INT), ("to_count", INT),
+        ("drop_rate", FLOAT),
+    )),
+    'funnel_device': (("mart_funnel_device",), _schema(
+        ("device_category", STRING), ("sessions", INT), ("viewed", INT), ("carted", INT),
+        ("purchased", INT), ("overall_cvr", FLOAT), ("view_to_cart", FLOAT),
+    )),
+    'funnel_day': (("mart_funnel_day", "mart_funnel_daycsv"), _schema(
+        ("session_day", INT), ("day_name", STRING), ("sessions", INT), ("purchased", INT),
+        ("cvr", FLOAT),
+    )),
+    'funnel_hour': (("mart_funnel_hour",), _schema(
+        ("session_hour", INT), ("sessions", INT), ("purchased", INT), ("cvr", FLOAT),
+    )),
+    'session_funnel': (("mart_session_funnel",), _schema(
+        ("session_date", DATE), ("session_hour", TINY), ("session_day_of_week", TINY),
+        ("device_category", CATEGORY), ("session_source", CATEGORY), ("session_medium", CATEGORY),
+        ("is_member", TINY), ("browsing_style", CATEGORY), ("engagement_grade", CATEGORY),
+        ("has_view_item", TINY), ("has_search", TINY), ("has_add_to_cart", TINY), ("has_begin_checkout", TINY),
+        ("has_add_payment_info", TINY), ("has_purchase", TINY),
+        ("purchase_revenue", FLOAT), ("minutes_to_buy", INT),
+    )),
+    'funnel_cube': (("mart_funnel_cube",), _schema(
+        ("session_date", DATE), ("session_hour", INT), ("session_day_of_week", INT),
+        ("device_category", STRING), ("session_source", STRING), ("session_medium", STRING),
+        ("session_campaign", STRING), ("is_member", INT),
+        ("sessions", INT), ("session_started", INT), ("viewed", INT), ("carted", INT),
+        ("checkout", INT), ("payment", INT), ("purchased", INT), ("revenue", FLOAT),
+    )),
+}
+
+
+def _read_arrow(path):
+    # memory-map: 페이지 캐시를 그대로 버퍼로 쓰므로 프로세스 메모리에 복사되지 않음
+    with pa.memory_map(path, "r") as source:
+        try:
+            return ipc.open_file(source).read_all()
+        except pa.ArrowInvalid:
+            source.seek(0)
+            return ipc.open_stream(source).read_all()
+
+
+def _read_parquet(path, schema):
+    return pq.read_table(path, columns=schema.names, memory_map=True)
+
+
+def _read_csv(path, schema):
+    return pv.read_csv(
+        path,
+        convert_options=pv.ConvertOptions(
+            column_types=schema, include_columns=schema.names, strings_can_be_null=True
+        ),
+    )
+
+
+def conform(table, schema, path=""):
+    """선언된 컬럼 순서/타입으로 맞추기 (정수형 HUGEINT → DOUBLE export 등은 여기서 복원)"""
+    missing = [name for name in schema.names if name not in table.column_names]
+    if missing:
+        raise MartSchemaError(f"{path}: 컬럼 누락 {missing}")
+    try:
+        return table.select(schema.names).cast(schema)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+        raise MartSchemaError(f"{path}: 스키마 변환 실패 - {e}") from e
+
+
+class MartStore(Mapping):
+    """키 → DataFrame 매핑. `key in store` 는 파일 존재 여부만 보고, 실제 읽기는 store[key] 시점
+
+    Streamlit 의 cache_resource 로 모든 세션이 한 객체를 공유하므로 캐시 변경은 lock 안에서만 한다.
+    cache_bytes(None 이면 제한 없음)를 넘으면 가장 오래 안 쓴 마트의 Arrow 테이블 / DataFrame 을 해제하며,
+    이미 받아 간 객체는 그 참조(MartView 등)가 살아 있는 동안 그대로 쓸 수 있다.
+    """
+
+    def __init__(self, root, marts=MARTS, cache_bytes=None):
+        self.root = root
+        self.marts = marts
+        self.cache_bytes = cache_bytes
+        self._paths = {key: self._locate(key) for key in marts}
+        self._tables = {}
+        self._frames = {}
+        self._recent = OrderedDict()
+        self._lock = threading.RLock()
+
+    @classmethod
+    def discover(cls, candidates, marts=MARTS, cache_bytes=None):
+        """마트 파일이 하나라도 있는 첫 번째 디렉토리로 생성 (없으면 None)"""
+        for root in candidates:
+            store = cls(root, marts, cache_bytes)
+            if len(store):
+                return store
+        return None
+
+    def _locate(self, key):
+        names, _ = self.marts[key]
+        for fmt in FORMATS:
+            for name in names:
+                path = os.path.join(self.root, f"{name}.{fmt}")
+                if os.path.exists(path):
+                    return path
+        return None
+
+    def path(self, key):
+        """마트 파일 경로 (없으면 None)"""
+        return self._paths.get(key)
+
+    def version(self, key):
+        """마트 내용이 바뀔 때만 달라지는 캐시 키 (경로, 수정 시각, 크기). LRU 해제 후 다시 읽어도 같다"""
+        path = self._paths.get(key)
+        if path is None:
+            return None
+        stat = os.stat(path)
+        return path, stat.st_mtime_ns, stat.st_size
+
+    # ===== Mapping =====
+    def __getitem__(self, key):
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._touch(key)
+                return frame
+        # 변환은 lock 밖에서 (동시에 같은 마트를 변환하면 먼저 넣은 쪽을 씀)
+        frame = self.table(key).to_pandas()
+        with self._lock:
+            frame = self._frames.setdefault(key, frame)
+            self._touch(key)
+        return frame
+
+    def __contains__(self, key):
+        return self._paths.get(key) is not None
+
+    def __iter__(self):
+        return (key for key, path in self._paths.items() if path is not None)
+
+    def __len__(self):
+        return sum(path is not None for path in self._paths.values())
+
+    # ===== 페이지 단위 로드 =====
+    def view(self, keys):
+        """keys 마트만 보이는 매핑 (세션/재실행마다 새로 만들고, 받아 간 마트는 뷰가 참조를 유지)"""
+        return MartView(self, [key for key in keys if key in self.marts])
+
+    def release(self, keep=()):
+        """keep 에 없는 마트의 Arrow 테이블 / DataFrame 캐시 해제 (다음 접근 때 다시 읽음)"""
+        with self._lock:
+            for key in list(self._recent):
+                if key not in keep:
+                    self._drop(key)
+
+    def _drop(self, key):
+        self._frames.pop(key, None)
+        self._tables.pop(key, None)
+        self._recent.pop(key, None)
+
+    def _touch(self, key):
+        """LRU 순서 갱신 후 cache_bytes 를 넘으면 오래된 마트부터 해제 (방금 쓴 마트는 유지, lock 안에서 호출)"""
+        self._recent[key] = None
+        self._recent.move_to_end(key)
+        if self.cache_bytes is None:
+            return
+        while len(self._recent) > 1 and self.cached_bytes() > self.cache_bytes:
+            self._drop(next(iter(self._recent)))
+
+    def cached_bytes(self):
+        """캐시된 Arrow 테이블 + DataFrame 크기 (memory-map 된 Arrow 버퍼도 포함하는 근사치)"""
+        with self._lock:
+            tables = sum(table.nbytes for table in self._tables.values())
+            frames = sum(int(frame.memory_usage(index=True).sum()) for frame in self._frames.values())
+        return tables + frames
+
+    # ===== Arrow =====
+    def table(self, key):
+        """스키마가 적용된 pyarrow.Table (DataFrame 변환 전 단계)"""
+        if key not in self:
+            raise KeyError(key)
+        with self._lock:
+            table = self._tables.get(key)
+            if table is not None:
+                self._touch(key)
+                return table
+        path = self._paths[key]
+        schema = self.marts[key][1]
+        table = conform(self._read(path, schema), schema, path)
+        with self._lock:
+            table = self._tables.setdefault(key, table)
+            self._touch(key)
+        return table
+
+    def _read(self, path, schema):
+        fmt = os.path.splitext(path)[1].lstrip(".")
+        if fmt == "arrow":
+            return _read_arrow(path)
+        if fmt == "parquet":
+            return _read_parquet(path, schema)
+        return _read_csv(path, schema)
+
+    def save(self, key, table, fmt="arrow"):
+        """스키마를 적용해 마트 파일로 기록 (파일명은 첫 번째 후보)"""
+        names, schema = self.marts[key]
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, f"{names[0]}.{fmt}")
+        table = conform(table, schema, path)
+        if fmt == "arrow":
+            with ipc.new_file(path, schema) as writer:
+                writer.write_table(table)
+        elif fmt == "parquet":
+            pq.write_table(table, path, compression="zstd")
+        else:
+            raise ValueError(f"지원하지 않는 형식입니다: {fmt}")
+        with self._lock:
+            self._paths[key] = path
+            self._drop(key)
+        return path
+
+
+class MartView(Mapping):
+    """페이지가 선언한 마트만 노출하는 MartStore 읽기 전용 뷰
+
+    선언하지 않은 마트는 `key in view` 가 False 이므로, 페이지에 의존성을 빠뜨리면
+    해당 섹션이 조용히 로드되는 대신 그 페이지에서 바로 드러난다.
+    받아 간 마트는 뷰가 직접 참조하므로 다른 세션 때문에 공유 캐시에서 해제되어도 이 뷰에서는 다시 읽지 않는다.
+    """
+
+    def __init__(self, store, keys):
+        self.store = store
+        self._keys = tuple(key for key in keys if key in store)
+        self._frames = {}
+        self._tables = {}
+        self._versions = {}
+
+    def __getitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        frame = self._frames.get(key)
+        if frame is None:
+            frame = self._frames[key] = self.store[key]
+            self._versions.setdefault(key, self.store.version(key))
+        return frame
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def table(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        table = self._tables.get(key)
+        if table is None:
+            table = self._tables[key] = self.store.table(key)
+            self._versions.setdefault(key, self.store.version(key))
+        return table
+
+    def version(self, key):
+        """이 뷰가 받아 간 마트의 버전 (store.version, 받은 시점 기준) - 파생 객체 캐시 키용"""
+        if key not in self._versions:
+            self.table(key)
+        return self._versions[key]
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="마트 파일을 스키마가 고정된 Arrow IPC / Parquet 로 변환")
+    parser.add_argument("--src", default="mart_tables", help="원본 마트 디렉토리 (csv/parquet/arrow)")
+    parser.add_argument("--out", default="mart_tables")
+    parser.add_argument("--format", choices=["arrow", "parquet"], default="arrow")
+    args = parser.parse_args(argv)
+
+    src = MartStore(args.src)
+    out = MartStore(args.out)
+    for key in src:
+        path = out.save(key, src.table(key), fmt=args.format)
+        print(f"{key}: {src.path(key)} → {path} [{src.table(key).num_rows:,} rows]")
+
+
+if __name__ == "__main__":
+    main()
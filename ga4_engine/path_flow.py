@@ -0,0 +1,239 @@
+"""세션 경로 흐름 (Sankey) 엔진: 반복 이벤트 압축 + 상위 N 경로 + 기타 버킷
+
+mart_funnel_sankey 는 세션이 도달한 마지막 단계만 세므로 단계 사이 이동이나 되돌아가기(루프)가 보이지 않는다.
+여기서는 세션 경로(정수 코드, sessionizer / path_index 와 같은 코드표)를 배치로 흘려보내며
+1. 노이즈 이벤트(scroll, user_engagement) 제거 → 연속 반복 압축 (view_item > view_item → view_item)
+2. 앞쪽 max_steps 단계 + 끝 표시(종료 / 이후 경로)를 uint64 키 하나로 묶어 경로별 세션 수 집계
+3. 경로 요약은 Misra-Gries 요약(키 capacity 개 상한, 병합 가능)으로 유지 → 세션 수와 무관하게 메모리 고정
+   (경로별 세션 수는 최대 max_error 만큼 과소 추정, 나머지는 첫 이벤트별 기타 버킷에 정확히 들어감)
+4. 연속 이벤트 전이 (시작 → a → b → ... → 종료) 는 코드 쌍 bincount 로 정확히 집계
+를 하고, 상위 N 경로 + 첫 이벤트별 "기타 경로" 로 Plotly Sankey 노드/링크 표를 만든다.
+노드는 (단계, 이벤트) 라서 view_item → add_to_cart → view_item 같은 루프도 앞으로 흐르는 선으로 보인다.
+
+사용 예:
+    python -m ga4_engine.path_flow --paths exports/session_paths.parquet --top-n 50 --out mart_tables
+    nodes, links = sankey(store['path_flow'], top_n=15)
+"""
+import argparse
+import glob
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from .mart_store import MartStore
+from .path_index import PATH_SEPARATOR, encode_paths
+from .sessionizer import EVENTS
+
+# 흐름에서 빼는 이벤트 (이동이 아니라 같은 페이지 안의 반응)
+IGNORED = ("scroll", "user_engagement")
+# 이벤트 코드(uint8) 밖의 표시용 코드
+START, MORE, END = 253, 254, 255
+OTHER = "(기타 경로)"
+LABELS = {START: "(시작)", MORE: "(이후 경로)", END: "(종료)"}
+# uint64 키 하나에 단계 코드 8개 (마지막 칸은 끝 표시용)
+MAX_STEPS = 7
+
+
+class PathFlow:
+    def __init__(self, max_steps=5, capacity=10_000, ignore=IGNORED, events=EVENTS):
+        if not 1 <= max_steps <= MAX_STEPS:
+            raise ValueError(f"max_steps 는 1~{MAX_STEPS} 이어야 합니다")
+        self.max_steps = max_steps
+        self.capacity = capacity
+        self.events = tuple(events)
+        self._ignored = np.array([self.events.index(name) for name in ignore if name in self.events], dtype=np.uint8)
+
+        self.keys = np.empty(0, dtype=np.uint64)
+        self.counts = np.empty(0, dtype=np.int64)
+        self.max_error = 0
+        self.n_sessions = 0
+        self.first_counts = np.zeros(256, dtype=np.int64)
+        self.transition_counts = np.zeros(256 * 256, dtype=np.int64)
+
+    def label(self, code):
+        return LABELS.get(code) or self.events[code]
+
+    # ===== 배치 집계 =====
+    def _collapse(self, paths):
+        """노이즈 제거 + 연속 반복 압축 → (코드, 세션 번호, 세션별 길이)"""
+        if isinstance(paths, pa.ChunkedArray):
+            paths = paths.combine_chunks()
+        lengths = pc.fill_null(pc.list_value_length(paths), 0).to_numpy(zero_copy_only=False).astype(np.int64)
+        codes = pc.list_flatten(paths).to_numpy(zero_copy_only=False).astype(np.uint8)
+        session = np.repeat(np.arange(len(lengths), dtype=np.int64), lengths)
+
+        keep = ~np.isin(codes, self._ignored)
+        codes, session = codes[keep], session[keep]
+        keep = np.ones(len(codes), dtype=bool)
+        keep[1:] = (codes[1:] != codes[:-1]) | (session[1:] != session[:-1])
+        codes, session = codes[keep], session[keep]
+        return codes, session, np.bincount(session, minlength=len(lengths))
+
+    def add(self, paths):
+        """경로 배치 (list<uint8> 또는 path / full_path 컬럼이 있는 테이블·배치) 반영"""
+        if isinstance(paths, (pa.Table, pa.RecordBatch)):
+            paths = paths.column("path") if "path" in paths.column_names else encode_paths(paths.column("full_path"), self.events)
+        codes, session, lengths = self._collapse(paths)
+        n = len(lengths)
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        position = np.arange(len(codes)) - offsets[session]
+
+        # 1) 경로 키: 앞쪽 max_steps 단계 코드 + 끝 표시, 칸당 8비트
+        steps = np.zeros((n, MAX_STEPS + 1), dtype=np.uint64)
+        shown = position < self.max_steps
+        steps[session[shown], position[shown]] = codes[shown]
+        shown_lengths = np.minimum(lengths, self.max_steps)
+        steps[np.arange(n), shown_lengths] = np.where(lengths > self.max_steps, MORE, END)
+        key = np.zeros(n, dtype=np.uint64)
+        for k in range(MAX_STEPS + 1):
+            key |= steps[:, k] << np.uint64(8 * (MAX_STEPS - k))
+        batch_keys, batch_counts = np.unique(key, return_counts=True)
+        self._absorb(batch_keys, batch_counts)
+
+        # 2) 첫 이벤트별 세션 수 (기타 버킷용, 정확)
+        self.first_counts += np.bincount(steps[:, 0].astype(np.int64), minlength=256)
+        self.n_sessions += n
+
+        # 3) 전이: 시작 → 첫 이벤트, 이벤트 → 다음 이벤트, 마지막 이벤트 → 종료 (전체 경로 기준)
+        source = np.full(len(codes) + n, START, dtype=np.int64)
+        target = np.full(len(codes) + n, END, dtype=np.int64)
+        at = offsets[session] + session + position  # 세션마다 (길이 + 1) 칸
+        target[at] = codes
+        source[at + 1] = codes
+        self.transition_counts += np.bincount(source * 256 + target, minlength=256 * 256)
+        return self
+
+    def _absorb(self, keys, counts):
+        """요약에 (키, 건수) 합산 후 capacity 개 초과분은 Misra-Gries 방식으로 잘라냄"""
+        keys = np.concatenate([self.keys, keys])
+        counts = np.concatenate([self.counts, counts])
+        unique, inverse = np.unique(keys, return_inverse=True)
+        counts = np.bincount(inverse.ravel(), weights=counts, minlength=len(unique)).astype(np.int64)
+        if len(unique) > self.capacity:
+            cut = int(np.partition(counts, len(counts) - self.capacity - 1)[len(counts) - self.capacity - 1])
+            counts = counts - cut
+            keep = counts > 0
+            unique, counts = unique[keep], counts[keep]
+            self.max_error += cut
+        self.keys, self.counts = unique, counts
+
+    def merge(self, other):
+        """다른 PathFlow (같은 설정, 다른 파티션) 요약을 합침"""
+        self.n_sessions += other.n_sessions
+        self.first_counts += other.first_counts
+        self.transition_counts += other.transition_counts
+        self.max_error += other.max_error
+        self._absorb(other.keys, other.counts)
+        return self
+
+    # ===== 결과 =====
+    def _decode(self, key):
+        """경로 키 → 단계 코드 목록 (끝 표시 포함)"""
+        codes = []
+        for k in range(MAX_STEPS + 1):
+            codes.append(int(key >> np.uint64(8 * (MAX_STEPS - k))) & 0xFF)
+            if codes[-1] in (MORE, END):
+                break
+        return codes
+
+    def paths(self, top_n=50):
+        """상위 top_n 경로 + 첫 이벤트별 기타 경로 (mart_path_flow 형식)"""
+        order = np.argsort(-self.counts, kind="stable")[:top_n]
+        rows, kept_first = [], np.zeros(256, dtype=np.int64)
+        for rank, i in enumerate(order, start=1):
+            codes = self._decode(self.keys[i])
+            kept_first[codes[0]] += self.counts[i]
+            rows.append((PATH_SEPARATOR.join(self.label(code) for code in codes), len(codes) - 1,
+                         int(self.counts[i]), rank, False))
+        for code in np.flatnonzero(self.first_counts - kept_first > 0):
+            if code == END:  # 흐름 이벤트가 하나도 없는 세션은 기타로 나눌 경로가 없음
+                continue
+            rows.append((f"{self.label(code)}{PATH_SEPARATOR}{OTHER}", 1,
+                         int(self.first_counts[code] - kept_first[code]), 0, True))
+        frame = pd.DataFrame(rows, columns=["path", "steps", "sessions", "path_rank", "is_other"])
+        frame["session_share"] = np.round(frame["sessions"] / max(self.n_sessions, 1) * 100, 3)
+        return frame
+
+    def transitions(self):
+        """연속 이벤트 전이 건수 (source, target, transitions), 시작/종료 포함"""
+        pairs = np.flatnonzero(self.transition_counts)
+        return pd.DataFrame({
+            "source": [self.label(int(pair) // 256) for pair in pairs],
+            "target": [self.label(int(pair) % 256) for pair in pairs],
+            "transitions": self.transition_counts[pairs],
+        }).sort_values("transitions", ascending=False, ignore_index=True)
+
+
+def sankey(paths, top_n=None):
+    """mart_path_flow 경로 표 → Plotly Sankey 노드 / 링크 표
+
+    top_n 이 표의 상위 경로 수보다 작으면 나머지 경로를 첫 이벤트별 기타 경로로 다시 합친다.
+    노드는 (단계, 라벨), 끝 표시(종료 / 이후 경로 / 기타 경로)는 라벨 하나당 노드 하나.
+    """
+    paths = paths.copy()
+    if top_n is not None:
+        demote = ~paths["is_other"] & (paths["path_rank"] > top_n)
+        first = paths["path"].str.split(PATH_SEPARATOR, regex=False).str[0]
+        paths.loc[demote, "path"] = first[demote] + PATH_SEPARATOR + OTHER
+        paths.loc[demote, "is_other"] = True
+        paths = paths.groupby(["path", "is_other"], as_index=False, sort=False).agg(
+            sessions=("sessions", "sum"), path_rank=("path_rank", "min"))
+
+    terminals = {OTHER, *LABELS.values()}
+    nodes, links = {}, {}
+
+    def node(step, label):
+        key = (None, label) if label in terminals else (step, label)
+        if key not in nodes:
+            nodes[key] = len(nodes)
+        return nodes[key]
+
+    for path, sessions in zip(paths["path"], paths["sessions"]):
+        labels = path.split(PATH_SEPARATOR)
+        for step, (source, target) in enumerate(zip(labels[:-1], labels[1:]), start=1):
+            link = (node(step, source), node(step + 1, target))
+            links[link] = links.get(link, 0) + int(sessions)
+
+    df_nodes = pd.DataFrame(
+        [(i, label, step) for (step, label), i in nodes.items()], columns=["node", "label", "step"]
+    ).sort_values("node", ignore_index=True)
+    df_links = pd.DataFrame(
+        [(source, target, value) for (source, target), value in links.items()], columns=["source", "target", "sessions"]
+    )
+    return df_nodes, df_links
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="세션 경로 흐름 (상위 N 경로 + 기타) → mart_path_flow")
+    parser.add_argument("--paths", required=True, help="path(list<uint8>) 또는 full_path 컬럼이 있는 세션 Parquet (glob 가능)")
+    parser.add_argument("--max-steps", type=int, default=5, help="경로에 남길 앞쪽 단계 수 (반복 압축 후)")
+    parser.add_argument("--top-n", type=int, default=50, help="마트에 남길 상위 경로 수")
+    parser.add_argument("--capacity", type=int, default=10_000, help="경로 요약에 유지할 최대 키 수")
+    parser.add_argument("--batch-size", type=int, default=1 << 18)
+    parser.add_argument("--out", default="mart_tables")
+    parser.add_argument("--format", choices=["arrow", "parquet"], default="arrow")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    paths = sorted(glob.glob(args.paths))
+    if not paths:
+        raise FileNotFoundError(f"세션 경로 파일이 없습니다: {args.paths}")
+    dataset = ds.dataset(paths, format="parquet")
+    column = "path" if "path" in dataset.schema.names else "full_path"
+    flow = PathFlow(max_steps=args.max_steps, capacity=args.capacity)
+    for batch in dataset.to_batches(columns=[column], batch_size=args.batch_size):
+        flow.add(batch)
+
+    table = pa.Table.from_pandas(flow.paths(args.top_n), preserve_index=False)
+    path = MartStore(args.out).save("path_flow", table, fmt=args.format)
+    print(f"path_flow: {path} [{table.num_rows:,} rows] 세션 {flow.n_sessions:,}개, "
+          f"요약 키 {len(flow.keys):,}개, 최대 과소 추정 {flow.max_error:,}, {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""정수 코드 세션 경로 + n-gram / 역색인
+
+세션 경로를 "session_start > view_item > ..." 문자열 대신 이벤트 코드 배열(list<uint8>, 코드표는
+sessionizer.EVENTS)로 두고, 그 위에 색인을 만들어 경로 조건을 문자열 스캔·정규식 없이 찾는다.
+
+색인 구조 (세션 경로를 이어 붙인 전체 이벤트 배열 기준 위치 e, 같은 세션 안에서는 연속):
+- 이벤트 역색인: 코드별 등장 위치 목록 (위치 오름차순 = 세션, 세션 내 순서 오름차순)
+- n-gram 색인: 길이 2..max_gram 연속 코드 조합별 세션 목록 (후보 세션을 좁히는 데 사용)
+질의:
+- contains(a, b, ...)               : 모든 이벤트를 포함하는 세션
+- followed_by([a, b, ...], within)  : a 뒤에 b ... 가 순서대로 (첫 이벤트부터 within 단계 안에) 나오는 세션
+- sequence([a, b, ...])             : 연속 경로 a > b > ... 를 포함하는 세션
+결과는 세션 행 번호(정렬된 int64 배열)이고, ids() / mask() 로 세션 ID / 불리언 마스크로 바꾼다.
+
+사용 예:
+    index = PathIndex.from_table(pq.read_table("session_paths.parquet"))   # sessionizer 출력
+    index = PathIndex.from_table(store.table("core_sessions"))             # full_path 문자열도 가능
+    rows = index.followed_by(["add_to_cart", "begin_checkout"], within=5)
+    index.ids(rows)
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .sessionizer import EVENTS
+
+PATH_SEPARATOR = " > "
+
+
+def encode_paths(full_path, events=EVENTS):
+    """full_path 문자열 ("a > b > c") → list<uint8> 코드 배열 (코드표에 없는 이벤트는 0)"""
+    if isinstance(full_path, pa.ChunkedArray):
+        full_path = full_path.combine_chunks()
+    parts = pc.split_pattern(full_path, PATH_SEPARATOR)
+    codes = pc.fill_null(pc.index_in(pc.list_flatten(parts), pa.array(events)), 0).cast(pa.uint8())
+    lengths = pc.fill_null(pc.list_value_length(parts), 0).to_numpy(zero_copy_only=False)
+    offsets = np.zeros(len(full_path) + 1, dtype=np.int32)
+    np.cumsum(lengths, out=offsets[1:])
+    return pa.ListArray.from_arrays(pa.array(offsets), codes)
+
+
+class PathIndex:
+    def __init__(self, paths, session_ids=None, max_gram=3, events=EVENTS):
+        if isinstance(paths, pa.ChunkedArray):
+            paths = paths.combine_chunks()
+        if not 1 <= max_gram <= 3:
+            raise ValueError("max_gram 은 1~3 이어야 합니다 ((n-gram 키, 세션) 을 int64 하나에 담음)")
+        self.events = tuple(events)
+        self._code = {name: code for code, name in enumerate(self.events)}
+        self.session_ids = session_ids
+        self.max_gram = max_gram
+
+        lengths = pc.fill_null(pc.list_value_length(paths), 0).to_numpy(zero_copy_only=False).astype(np.int64)
+        self.n_sessions = len(lengths)
+        self.offsets = np.zeros(self.n_sessions + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.offsets[1:])
+        self.codes = pc.list_flatten(paths).to_numpy(zero_copy_only=False).astype(np.uint8)
+        self.session = np.repeat(np.arange(self.n_sessions, dtype=np.int64), lengths)
+
+        # 이벤트 역색인: 코드순 안정 정렬 → 코드 안에서는 위치 오름차순
+        self._postings = np.argsort(self.codes, kind="stable")
+        self._bounds = np.searchsorted(self.codes[self._postings], np.arange(257))
+        self._event_sessions = {}
+
+        # n-gram 색인: (n-gram 키, 세션) 중복 제거 후 키별 세션 목록
+        self._grams = {}
+        for n in range(2, max_gram + 1):
+            starts = np.flatnonzero(self._valid_starts(n))
+            key = np.zeros(len(starts), dtype=np.int64)
+            for k in range(n):
+                key = (key << 8) | self.codes[starts + k]
+            pairs = np.sort((key << 32) | self.session[starts])
+            pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]] if len(pairs) else pairs
+            keys, sessions = pairs >> 32, pairs & 0xFFFFFFFF
+            gram_starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else keys
+            self._grams[n] = (keys[gram_starts], np.r_[gram_starts, len(keys)], sessions)
+
+    @classmethod
+    def from_table(cls, table, max_gram=3, events=EVENTS):
+        """sessionizer 출력 (path) 또는 full_path 문자열 컬럼이 있는 세션 테이블로 색인 생성"""
+        if "path" in table.column_names:
+            paths = table.column("path")
+        else:
+            paths = encode_paths(table.column("full_path"), events)
+        session_ids = table.column("session_unique_id") if "session_unique_id" in table.column_names else None
+        return cls(paths, session_ids, max_gram, events)
+
+    def _valid_starts(self, n):
+        """길이 n 조합이 한 세션 안에 들어가는 시작 위치"""
+        return np.arange(len(self.codes)) + (n - 1) < self.offsets[self.session + 1]
+
+    def code(self, event):
+        if isinstance(event, (int, np.integer)):
+            return int(event)
+        try:
+            return self._code[event]
+        except KeyError:
+            raise KeyError(f"코드표에 없는 이벤트입니다: {event}") from None
+
+    # ===== 색인 조회 =====
+    def positions(self, event):
+        """이벤트가 나온 전체 위치 (오름차순)"""
+        code = self.code(event)
+        return self._postings[self._bounds[code]:self._bounds[code + 1]]
+
+    def sessions_with(self, event):
+        """이벤트를 한 번 이상 포함하는 세션"""
+        code = self.code(event)
+        if code not in self._event_sessions:
+            sessions = self.session[self.positions(code)]
+            self._event_sessions[code] = sessions[np.r_[True, sessions[1:] != sessions[:-1]]] if len(sessions) else sessions
+        return self._event_sessions[code]
+
+    def _gram_sessions(self, codes):
+        n = len(codes)
+        gram_keys, gram_bounds, sessions = self._grams[n]
+        key = 0
+        for code in codes:
+            key = (key << 8) | code
+        i = np.searchsorted(gram_keys, key)
+        if i == len(gram_keys) or gram_keys[i] != key:
+            return np.empty(0, dtype=np.int64)
+        return sessions[gram_bounds[i]:gram_bounds[i + 1]]
+
+    def _intersect(self, lists):
+        result = lists[0]
+        for other in lists[1:]:
+            result = np.intersect1d(result, other, assume_unique=True)
+        return result
+
+    # ===== 질의 =====
+    def contains(self, *events):
+        """모든 이벤트를 (순서 무관) 포함하는 세션"""
+        return self._intersect(sorted((self.sessions_with(event) for event in events), key=len))
+
+    def followed_by(self, events, within=None):
+        """events 가 순서대로 나오는 세션 (사이에 다른 이벤트 허용, within 이면 첫 이벤트부터 within 단계 이내)
+
+        시작 위치마다 다음 이벤트의 가장 이른 위치를 따라가므로 끝 위치가 최소가 되어 within 판정이 정확하다.
+        """
+        codes = [self.code(event) for event in events]
+        candidates = self.contains(*codes)
+        if len(candidates) == 0:
+            return candidates
+        first = self.positions(codes[0])
+        first = first[np.isin(self.session[first], candidates, assume_unique=False)]
+        current, alive = first, np.ones(len(first), dtype=bool)
+        for code in codes[1:]:
+            following = self.positions(code)
+            i = np.searchsorted(following, current, side="right")
+            found = i < len(following)
+            nxt = np.where(found, following[np.minimum(i, len(following) - 1)], 0)
+            alive &= found & (self.session[nxt] == self.session[first])
+            current = np.where(alive, nxt, current)
+        if within is not None:
+            alive &= current - first <= within
+        return np.unique(self.session[first[alive]])
+
+    def sequence(self, events):
+        """연속 경로 events[0] > events[1] > ... 를 포함하는 세션 (n-gram 색인으로 후보를 좁힌 뒤 위치 확인)"""
+        codes = [self.code(event) for event in events]
+        n = len(codes)
+        if n == 1:
+            return self.sessions_with(codes[0])
+        gram = min(n, self.max_gram)
+        if gram >= 2:
+            candidates = self._intersect(sorted(
+                (self._gram_sessions(codes[k:k + gram]) for k in range(n - gram + 1)), key=len))
+        else:
+            candidates = self.contains(*codes)
+        if n <= self.max_gram or len(candidates) == 0:
+            return candidates
+        first = self.positions(codes[0])
+        first = first[np.isin(self.session[first], candidates) & (first + n <= self.offsets[self.session[first] + 1])]
+        match = np.ones(len(first), dtype=bool)
+        for k, code in enumerate(codes[1:], start=1):
+            match &= self.codes[first + k] == code
+        return np.unique(self.session[first[match]])
+
+    def frequent(self, n=2, top_k=20):
+        """세션 수 기준 상위 n-gram (n=1 이면 이벤트)"""
+        if n == 1:
+            counts = {code: len(self.sessions_with(code)) for code in range(len(self.events))}
+            labels = [(self.events[code],) for code in counts]
+            values = list(counts.values())
+        else:
+            if n not in self._grams:
+                raise ValueError(f"n 은 max_gram({self.max_gram}) 이하여야 합니다")
+            gram_keys, gram_bounds, _ = self._grams[n]
+            values = np.diff(gram_bounds)
+            labels = [tuple(self.events[(int(key) >> (8 * (n - 1 - k))) & 0xFF] for k in range(n)) for key in gram_keys]
+        frame = pd.DataFrame({
+            "ngram": [PATH_SEPARATOR.join(label) for label in labels],
+            "sessions": values,
+        })
+        frame = frame[frame["sessions"] > 0]
+        frame["session_share"] = frame["sessions"] / max(self.n_sessions, 1)
+        return frame.sort_values("sessions", ascending=False, ignore_index=True).head(top_k)
+
+    # ===== 결과 변환 =====
+    def ids(self, rows):
+        """세션 행 번호 → session_unique_id"""
+        if self.session_ids is None:
+            raise ValueError("session_unique_id 없이 만든 색인입니다")
+        return self.session_ids.take(pa.array(rows, type=pa.int64()))
+
+    def mask(self, rows):
+        mask = np.zeros(self.n_sessions, dtype=bool)
+        mask[rows] = True
+        return mask
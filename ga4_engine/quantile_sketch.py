@@ -0,0 +1,182 @@
+"""구매 소요 시간 / 주문 금액 분포 스케치 (일자 x 기기 x 유입 소스)
+
+mart_time_to_conversion 은 분 단위로 GROUP BY 한 뒤 고정 CASE 구간으로 묶어 두므로 다른 분위수나 구간,
+기간을 보려면 다시 집계해야 한다. 여기서는 그룹(일자 x 기기 x 유입 소스)마다 값 분포를 작은 가중 표본으로
+요약해 mart_conversion_sketch 에 저장하고, 대시보드가 원하는 기간·필터의 행을 합쳐 분위수 / 구간 분포를 계산한다.
+
+스케치 (그룹 하나, 값 n 개, 크기 k):
+- n <= k 이면 값을 그대로 저장 (정확)
+- n > k 이면 정렬한 값을 크기 s = ceil(n / k) 블록으로 나눠 블록 가운데 값 하나를 블록 크기 가중치로 저장
+  → 임의의 x 에 대해 "x 미만 건수" 오차가 블록당 s / 2 이하
+병합은 가중 표본을 이어 붙이기만 하면 되고 오차는 더해진다:
+    순위 오차 <= sum(그룹별 s / 2) <= (합친 건수) / k   (k 이하 그룹은 0)
+건수 / 합계 / 최솟값 / 최댓값은 그룹별로 따로 저장하므로 평균(객단가)은 항상 정확하다.
+
+새 일자만 추가할 때는 --append 로 기존 마트에서 입력에 있는 일자만 바꿔 쓴다.
+
+사용 예:
+    python -m ga4_engine.quantile_sketch --sessions mart_tables_local/mart_session_funnel.parquet --out mart_tables
+"""
+import argparse
+import glob
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from .mart_store import MartStore
+
+DIMENSIONS = ["session_date", "device_category", "session_source"]
+# 지표 → mart_session_funnel 컬럼 (구매 세션만 값이 있음)
+METRICS = {"minutes_to_buy": "minutes_to_buy", "order_value": "purchase_revenue"}
+DEFAULT_K = 256
+
+
+class QuantileSketch:
+    """가중 표본 (items 오름차순) + 정확한 건수 / 합계 / 최솟값 / 최댓값"""
+
+    def __init__(self, items, weights, total=0.0, minimum=np.nan, maximum=np.nan, max_error=0.0):
+        order = np.argsort(items, kind="stable")
+        self.items = np.asarray(items, dtype=np.float64)[order]
+        self.weights = np.asarray(weights, dtype=np.int64)[order]
+        self.cumulative = np.cumsum(self.weights)
+        self.count = int(self.cumulative[-1]) if len(self.cumulative) else 0
+        self.total = float(total)
+        self.min = float(minimum)
+        self.max = float(maximum)
+        self.max_error = float(max_error)
+
+    @classmethod
+    def from_values(cls, values, k=DEFAULT_K):
+        values = np.sort(np.asarray(values, dtype=np.float64))
+        offsets, items, weights, errors = _compact(values, np.array([0, len(values)]), k)
+        return cls(items, weights, values.sum(), values[0] if len(values) else np.nan,
+                   values[-1] if len(values) else np.nan, errors.sum())
+
+    @classmethod
+    def from_rows(cls, rows):
+        """마트 행(items / weights / total / min / max / max_error) 여러 개를 합친 스케치"""
+        if len(rows) == 0:
+            return cls([], [])
+        return cls(
+            np.concatenate(rows["items"].to_numpy()), np.concatenate(rows["weights"].to_numpy()),
+            rows["total"].sum(), rows["min"].min(), rows["max"].max(), rows["max_error"].sum(),
+        )
+
+    def merge(self, *others):
+        sketches = (self, *others)
+        return QuantileSketch(
+            np.concatenate([s.items for s in sketches]), np.concatenate([s.weights for s in sketches]),
+            sum(s.total for s in sketches), np.nanmin([s.min for s in sketches]),
+            np.nanmax([s.max for s in sketches]), sum(s.max_error for s in sketches),
+        )
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else np.nan
+
+    def rank(self, x):
+        """x 미만 건수 추정 (오차 max_error 이하)"""
+        i = np.searchsorted(self.items, x, side="left")
+        return np.where(i > 0, self.cumulative[np.maximum(i - 1, 0)], 0)
+
+    def quantile(self, q):
+        """하위 q 분위 값 (PERCENTILE_DISC 기준: 누적 건수가 q * n 이상이 되는 첫 값)"""
+        if not self.count:
+            return np.full(np.shape(q), np.nan)
+        target = np.maximum(np.ceil(np.asarray(q, dtype=np.float64) * self.count), 1)
+        i = np.minimum(np.searchsorted(self.cumulative, target, side="left"), len(self.items) - 1)
+        return np.clip(self.items[i], self.min, self.max)
+
+    def histogram(self, edges):
+        """구간 [edges[i], edges[i+1]) 별 건수 추정"""
+        below = self.rank(np.asarray(edges, dtype=np.float64))
+        return np.diff(below)
+
+
+def _compact(values, bounds, k):
+    """그룹별로 정렬된 values (그룹 경계 bounds) → 그룹별 가중 표본 (offsets, items, weights, 그룹별 최대 순위 오차)"""
+    sizes = np.diff(bounds)
+    group = np.repeat(np.arange(len(sizes)), sizes)
+    group_step = np.maximum(-(-sizes // k), 1)
+    step = group_step[group]
+    position = np.arange(len(values)) - bounds[:-1][group]
+    block_start = position - position % step
+    block_size = np.minimum(step, sizes[group] - block_start)
+    keep = position - block_start == (block_size - 1) // 2
+    counts = np.bincount(group[keep], minlength=len(sizes))
+    offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets, values[keep], block_size[keep], group_step // 2
+
+
+def build(sessions, k=DEFAULT_K):
+    """구매 세션 DataFrame (DIMENSIONS + METRICS 컬럼) → 마트 행 (그룹 x 지표)"""
+    frames = []
+    for metric, column in METRICS.items():
+        part = sessions.loc[sessions[column].notna(), DIMENSIONS + [column]].sort_values(DIMENSIONS + [column])
+        if part.empty:
+            continue
+        keys = part[DIMENSIONS].to_numpy()
+        values = part[column].to_numpy(dtype=np.float64)
+        changed = np.r_[True, (keys[1:] != keys[:-1]).any(axis=1)]
+        starts = np.flatnonzero(changed)
+        bounds = np.r_[starts, len(values)]
+        offsets, items, weights, errors = _compact(values, bounds, k)
+        frame = part.iloc[starts][DIMENSIONS].reset_index(drop=True)
+        frame["metric"] = metric
+        frame["n"] = np.diff(bounds)
+        frame["total"] = np.add.reduceat(values, starts)
+        frame["min"] = values[starts]
+        frame["max"] = values[bounds[1:] - 1]
+        frame["max_error"] = errors
+        frame["items"] = np.split(items, offsets[1:-1])
+        frame["weights"] = np.split(weights, offsets[1:-1])
+        frames.append(frame)
+    columns = DIMENSIONS + ["metric", "n", "total", "min", "max", "max_error", "items", "weights"]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="구매 소요 시간 / 주문 금액 분포 스케치 → mart_conversion_sketch")
+    parser.add_argument("--sessions", required=True,
+                        help="mart_session_funnel Parquet (session_date, device_category, session_source, "
+                             "minutes_to_buy, purchase_revenue; glob 가능)")
+    parser.add_argument("-k", type=int, default=DEFAULT_K, help="그룹당 최대 표본 수 (클수록 정확, 순위 오차 <= 건수 / k)")
+    parser.add_argument("--append", action="store_true", help="기존 마트에서 입력에 있는 일자만 바꿔 쓰기")
+    parser.add_argument("--out", default="mart_tables")
+    parser.add_argument("--format", choices=["arrow", "parquet"], default="arrow")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    paths = sorted(glob.glob(args.sessions))
+    if not paths:
+        raise FileNotFoundError(f"세션 파일이 없습니다: {args.sessions}")
+    dataset = ds.dataset(paths, format="parquet")
+    sessions = dataset.to_table(
+        columns=DIMENSIONS + list(METRICS.values()),
+        filter=ds.field("minutes_to_buy").is_valid() | ds.field("purchase_revenue").is_valid(),
+    ).to_pandas()
+    frame = build(sessions, args.k)
+
+    store = MartStore(args.out)
+    kept = 0
+    if args.append and "conversion_sketch" in store:
+        previous = store.table("conversion_sketch").to_pandas()
+        previous = previous[~previous["session_date"].isin(set(frame["session_date"]))]
+        kept = len(previous)
+        frame = pd.concat([previous.astype({"device_category": str, "session_source": str, "metric": str}), frame],
+                          ignore_index=True)
+        store.release()
+
+    table = pa.Table.from_pandas(frame, preserve_index=False).combine_chunks()
+    path = store.save("conversion_sketch", table, fmt=args.format)
+    stored = int(sum(len(items) for items in frame["items"]))
+    print(f"conversion_sketch: {path} [{table.num_rows:,} rows, 기존 유지 {kept:,}] "
+          f"구매 세션 {len(sessions):,}개, 표본 {stored:,}개 (k={args.k}), {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""세그먼트 자동 탐색 (세그먼트 vs 전체 유의성 스캔)
+
+mart_session_funnel (세션 1행) 의 차원 조합마다 목표 단계 전환율을 계산해, 전체(baseline)와 차이가 크고
+유의한 세그먼트를 찾는다. Variety vs Deep 같은 손으로 고른 대비 대신 모든 조합을 빠짐없이 본다.
+
+1. 세션 → 셀: 스캔 차원 전체 조합(셀)별 세션 수 / 단계별 도달 수 (세션 수에 선형, 생성 시 한 번)
+2. 깊이 1..max_depth 의 차원 부분집합마다 셀을 FunnelCube.rollup 으로 합산 (셀 수에 선형)
+3. min_sessions 미만 슬라이스 제거 후 segment_stats 로 한 번에 검정
+   (세그먼트 vs 나머지 세션 z 검정, Cohen's h, 향상도, Benjamini-Hochberg / Holm 보정)
+4. 보정 후 유의한 세그먼트를 효과 크기 |h| 순으로 상위 K 개
+
+사용 예:
+    scanner = SegmentScanner(store['session_funnel'])
+    scanner.scan('has_purchase', max_depth=3, min_sessions=500, top_k=20)
+"""
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from . import segment_stats
+from .funnel_cube import FunnelCube
+
+DIMENSIONS = ["device_category", "session_source", "session_hour", "browsing_style", "engagement_grade"]
+FLAGS = ["has_view_item", "has_add_to_cart", "has_begin_checkout", "has_add_payment_info", "has_purchase"]
+
+# 셀 조합 수가 이 값(또는 세션 수)보다 크면 혼합 진법 대신 np.unique(axis=0) 로 셀 번호 부여
+_DENSE_KEYS = 1 << 20
+
+
+def _label(dim, values):
+    """'차원=값' 라벨 (NULL 은 '(null)', astype(str) 만 쓰면 NULL 이 라벨째 NaN 이 됨)"""
+    values = values.astype(object)
+    return values.where(values.notna(), "(null)").map(str).radd(f"{dim}=")
+
+
+class SegmentScanner:
+    def __init__(self, sessions, dimensions=DIMENSIONS, flags=FLAGS):
+        columns = sessions.column_names if isinstance(sessions, pa.Table) else list(sessions.columns)
+        self.dimensions = [dim for dim in dimensions if dim in columns]
+        self.flags = [flag for flag in flags if flag in columns]
+        if isinstance(sessions, pa.Table):
+            sessions = sessions.select(self.dimensions + self.flags).to_pandas()
+        self.n_sessions = len(sessions)
+        cells = self._cells(sessions)
+        self.n_cells = len(cells)
+        self.totals = {flag: int(cells[flag].sum()) for flag in self.flags}
+        self.cube = FunnelCube(cells, dimensions=self.dimensions, measures=["sessions"] + self.flags)
+
+    def _cells(self, sessions):
+        """세션 → 스캔 차원 전체 조합별 합계 (NULL 도 하나의 값)"""
+        codes, levels = [], []
+        for dim in self.dimensions:
+            dim_codes, dim_levels = pd.factorize(sessions[dim], use_na_sentinel=False)
+            codes.append(dim_codes.astype(np.int64))
+            levels.append(pd.Index(dim_levels))
+        sizes = [max(len(dim_levels), 1) for dim_levels in levels]
+
+        if int(np.prod(sizes, dtype=object)) <= max(_DENSE_KEYS, self.n_sessions):
+            key = np.zeros(self.n_sessions, dtype=np.int64)
+            for dim_codes, size in zip(codes, sizes):
+                key *= size
+                key += dim_codes
+            counts = np.bincount(key)
+            present = np.flatnonzero(counts)
+            cell_of = np.zeros(len(counts), dtype=np.int64)
+            cell_of[present] = np.arange(len(present))
+            inverse = cell_of[key]
+            cell_codes, rest = [], present
+            for size in reversed(sizes):
+                cell_codes.append(rest % size)
+                rest = rest // size
+            cell_codes = cell_codes[::-1]
+        else:
+            unique, inverse = np.unique(np.stack(codes, axis=1), axis=0, return_inverse=True)
+            inverse = inverse.ravel()
+            cell_codes = [unique[:, i] for i in range(len(codes))]
+
+        cells = {dim: dim_levels.take(dim_codes) for dim, dim_levels, dim_codes in zip(self.dimensions, levels, cell_codes)}
+        cells["sessions"] = np.bincount(inverse)
+        for flag in self.flags:
+            values = sessions[flag].to_numpy(dtype=np.float64, na_value=0.0)
+            cells[flag] = np.bincount(inverse, weights=values, minlength=len(cells["sessions"])).astype(np.int64)
+        return pd.DataFrame(cells)
+
+    def slices(self, target="has_purchase", max_depth=2, min_sessions=100, dimensions=None):
+        """깊이 1..max_depth 의 모든 슬라이스 (세션 수 min_sessions 미만 제외), 슬라이스에 없는 차원은 NaN"""
+        if target not in self.flags:
+            raise KeyError(f"스캔할 수 없는 단계입니다: {target}")
+        dimensions = [dim for dim in (dimensions or self.dimensions) if dim in self.dimensions]
+        frames = []
+        for depth in range(1, max_depth + 1):
+            for dims in combinations(dimensions, depth):
+                rolled = self.cube.rollup(list(dims), rates=False)
+                rolled = rolled[rolled["sessions"] >= min_sessions]
+                if rolled.empty:
+                    continue
+                label = _label(dims[0], rolled[dims[0]])
+                for dim in dims[1:]:
+                    label = label + " · " + _label(dim, rolled[dim])
+                frames.append(pd.DataFrame({
+                    "segment": label.to_numpy(),
+                    "depth": depth,
+                    **{dim: rolled[dim].astype(object).to_numpy() for dim in dims},
+                    "sessions": rolled["sessions"].to_numpy(),
+                    "conversions": rolled[target].to_numpy(),
+                }))
+        if not frames:
+            return pd.DataFrame(columns=["segment", "depth", *dimensions, "sessions", "conversions"])
+        return pd.concat(frames, ignore_index=True)
+
+    def scan(self, target="has_purchase", max_depth=2, min_sessions=100, top_k=20,
+             alpha=0.05, correction="bh", dimensions=None):
+        """전체 대비 유의하게 다른 세그먼트 상위 top_k (|Cohen's h| 순, top_k=None 이면 전부)"""
+        slices = self.slices(target, max_depth, min_sessions, dimensions)
+        total_sessions, total_conversions = self.n_sessions, self.totals[target]
+        baseline = total_conversions / total_sessions if total_sessions else np.nan
+
+        sessions = slices["sessions"].to_numpy(dtype=np.float64)
+        conversions = slices["conversions"].to_numpy(dtype=np.float64)
+        rest_sessions, rest_conversions = total_sessions - sessions, total_conversions - conversions
+        rate, ci_low, ci_high = segment_stats.wilson_interval(conversions, sessions)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rest_rate = rest_conversions / rest_sessions
+        z, p_value = segment_stats.two_proportion_ztest(conversions, sessions, rest_conversions, rest_sessions)
+        q_value = segment_stats.p_adjust(p_value, correction)
+
+        result = slices.assign(
+            rate=np.round(rate * 100, 2),
+            ci_low=np.round(ci_low * 100, 2),
+            ci_high=np.round(ci_high * 100, 2),
+            baseline=round(baseline * 100, 2),
+            lift=rate / baseline if baseline else np.nan,
+            cohens_h=segment_stats.cohens_h(rate, rest_rate),
+            z=z,
+            p_value=p_value,
+            q_value=q_value,
+            significant=q_value < alpha,
+        )
+        result = result.sort_values(
+            ["significant", "cohens_h"], ascending=[False, False],
+            key=lambda col: col.abs() if col.name == "cohens_h" else col, ignore_index=True,
+        )
+        return result if top_k is None else result.head(top_k)
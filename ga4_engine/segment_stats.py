@@ -0,0 +1,129 @@
+"""세그먼트 전환율 통계 검정 (NumPy 벡터 연산)
+
+대시보드의 검정 함수는 세그먼트 한 쌍씩 scipy 를 호출하므로, 시간대·유입·기기·프로모션·SKU 처럼
+세그먼트가 수천 개면 파이썬 루프가 된다. 여기 함수들은 모두 배열을 받아 한 번에 계산한다.
+- 입력은 브로드캐스트 가능한 배열 (스칼라도 가능), 전환율은 0~1 비율
+- 2xK 카이제곱은 마지막 축이 K (여러 검정을 행으로 쌓아 한 번에)
+- 여러 검정을 동시에 볼 때는 p_adjust 로 Holm / Benjamini-Hochberg 보정
+
+scipy.stats.chi2_contingency 와 같은 값을 내도록 2x2 (자유도 1) 에는 기본으로 Yates 보정을 적용한다.
+"""
+import numpy as np
+from scipy import special
+
+__all__ = ["wilson_interval", "cohens_h", "two_proportion_ztest", "chi2_2x2", "chi2_2xk", "p_adjust"]
+
+
+def _z(confidence):
+    return special.ndtri((1 + np.asarray(confidence, dtype=np.float64)) / 2)
+
+
+def _arrays(*values):
+    return [np.asarray(v, dtype=np.float64) for v in values]
+
+
+def wilson_interval(successes, totals, confidence=0.95):
+    """Wilson Score 신뢰구간 → (전환율, 하한, 상한), 표본 0 이면 모두 0"""
+    successes, totals = _arrays(successes, totals)
+    z = _z(confidence)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = successes / totals
+        denominator = 1 + z**2 / totals
+        center = (p + z**2 / (2 * totals)) / denominator
+        margin = z * np.sqrt((p * (1 - p) + z**2 / (4 * totals)) / totals) / denominator
+    empty = totals <= 0
+    rate = np.where(empty, 0.0, p)
+    low = np.where(empty, 0.0, np.clip(center - margin, 0, 1))
+    high = np.where(empty, 0.0, np.clip(center + margin, 0, 1))
+    return rate, low, high
+
+
+def cohens_h(p1, p2):
+    """Cohen's h 효과 크기 (부호 있음, 크기는 abs 로)"""
+    p1, p2 = _arrays(p1, p2)
+    return 2 * np.arcsin(np.sqrt(p1)) - 2 * np.arcsin(np.sqrt(p2))
+
+
+def two_proportion_ztest(s1, n1, s2, n2):
+    """두 비율 z 검정 (합동 분산, 양측) → (z, p)"""
+    s1, n1, s2, n2 = _arrays(s1, n1, s2, n2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pooled = (s1 + s2) / (n1 + n2)
+        se = np.sqrt(pooled * (1 - pooled) * (1 / n1 + 1 / n2))
+        z = (s1 / n1 - s2 / n2) / se
+    return z, 2 * special.ndtr(-np.abs(z))
+
+
+def _chi2_sf(chi2, dof):
+    return special.chdtrc(dof, chi2)
+
+
+def chi2_2x2(s1, n1, s2, n2, correction=True):
+    """두 그룹 전환/미전환 2x2 카이제곱 → (chi2, p). 기대빈도 0 인 칸이 있으면 NaN"""
+    s1, n1, s2, n2 = _arrays(s1, n1, s2, n2)
+    observed = np.stack(np.broadcast_arrays(s1, n1 - s1, s2, n2 - s2), axis=-1)
+    chi2, _ = _chi2_table(observed.reshape(observed.shape[:-1] + (2, 2)), correction)
+    return chi2, _chi2_sf(chi2, 1)
+
+
+def chi2_2xk(successes, totals, correction=True, axis=-1):
+    """K 개 그룹 전환율 동질성 검정 (2xK) → (chi2, p, dof)
+
+    axis 방향이 그룹. 표본 0 인 그룹은 제외하고 자유도를 센다 (K-1).
+    """
+    successes = np.moveaxis(np.asarray(successes, dtype=np.float64), axis, -1)
+    totals = np.moveaxis(np.asarray(totals, dtype=np.float64), axis, -1)
+    observed = np.stack([successes, totals - successes], axis=-1)
+    present = totals > 0
+    observed = np.where(present[..., None], observed, 0.0)
+    chi2, dof = _chi2_table(observed, correction, present)
+    return chi2, _chi2_sf(chi2, dof), dof
+
+
+def _chi2_table(observed, correction, present=None):
+    """(..., K, 2) 분할표 → (chi2, 자유도). 자유도 1 이면 scipy 와 같은 Yates 보정"""
+    if present is None:
+        present = np.ones(observed.shape[:-1], dtype=bool)
+    row_totals = observed.sum(axis=-1, keepdims=True)
+    col_totals = observed.sum(axis=-2, keepdims=True)
+    grand = row_totals.sum(axis=-2, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = row_totals * col_totals / grand
+    dof = (present.sum(axis=-1) - 1) * (np.count_nonzero(col_totals[..., 0, :] > 0, axis=-1) - 1)
+    if correction:
+        # 관측값을 기대값 쪽으로 0.5 만큼 (기대값을 넘지 않게) 이동
+        diff = expected - observed
+        adjusted = observed + np.sign(diff) * np.minimum(0.5, np.abs(diff))
+        observed = np.where((dof == 1)[..., None, None], adjusted, observed)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cells = np.where(present[..., None], (observed - expected) ** 2 / expected, 0.0)
+    chi2 = cells.sum(axis=(-2, -1))
+    # 기대빈도 0 인 칸 (전환 0 건 또는 전부 전환) 은 검정 불가
+    invalid = (dof < 1) | np.any(present[..., None] & (expected <= 0), axis=(-2, -1))
+    return np.where(invalid, np.nan, chi2), np.maximum(dof, 0)
+
+
+def p_adjust(p_values, method="holm", axis=-1):
+    """다중 비교 보정된 p 값 (holm: FWER, bh: FDR). NaN 은 검정 수에서 빼고 그대로 둔다"""
+    p = np.moveaxis(np.asarray(p_values, dtype=np.float64), axis, -1)
+    valid = ~np.isnan(p)
+    m = valid.sum(axis=-1, keepdims=True)
+    filled = np.where(valid, p, np.inf)
+    order = np.argsort(filled, axis=-1, kind="stable")
+    ranked = np.take_along_axis(filled, order, axis=-1)
+    rank = np.arange(1, p.shape[-1] + 1)
+
+    if method == "holm":
+        with np.errstate(invalid="ignore"):  # NaN 자리 (rank > m) 의 0 * inf
+            adjusted = np.maximum.accumulate((m - rank + 1) * ranked, axis=-1)
+    elif method == "bh":
+        # 뒤에서부터 누적 최소 (NaN 자리는 inf 로 맨 뒤에 있으므로 영향 없음)
+        adjusted = np.flip(np.minimum.accumulate(np.flip(ranked * m / rank, -1), axis=-1), -1)
+    else:
+        raise ValueError(f"지원하지 않는 보정 방법입니다: {method}")
+
+    adjusted = np.minimum(adjusted, 1.0)
+    result = np.empty_like(adjusted)
+    np.put_along_axis(result, order, adjusted, axis=-1)
+    result = np.where(valid, result, np.nan)
+    return np.moveaxis(result, -1, axis)
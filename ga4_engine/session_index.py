@@ -0,0 +1,208 @@
+"""세션 단위 교차 필터(cross-filter) 비트맵 인덱스
+
+mart_session_funnel (세션 1행, 범주형 차원 + 퍼널 도달 플래그)을 메모리에 인덱싱해 두고,
+차트에서 고른 값으로 다른 차트의 분포를 웨어하우스 재조회 없이 다시 집계한다.
+
+인덱스 구조 (세션 N 개 → N 비트 = N/64 개의 uint64):
+- 차원 값마다 "그 값을 가진 세션" 비트맵
+- 퍼널 플래그마다 "그 단계에 도달한 세션" 비트맵
+필터는 선택한 값 비트맵의 OR(같은 차원) / AND(다른 차원), 건수는 AND 후 popcount 로 계산한다.
+1,000만 세션 기준 비트맵 하나가 1.25MB 라 AND + popcount 가 1ms 미만이다.
+
+교차 필터 규칙: 각 차원의 분포는 자기 차원에 걸린 필터를 제외한 나머지 필터로 계산
+(선택한 막대 외의 값도 계속 보여야 다른 값을 고를 수 있음).
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .funnel_cube import rate_columns
+
+# 값 개수가 적은 차원만 기본으로 인덱싱 (값마다 비트맵 하나)
+DIMENSIONS = [
+    "device_category", "session_hour", "session_day_of_week", "session_source",
+    "session_medium", "is_member", "browsing_style",
+]
+# 퍼널 플래그 → 집계 컬럼명 (mart_funnel_cube 와 같은 이름)
+FLAGS = {
+    "has_view_item": "viewed",
+    "has_add_to_cart": "carted",
+    "has_begin_checkout": "checkout",
+    "has_add_payment_info": "payment",
+    "has_purchase": "purchased",
+}
+
+if hasattr(np, "bitwise_count"):
+    def _popcount(words):
+        return int(np.bitwise_count(words).sum())
+else:  # numpy < 2.0
+    _POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount(words):
+        return int(_POPCOUNT8[words.view(np.uint8)].sum(dtype=np.int64))
+
+
+def _pack(flags):
+    """bool 배열 → uint64 비트맵 (64 비트 단위로 0 패딩)"""
+    padded = np.zeros(-(-len(flags) // 64) * 64, dtype=bool)
+    padded[:len(flags)] = flags
+    return np.packbits(padded, bitorder="little").view(np.uint64)
+
+
+def _is_ordinal(dtype):
+    """순서가 있는 차원 (시간대, 요일, 회원 여부 등 숫자 / 날짜)"""
+    if pa.types.is_dictionary(dtype):
+        dtype = dtype.value_type
+    return pa.types.is_integer(dtype) or pa.types.is_floating(dtype) or pa.types.is_temporal(dtype)
+
+
+def _encode(column):
+    """ChunkedArray → (값 목록, 코드 배열). 순서가 있는 차원은 값 순서로, NULL 은 마지막 값(None)으로"""
+    ordinal = _is_ordinal(column.type)
+    if not pa.types.is_dictionary(column.type):
+        column = pc.dictionary_encode(column)
+    column = column.unify_dictionaries()
+    dictionary = column.chunk(0).dictionary if column.num_chunks else pa.array([], pa.string())
+    indices = pa.chunked_array([chunk.indices for chunk in column.chunks], column.type.index_type)
+    levels = dictionary.to_pylist()
+    has_null = indices.null_count > 0
+    if has_null:
+        indices = indices.fill_null(len(levels))
+    codes = indices.to_numpy()
+    if ordinal and levels:
+        # dictionary 는 처음 나온 순서라 막대가 뒤섞이므로 값 순서로 코드를 다시 매김 (NULL 코드는 그대로 마지막)
+        order = sorted(range(len(levels)), key=levels.__getitem__)
+        remap = np.empty(len(levels) + 1, dtype=codes.dtype)
+        remap[order] = np.arange(len(levels))
+        remap[len(levels)] = len(levels)
+        levels = [levels[i] for i in order]
+        codes = remap[codes]
+    if has_null:
+        levels.append(None)
+    return levels, codes
+
+
+class SessionIndex:
+    def __init__(self, table, dimensions=DIMENSIONS, flags=FLAGS):
+        if isinstance(table, pd.DataFrame):
+            table = pa.Table.from_pandas(table, preserve_index=False)
+        self.n_sessions = table.num_rows
+        self.dimensions = [dim for dim in dimensions if dim in table.column_names]
+        self.flags = {name: flag for flag, name in flags.items() if flag in table.column_names}
+
+        self._flag_bitmaps = {
+            name: _pack(np.nan_to_num(table[flag].to_numpy(zero_copy_only=False)).astype(bool))
+            for name, flag in self.flags.items()
+        }
+        self._levels = {}
+        self._bitmaps = {}
+        for dim in self.dimensions:
+            levels, codes = _encode(table[dim])
+            self._levels[dim] = levels
+            self._bitmaps[dim] = [_pack(codes == i) for i in range(len(levels))]
+        self._words = len(_pack(np.zeros(self.n_sessions, dtype=bool)))
+        self._base = {}
+
+    def levels(self, dim):
+        """차원 값 목록 (NULL 제외 후 정렬, 필터 위젯 옵션용)"""
+        return sorted(level for level in self._levels[dim] if level is not None)
+
+    def nbytes(self):
+        """비트맵 전체 메모리 크기"""
+        bitmaps = [b for levels in self._bitmaps.values() for b in levels] + list(self._flag_bitmaps.values())
+        return sum(b.nbytes for b in bitmaps)
+
+    # ===== 필터 =====
+    def _dim_filter(self, dim, values):
+        """한 차원에서 고른 값들의 OR 비트맵"""
+        if dim not in self._bitmaps:
+            raise KeyError(f"인덱스에 없는 차원입니다: {dim}")
+        wanted = set(values)
+        bitmap = np.zeros(self._words, dtype=np.uint64)
+        for level, level_bitmap in zip(self._levels[dim], self._bitmaps[dim]):
+            if level in wanted:
+                bitmap |= level_bitmap
+        return bitmap
+
+    def _filters(self, filters):
+        """필터가 걸린 차원별 비트맵 (None / 빈 목록은 필터 없음)"""
+        bitmaps = {}
+        for dim, values in (filters or {}).items():
+            if values is None:
+                continue
+            if isinstance(values, (str, bytes)) or not np.iterable(values):
+                values = [values]
+            values = list(values)
+            if values:
+                bitmaps[dim] = self._dim_filter(dim, values)
+        return bitmaps
+
+    @staticmethod
+    def _combine(bitmaps, exclude=None):
+        combined = None
+        for dim, bitmap in bitmaps.items():
+            if dim == exclude:
+                continue
+            combined = bitmap.copy() if combined is None else np.bitwise_and(combined, bitmap, out=combined)
+        return combined
+
+    # ===== 집계 =====
+    def _counts(self, bitmap, selected, flags, buffers):
+        """bitmap AND selected 에 속한 세션 수 + 플래그별 세션 수 (buffers 는 재사용 작업 공간)"""
+        if selected is not None:
+            bitmap = np.bitwise_and(bitmap, selected, out=buffers[0])
+        counts = {"sessions": _popcount(bitmap)}
+        for name in flags:
+            counts[name] = _popcount(np.bitwise_and(bitmap, self._flag_bitmaps[name], out=buffers[1]))
+        return counts
+
+    def _buffers(self):
+        return np.empty(self._words, dtype=np.uint64), np.empty(self._words, dtype=np.uint64)
+
+    def _distribution(self, dim, selected, flags):
+        if selected is None and (dim, flags) in self._base:
+            return self._base[dim, flags]
+        buffers = self._buffers()
+        rows = [self._counts(level_bitmap, selected, flags, buffers) for level_bitmap in self._bitmaps[dim]]
+        columns = {dim: self._levels[dim]}
+        for name in ("sessions",) + flags:
+            columns[name] = np.array([row[name] for row in rows], dtype=np.int64)
+        columns.update(rate_columns(columns))
+        result = pd.DataFrame(columns)
+        result = result[result["sessions"] > 0].reset_index(drop=True)
+        if selected is None:
+            # 필터가 없을 때의 분포는 바뀌지 않으므로 재사용
+            self._base[dim, flags] = result
+        return result
+
+    def _flag_names(self, flags):
+        if flags is None:
+            return tuple(self.flags)
+        unknown = [name for name in flags if name not in self.flags]
+        if unknown:
+            raise KeyError(f"인덱스에 없는 플래그입니다: {unknown}")
+        return tuple(flags)
+
+    def total(self, filters=None, flags=None):
+        """필터를 모두 적용한 전체 퍼널 (1행)"""
+        selected = self._combine(self._filters(filters))
+        if selected is None:
+            selected = _pack(np.ones(self.n_sessions, dtype=bool))
+        counts = self._counts(selected, None, self._flag_names(flags), self._buffers())
+        columns = {k: [v] for k, v in counts.items()}
+        columns.update(rate_columns(columns))
+        return pd.DataFrame(columns)
+
+    def breakdown(self, dim, filters=None, flags=("purchased",)):
+        """dim 값별 세션 수 / 플래그 수 (dim 자신에 걸린 필터는 제외 = 교차 필터)
+
+        flags 는 값마다 popcount 를 한 번씩 더 하므로 차트에 필요한 것만 (None 이면 전부)
+        """
+        return self.crossfilter([dim], filters, flags)[dim]
+
+    def crossfilter(self, dims, filters=None, flags=("purchased",)):
+        """여러 차원의 분포를 한 번에 (차원별 필터 비트맵은 한 번만 계산)"""
+        flags = self._flag_names(flags)
+        bitmaps = self._filters(filters)
+        return {dim: self._distribution(dim, self._combine(bitmaps, exclude=dim), flags) for dim in dims}
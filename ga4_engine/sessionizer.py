@@ -0,0 +1,319 @@
+"""원본 이벤트 → 세션 특성 스트리밍 세션화 (시간순 1회 통과, 세션별 상태 상한)
+
+GA4 events_* Parquet 를 배치 단위로 한 번만 읽어 세션(user_pseudo_id-ga_session_id)마다
+- 이벤트 경로: 이벤트 이름 대신 정수 코드 배열 (list<uint8>, 코드표는 EVENTS / 출력 메타데이터)
+- 퍼널 플래그: has_view_item ... has_purchase (fct_sessions 와 같은 이름)
+- 시간: 세션 시작/종료/구매 시각, 시작 후 각 단계 첫 도달까지 걸린 초
+를 만든다. fct_sessions 의 STRING_AGG(full_path) 를 만들고 다시 REGEXP 로 찾는 대신,
+경로를 코드 배열로 두면 "add_to_cart 포함" 같은 조건을 문자열 스캔 없이 확인할 수 있다.
+
+상태 관리:
+- 열린 세션만 메모리에 둔다. 세션 하나의 상태는 스칼라 몇 개 + 최대 max_path_events 개의 (시각, 코드)
+- 배치마다 그 배치에 나온 세션만 기존 상태와 합치고 (np.*.reduceat, 파이썬 행 루프 없음)
+- 워터마크(지금까지 본 최대 시각) - (idle_minutes + lateness_minutes) 보다 오래 조용한 세션을 닫아 내보낸다
+입력은 시간순이라고 가정한다. 일 단위 샤드처럼 샤드 안이 정렬되지 않은 원본은 lateness_minutes 를
+샤드 길이(1440)로 주면 되고, 그만큼 열린 세션이 늘어난다. 허용 지연보다 늦게 온 이벤트는 late_events 로 센다
+(이미 닫힌 세션이면 같은 세션이 조각으로 한 번 더 나온다).
+
+fct_sessions 와의 차이: stg_events 는 이벤트 x 상품 행이라 full_path / path_length 에 상품 수만큼
+같은 이벤트가 반복되지만, 여기서는 이벤트 1건 = 코드 1개다.
+
+사용 예:
+    python -m ga4_engine.sessionizer --events "data/events_*.parquet" --out exports/session_paths.parquet
+    python -m ga4_engine.sessionizer --events "data/events_*.parquet" --lateness-minutes 1440 --out ...
+"""
+import argparse
+import glob
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# 이벤트 코드표 (코드 = 위치, 0 은 코드표에 없는 이벤트). 코드를 바꾸면 기존 출력과 호환되지 않으므로 뒤에만 추가
+EVENTS = (
+    "(other)", "session_start", "first_visit", "page_view", "user_engagement", "scroll",
+    "view_item_list", "select_item", "view_item", "view_search_results", "view_promotion",
+    "select_promotion", "add_to_wishlist", "add_to_cart", "remove_from_cart", "view_cart",
+    "begin_checkout", "add_shipping_info", "add_payment_info", "purchase", "refund",
+    "login", "sign_up", "click", "file_download", "video_start", "video_progress", "video_complete",
+)
+# 플래그 컬럼 → 이벤트 (fct_sessions 와 같은 기준)
+FLAGS = {
+    "has_session_start": "session_start",
+    "has_view_item": "view_item",
+    "has_search": "view_search_results",
+    "has_add_to_cart": "add_to_cart",
+    "has_begin_checkout": "begin_checkout",
+    "has_add_payment_info": "add_payment_info",
+    "has_purchase": "purchase",
+}
+# 세션 시작 후 첫 도달까지 걸린 시간을 기록할 퍼널 단계
+STEPS = ["view_item", "add_to_cart", "begin_checkout", "add_payment_info", "purchase"]
+
+COLUMNS = ["event_date", "event_timestamp", "event_name", "user_pseudo_id", "event_params"]
+_NEVER = np.iinfo(np.int64).max
+_MICROS_PER_MINUTE = 60_000_000
+
+
+def event_codes(events=EVENTS):
+    """이벤트 이름 → 코드"""
+    return {name: code for code, name in enumerate(events)}
+
+
+def decode(path, events=EVENTS):
+    """코드 배열 → 이벤트 이름 목록"""
+    return [events[code] for code in path]
+
+
+def _session_ids(batch):
+    """CONCAT(user_pseudo_id, '-', ga_session_id) (stg_events 의 session_unique_id 와 같은 값)"""
+    params = batch.column("event_params")
+    flat = pc.list_flatten(params)
+    parents = pc.list_parent_indices(params).to_numpy()
+    hit = pc.equal(flat.field("key"), "ga_session_id").to_numpy(zero_copy_only=False)
+    hit &= ~flat.field("value").field("int_value").is_null().to_numpy(zero_copy_only=False)
+    values = pc.fill_null(flat.field("value").field("int_value"), 0).to_numpy(zero_copy_only=False)
+    session_id = np.zeros(batch.num_rows, dtype=np.int64)
+    found = np.zeros(batch.num_rows, dtype=bool)
+    # 같은 키가 여러 번 나오면 첫 값 (역순으로 대입해 앞쪽 값이 남게)
+    session_id[parents[hit][::-1]] = values[hit][::-1]
+    found[parents[hit]] = True
+    session_id = pa.array(session_id, mask=~found).cast(pa.string())
+    return pc.binary_join_element_wise(batch.column("user_pseudo_id"), session_id, "-").to_numpy(zero_copy_only=False)
+
+
+class _State:
+    """세션 상태 묶음 (세션 n 개 + 이벤트 CSR)"""
+
+    FIELDS = ("keys", "date", "start", "end", "purchased", "length", "flags", "first")
+
+    def __init__(self, keys, date, start, end, purchased, length, flags, first, offsets, ts, codes, seq):
+        self.keys, self.date, self.start, self.end = keys, date, start, end
+        self.purchased, self.length, self.flags, self.first = purchased, length, flags, first
+        self.offsets, self.ts, self.codes, self.seq = offsets, ts, codes, seq
+
+    def __len__(self):
+        return len(self.keys)
+
+    @classmethod
+    def empty(cls, n_steps):
+        return cls(
+            np.empty(0, dtype=object), np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int64),
+            np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64),
+            np.empty(0, dtype=np.uint8), np.empty((0, n_steps), dtype=np.int64),
+            np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint8),
+            np.empty(0, dtype=np.int64),
+        )
+
+    def take(self, rows):
+        """세션 rows 만 남긴 상태 (이벤트 구간도 함께)"""
+        counts = np.diff(self.offsets)[rows]
+        starts = self.offsets[:-1][rows]
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        events = np.repeat(starts - offsets[:-1], counts) + np.arange(offsets[-1])
+        return _State(
+            *(getattr(self, name)[rows] for name in self.FIELDS),
+            offsets, self.ts[events], self.codes[events], self.seq[events],
+        )
+
+    @staticmethod
+    def concat(parts):
+        offsets = [parts[0].offsets]
+        for part in parts[1:]:
+            offsets.append(part.offsets[1:] + offsets[-1][-1])
+        return _State(
+            *(np.concatenate([getattr(part, name) for part in parts]) for name in _State.FIELDS),
+            np.concatenate(offsets),
+            *(np.concatenate([getattr(part, name) for part in parts]) for name in ("ts", "codes", "seq")),
+        )
+
+
+class Sessionizer:
+    def __init__(self, idle_minutes=30, lateness_minutes=0, max_path_events=4096, batch_size=1 << 18, events=EVENTS):
+        self.close_after = int((idle_minutes + lateness_minutes) * _MICROS_PER_MINUTE)
+        self.max_path_events = max_path_events
+        self.batch_size = batch_size
+        self.events = tuple(events)
+        if len(self.events) > 256:
+            raise ValueError("이벤트 코드표는 256개 이하여야 합니다 (uint8)")
+        self._codes = pa.array(self.events)
+        self._flag_codes = np.array([self.events.index(event) for event in FLAGS.values()], dtype=np.int64)
+        self._step_codes = np.array([self.events.index(step) for step in STEPS], dtype=np.int64)
+        # 코드 → 플래그 비트 / 단계 번호 조회표
+        self._flag_bits = np.zeros(len(self.events), dtype=np.uint8)
+        self._flag_bits[self._flag_codes] = 1 << np.arange(len(self._flag_codes), dtype=np.uint8)
+        self._step_of = np.full(len(self.events), -1, dtype=np.int64)
+        self._step_of[self._step_codes] = np.arange(len(self._step_codes))
+        self._purchase = self.events.index("purchase")
+
+        self.state = _State.empty(len(STEPS))
+        self.watermark = None
+        self._seq = 0
+        self.stats = {"events": 0, "sessions": 0, "late_events": 0, "other_events": 0,
+                      "truncated_sessions": 0, "max_open_sessions": 0}
+
+    # ===== 배치 → 상태 =====
+    def _batch_state(self, batch):
+        """이벤트 1건 = 세션 조각 1개 (길이 1) 로 본 상태"""
+        n = batch.num_rows
+        keys = _session_ids(batch)
+        ts = batch.column("event_timestamp").to_numpy(zero_copy_only=False).astype(np.int64)
+        date = pc.cast(pc.strptime(batch.column("event_date"), format="%Y%m%d", unit="s"), pa.date32())
+        date = date.to_numpy(zero_copy_only=False).astype(np.int32)
+        codes = pc.fill_null(pc.index_in(batch.column("event_name"), self._codes), 0).to_numpy(zero_copy_only=False)
+        codes = codes.astype(np.uint8)
+        self.stats["other_events"] += int(np.count_nonzero(codes == 0))
+
+        step = self._step_of[codes]
+        first = np.full((n, len(STEPS)), _NEVER, dtype=np.int64)
+        has_step = step >= 0
+        first[np.flatnonzero(has_step), step[has_step]] = ts[has_step]
+        seq = np.arange(self._seq, self._seq + n, dtype=np.int64)
+        self._seq += n
+        return _State(
+            keys, date, ts, ts.copy(), np.where(codes == self._purchase, ts, -1), np.ones(n, dtype=np.int64),
+            self._flag_bits[codes], first, np.arange(n + 1, dtype=np.int64), ts, codes, seq,
+        )
+
+    def _merge(self, state):
+        """같은 세션 조각을 하나로 합침 (스칼라는 reduceat, 이벤트는 (세션, 시각, 도착 순) 정렬 후 앞쪽 max_path_events 개)"""
+        group, uniques = pd.factorize(state.keys, use_na_sentinel=False)
+        order = np.argsort(group, kind="stable")
+        group = group[order]
+        bounds = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+        merged = state.take(order)
+
+        event_group = np.repeat(group, np.diff(merged.offsets))
+        event_order = np.lexsort((merged.seq, merged.ts, event_group))
+        event_group = event_group[event_order]
+        lengths = np.bincount(event_group, minlength=len(uniques))
+        starts = np.zeros(len(uniques) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=starts[1:])
+        keep = np.arange(len(event_group)) - starts[event_group] < self.max_path_events
+        kept = np.minimum(lengths, self.max_path_events)
+        offsets = np.zeros(len(uniques) + 1, dtype=np.int64)
+        np.cumsum(kept, out=offsets[1:])
+        event_order = event_order[keep]
+
+        return _State(
+            np.asarray(uniques, dtype=object),
+            np.minimum.reduceat(merged.date, bounds),
+            np.minimum.reduceat(merged.start, bounds),
+            np.maximum.reduceat(merged.end, bounds),
+            np.maximum.reduceat(merged.purchased, bounds),
+            np.add.reduceat(merged.length, bounds),
+            np.bitwise_or.reduceat(merged.flags, bounds),
+            np.minimum.reduceat(merged.first, bounds, axis=0),
+            offsets, merged.ts[event_order], merged.codes[event_order], merged.seq[event_order],
+        )
+
+    def push(self, batch):
+        """이벤트 배치 하나를 반영하고, 닫힌 세션이 있으면 세션 테이블로 반환 (없으면 None)"""
+        if batch.num_rows == 0:
+            return None
+        incoming = self._batch_state(batch)
+        self.stats["events"] += len(incoming)
+        if self.watermark is not None:
+            self.stats["late_events"] += int(np.count_nonzero(incoming.ts < self.watermark - self.close_after))
+        batch_max = int(incoming.ts.max())
+        self.watermark = batch_max if self.watermark is None else max(self.watermark, batch_max)
+
+        # 이번 배치에 나온 세션만 기존 상태와 합침
+        touched = pd.Index(pd.unique(incoming.keys)).get_indexer(self.state.keys) >= 0
+        rest = self.state.take(np.flatnonzero(~touched))
+        merged = self._merge(_State.concat([self.state.take(np.flatnonzero(touched)), incoming]))
+        state = _State.concat([rest, merged])
+
+        closed = state.end < self.watermark - self.close_after
+        self.state = state.take(np.flatnonzero(~closed))
+        self.stats["max_open_sessions"] = max(self.stats["max_open_sessions"], len(self.state))
+        return self._emit(state.take(np.flatnonzero(closed))) if closed.any() else None
+
+    def flush(self):
+        """남은 세션을 모두 닫아 반환 (입력 끝)"""
+        state, self.state = self.state, _State.empty(len(STEPS))
+        return self._emit(state) if len(state) else None
+
+    # ===== 상태 → 세션 테이블 =====
+    def schema(self):
+        fields = [
+            ("session_unique_id", pa.string()),
+            ("session_date", pa.date32()),
+            ("session_start_at", pa.timestamp("us", tz="UTC")),
+            ("session_end_at", pa.timestamp("us", tz="UTC")),
+            ("purchased_at", pa.timestamp("us", tz="UTC")),
+            ("path_length", pa.int32()),
+            ("path", pa.list_(pa.uint8())),
+        ]
+        fields += [(flag, pa.int8()) for flag in FLAGS]
+        fields += [(f"seconds_to_{step}", pa.int32()) for step in STEPS]
+        return pa.schema(fields, metadata={"event_codes": json.dumps(list(self.events))})
+
+    def _emit(self, state):
+        n = len(state)
+        self.stats["sessions"] += n
+        self.stats["truncated_sessions"] += int(np.count_nonzero(state.length > np.diff(state.offsets)))
+        columns = [
+            pa.array(state.keys, type=pa.string()),
+            pa.array(state.date, type=pa.date32()),
+            pa.array(state.start, type=pa.timestamp("us", tz="UTC")),
+            pa.array(state.end, type=pa.timestamp("us", tz="UTC")),
+            pa.array(state.purchased, type=pa.timestamp("us", tz="UTC"), mask=state.purchased < 0),
+            pa.array(state.length, type=pa.int32()),
+            pa.ListArray.from_arrays(pa.array(state.offsets, type=pa.int32()), pa.array(state.codes, type=pa.uint8())),
+        ]
+        columns += [pa.array((state.flags >> bit) & 1, type=pa.int8()) for bit in range(len(FLAGS))]
+        reached = state.first != _NEVER
+        seconds = (state.first - state.start[:, None]) // 1_000_000
+        columns += [pa.array(seconds[:, i], type=pa.int32(), mask=~reached[:, i]) for i in range(len(STEPS))]
+        return pa.Table.from_arrays(columns, schema=self.schema())
+
+    # ===== 파일 단위 실행 =====
+    def stream(self, paths):
+        """Parquet 파일들(이름순 = 시간순)을 배치로 읽으며 닫힌 세션 테이블을 차례로 내보냄"""
+        for path in paths:
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=self.batch_size, columns=COLUMNS):
+                table = self.push(batch)
+                if table is not None:
+                    yield table
+        table = self.flush()
+        if table is not None:
+            yield table
+
+    def run(self, pattern, out):
+        """glob 패턴의 이벤트 파일 → 세션 Parquet (닫힌 세션부터 바로 기록)"""
+        paths = sorted(glob.glob(pattern))
+        if not paths:
+            raise FileNotFoundError(f"이벤트 파일이 없습니다: {pattern}")
+        with pq.ParquetWriter(out, self.schema()) as writer:
+            for table in self.stream(paths):
+                writer.write_table(table)
+        return self.stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="GA4 원본 이벤트 → 세션 경로/플래그/시간 스트리밍 세션화")
+    parser.add_argument("--events", required=True, help="events_* Parquet (glob, 이름순 = 시간순)")
+    parser.add_argument("--out", default="session_paths.parquet")
+    parser.add_argument("--idle-minutes", type=float, default=30, help="이 시간 동안 이벤트가 없으면 세션 종료")
+    parser.add_argument("--lateness-minutes", type=float, default=0, help="입력 시간순 허용 오차 (일 단위 샤드는 1440)")
+    parser.add_argument("--max-path-events", type=int, default=4096, help="세션별로 보관할 최대 경로 길이")
+    parser.add_argument("--batch-size", type=int, default=1 << 18)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    sessionizer = Sessionizer(args.idle_minutes, args.lateness_minutes, args.max_path_events, args.batch_size)
+    stats = sessionizer.run(args.events, args.out)
+    print(f"{args.out}: 세션 {stats['sessions']:,}개 / 이벤트 {stats['events']:,}건, "
+          f"최대 열린 세션 {stats['max_open_sessions']:,}개, 지연 이벤트 {stats['late_events']:,}건, "
+          f"코드표 밖 이벤트 {stats['other_events']:,}건, 경로 잘림 {stats['truncated_sessions']:,}개, "
+          f"{time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
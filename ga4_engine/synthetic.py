@@ -0,0 +1,514 @@
+"""GA4 이벤트 합성 데이터 생성기 (벤치마크용)
+
+ga4_obfuscated_sample_ecommerce 와 같은 중첩 스키마(event_params, items, device, geo,
+ecommerce)의 events_YYYYMMDD-<part>.parquet 샤드를 만든다. 세션 수, 퍼널 단계별 전환율,
+카탈로그 크기를 조절할 수 있고, 같은 seed 면 항상 같은 데이터가 나온다.
+세션 단위 청크로 numpy 벡터 연산만 사용하므로 1,000만 세션 이상도 메모리 일정하게 생성 가능.
+
+사용 예:
+    python -m ga4_engine.synthetic --sessions 10000000 --days 31 --out data/
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# ===== 기본값: 2020년 12월 샘플과 비슷한 분포 =====
+DEVICES = ["desktop", "mobile", "tablet"]
+DEVICE_WEIGHTS = [0.58, 0.40, 0.02]
+OPERATING_SYSTEMS = {"desktop": "Windows", "mobile": "Android", "tablet": "iOS"}
+TRAFFIC_SOURCES = [
+    ("(direct)", "(none)", "(direct)"),
+    ("shop.googlemerchandisestore.com", "referral", "(referral)"),
+    ("google", "organic", "(organic)"),
+    ("<Other>", "<Other>", "<Other>"),
+    ("google", "cpc", "holiday_sale"),
+    ("(data deleted)", "(data deleted)", "(data deleted)"),
+]
+TRAFFIC_WEIGHTS = [0.34, 0.29, 0.19, 0.06, 0.08, 0.04]
+COUNTRIES = [("Americas", "United States"), ("Asia", "India"), ("Americas", "Canada"),
+             ("Europe", "United Kingdom"), ("Asia", "South Korea"), ("Europe", "France")]
+COUNTRY_WEIGHTS = [0.44, 0.10, 0.08, 0.06, 0.04, 0.28]
+CATEGORY_ROOTS = ["Apparel", "Bags", "Drinkware", "Office", "Lifestyle", "Electronics", "Stationery"]
+PROMOTIONS = ["Reach New Heights", "Act Responsible", "Complete Your Collection",
+              "Google Mural Collection", "Holiday Sale", "New Arrivals", "Best Sellers"]
+# 시간대별 세션 비중 (0~23시)
+HOUR_WEIGHTS = np.array([4, 4, 4, 4, 4, 4, 4, 4, 4, 4, 5, 5, 5, 5, 6, 6, 6, 5, 5, 4, 4, 4, 4, 4], float)
+
+# event_params 로 내보내는 키 (int / string 구분)
+INT_PARAMS = ["ga_session_id", "ga_session_number", "session_engaged", "engagement_time_msec"]
+STRING_PARAMS = ["page_title", "page_location", "source", "medium", "campaign"]
+
+# 세션 내 이벤트 순서 (같은 순위끼리는 무작위로 섞임)
+EVENT_ORDER = {
+    "session_start": 0.0, "page_view": 1.0, "scroll": 1.0, "user_engagement": 1.0,
+    "view_search_results": 1.0, "view_promotion": 1.0, "select_promotion": 1.0, "view_item": 1.0,
+    "add_to_cart": 2.0, "begin_checkout": 3.0, "add_shipping_info": 3.5,
+    "add_payment_info": 4.0, "purchase": 5.0,
+}
+EVENT_NAMES = list(EVENT_ORDER)
+
+
+@dataclass
+class SyntheticConfig:
+    sessions: int = 133_368
+    days: int = 31
+    start_date: str = "20201201"
+    seed: int = 42
+    # 세션 → 단계별 조건부 전환율 (전체 구매율 ≈ 1.6%)
+    view_rate: float = 0.21
+    cart_rate: float = 0.30
+    checkout_rate: float = 0.52
+    payment_rate: float = 0.66
+    purchase_rate: float = 0.74
+    # 카탈로그
+    catalog_size: int = 1_500
+    categories: int = 40
+    zipf_exponent: float = 1.1
+    avg_basket_size: float = 2.5
+    # 탐색 행동
+    avg_item_views: float = 6.0
+    variety_rate: float = 0.35
+    promo_view_rate: float = 0.30
+    promo_click_rate: float = 0.08
+    search_rate: float = 0.10
+    member_rate: float = 0.05
+    sessions_per_user: float = 1.4
+    # 출력
+    chunk_sessions: int = 50_000
+    device_weights: list = field(default_factory=lambda: list(DEVICE_WEIGHTS))
+    traffic_weights: list = field(default_factory=lambda: list(TRAFFIC_WEIGHTS))
+
+
+# ===== Arrow 스키마 (GA4 export 의 분석에 쓰는 부분집합) =====
+PARAM_VALUE = pa.struct([
+    ("string_value", pa.string()), ("int_value", pa.int64()),
+    ("float_value", pa.float64()), ("double_value", pa.float64()),
+])
+EVENT_PARAM = pa.struct([("key", pa.string()), ("value", PARAM_VALUE)])
+ITEM = pa.struct([
+    ("item_id", pa.string()), ("item_name", pa.string()), ("item_brand", pa.string()),
+    ("item_category", pa.string()), ("price", pa.float64()), ("quantity", pa.int64()),
+    ("item_revenue", pa.float64()), ("promotion_id", pa.string()),
+    ("promotion_name", pa.string()), ("creative_name", pa.string()),
+])
+DEVICE = pa.struct([
+    ("category", pa.string()), ("operating_system", pa.string()),
+    ("language", pa.string()), ("is_limited_ad_tracking", pa.string()),
+])
+GEO = pa.struct([("continent", pa.string()), ("country", pa.string())])
+ECOMMERCE = pa.struct([
+    ("transaction_id", pa.string()), ("purchase_revenue", pa.float64()),
+    ("total_item_quantity", pa.int64()), ("unique_items", pa.int64()),
+])
+EVENTS_SCHEMA = pa.schema([
+    ("event_date", pa.string()),
+    ("event_timestamp", pa.int64()),
+    ("event_name", pa.string()),
+    ("event_params", pa.list_(EVENT_PARAM)),
+    ("user_id", pa.string()),
+    ("user_pseudo_id", pa.string()),
+    ("device", DEVICE),
+    ("geo", GEO),
+    ("ecommerce", ECOMMERCE),
+    ("items", pa.list_(ITEM)),
+    ("platform", pa.string()),
+])
+
+
+class Catalog:
+    """상품 카탈로그: 카테고리별 가격대 + Zipf(근사) 인기도"""
+
+    def __init__(self, config, rng):
+        n = config.catalog_size
+        self.size = n
+        self.n_categories = config.categories
+        self.category = np.sort(rng.integers(0, config.categories, n))
+        # 카테고리별 첫 상품 위치 → 카테고리 내 Zipf 샘플링에 사용
+        self.category_start = np.searchsorted(self.category, np.arange(config.categories))
+        self.category_size = np.diff(np.append(self.category_start, n))
+        base_price = rng.lognormal(3.0, 0.8, config.categories)
+        self.price = np.round(base_price[self.category] * rng.lognormal(0, 0.35, n), 2)
+        self.exponent = config.zipf_exponent
+
+        category_names = np.array([
+            f"{CATEGORY_ROOTS[c % len(CATEGORY_ROOTS)]}/Line {c:02d}/" for c in range(config.categories)
+        ])
+        self.item_ids = pa.array([f"GGOE{i:06d}" for i in range(n)])
+        self.item_names = pa.array([
+            f"Google {CATEGORY_ROOTS[c % len(CATEGORY_ROOTS)]} Item {i:05d}" for i, c in enumerate(self.category)
+        ])
+        self.item_categories = pa.array(category_names[self.category])
+
+    def sample(self, rng, categories):
+        """카테고리 배열마다 상품 하나씩 (카테고리 내 인기도는 Zipf)"""
+        sizes = np.maximum(self.category_size[categories], 1)
+        # 로그 균등 역변환 (지수 1 의 유한 Zipf 근사, exponent 가 클수록 상위 쏠림)
+        u = rng.random(len(categories))
+        rank = np.floor(sizes ** u ** self.exponent).astype(np.int64) - 1
+        rank = np.clip(rank, 0, sizes - 1)
+        return np.minimum(self.category_start[categories] + rank, self.size - 1)
+
+
+def _string_take(values, indices, mask=None):
+    """문자열 사전 + 정수 인덱스 → Arrow 문자열 배열 (C++ take 로 벡터화)"""
+    return pa.array(values).take(pa.array(indices, mask=mask))
+
+
+class SyntheticGA4:
+    def __init__(self, config=None):
+        self.config = config or SyntheticConfig()
+        # 카탈로그/유저 풀은 전체 기간 공통, 세션 난수열은 날짜별로 write_day 에서 분리
+        self.catalog = Catalog(self.config, np.random.default_rng(self.config.seed))
+        self.n_users = max(1, int(self.config.sessions / self.config.sessions_per_user))
+        self.rng = np.random.default_rng([self.config.seed, 0])
+        self._transaction_counter = 0
+
+    # ----- 1. 세션 속성 -----
+    def _sessions(self, n, day_start_us):
+        c, rng = self.config, self.rng
+        hour = rng.choice(24, n, p=HOUR_WEIGHTS / HOUR_WEIGHTS.sum())
+        start_us = day_start_us + (hour * 3600 + rng.random(n) * 3600) * 1_000_000
+        user = rng.integers(0, self.n_users, n)
+
+        # 퍼널 도달 단계 (0: 방문만 ~ 5: 구매)
+        rates = np.array([c.view_rate, c.cart_rate, c.checkout_rate, c.payment_rate, c.purchase_rate])
+        passed = rng.random((n, len(rates))) < rates
+        stage = np.cumprod(passed, axis=1).sum(axis=1)
+
+        sessions = {
+            "start_us": start_us.astype(np.int64),
+            "user": user,
+            # GA4 와 같이 세션 시작 시각(epoch 초)
+            "ga_session_id": (start_us // 1_000_000).astype(np.int64),
+            "stage": stage,
+            "device": rng.choice(len(DEVICES), n, p=np.array(c.device_weights) / sum(c.device_weights)),
+            "traffic": rng.choice(len(TRAFFIC_SOURCES), n, p=np.array(c.traffic_weights) / sum(c.traffic_weights)),
+            "country": rng.choice(len(COUNTRIES), n, p=np.array(COUNTRY_WEIGHTS)),
+            "is_member": rng.random(n) < c.member_rate,
+            "engaged": (stage > 0) | (rng.random(n) < 0.4),
+            "focus_category": rng.integers(0, self.catalog.n_categories, n),
+            "variety": rng.random(n) < c.variety_rate,
+        }
+        return sessions
+
+    # ----- 2. 세션별 이벤트 개수 -----
+    def _event_counts(self, s):
+        c, rng = self.config, self.rng
+        n = len(s["stage"])
+        stage = s["stage"]
+        # 조회 깊이는 긴 꼬리 분포 (일부 세션은 수백~수천 건)
+        depth = np.where(
+            stage >= 1,
+            1 + np.floor(rng.lognormal(np.log(c.avg_item_views), 1.0, n) * (1 + stage * 0.5)).astype(np.int64),
+            0,
+        )
+        promo_view = rng.random(n) < c.promo_view_rate
+        return {
+            "session_start": np.ones(n, np.int64),
+            "page_view": 1 + rng.poisson(3 + depth * 0.3),
+            "scroll": rng.poisson(1.0, n),
+            "user_engagement": rng.poisson(1.0, n) * s["engaged"],
+            "view_search_results": rng.poisson(1.5, n) * (rng.random(n) < c.search_rate),
+            "view_promotion": promo_view.astype(np.int64),
+            "select_promotion": (promo_view & (rng.random(n) < c.promo_click_rate)).astype(np.int64),
+            "view_item": depth,
+            "add_to_cart": np.where(stage >= 2, 1 + rng.poisson(0.6, n), 0),
+            "begin_checkout": (stage >= 3).astype(np.int64),
+            "add_shipping_info": (stage >= 4).astype(np.int64),
+            "add_payment_info": (stage >= 4).astype(np.int64),
+            "purchase": (stage >= 5).astype(np.int64),
+        }
+
+    # ----- 3. 이벤트 행 전개 + 시간 순서 -----
+    def _expand(self, s, counts):
+        rng = self.rng
+        names, session_idx, order = [], [], []
+        for code, name in enumerate(EVENT_NAMES):
+            idx = np.repeat(np.arange(len(counts[name])), counts[name])
+            session_idx.append(idx)
+            names.append(np.full(len(idx), code, np.int8))
+            order.append(EVENT_ORDER[name] + rng.random(len(idx)) * (0.999 if EVENT_ORDER[name] == 1.0 else 0.0))
+        session_idx = np.concatenate(session_idx)
+        names = np.concatenate(names)
+        order = np.concatenate(order)
+
+        sort = np.lexsort((order, session_idx))
+        session_idx, names = session_idx[sort], names[sort]
+
+        # 세션 내 누적 시간 간격 (평균 25초)
+        gaps = rng.exponential(25_000_000, len(session_idx)).astype(np.int64)
+        first = np.r_[True, session_idx[1:] != session_idx[:-1]]
+        gaps[first] = 0
+        elapsed = np.cumsum(gaps)
+        elapsed -= np.maximum.accumulate(np.where(first, elapsed, 0))
+        timestamps = s["start_us"][session_idx] + elapsed
+        return session_idx, names, timestamps
+
+    # ----- 4. items 배열 -----
+    def _items(self, s, session_idx, names):
+        c, rng = self.config, self.rng
+        code = {name: i for i, name in enumerate(EVENT_NAMES)}
+        n_items = np.zeros(len(names), np.int64)
+        for name in ("view_item", "add_to_cart", "view_promotion", "select_promotion"):
+            n_items[names == code[name]] = 1
+        is_purchase = names == code["purchase"]
+        n_items[is_purchase] = 1 + rng.poisson(max(c.avg_basket_size - 1, 0), is_purchase.sum())
+
+        offsets = np.r_[0, np.cumsum(n_items)]
+        item_event = np.repeat(np.arange(len(names)), n_items)
+        item_session = session_idx[item_event]
+
+        # 대부분 세션의 관심 카테고리, variety 세션은 다른 카테고리도 탐색
+        wander = s["variety"][item_session] & (rng.random(len(item_event)) < 0.5)
+        category = np.where(
+            wander,
+            rng.integers(0, self.catalog.n_categories, len(item_event)),
+            s["focus_category"][item_session],
+        )
+        item = self.catalog.sample(rng, category)
+        quantity = np.where(rng.random(len(item)) < 0.85, 1, rng.integers(2, 6, len(item)))
+        price = self.catalog.price[item]
+
+        promo_event = np.isin(names[item_event], [code["view_promotion"], code["select_promotion"]])
+        promo = rng.integers(0, len(PROMOTIONS), len(item))
+        promo_names = _string_take(PROMOTIONS, promo, mask=~promo_event)
+
+        struct = pa.StructArray.from_arrays(
+            [
+                self.catalog.item_ids.take(pa.array(item)),
+                self.catalog.item_names.take(pa.array(item)),
+                pa.repeat("Google", len(item)),
+                self.catalog.item_categories.take(pa.array(item)),
+                pa.array(price),
+                pa.array(quantity),
+                pa.array(np.where(is_purchase[item_event], price * quantity, np.nan), mask=~is_purchase[item_event]),
+                pc.cast(pa.array(promo, mask=~promo_event), pa.string()),
+                promo_names,
+                promo_names,
+            ],
+            fields=list(ITEM),
+        )
+        items = pa.ListArray.from_arrays(pa.array(offsets, pa.int32()), struct)
+
+        # 구매 이벤트의 주문 금액/수량
+        revenue = np.zeros(len(names))
+        qty_total = np.zeros(len(names), np.int64)
+        if len(item):
+            line = np.where(is_purchase[item_event], price * quantity, 0.0)
+            np.add.at(revenue, item_event, line)
+            np.add.at(qty_total, item_event, np.where(is_purchase[item_event], quantity, 0))
+        return items, np.round(revenue, 2), qty_total, n_items
+
+    # ----- 5. event_params 배열 -----
+    def _event_params(self, s, session_idx, names):
+        rng = self.rng
+        n = len(names)
+        code = {name: i for i, name in enumerate(EVENT_NAMES)}
+        traffic = s["traffic"][session_idx]
+        user_session_no = 1 + (s["user"][session_idx] % 7)
+
+        # 페이지: 홈 / 카테고리 / 장바구니 / 결제
+        page = np.where(
+            names == code["view_item"], 1 + s["focus_category"][session_idx] % len(CATEGORY_ROOTS),
+            np.where(names == code["add_to_cart"], len(CATEGORY_ROOTS) + 1,
+                     np.where(names >= code["begin_checkout"], len(CATEGORY_ROOTS) + 2, 0)),
+        )
+        titles = ["Home"] + [f"{root} | Google Merchandise Store" for root in CATEGORY_ROOTS] + ["Shopping Cart", "Checkout Your Information"]
+        urls = ["https://shop.googlemerchandisestore.com/"] + [
+            f"https://shop.googlemerchandisestore.com/Google+Redesign/{root}" for root in CATEGORY_ROOTS
+        ] + ["https://shop.googlemerchandisestore.com/basket.html", "https://shop.googlemerchandisestore.com/yourinfo.html"]
+
+        int_values = [
+            s["ga_session_id"][session_idx],
+            user_session_no,
+            s["engaged"][session_idx].astype(np.int64),
+            rng.integers(0, 60_000, n),
+        ]
+        # source/medium/campaign 은 세션 첫 이벤트 근처에만 붙는 GA4 특성 재현
+        first = np.r_[True, session_idx[1:] != session_idx[:-1]]
+        has_traffic = first | (rng.random(n) < 0.5)
+        string_dict = titles + urls + [t[0] for t in TRAFFIC_SOURCES] + [t[1] for t in TRAFFIC_SOURCES] + [t[2] for t in TRAFFIC_SOURCES]
+        base = [0, len(titles), 2 * len(titles), 2 * len(titles) + len(TRAFFIC_SOURCES), 2 * len(titles) + 2 * len(TRAFFIC_SOURCES)]
+        string_idx = [page + base[0], page + base[1], traffic + base[2], traffic + base[3], traffic + base[4]]
+        string_mask = [np.zeros(n, bool), np.zeros(n, bool), ~has_traffic, ~has_traffic, ~has_traffic]
+
+        k_int, k_str = len(INT_PARAMS), len(STRING_PARAMS)
+        k = k_int + k_str
+        # (이벤트, 키) 행렬을 row-major 로 펼쳐 list<struct> 로 구성
+        int_matrix = np.zeros((n, k), np.int64)
+        int_matrix[:, :k_int] = np.column_stack(int_values)
+        int_mask = np.zeros((n, k), bool)
+        int_mask[:, k_int:] = True
+        str_matrix = np.zeros((n, k), np.int64)
+        str_matrix[:, k_int:] = np.column_stack(string_idx)
+        str_mask = np.ones((n, k), bool)
+        str_mask[:, k_int:] = np.column_stack(string_mask)
+
+        keys = _string_take(INT_PARAMS + STRING_PARAMS, np.tile(np.arange(k), n))
+        values = pa.StructArray.from_arrays(
+            [
+                _string_take(string_dict, str_matrix.ravel(), mask=str_mask.ravel()),
+                pa.array(int_matrix.ravel(), mask=int_mask.ravel()),
+                pa.nulls(n * k, pa.float64()),
+                pa.nulls(n * k, pa.float64()),
+            ],
+            fields=list(PARAM_VALUE),
+        )
+        params = pa.StructArray.from_arrays([keys, values], fields=list(EVENT_PARAM))
+        return pa.ListArray.from_arrays(pa.array(np.arange(n + 1) * k, pa.int32()), params)
+
+    # ----- 6. 청크 → Arrow 테이블 -----
+    def chunk(self, n, day_start_us):
+        s = self._sessions(n, day_start_us)
+        counts = self._event_counts(s)
+        session_idx, names, timestamps = self._expand(s, counts)
+        items, revenue, qty_total, n_items = self._items(s, session_idx, names)
+        params = self._event_params(s, session_idx, names)
+
+        code = {name: i for i, name in enumerate(EVENT_NAMES)}
+        is_purchase = names == code["purchase"]
+        txn = np.zeros(len(names), np.int64)
+        txn[is_purchase] = self._transaction_counter + np.arange(is_purchase.sum())
+        self._transaction_counter += int(is_purchase.sum())
+
+        device = s["device"][session_idx]
+        country = s["country"][session_idx]
+        # 이벤트 날짜: 일 단위 정수 → 'YYYYMMDD' 사전 조회 (자정 넘긴 이벤트는 다음 날짜)
+        day = timestamps // 86_400_000_000
+        first_day = int(day.min())
+        date_strings = [
+            (datetime(1970, 1, 1) + timedelta(days=first_day + i)).strftime("%Y%m%d")
+            for i in range(int(day.max()) - first_day + 1)
+        ]
+        # user_pseudo_id / user_id 는 세션 단위로 만든 뒤 이벤트로 전개
+        pseudo_ids = pc.binary_join_element_wise(
+            pc.cast(pa.array(s["user"] + 1_000_000), pa.string()),
+            pc.cast(pa.array(s["user"] % 9_973 + 1_600_000_000), pa.string()),
+            ".",
+        )
+        member_ids = pc.cast(pa.array(s["user"], mask=~s["is_member"]), pa.string())
+        event_session = pa.array(session_idx)
+        return pa.Table.from_arrays(
+            [
+                _string_take(date_strings, day - first_day),
+                pa.array(timestamps),
+                _string_take(EVENT_NAMES, names.astype(np.int64)),
+                params,
+                member_ids.take(event_session),
+                pseudo_ids.take(event_session),
+                pa.StructArray.from_arrays(
+                    [
+                        _string_take(DEVICES, device),
+                        _string_take([OPERATING_SYSTEMS[d] for d in DEVICES], device),
+                        pa.repeat("en-us", len(names)),
+                        pa.repeat("No", len(names)),
+                    ],
+                    fields=list(DEVICE),
+                ),
+                pa.StructArray.from_arrays(
+                    [
+                        _string_take([c[0] for c in COUNTRIES], country),
+                        _string_take([c[1] for c in COUNTRIES], country),
+                    ],
+                    fields=list(GEO),
+                ),
+                pa.StructArray.from_arrays(
+                    [
+                        pc.cast(pa.array(txn, mask=~is_purchase), pa.string()),
+                        pa.array(revenue, mask=~is_purchase),
+                        pa.array(qty_total, mask=~is_purchase),
+                        pa.array(n_items, mask=~is_purchase),
+                    ],
+                    fields=list(ECOMMERCE),
+                ),
+                items,
+                pa.repeat("WEB", len(names)),
+            ],
+            schema=EVENTS_SCHEMA,
+        )
+
+    # ----- 7. 일자별 샤드 쓰기 -----
+    def write_day(self, d, out_dir, compression="zstd"):
+        """d 번째 날 세션을 생성해 events_YYYYMMDD-<part>.parquet 로 기록
+
+        날짜마다 (seed, d) 로 난수열을 분리하므로 병렬 여부와 관계없이 결과가 같다.
+        자정을 넘긴 이벤트는 BigQuery EXPORT 샤드처럼 다음 날짜의 별도 part 파일로 쓴다.
+        """
+        c = self.config
+        self.rng = np.random.default_rng([c.seed, d])
+        self._transaction_counter = d * 1_000_000_000
+        day = datetime.strptime(c.start_date, "%Y%m%d").replace(tzinfo=timezone.utc) + timedelta(days=d)
+        suffix = day.strftime("%Y%m%d")
+        day_start_us = int(day.timestamp() * 1_000_000)
+        n_sessions = c.sessions // c.days + (1 if d < c.sessions % c.days else 0)
+
+        writers, paths = {}, []
+        remaining = n_sessions
+        while remaining > 0:
+            n = min(remaining, c.chunk_sessions)
+            remaining -= n
+            table = self.chunk(n, day_start_us)
+            for date in pc.unique(table["event_date"]).to_pylist():
+                if date not in writers:
+                    # 당일 이벤트는 part 0, 이월 이벤트는 생성한 날 기준 part 번호
+                    part = 0 if date == suffix else d + 1
+                    path = os.path.join(out_dir, f"events_{date}-{part:012d}.parquet")
+                    writers[date] = pq.ParquetWriter(path, EVENTS_SCHEMA, compression=compression)
+                    paths.append(path)
+                writers[date].write_table(table.filter(pc.equal(table["event_date"], date)))
+        for writer in writers.values():
+            writer.close()
+        return paths
+
+    def write(self, out_dir, compression="zstd", workers=1):
+        """전체 기간 샤드 생성 (workers > 1 이면 날짜 단위 프로세스 병렬)"""
+        os.makedirs(out_dir, exist_ok=True)
+        days = range(self.config.days)
+        if workers <= 1:
+            results = [self.write_day(d, out_dir, compression) for d in days]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(self.write_day, days, [out_dir] * len(days), [compression] * len(days)))
+        return sorted(path for paths in results for path in paths)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="GA4 events_* 합성 Parquet 샤드 생성")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--sessions", type=int, default=SyntheticConfig.sessions)
+    parser.add_argument("--days", type=int, default=SyntheticConfig.days)
+    parser.add_argument("--start-date", default=SyntheticConfig.start_date)
+    parser.add_argument("--seed", type=int, default=SyntheticConfig.seed)
+    parser.add_argument("--catalog-size", type=int, default=SyntheticConfig.catalog_size)
+    parser.add_argument("--categories", type=int, default=SyntheticConfig.categories)
+    parser.add_argument("--view-rate", type=float, default=SyntheticConfig.view_rate)
+    parser.add_argument("--cart-rate", type=float, default=SyntheticConfig.cart_rate)
+    parser.add_argument("--checkout-rate", type=float, default=SyntheticConfig.checkout_rate)
+    parser.add_argument("--payment-rate", type=float, default=SyntheticConfig.payment_rate)
+    parser.add_argument("--purchase-rate", type=float, default=SyntheticConfig.purchase_rate)
+    parser.add_argument("--chunk-sessions", type=int, default=SyntheticConfig.chunk_sessions)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    config = SyntheticConfig(
+        sessions=args.sessions, days=args.days, start_date=args.start_date, seed=args.seed,
+        catalog_size=args.catalog_size, categories=args.categories,
+        view_rate=args.view_rate, cart_rate=args.cart_rate, checkout_rate=args.checkout_rate,
+        payment_rate=args.payment_rate, purchase_rate=args.purchase_rate,
+        chunk_sessions=args.chunk_sessions,
+    )
+    started = time.perf_counter()
+    paths = SyntheticGA4(config).write(args.out, workers=args.workers)
+    print(f"{len(paths)}개 샤드, {config.sessions:,} 세션 생성 완료 ({time.perf_counter() - started:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""KPI 불확실성 엔진 (Poisson 부트스트랩 + Beta-Binomial 사후분포)
+
+Wilson 구간은 단순 비율에만 쓸 수 있어, 객단가 (mart_time_to_conversion.avg_order_value),
+건당 손실 금액 (mart_cart_abandon.avg_lost_value), 행동별 Lift (int_lift_weight) 같은 지표에는 구간이 없었다.
+
+- 부트스트랩: 세션마다 Poisson(1) 가중치를 주는 Poisson 부트스트랩으로 그룹별 sum(분자) / sum(분모) 를 재표본
+  · 같은 값(그룹, 분자, 분모)을 가진 세션 c 개의 가중치 합은 Poisson(c) 이므로, 세션 배열을 값 조합별 건수로
+    한 번 압축(compress)해 두고 셀 단위로 뽑는다. 플래그 지표는 셀이 수십 개라 세션 수와 무관하게 빠르다.
+  · 재표본 축으로 벡터화: (재표본 x 셀) 가중치 행렬 블록을 만들고 그룹 경계에서 reduceat
+  · 행이 세션보다 잘게 나뉜 원본 (이탈 세션 x 상품 행) 은 clusters 로 세션 ID 를 주면 (세션, 그룹) 합계를
+    한 단위로 묶어 세션마다 가중치 하나를 쓴다. 그룹별 구간은 그 그룹의 행만 보므로 그룹 사이에
+    가중치를 공유하지 않아도 세션 단위 재표본과 같은 분포다.
+- 베이지안: 전환율은 Beta(a + 전환, b + 미전환) 사후분포의 분위수 (scipy.special.betaincinv, 벡터)
+  Lift = P(y | 행동) / P(y) 는 P(행동), P(y | 행동), P(y | 행동 안 함) 이 독립 Beta 사후분포가 되도록
+  분해해 표본을 뽑는다 (다항분포 + Dirichlet 사전분포와 같은 결과).
+- UncertaintyEngine: 지표별 압축 셀을 보관하고 (대시보드에서 캐시), 지표들을 프로세스 풀에서 동시에 계산
+
+구간은 모두 양쪽 분위수 (percentile) 구간이다.
+
+사용 예:
+    engine = UncertaintyEngine(n_resamples=2000)
+    engine.add_ratio('aov', revenue, groups=time_bucket)
+    engine.add_lift('lift', has_purchase, {'view_item': has_view_item, 'add_to_cart': has_add_to_cart})
+    intervals = engine.run()
+"""
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import special
+
+__all__ = [
+    "compress", "bootstrap_ratio", "bootstrap_lift", "beta_interval", "beta_lift_interval", "UncertaintyEngine",
+]
+
+# 한 번에 만드는 (재표본 x 셀) 가중치 원소 수 상한
+_BLOCK = 1 << 21
+
+
+def _bounds(confidence):
+    alpha = (1 - confidence) / 2
+    return alpha, 1 - alpha
+
+
+def compress(values, groups=None):
+    """단위(세션) x k 값 배열 → (셀 값 (m, k), 셀 건수 (m,), 셀 그룹 코드 (m,), 그룹 라벨)
+
+    셀은 그룹 코드 순으로 정렬되어 있다. 값에 NaN 이 있는 세션은 뺀다.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, None]
+    if groups is None:
+        codes, labels = np.zeros(len(values), dtype=np.int64), pd.Index([None])
+    else:
+        codes, labels = pd.factorize(pd.Series(groups), sort=True)
+        labels = pd.Index(labels)
+    keep = ~np.isnan(values).any(axis=1) & (codes >= 0)
+
+    # 열마다 값 → 정수 코드, 그룹 코드를 최상위 자리로 한 혼합 진법 키 (키 정렬 = 그룹 순)
+    digits, uniques = [codes[keep].astype(np.int64)], []
+    for column in values[keep].T:
+        column_codes, column_values = pd.factorize(column)
+        digits.append(column_codes.astype(np.int64))
+        uniques.append(np.asarray(column_values, dtype=np.float64))
+    sizes = [max(len(labels), 1)] + [max(len(u), 1) for u in uniques]
+    if int(np.prod(sizes, dtype=object)) < 1 << 62:
+        key = np.zeros(len(digits[0]), dtype=np.int64)
+        for column_codes, size in zip(digits, sizes):
+            key *= size
+            key += column_codes
+        keys, counts = np.unique(key, return_counts=True)
+        cell_digits = []
+        for size in reversed(sizes):
+            cell_digits.append(keys % size)
+            keys = keys // size
+        cell_digits = cell_digits[::-1]
+    else:
+        rows, counts = np.unique(np.column_stack(digits), axis=0, return_counts=True)
+        cell_digits = list(rows.T)
+    cells = np.column_stack([u[d] for u, d in zip(uniques, cell_digits[1:])]) if uniques else np.empty((len(counts), 0))
+    return cells, counts, cell_digits[0], labels
+
+
+def _resample_sums(cells, counts, codes, n_groups, n_resamples, rng):
+    """재표본별·그룹별 합계 (n_resamples, n_groups, k). 셀은 그룹 코드 순 정렬"""
+    sums = np.zeros((n_resamples, n_groups, cells.shape[1]))
+    step = max(1, _BLOCK // n_resamples)
+    for start in range(0, len(cells), step):
+        stop = min(start + step, len(cells))
+        weights = rng.poisson(counts[start:stop], size=(n_resamples, stop - start)).astype(np.float64)
+        block_codes = codes[start:stop]
+        starts = np.flatnonzero(np.r_[True, block_codes[1:] != block_codes[:-1]])
+        weighted = weights[:, :, None] * cells[None, start:stop, :]
+        sums[:, block_codes[starts], :] += np.add.reduceat(weighted, starts, axis=1)
+    return sums
+
+
+def _observed_sums(cells, counts, codes, n_groups):
+    sums = np.zeros((n_groups, cells.shape[1]))
+    np.add.at(sums, codes, cells * counts[:, None])
+    return sums
+
+
+def _ratio(sums):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return sums[..., 0] / sums[..., 1]
+
+
+def _lift(sums):
+    """합계 열 [1, y, s_1..s_J, y*s_1..y*s_J] → 행동별 Lift (..., J)"""
+    n_signals = (sums.shape[-1] - 2) // 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        base = sums[..., 1] / sums[..., 0]
+        conditional = sums[..., 2 + n_signals:] / sums[..., 2:2 + n_signals]
+        return conditional / base[..., None]
+
+
+def _summarize(estimate, resampled, confidence):
+    """관측 추정치 + 재표본 분포 → 추정치 / 하한 / 상한 / 표준오차"""
+    low, high = _bounds(confidence)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # 재표본이 전부 NaN 인 그룹 (표본 0)
+        ci_low, ci_high = np.nanquantile(resampled, [low, high], axis=0)
+        std_error = np.nanstd(resampled, axis=0)
+    return {"estimate": estimate, "ci_low": ci_low, "ci_high": ci_high, "std_error": std_error}
+
+
+def _bootstrap_cells(kind, compressed, n_resamples, confidence, seed):
+    """압축 셀 하나에 대한 부트스트랩 (프로세스 풀 작업 단위)"""
+    cells, counts, codes, labels, extra = compressed
+    rng = np.random.default_rng(seed)
+    n_groups = len(labels)
+    observed = _observed_sums(cells, counts, codes, n_groups)
+    resampled = _resample_sums(cells, counts, codes, n_groups, n_resamples, rng)
+
+    if kind == "ratio":
+        result = pd.DataFrame({"group": labels, "n": observed[:, 1]})
+        for name, column in _summarize(_ratio(observed), _ratio(resampled), confidence).items():
+            result[name] = column
+        return result
+
+    # lift: 그룹 1개, 행동별 1행
+    result = pd.DataFrame({"signal": extra, "n": observed[0, 2:2 + len(extra)]})
+    for name, column in _summarize(_lift(observed)[0], _lift(resampled)[:, 0], confidence).items():
+        result[name] = column
+    return result
+
+
+def _ratio_cells(numerator, denominator=None, groups=None, clusters=None):
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.ones_like(numerator) if denominator is None else np.asarray(denominator, dtype=np.float64)
+    if clusters is not None:
+        # 같은 세션의 행은 가중치 하나를 공유 → (세션, 그룹) 합계가 재표본 단위
+        keep = ~(np.isnan(numerator) | np.isnan(denominator))
+        frame = pd.DataFrame({"cluster": np.asarray(clusters)[keep], "numerator": numerator[keep],
+                              "denominator": denominator[keep]})
+        keys = ["cluster"]
+        if groups is not None:
+            frame["group"] = np.asarray(groups)[keep]
+            keys.append("group")
+        summed = frame.groupby(keys, sort=False).sum()
+        numerator, denominator = summed["numerator"].to_numpy(), summed["denominator"].to_numpy()
+        groups = None if groups is None else summed.index.get_level_values("group")
+    return (*compress(np.column_stack([numerator, denominator]), groups), None)
+
+
+def _lift_cells(outcome, signals):
+    """0/1 플래그 조합을 비트 키로 바로 세어 셀 구성 (플래그 J 개 → 셀 최대 2^(J+1) 개)"""
+    flags = [np.asarray(outcome)] + [np.asarray(flag) for flag in signals.values()]
+    key = np.zeros(len(flags[0]), dtype=np.int64)
+    for bit, flag in enumerate(flags):
+        key |= (flag > 0).astype(np.int64) << bit
+    counts = np.bincount(key, minlength=1 << len(flags))
+    present = np.flatnonzero(counts)
+    bits = (present[:, None] >> np.arange(len(flags))) & 1
+    y, s = bits[:, :1], bits[:, 1:]
+    cells = np.column_stack([np.ones(len(present)), y, s, s * y]).astype(np.float64)
+    return cells, counts[present], np.zeros(len(present), dtype=np.int64), pd.Index([None]), list(signals)
+
+
+def bootstrap_ratio(numerator, denominator=None, groups=None, clusters=None, n_resamples=2000, confidence=0.95, seed=0):
+    """그룹별 sum(numerator) / sum(denominator) 의 Poisson 부트스트랩 구간
+
+    denominator 를 생략하면 평균 (행 1개 = 1). clusters(세션 ID) 를 주면 같은 세션의 행은 함께 재표본.
+    결과: group, n(분모 합), estimate, ci_low, ci_high, std_error
+    """
+    return _bootstrap_cells("ratio", _ratio_cells(numerator, denominator, groups, clusters), n_resamples, confidence, seed)
+
+
+def bootstrap_lift(outcome, signals, n_resamples=2000, confidence=0.95, seed=0):
+    """행동별 Lift = P(outcome | 행동) / P(outcome) 의 부트스트랩 구간 (모든 행동이 같은 재표본을 공유)
+
+    signals: {행동 이름: 0/1 배열}. 결과: signal, n(행동 세션 수), estimate, ci_low, ci_high, std_error
+    """
+    return _bootstrap_cells("lift", _lift_cells(outcome, signals), n_resamples, confidence, seed)
+
+
+def beta_interval(successes, totals, confidence=0.95, prior=(1.0, 1.0)):
+    """Beta-Binomial 사후분포 → (사후 평균, 하한, 상한). 기본 사전분포는 균등 Beta(1, 1)"""
+    successes = np.asarray(successes, dtype=np.float64)
+    totals = np.asarray(totals, dtype=np.float64)
+    a = prior[0] + successes
+    b = prior[1] + totals - successes
+    low, high = _bounds(confidence)
+    return a / (a + b), special.betaincinv(a, b, low), special.betaincinv(a, b, high)
+
+
+def beta_lift_interval(sessions, signal_sessions, signal_conversions, conversions,
+                       confidence=0.95, prior=(1.0, 1.0), draws=20000, seed=0):
+    """Lift = P(y | 행동) / P(y) 의 사후분포 → (사후 중앙값, 하한, 상한)
+
+    P(y) = P(행동) P(y | 행동) + (1 - P(행동)) P(y | 행동 안 함) 으로 나누면 세 확률의 사후분포가 서로 독립인
+    Beta 가 되므로, 각각 draws 개씩 뽑아 Lift 분포를 만든다. 행동이 여러 개면 배열로 (행동별로 독립 계산).
+    """
+    n, s, sy, y = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64) for v in
+                                         (sessions, signal_sessions, signal_conversions, conversions)))
+    rng = np.random.default_rng(seed)
+    shape = (draws,) + n.shape
+    p_signal = rng.beta(prior[0] + s, prior[1] + n - s, size=shape)
+    p_with = rng.beta(prior[0] + sy, prior[1] + s - sy, size=shape)
+    p_without = rng.beta(prior[0] + y - sy, prior[1] + (n - s) - (y - sy), size=shape)
+    lift = p_with / (p_signal * p_with + (1 - p_signal) * p_without)
+    low, high = _bounds(confidence)
+    median, ci_low, ci_high = np.quantile(lift, [0.5, low, high], axis=0)
+    return median, ci_low, ci_high
+
+
+class UncertaintyEngine:
+    """지표별 세션 배열을 압축 셀로 보관하고, run() 에서 지표 단위로 프로세스 풀에 나눠 부트스트랩"""
+
+    def __init__(self, n_resamples=2000, confidence=0.95, workers=None, seed=0):
+        self.n_resamples = n_resamples
+        self.confidence = confidence
+        self.workers = workers or os.cpu_count()
+        self.seed = seed
+        self._jobs = {}
+        self._results = {}
+
+    def __contains__(self, name):
+        return name in self._jobs
+
+    def add_ratio(self, name, numerator, denominator=None, groups=None, clusters=None):
+        """그룹별 비율 지표 등록 (denominator 생략 시 평균, clusters 는 행이 속한 세션 ID)"""
+        self._jobs[name] = ("ratio", _ratio_cells(numerator, denominator, groups, clusters))
+        self._results.pop(name, None)
+
+    def add_lift(self, name, outcome, signals):
+        """행동별 Lift 지표 등록"""
+        self._jobs[name] = ("lift", _lift_cells(outcome, signals))
+        self._results.pop(name, None)
+
+    def n_cells(self, name):
+        return len(self._jobs[name][1][0])
+
+    def run(self, names=None):
+        """{지표 이름: 구간 DataFrame}. 이미 계산한 지표는 다시 계산하지 않는다"""
+        names = list(self._jobs) if names is None else list(names)
+        pending = [name for name in names if name not in self._results]
+        # 지표마다 독립 난수열 (등록 순서로 고정되어 실행 순서·워커 수와 무관하게 재현)
+        seeds = dict(zip(self._jobs, np.random.SeedSequence(self.seed).spawn(len(self._jobs))))
+        args = [(*self._jobs[name], self.n_resamples, self.confidence, seeds[name]) for name in pending]
+
+        if self.workers > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(pending))) as pool:
+                futures = [pool.submit(_bootstrap_cells, *arg) for arg in args]
+                for name, future in zip(pending, futures):
+                    self._results[name] = future.result()
+        else:
+            for name, arg in zip(pending, args):
+                self._results[name] = _bootstrap_cells(*arg)
+        return {name: self._results[name] for name in names}
@@ -0,0 +1,45 @@
+{#
+    event_params 배열에서 여러 키를 한 번에 꺼내는 매크로
+
+    params: [(key, type, alias), ...]  type 은 string / int / float / double
+    결과는 alias 를 필드로 갖는 STRUCT 하나 → 모델에서는 params.<alias> 로 사용
+
+    키마다 (SELECT value.x FROM UNNEST(event_params) WHERE key = ...) 를 쓰면
+    행마다 배열을 키 개수만큼 다시 펼치므로, BigQuery 에서는 배열을 한 번만 펼쳐
+    MAX(IF(key = ...)) 로 피벗한다. (GA4 event_params 의 key 는 이벤트 내에서 유일)
+#}
+
+{% macro extract_event_params(params, column='event_params') -%}
+    {{ adapter.dispatch('extract_event_params')(params, column) }}
+{%- endmacro %}
+
+
+{# type → event_params.value 의 필드명 #}
+{% macro event_param_value_field(type) -%}
+    {%- set fields = {'string': 'string_value', 'int': 'int_value', 'float': 'float_value', 'double': 'double_value'} -%}
+    {%- if type not in fields -%}
+        {{ exceptions.raise_compiler_error("extract_event_params: 지원하지 않는 타입입니다 - " ~ type) }}
+    {%- endif -%}
+    {{ fields[type] }}
+{%- endmacro %}
+
+
+{% macro default__extract_event_params(params, column) -%}
+(
+    SELECT AS STRUCT
+    {%- for key, type, alias in params %}
+        MAX(IF(key = '{{ key }}', value.{{ event_param_value_field(type) }}, NULL)) AS {{ alias }}{{ ',' if not loop.last }}
+    {%- endfor %}
+    FROM UNNEST({{ column }})
+)
+{%- endmacro %}
+
+
+{# DuckDB: 상관 서브쿼리 집계보다 벡터화된 list_filter 가 훨씬 빠름 (로컬 실행용) #}
+{% macro duckdb__extract_event_params(params, column) -%}
+struct_pack(
+    {%- for key, type, alias in params %}
+    {{ alias }} := list_filter({{ column }}, lambda p: p.key = '{{ key }}')[1].value.{{ event_param_value_field(type) }}{{ ',' if not loop.last }}
+    {%- endfor %}
+)
+{%- endmacro %}
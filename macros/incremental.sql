@@ -0,0 +1,25 @@
+{#
+    증분(incremental) 실행용 공통 필터
+
+    - incremental_window_start: 이미 적재된 마지막 날짜에서 lookback 일수만큼 뒤로 간 날짜
+      (늦게 도착한 이벤트를 다시 반영하기 위한 재처리 구간의 시작점)
+    - incremental_session_filter: 세션 단위 모델용 WHERE 절
+      재처리 구간에 이벤트가 하나라도 있는 세션만 다시 집계하되,
+      자정을 넘긴 세션이 잘리지 않도록 하루 전 파티션의 이벤트까지 함께 읽는다.
+#}
+
+{% macro incremental_window_start(date_column) -%}
+    (SELECT DATE_SUB(MAX({{ date_column }}), INTERVAL {{ var('incremental_lookback_days') }} DAY) FROM {{ this }})
+{%- endmacro %}
+
+
+{% macro incremental_session_filter(date_column='session_date') -%}
+{%- if is_incremental() %}
+    WHERE event_date >= DATE_SUB({{ incremental_window_start(date_column) }}, INTERVAL 1 DAY)
+      AND session_unique_id IN (
+          SELECT session_unique_id
+          FROM {{ ref('stg_events') }}
+          WHERE event_date >= {{ incremental_window_start(date_column) }}
+      )
+{%- endif %}
+{%- endmacro %}
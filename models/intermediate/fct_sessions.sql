@@ -0,0 +1,70 @@
+{{ config(
+    materialized='incremental',
+    incremental_strategy='merge',
+    unique_key='session_unique_id',
+    partition_by={'field': 'session_date', 'data_type': 'date'},
+    cluster_by=['session_unique_id']
+) }}
+
+-- 세션 단위 공통 팩트 테이블
+-- stg_events 를 세션 기준으로 한 번만 집계해 두고,
+-- int_session_funnel / int_session_paths / int_browsing_style / int_engage_lift_score /
+-- int_lift_weight / mart_time_to_conversion / mart_user_journey 는 이 테이블을 그대로 잘라 쓴다.
+-- (stg_events 는 이벤트 x 상품 행이므로 건수/합계 지표는 기존 모델과 같은 기준)
+
+SELECT
+    session_unique_id,
+
+    -- 1. 사용자 / 세션 속성 (세션 내 하나의 값만 가져오기 위해 MAX)
+    MAX(user_pseudo_id) AS user_pseudo_id,
+    MAX(master_id) AS master_id,
+    MAX(is_member) AS is_member,
+    MAX(session_source) AS session_source,
+    MAX(session_medium) AS session_medium,
+    MAX(session_campaign) AS session_campaign,
+    MAX(device_category) AS device_category,
+
+    -- 2. 시간 정보
+    MIN(event_date) AS session_date,
+    MIN(event_timestamp) AS session_start_at,
+    MAX(event_timestamp) AS session_end_at,
+    MAX(CASE WHEN event_name = 'purchase' THEN event_timestamp END) AS purchased_at,
+    MIN(EXTRACT(HOUR FROM event_timestamp)) AS session_hour,
+    MIN(EXTRACT(DAYOFWEEK FROM event_timestamp)) AS session_day_of_week,
+
+    -- 3. 행동 여부 (Flags)
+    MAX(CASE WHEN event_name = 'session_start' THEN 1 ELSE 0 END) AS has_session_start,
+    MAX(CASE WHEN event_name = 'view_item' THEN 1 ELSE 0 END) AS has_view_item,
+    MAX(CASE WHEN event_name = 'view_search_results' THEN 1 ELSE 0 END) AS has_search,
+    MAX(CASE WHEN event_name = 'add_to_cart' THEN 1 ELSE 0 END) AS has_add_to_cart,
+    MAX(CASE WHEN event_name = 'begin_checkout' THEN 1 ELSE 0 END) AS has_begin_checkout,
+    MAX(CASE WHEN event_name = 'add_payment_info' THEN 1 ELSE 0 END) AS has_add_payment_info,
+    MAX(CASE WHEN event_name = 'purchase' THEN 1 ELSE 0 END) AS has_purchase,
+
+    -- 4. 매출 정보
+    MAX(purchase_revenue) AS revenue,
+    SUM(item_revenue_calc) AS item_revenue,
+
+    -- 5. 경로 (예: session_start > view_item > add_to_cart)
+    STRING_AGG(event_name, ' > ' ORDER BY event_timestamp ASC) AS full_path,
+    COUNT(*) AS path_length,
+
+    -- 6. 카테고리 탐색 통계
+    COUNT(DISTINCT CASE WHEN event_name = 'view_item' THEN item_category END) AS distinct_categories_viewed,
+    COUNT(CASE WHEN event_name = 'view_item' THEN item_name END) AS total_items_viewed,
+
+    -- 7. 참여 점수용 행동 횟수 (가중치는 같은 빌드의 int_lift_weight 에서 int_engage_lift_score 가 곱함)
+    COUNTIF(event_name = 'view_item') AS view_item_events,
+    COUNTIF(event_name = 'view_search_results') AS search_events,
+    COUNTIF(event_name = 'add_to_cart') AS add_to_cart_events,
+    COUNTIF(event_name = 'begin_checkout') AS begin_checkout_events,
+    COUNTIF(event_name = 'add_payment_info') AS add_payment_info_events,
+
+    -- 8. 클릭한 프로모션 (mart_promo_quality 가 클릭 이벤트를 다시 읽지 않고 세션 단위로 집계)
+    ARRAY_AGG(DISTINCT CASE
+        WHEN event_name = 'select_promotion' AND promotion_name != '(not set)' THEN promotion_name
+    END IGNORE NULLS) AS clicked_promotions
+
+FROM {{ ref('stg_events') }}
+{{ incremental_session_filter() }}
+GROUP BY session_unique_id
@@ -1,41 +1,138 @@
 {{ config(materialized='table') }}
 
-WITH session_scores AS (
+-- 점수 = 행동 횟수 x 같은 빌드의 int_lift_weight Lift 를 반올림한 가중치 (그 외 이벤트는 1점)
+-- 행동 횟수는 fct_sessions 에 세션 단위로 증분 적재되고, 가중치와 등급(백분위)은
+-- 전체 분포 기준이어야 하므로 여기서 매번 다시 계산한다.
+-- engagement_weight_grain = 'week' 이면 세션이 속한 주의 가중치를 쓴다.
+--
+-- 등급 경계 (engagement_grade_method)
+-- - approx: APPROX_QUANTILES 스케치로 상위 20% / 50% 점수 경계를 구해 비교만 (전체 정렬 없음, 기본)
+-- - exact : PERCENT_RANK() 전체 정렬 (파티션 없는 윈도우라 워커 하나가 전부 정렬, 작은 데이터용)
+--
+-- 근사 경계 검사 (engagement_grade_rank_error = ε)
+-- 경계 점수 c 의 순위 구간 [c 초과 세션 수, c 이상 세션 수] 가 exact 모드의 목표 순위
+-- t = 0.2 x (n - 1) (Medium 은 0.5) 에서 ε x n 세션 넘게 떨어지면 빌드를 ERROR 로 중단한다.
+-- 집계 한 번(COUNTIF)이라 정렬은 없고, 통과하면 exact 대비 등급이 다른 세션은
+-- 경계마다 ε x n + 경계 점수의 동점 세션 수 이내 (동점 세션은 두 모드 모두 한 등급으로 묶임).
+{%- set rank_error = var('engagement_grade_rank_error') %}
+{%- if not (rank_error > 0 and rank_error < 1) %}
+{{ exceptions.raise_compiler_error("engagement_grade_rank_error 는 0 초과 1 미만이어야 합니다: " ~ rank_error) }}
+{%- endif %}
+{% set weekly = var('engagement_weight_grain') == 'week' %}
+{% set exact = var('engagement_grade_method') == 'exact' %}
+{#- 분위 개수는 10 의 배수 (80% / 50% 위치가 정확히 한 칸), 해상도는 ε 정도 #}
+{% set n_quantiles = [((1 / rank_error) | round | int) // 10 * 10, 10] | max %}
+{% set cutoffs = {'high': 0.2, 'medium': 0.5} %}
+
+WITH weights AS (
     SELECT
-        session_unique_id,
-        user_pseudo_id,
-        
-        -- Lift 기반 점수 산정
-        SUM(CASE 
-            WHEN event_name = 'view_item' THEN 5              -- Lift 4.6 -> 5점
-            WHEN event_name = 'view_search_results' THEN 3    -- Lift 2.9 -> 3점
-            WHEN event_name = 'add_to_cart' THEN 12           -- Lift 11.8 -> 12점
-            WHEN event_name = 'begin_checkout' THEN 31        -- Lift 30.6 -> 31점
-            WHEN event_name = 'add_payment_info' THEN 47      -- Lift 46.5 -> 47점
-            
-            -- 그 외 단순 방문 
-            ELSE 1
-        END) AS engagement_score
-    FROM {{ ref('stg_events') }}
-    GROUP BY 1, 2
+        {%- if weekly %}
+        weight_week,
+        {%- endif %}
+        -- 반올림 / 빈 Lift 1점 처리는 int_lift_weight 에서 (대시보드도 같은 값을 mart_engagement_weights 로 읽음)
+        weight_view AS w_view,
+        weight_search AS w_search,
+        weight_cart AS w_cart,
+        weight_checkout AS w_checkout,
+        weight_payment AS w_payment
+    FROM {{ ref('int_lift_weight') }}
+),
+
+scored AS (
+    SELECT
+        f.session_unique_id,
+        f.user_pseudo_id,
+        f.session_date,
+        f.view_item_events * w.w_view
+            + f.search_events * w.w_search
+            + f.add_to_cart_events * w.w_cart
+            + f.begin_checkout_events * w.w_checkout
+            + f.add_payment_info_events * w.w_payment
+            -- 그 외 단순 방문 이벤트
+            + (f.path_length - f.view_item_events - f.search_events - f.add_to_cart_events
+               - f.begin_checkout_events - f.add_payment_info_events) AS engagement_score
+    FROM {{ ref('fct_sessions') }} f
+    {%- if weekly %}
+    LEFT JOIN weights w ON DATE_TRUNC(f.session_date, ISOWEEK) = w.weight_week
+    {%- else %}
+    CROSS JOIN weights w
+    {%- endif %}
 ),
 
+{%- if exact %}
+
 ranked AS (
     SELECT
-        *,
+        session_unique_id,
+        user_pseudo_id,
+        session_date,
+        engagement_score,
         -- 점수 줄세우기 (백분위 계산)
         PERCENT_RANK() OVER (ORDER BY engagement_score DESC) as pct_rank
-    FROM session_scores
+    FROM scored
 )
 
 SELECT
     session_unique_id,
     user_pseudo_id,
+    session_date,
     engagement_score,
     -- 등급 부여 (상위 20% / 50% / 나머지)
-    CASE 
+    CASE
         WHEN pct_rank <= 0.2 THEN 'High Intent'   -- 상위 20% (진성 유저)
         WHEN pct_rank <= 0.5 THEN 'Medium Intent' -- 상위 20~50% (탐색 유저)
         ELSE 'Low Intent'                         -- 하위 50% (이탈 유저)
     END AS engagement_grade
-FROM ranked
\ No newline at end of file
+FROM ranked
+{%- else %}
+
+quantiles AS (
+    -- 점수 분포 분위수 한 번 (PERCENT_RANK <= 0.2 ⇔ 점수 >= 80% 분위수, 동점은 같은 등급)
+    SELECT APPROX_QUANTILES(engagement_score, {{ n_quantiles }}) AS q
+    FROM scored
+),
+
+ranks AS (
+    -- 근사 경계의 실제 순위 (경계보다 높은 / 같거나 높은 세션 수)
+    SELECT
+        COUNT(*) AS n,
+        {%- for grade, share in cutoffs.items() %}
+        {%- set offset = (n_quantiles * (1 - share)) | round | int %}
+        ANY_VALUE(q.q[OFFSET({{ offset }})]) AS {{ grade }}_cutoff,
+        COUNTIF(s.engagement_score > q.q[OFFSET({{ offset }})]) AS {{ grade }}_above,
+        COUNTIF(s.engagement_score >= q.q[OFFSET({{ offset }})]) AS {{ grade }}_at_or_above{{ ',' if not loop.last }}
+        {%- endfor %}
+    FROM scored s
+    CROSS JOIN quantiles q
+),
+
+cutoffs AS (
+    SELECT
+        {%- for grade, share in cutoffs.items() %}
+        {%- set target = share ~ ' * (n - 1)' %}
+        IF(
+            GREATEST({{ grade }}_above - {{ target }}, {{ target }} - {{ grade }}_at_or_above, 0) > {{ rank_error }} * n,
+            ERROR(CONCAT(
+                '상위 {{ (share * 100) | int }}% 근사 경계 순위 ', CAST({{ grade }}_above AS STRING), '~', CAST({{ grade }}_at_or_above AS STRING),
+                ' 가 목표 ', CAST({{ target }} AS STRING), ' 에서 engagement_grade_rank_error 를 넘음 (exact 모드로 다시 빌드)'
+            )),
+            {{ grade }}_cutoff
+        ) AS {{ grade }}_cutoff{{ ',' if not loop.last }}
+        {%- endfor %}
+    FROM ranks
+)
+
+SELECT
+    s.session_unique_id,
+    s.user_pseudo_id,
+    s.session_date,
+    s.engagement_score,
+    -- 등급 부여 (상위 20% / 50% / 나머지)
+    CASE
+        WHEN s.engagement_score >= c.high_cutoff THEN 'High Intent'     -- 상위 20% (진성 유저)
+        WHEN s.engagement_score >= c.medium_cutoff THEN 'Medium Intent' -- 상위 20~50% (탐색 유저)
+        ELSE 'Low Intent'                                               -- 하위 50% (이탈 유저)
+    END AS engagement_grade
+FROM scored s
+CROSS JOIN cutoffs c
+{%- endif %}
@@ -1,23 +1,34 @@
 {{ config(materialized = 'table') }}
 
+-- 행동별 Lift = P(구매 | 행동) / P(구매)
+-- int_engage_lift_score 가 같은 빌드에서 이 값을 참여 점수 가중치로 읽는다 (손으로 옮겨 적지 않음).
+-- engagement_weight_grain = 'week' 이면 주(ISO, 월요일 시작)별로 따로 계산해 트래픽 구성 변화에 맞춰 매주 다시 보정한다.
+{% set weekly = var('engagement_weight_grain') == 'week' %}
+
 WITH session_stats AS (
     SELECT
-        session_unique_id,
+        {%- if weekly %}
+        DATE_TRUNC(session_date, ISOWEEK) AS weight_week,
+        {%- endif %}
+
         -- 1. 목표(Goal): 구매 여부 (0 or 1)
-        MAX(IF(event_name = 'purchase', 1, 0)) as is_converted,
-        
+        has_purchase as is_converted,
+
         -- 2. 신호(Signal): 각 행동을 했는지 여부 (0 or 1)
-        MAX(IF(event_name = 'view_item', 1, 0)) as has_view_item,
-        MAX(IF(event_name = 'view_search_results', 1, 0)) as has_search,
-        MAX(IF(event_name = 'add_to_cart', 1, 0)) as has_cart,
-        MAX(IF(event_name = 'begin_checkout', 1, 0)) as has_checkout,
-        MAX(IF(event_name = 'add_payment_info', 1, 0)) as has_payment
-    FROM {{ ref('stg_events') }} -- (혹은 stg_ga4_events)
-    GROUP BY 1
+        has_view_item,
+        has_search,
+        has_add_to_cart as has_cart,
+        has_begin_checkout as has_checkout,
+        has_add_payment_info as has_payment
+    FROM {{ ref('fct_sessions') }}
 ),
 
 rates AS (
     SELECT
+        {%- if weekly %}
+        weight_week,
+        {%- endif %}
+
         -- A. 베이스라인: 전체 세션의 평균 구매율 (Base Probability)
         SAFE_DIVIDE(SUM(is_converted), COUNT(*)) as base_cv,
         
@@ -29,14 +40,34 @@ rates AS (
         SAFE_DIVIDE(COUNTIF(has_checkout=1 AND is_converted=1), COUNTIF(has_checkout=1)) as checkout_cv,
         SAFE_DIVIDE(COUNTIF(has_payment=1 AND is_converted=1), COUNTIF(has_payment=1)) as payment_cv
     FROM session_stats
+    {%- if weekly %}
+    GROUP BY weight_week
+    {%- endif %}
+),
+
+lifts AS (
+    SELECT
+        {%- if weekly %}
+        weight_week,
+        {%- endif %}
+
+        -- C. Lift(향상도) 계산: 조건부 확률 / 베이스라인
+        -- "이 행동을 하면 구매 확률이 몇 배(X)로 뛰는가?"
+        ROUND(SAFE_DIVIDE(view_cv, base_cv), 1) as score_view,       -- 결과: 4.6
+        ROUND(SAFE_DIVIDE(search_cv, base_cv), 1) as score_search,   -- 결과: 2.9
+        ROUND(SAFE_DIVIDE(cart_cv, base_cv), 1) as score_cart,       -- 결과: 11.8
+        ROUND(SAFE_DIVIDE(checkout_cv, base_cv), 1) as score_checkout, -- 결과: 30.6
+        ROUND(SAFE_DIVIDE(payment_cv, base_cv), 1) as score_payment  -- 결과: 46.5
+    FROM rates
 )
 
 SELECT
-    -- C. Lift(향상도) 계산: 조건부 확률 / 베이스라인
-    -- "이 행동을 하면 구매 확률이 몇 배(X)로 뛰는가?"
-    ROUND(view_cv / base_cv, 1) as score_view,       -- 결과: 4.6
-    ROUND(search_cv / base_cv, 1) as score_search,   -- 결과: 2.9
-    ROUND(cart_cv / base_cv, 1) as score_cart,       -- 결과: 11.8
-    ROUND(checkout_cv / base_cv, 1) as score_checkout, -- 결과: 30.6
-    ROUND(payment_cv / base_cv, 1) as score_payment  -- 결과: 46.5
-FROM rates
\ No newline at end of file
+    *,
+    -- D. 참여 점수 가중치: 위 Lift 를 정수로 반올림 (int_engage_lift_score / mart_engagement_weights 가 그대로 읽음)
+    -- Lift 가 없으면 (해당 주에 행동/구매 세션이 없음) 단순 방문과 같은 1점
+    CAST(IFNULL(ROUND(score_view), 1) AS INT64) AS weight_view,
+    CAST(IFNULL(ROUND(score_search), 1) AS INT64) AS weight_search,
+    CAST(IFNULL(ROUND(score_cart), 1) AS INT64) AS weight_cart,
+    CAST(IFNULL(ROUND(score_checkout), 1) AS INT64) AS weight_checkout,
+    CAST(IFNULL(ROUND(score_payment), 1) AS INT64) AS weight_payment
+FROM lifts
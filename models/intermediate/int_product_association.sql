@@ -1,20 +1,79 @@
-{{ config(materialized='table') }}
+{{ config(materialized='table', cluster_by=['product_A']) }}
 
-WITH purchase_items AS (
+-- 상품 2개 조합 연관 규칙 (support / confidence / lift)
+-- 조합별 거래 수는 int_product_pair_counts (support 임계값 적용), 여기서는 confidence / lift / 상위 K 만
+-- 임계값/상위 K 는 dbt_project.yml 의 bundle_* var
+{% set min_confidence = var('bundle_min_confidence') %}
+{% set min_lift = var('bundle_min_lift') %}
+{% set top_k = var('bundle_top_k') %}
+
+WITH rules AS (
+    SELECT
+        *,
+        pair_transactions / n_transactions AS support,
+        pair_transactions / item_A_transactions AS confidence_A_to_B,
+        pair_transactions / item_B_transactions AS confidence_B_to_A,
+        pair_transactions * n_transactions / (item_A_transactions * item_B_transactions) AS lift
+    FROM {{ ref('int_product_pair_counts') }}
+),
+
+filtered AS (
+    SELECT *
+    FROM rules
+    WHERE GREATEST(confidence_A_to_B, confidence_B_to_A) >= {{ min_confidence }}
+      AND lift >= {{ min_lift }}
+),
+
+product_ranks AS (
+    -- 조합을 양쪽 상품 기준으로 펼쳐 상품별 향상도 순위 (A < B 로만 저장하므로 한쪽만 보면 이름이 뒤인 상품은 조합이 거의 남지 않음)
     SELECT
-        transaction_id,
-        session_unique_id,
-        item_name
-    FROM {{ ref('stg_events') }}
-    WHERE event_name = 'purchase' 
-      AND transaction_id IS NOT NULL
+        product_A,
+        product_B,
+        product,
+        ROW_NUMBER() OVER (PARTITION BY product ORDER BY lift DESC, pair_transactions DESC, partner) AS product_rank
+    FROM (
+        SELECT product_A, product_B, product_A AS product, product_B AS partner, lift, pair_transactions FROM filtered
+        UNION ALL
+        SELECT product_A, product_B, product_B AS product, product_A AS partner, lift, pair_transactions FROM filtered
+    )
+),
+
+ranked AS (
+    SELECT
+        f.*,
+        -- 상품 A 기준 B 의 순위 / 상품 B 기준 A 의 순위 (상위 K 가지치기용)
+        r.rank_in_A,
+        r.rank_in_B
+    FROM filtered f
+    JOIN (
+        SELECT
+            product_A,
+            product_B,
+            MAX(IF(product = product_A, product_rank, NULL)) AS rank_in_A,
+            MAX(IF(product = product_B, product_rank, NULL)) AS rank_in_B
+        FROM product_ranks
+        GROUP BY 1, 2
+    ) r ON f.product_A = r.product_A AND f.product_B = r.product_B
 )
+
 SELECT
-    a.session_unique_id,
-    a.transaction_id,
-    a.item_name AS product_A,
-    b.item_name AS product_B
-FROM purchase_items a
-JOIN purchase_items b
-  ON a.transaction_id = b.transaction_id
- AND a.item_name < b.item_name -- 중복 제거 (A-B만 남김)
\ No newline at end of file
+    product_A,
+    product_B,
+    pair_transactions,
+    item_A_transactions,
+    item_B_transactions,
+    n_transactions,
+    support,
+    confidence_A_to_B,
+    confidence_B_to_A,
+    lift,
+    rank_in_A,
+    rank_in_B,
+    buyer_score_sum,
+    scored_transactions,
+    high_intent_transactions
+FROM ranked
+{% if top_k > 0 %}
+-- 두 상품 중 어느 한쪽의 상위 K 에 들면 유지
+WHERE LEAST(rank_in_A, rank_in_B) <= {{ top_k }}
+{% endif %}
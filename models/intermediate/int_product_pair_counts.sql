@@ -0,0 +1,82 @@
+{{ config(materialized='table', cluster_by=['product_A']) }}
+
+-- 상품 2개 조합별 거래 수 (support 임계값만 적용)
+-- 구매 라인끼리 self-join 하면 장바구니 크기의 제곱만큼 행이 생긴 채로 저장되므로,
+-- 거래별 정렬된 상품 배열에서 조합을 펼치는 즉시 조합 단위로 집계한다 (거래 x 조합 행은 저장하지 않음).
+-- support 만 하위 집합으로 갈수록 커지므로(anti-monotone) 여기서는 support 로만 거르고,
+-- confidence / lift / 상위 K 는 int_product_association(2개), int_product_triples(3개)가 각자 적용한다.
+{% set min_support = var('bundle_min_support') %}
+
+WITH purchase_items AS (
+    -- 같은 거래에 같은 상품이 여러 줄이어도 1번으로
+    SELECT DISTINCT
+        transaction_id,
+        session_unique_id,
+        item_name
+    FROM {{ ref('stg_events') }}
+    WHERE event_name = 'purchase'
+      AND transaction_id IS NOT NULL
+      AND item_name IS NOT NULL
+),
+
+item_support AS (
+    SELECT
+        item_name,
+        COUNT(DISTINCT transaction_id) AS item_transactions
+    FROM purchase_items
+    GROUP BY 1
+),
+
+total AS (
+    SELECT COUNT(DISTINCT transaction_id) AS n_transactions
+    FROM purchase_items
+),
+
+baskets AS (
+    -- 거래별 상품 배열 (이름순 정렬 → 배열 위치 i < j 가 곧 product_A < product_B)
+    -- 조합 거래 수는 두 상품 각각의 거래 수를 넘을 수 없으므로 min_support 미만 상품은 미리 제외 (Apriori)
+    SELECT
+        p.transaction_id,
+        MIN(p.session_unique_id) AS session_unique_id,
+        ARRAY_AGG(DISTINCT p.item_name ORDER BY p.item_name) AS items
+    FROM purchase_items p
+    JOIN item_support i ON p.item_name = i.item_name
+    WHERE i.item_transactions >= {{ min_support }}
+    GROUP BY 1
+    HAVING COUNT(DISTINCT p.item_name) >= 2
+),
+
+scored_baskets AS (
+    -- 구매자 점수는 거래 단위로 한 번만 붙임 (조합마다 세션 테이블을 다시 조인하지 않음)
+    SELECT
+        b.transaction_id,
+        b.items,
+        s.engagement_score,
+        s.engagement_grade
+    FROM baskets b
+    LEFT JOIN {{ ref('int_engage_lift_score') }} s ON b.session_unique_id = s.session_unique_id
+),
+
+pair_counts AS (
+    SELECT
+        a AS product_A,
+        b AS product_B,
+        COUNT(*) AS pair_transactions,
+        SUM(engagement_score) AS buyer_score_sum,
+        COUNT(engagement_score) AS scored_transactions,
+        COUNTIF(engagement_grade = 'High Intent') AS high_intent_transactions
+    FROM scored_baskets, UNNEST(items) AS a WITH OFFSET i, UNNEST(items) AS b WITH OFFSET j
+    WHERE i < j
+    GROUP BY 1, 2
+    HAVING COUNT(*) >= {{ min_support }}
+)
+
+SELECT
+    p.*,
+    ia.item_transactions AS item_A_transactions,
+    ib.item_transactions AS item_B_transactions,
+    t.n_transactions
+FROM pair_counts p
+JOIN item_support ia ON p.product_A = ia.item_name
+JOIN item_support ib ON p.product_B = ib.item_name
+CROSS JOIN total t
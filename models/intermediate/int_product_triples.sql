@@ -0,0 +1,110 @@
+{{ config(materialized='table', cluster_by=['product_A'], enabled=var('bundle_mine_triples')) }}
+
+-- 상품 3개 조합 연관 규칙 (bundle_mine_triples: true 일 때만 빌드)
+-- 세 하위 조합이 모두 int_product_pair_counts 에 있는 경우만 후보로 (Apriori),
+-- 장바구니도 그 조합에 등장하는 상품으로 먼저 줄인 뒤 펼친다.
+-- 하위 조합으로 가지치기해도 되는 건 support 뿐이므로 (confidence / lift / 상위 K 는 anti-monotone 이 아님)
+-- 후보는 support 만 적용한 조합에서 만들고, 나머지 임계값은 3개 조합 자체에 적용한다.
+{% set min_support = var('bundle_min_support') %}
+{% set min_confidence = var('bundle_min_confidence') %}
+{% set min_lift = var('bundle_min_lift') %}
+{% set top_k = var('bundle_top_k') %}
+
+WITH pairs AS (
+    SELECT product_A, product_B, pair_transactions, item_A_transactions, item_B_transactions, n_transactions
+    FROM {{ ref('int_product_pair_counts') }}
+),
+
+pair_items AS (
+    SELECT product_A AS item_name FROM pairs
+    UNION DISTINCT
+    SELECT product_B FROM pairs
+),
+
+baskets AS (
+    SELECT
+        e.transaction_id,
+        ARRAY_AGG(DISTINCT e.item_name ORDER BY e.item_name) AS items
+    FROM {{ ref('stg_events') }} e
+    JOIN pair_items p ON e.item_name = p.item_name
+    WHERE e.event_name = 'purchase'
+      AND e.transaction_id IS NOT NULL
+    GROUP BY 1
+    HAVING COUNT(DISTINCT e.item_name) >= 3
+),
+
+triple_counts AS (
+    SELECT
+        a AS product_A,
+        b AS product_B,
+        c AS product_C,
+        COUNT(*) AS triple_transactions
+    FROM baskets, UNNEST(items) AS a WITH OFFSET i, UNNEST(items) AS b WITH OFFSET j, UNNEST(items) AS c WITH OFFSET k
+    WHERE i < j AND j < k
+    GROUP BY 1, 2, 3
+    HAVING COUNT(*) >= {{ min_support }}
+),
+
+rules AS (
+    SELECT
+        t.product_A,
+        t.product_B,
+        t.product_C,
+        t.triple_transactions,
+        t.triple_transactions / ab.n_transactions AS support,
+        -- {A, B} 를 산 거래 중 C 도 산 비율 (나머지 두 방향도 같은 방식)
+        t.triple_transactions / ab.pair_transactions AS confidence_AB_to_C,
+        t.triple_transactions / ac.pair_transactions AS confidence_AC_to_B,
+        t.triple_transactions / bc.pair_transactions AS confidence_BC_to_A,
+        t.triple_transactions * ab.n_transactions * ab.n_transactions
+            / (ab.item_A_transactions * ab.item_B_transactions * ac.item_B_transactions) AS lift
+    FROM triple_counts t
+    JOIN pairs ab ON t.product_A = ab.product_A AND t.product_B = ab.product_B
+    JOIN pairs ac ON t.product_A = ac.product_A AND t.product_C = ac.product_B
+    JOIN pairs bc ON t.product_B = bc.product_A AND t.product_C = bc.product_B
+),
+
+filtered AS (
+    SELECT *
+    FROM rules
+    WHERE GREATEST(confidence_AB_to_C, confidence_AC_to_B, confidence_BC_to_A) >= {{ min_confidence }}
+      AND lift >= {{ min_lift }}
+),
+
+product_ranks AS (
+    -- 조합을 세 상품 기준으로 펼쳐 상품별 향상도 순위
+    SELECT
+        product_A,
+        product_B,
+        product_C,
+        ROW_NUMBER() OVER (
+            PARTITION BY product ORDER BY lift DESC, triple_transactions DESC, product_A, product_B, product_C
+        ) AS product_rank
+    FROM (
+        SELECT *, product_A AS product FROM filtered
+        UNION ALL
+        SELECT *, product_B AS product FROM filtered
+        UNION ALL
+        SELECT *, product_C AS product FROM filtered
+    )
+),
+
+ranked AS (
+    SELECT
+        f.*,
+        -- 세 상품 중 이 조합을 가장 높게 둔 상품 기준 순위 (상위 K 가지치기용)
+        r.top_rank
+    FROM filtered f
+    JOIN (
+        SELECT product_A, product_B, product_C, MIN(product_rank) AS top_rank
+        FROM product_ranks
+        GROUP BY 1, 2, 3
+    ) r ON f.product_A = r.product_A AND f.product_B = r.product_B AND f.product_C = r.product_C
+)
+
+SELECT *
+FROM ranked
+{% if top_k > 0 %}
+-- 세 상품 중 어느 한쪽의 상위 K 에 들면 유지
+WHERE top_rank <= {{ top_k }}
+{% endif %}
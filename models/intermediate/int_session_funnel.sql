@@ -1,31 +1,34 @@
-{{ config(materialized='table') }}
+{{ config(materialized='view') }}
 
+-- 세션별 퍼널 도달 여부 (fct_sessions 에서 필요한 컬럼만 선택)
 SELECT
     session_unique_id,
-    
+
     -- 1. 세션 속성 정보 (Dimension)
-    -- (MAX 함수는 세션 내 하나의 값만 가져오기 위함)
-    MAX(session_source) AS session_source,
-    MAX(session_medium) AS session_medium,
-    MAX(session_campaign) AS session_campaign,
-    MAX(device_category) AS device_category,
-    MAX(is_member) AS is_member,
-    
+    session_source,
+    session_medium,
+    session_campaign,
+    device_category,
+    is_member,
+
     -- 2. 시간 정보
-    MIN(event_timestamp) AS session_start_at,
-    MIN(EXTRACT(HOUR FROM event_timestamp)) AS session_hour,
-    MIN(EXTRACT(DAYOFWEEK FROM event_timestamp)) AS session_day_of_week,
+    session_date,
+    session_start_at,
+    purchased_at,
+    session_hour,
+    session_day_of_week,
 
     -- 3. 퍼널 도달 여부 (Flags)
-    MAX(CASE WHEN event_name = 'session_start' THEN 1 ELSE 0 END) AS has_session_start,
-    MAX(CASE WHEN event_name = 'view_item' THEN 1 ELSE 0 END) AS has_view_item,
-    MAX(CASE WHEN event_name = 'add_to_cart' THEN 1 ELSE 0 END) AS has_add_to_cart,
-    MAX(CASE WHEN event_name = 'begin_checkout' THEN 1 ELSE 0 END) AS has_begin_checkout,
-    MAX(CASE WHEN event_name = 'add_payment_info' THEN 1 ELSE 0 END) AS has_add_payment_info,
-    MAX(CASE WHEN event_name = 'purchase' THEN 1 ELSE 0 END) AS has_purchase,
-    
+    has_session_start,
+    has_view_item,
+    has_search,
+    has_add_to_cart,
+    has_begin_checkout,
+    has_add_payment_info,
+    has_purchase,
+
     -- 4. 매출 정보
-    MAX(purchase_revenue) AS revenue
+    revenue,
+    item_revenue
 
-FROM {{ ref('stg_events') }}
-GROUP BY session_unique_id
\ No newline at end of file
+FROM {{ ref('fct_sessions') }}
@@ -6,17 +6,9 @@ WITH product_tiers AS (
 ),
 
 pair_stats AS (
-    -- 2. 상품 조합 + 유저 점수 + 이동 경로
-    SELECT
-        p.product_A,
-        p.product_B,
-        p.transaction_id,
-        s.engagement_score,
-        s.engagement_grade,
-        ph.path_length
-    FROM {{ ref('int_product_association') }} p
-    LEFT JOIN {{ ref('int_engage_lift_score') }} s ON p.session_unique_id = s.session_unique_id
-    LEFT JOIN {{ ref('int_session_paths') }} ph ON p.session_unique_id = ph.session_unique_id
+    -- 2. 상품 조합 (int_product_association 에서 조합 단위로 이미 집계됨)
+    SELECT *
+    FROM {{ ref('int_product_association') }}
 )
 
 SELECT
@@ -29,11 +21,11 @@ SELECT
     pr_b.price_tier AS tier_B, 
     
     -- B. 판매 성과
-    COUNT(DISTINCT ps.transaction_id) AS pair_sales_count,
+    ps.pair_transactions AS pair_sales_count,
     
     -- C. 구매자 특성
-    ROUND(AVG(ps.engagement_score), 1) AS avg_buyer_score,
-    ROUND(COUNTIF(ps.engagement_grade = 'High Intent') / COUNT(*) * 100, 1) AS high_intent_ratio,
+    ROUND(SAFE_DIVIDE(ps.buyer_score_sum, ps.scored_transactions), 1) AS avg_buyer_score,
+    ROUND(ps.high_intent_transactions / ps.pair_transactions * 100, 1) AS high_intent_ratio,
     
     -- D. 번들 전략
     CASE
@@ -50,13 +42,17 @@ SELECT
              THEN 'Volume Builder (크로스셀링)'
              
         ELSE 'General Bundle'
-    END AS bundle_strategy_type
+    END AS bundle_strategy_type,
+
+    -- E. 연관 규칙 지표
+    ROUND(ps.support * 100, 3) AS support_pct,
+    ROUND(ps.confidence_A_to_B * 100, 1) AS confidence_A_to_B,
+    ROUND(ps.confidence_B_to_A * 100, 1) AS confidence_B_to_A,
+    ROUND(ps.lift, 2) AS lift
 
 FROM pair_stats ps
 
 LEFT JOIN product_tiers pr_a ON ps.product_A = pr_a.item_name
 LEFT JOIN product_tiers pr_b ON ps.product_B = pr_b.item_name
 
-GROUP BY 1, 2, 3, 4, 5, 6, bundle_strategy_type
-HAVING pair_sales_count >= 3
 ORDER BY pair_sales_count DESC
\ No newline at end of file
@@ -0,0 +1,26 @@
+{{ config(materialized='table', cluster_by=['item_name']) }}
+
+-- 이탈 세션 x 장바구니 상품 1행 (mart_cart_abandon 집계 원본)
+-- 대시보드가 상품별 건당 손실 금액의 신뢰구간을 세션 단위 재표본으로 계산할 때도 쓴다.
+WITH abandoned_sessions AS (
+    -- 1. 이탈 세션 추출 (기존과 동일)
+    SELECT 
+        session_unique_id
+    FROM {{ ref('mart_core_sessions') }}
+    WHERE 
+        (is_missed_opportunity = TRUE) OR 
+        (REGEXP_CONTAINS(full_path, r'add_to_cart') AND is_converted = 0)
+)
+
+-- 2. 상품 정보 추출
+SELECT
+    e.session_unique_id,
+    e.item_name,
+    -- [핵심] 카테고리가 여러 개일 경우, 알파벳 순서상 첫 번째 것 하나만 가져옴 (대표 카테고리)
+    -- 또는 SPLIT(e.item_category, '/')[SAFE_OFFSET(0)] 처럼 대분류만 쓸 수도 있음
+    MIN(e.item_category) AS item_category, 
+    e.item_revenue_calc AS potential_revenue
+FROM {{ ref('stg_events') }} e
+INNER JOIN abandoned_sessions s ON e.session_unique_id = s.session_unique_id
+WHERE e.event_name = 'add_to_cart'
+GROUP BY 1, 2, 4 -- item_category는 집계함수(MIN)를 썼으므로 그룹핑에서 제외하거나 조정
@@ -1,19 +1,29 @@
 {{ config(materialized='table') }}
 
-WITH device_stats AS (
-    -- 1. 디바이스별 기초 통계 집계
+-- 세션 1행 테이블끼리만 조인 (fct_sessions 의 세션 귀속 기기 + int_engage_lift_score 등급)
+-- stg_events 와 조인하면 이벤트 x 상품 행마다 세션이 복제되어 High Intent 가 세션 수보다 커지고
+-- 이벤트 테이블 전체가 셔플된다. 여기서는 조인 입력이 세션 수에 비례한다.
+WITH sessions AS (
     SELECT
-        e.device_category,
-        COUNT(DISTINCT e.session_unique_id) AS total_sessions,
-        
-        -- High Intent 유저 수
-        COUNTIF(s.engagement_grade = 'High Intent') AS high_intent_users,
-        
-        -- High Intent 유저 중 구매자 수
-        COUNTIF(s.engagement_grade = 'High Intent' AND p.is_converted = 1) AS high_intent_converters
-    FROM {{ ref('stg_events') }} e
-    JOIN {{ ref('int_engage_lift_score') }} s ON e.session_unique_id = s.session_unique_id
-    JOIN {{ ref('int_session_paths') }} p ON e.session_unique_id = p.session_unique_id
+        f.device_category,
+        f.has_purchase,
+        s.engagement_grade
+    FROM {{ ref('fct_sessions') }} f
+    JOIN {{ ref('int_engage_lift_score') }} s ON f.session_unique_id = s.session_unique_id
+),
+
+device_stats AS (
+    -- 1. 디바이스별 기초 통계 집계 (세션 단위)
+    SELECT
+        device_category,
+        COUNT(*) AS total_sessions,
+
+        -- High Intent 세션 수
+        COUNTIF(engagement_grade = 'High Intent') AS high_intent_users,
+
+        -- High Intent 세션 중 구매 세션 수
+        COUNTIF(engagement_grade = 'High Intent' AND has_purchase = 1) AS high_intent_converters
+    FROM sessions
     GROUP BY 1
 ),
 
@@ -31,21 +41,21 @@ SELECT
     device_category,
     total_sessions,
     high_intent_users,
-    
+
     -- 진성 유저 비중 (%)
     ROUND(SAFE_DIVIDE(high_intent_users, total_sessions) * 100, 1) AS high_intent_ratio,
-    
+
     -- 전환율 (%)
     ROUND(high_intent_cvr * 100, 1) AS high_intent_cvr_percent,
-    
+
     -- [핵심] PC 대비 상대 효율 (Relative Efficiency Index)
     -- 공식: (내 CVR / 데스크탑 CVR) * 100
     ROUND(
         SAFE_DIVIDE(
-            high_intent_cvr, 
+            high_intent_cvr,
             MAX(CASE WHEN device_category = 'desktop' THEN high_intent_cvr END) OVER()
-        ) * 100, 
+        ) * 100,
     0) AS efficiency_index_vs_pc
 
 FROM cvr_calculation
-ORDER BY high_intent_cvr DESC
\ No newline at end of file
+ORDER BY high_intent_cvr DESC
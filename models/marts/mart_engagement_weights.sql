@@ -0,0 +1,21 @@
+{{ config(materialized='table') }}
+
+-- 참여 점수(int_engage_lift_score)에 실제로 곱해진 행동별 Lift / 정수 가중치 (대시보드 '점수' 컬럼)
+-- engagement_weight_grain = 'week' 이면 주별 행, build 이면 weight_week 가 NULL 인 행 하나씩
+{% set weekly = var('engagement_weight_grain') == 'week' %}
+{% set week = 'weight_week' if weekly else 'CAST(NULL AS DATE)' %}
+
+SELECT {{ week }} AS weight_week, 'view_item' AS signal, score_view AS lift, weight_view AS weight
+FROM {{ ref('int_lift_weight') }}
+UNION ALL
+SELECT {{ week }}, 'view_search_results', score_search, weight_search
+FROM {{ ref('int_lift_weight') }}
+UNION ALL
+SELECT {{ week }}, 'add_to_cart', score_cart, weight_cart
+FROM {{ ref('int_lift_weight') }}
+UNION ALL
+SELECT {{ week }}, 'begin_checkout', score_checkout, weight_checkout
+FROM {{ ref('int_lift_weight') }}
+UNION ALL
+SELECT {{ week }}, 'add_payment_info', score_payment, weight_payment
+FROM {{ ref('int_lift_weight') }}
@@ -0,0 +1,34 @@
+{{ config(
+    materialized='table',
+    partition_by={'field': 'session_date', 'data_type': 'date'},
+    cluster_by=['device_category', 'session_source']
+) }}
+
+-- 퍼널 큐브: 날짜 x 시간 x 요일 x 기기 x 유입 x 회원 단위로 단계별 세션 수를 미리 합산
+-- 모든 지표가 합산 가능(additive)하므로 어떤 차원 조합이든 SUM 으로 다시 묶으면 된다.
+-- (mart_funnel_overall / device / day / hour / source / dropoff 는 이 큐브의 롤업)
+SELECT
+    -- 1. 차원
+    session_date,
+    session_hour,
+    session_day_of_week,
+    device_category,
+    session_source,
+    session_medium,
+    session_campaign,
+    is_member,
+
+    -- 2. 단계별 도달 세션 수
+    COUNT(*) AS sessions,
+    SUM(has_session_start) AS session_started,
+    SUM(has_view_item) AS viewed,
+    SUM(has_add_to_cart) AS carted,
+    SUM(has_begin_checkout) AS checkout,
+    SUM(has_add_payment_info) AS payment,
+    SUM(has_purchase) AS purchased,
+
+    -- 3. 매출
+    SUM(IFNULL(revenue, 0)) AS revenue
+
+FROM {{ ref('int_session_funnel') }}
+GROUP BY 1, 2, 3, 4, 5, 6, 7, 8
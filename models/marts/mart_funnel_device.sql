@@ -2,13 +2,13 @@
 
 SELECT
     device_category,
-    COUNT(*) AS sessions,
-    SUM(has_view_item) AS viewed,
-    SUM(has_add_to_cart) AS carted,
-    SUM(has_purchase) AS purchased,
+    SUM(sessions) AS sessions,
+    SUM(viewed) AS viewed,
+    SUM(carted) AS carted,
+    SUM(purchased) AS purchased,
     
-    ROUND(SUM(has_purchase) / COUNT(*) * 100, 2) AS overall_cvr,
-    ROUND(SUM(has_add_to_cart) / NULLIF(SUM(has_view_item), 0) * 100, 2) AS view_to_cart
-FROM {{ ref('int_session_funnel') }}
+    ROUND(SUM(purchased) / SUM(sessions) * 100, 2) AS overall_cvr,
+    ROUND(SUM(carted) / NULLIF(SUM(viewed), 0) * 100, 2) AS view_to_cart
+FROM {{ ref('mart_funnel_cube') }}
 GROUP BY device_category
 ORDER BY sessions DESC
\ No newline at end of file
@@ -2,13 +2,13 @@
 
 WITH funnel_counts AS (
     SELECT
-        COUNT(*) AS total_sessions,
-        SUM(has_view_item) AS viewed,
-        SUM(has_add_to_cart) AS carted,
-        SUM(has_begin_checkout) AS checkout,
-        SUM(has_add_payment_info) AS payment,
-        SUM(has_purchase) AS purchased
-    FROM {{ ref('int_session_funnel') }}
+        SUM(sessions) AS total_sessions,
+        SUM(viewed) AS viewed,
+        SUM(carted) AS carted,
+        SUM(checkout) AS checkout,
+        SUM(payment) AS payment,
+        SUM(purchased) AS purchased
+    FROM {{ ref('mart_funnel_cube') }}
 )
 
 SELECT 1 AS step_order, 'Session → View Item' AS step, total_sessions AS from_count, viewed AS to_count,
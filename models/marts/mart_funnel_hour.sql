@@ -2,9 +2,9 @@
 
 SELECT
     session_hour,
-    COUNT(*) AS sessions,
-    SUM(has_purchase) AS purchased,
-    ROUND(SUM(has_purchase) / COUNT(*) * 100, 2) AS cvr
-FROM {{ ref('int_session_funnel') }}
+    SUM(sessions) AS sessions,
+    SUM(purchased) AS purchased,
+    ROUND(SUM(purchased) / SUM(sessions) * 100, 2) AS cvr
+FROM {{ ref('mart_funnel_cube') }}
 GROUP BY session_hour
 ORDER BY session_hour
\ No newline at end of file
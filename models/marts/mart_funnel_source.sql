@@ -3,11 +3,11 @@
 SELECT
     IFNULL(session_source, '(direct)') AS source,
     IFNULL(session_medium, '(none)') AS medium,
-    COUNT(*) AS sessions,
-    SUM(has_purchase) AS purchased,
-    ROUND(SUM(has_purchase) / COUNT(*) * 100, 2) AS cvr
-FROM {{ ref('int_session_funnel') }}
+    SUM(sessions) AS sessions,
+    SUM(purchased) AS purchased,
+    ROUND(SUM(purchased) / SUM(sessions) * 100, 2) AS cvr
+FROM {{ ref('mart_funnel_cube') }}
 GROUP BY 1, 2
-HAVING COUNT(*) >= 50
+HAVING SUM(sessions) >= 50
 ORDER BY sessions DESC
 LIMIT 20
\ No newline at end of file
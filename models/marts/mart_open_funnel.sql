@@ -1,6 +1,21 @@
 {{ config(materialized='table') }}
 
+-- 단계별 세션 수: distinct_count_method 가 hll 이면 int_daily_session_sketch 의 일별 스케치를 병합 (근사),
+-- exact 이면 stg_events 전체에서 COUNT(DISTINCT)
 WITH funnel_counts AS (
+    {%- if var('distinct_count_method') == 'hll' %}
+    SELECT
+        MAX(IF(metric = 'session', sessions, NULL)) AS step_1_session_start,
+        MAX(IF(metric = 'view_item', sessions, NULL)) AS step_2_view_product,
+        MAX(IF(metric = 'add_to_cart', sessions, NULL)) AS step_3_add_to_cart,
+        MAX(IF(metric = 'purchase', sessions, NULL)) AS step_4_purchase
+    FROM (
+        SELECT metric, HLL_COUNT.MERGE(sessions_sketch) AS sessions
+        FROM {{ ref('int_daily_session_sketch') }}
+        WHERE dimension = ''
+        GROUP BY metric
+    )
+    {%- else %}
     SELECT
         -- 1. 전체 세션 수
         COUNT(DISTINCT session_unique_id) AS step_1_session_start,
@@ -14,6 +29,7 @@ WITH funnel_counts AS (
         -- 4. 구매 완료 세션 수
         COUNT(DISTINCT CASE WHEN event_name = 'purchase' THEN session_unique_id END) AS step_4_purchase
     FROM {{ ref('stg_events') }}
+    {%- endif %}
 )
 
 SELECT
@@ -1,27 +1,45 @@
 {{ config(materialized='table') }}
 
+-- 프로모션을 클릭한 세션 단위로 집계 (fct_sessions.clicked_promotions, 이벤트 행을 다시 읽지 않음)
+-- 클릭 세션 수: distinct_count_method 가 hll 이면 int_daily_session_sketch 의 일별 스케치를 병합 (근사),
+-- exact 이면 세션 행 수 그대로. 평균 점수 / High Intent 수 / 전환율은 두 방식 모두 같은 세션 행에서 정확히 센다.
+{% set hll = var('distinct_count_method') == 'hll' %}
+
 WITH promo_clicks AS (
-    -- 1. 배너를 클릭한 세션 정보 가져오기
+    -- 1. 배너를 클릭한 세션 (세션 x 클릭한 프로모션 한 행)
     SELECT
-        e.promotion_name,
-        e.session_unique_id
-    FROM {{ ref('stg_events') }} e
-    WHERE e.event_name = 'select_promotion'
-      AND e.promotion_name != '(not set)'
+        promotion_name,
+        f.session_unique_id,
+        f.has_purchase
+    FROM {{ ref('fct_sessions') }} f,
+        UNNEST(f.clicked_promotions) AS promotion_name
+),
+{%- if hll %}
+
+click_sketches AS (
+    SELECT
+        dimension AS promotion_name,
+        HLL_COUNT.MERGE(sessions_sketch) AS click_sessions
+    FROM {{ ref('int_daily_session_sketch') }}
+    WHERE metric = 'select_promotion'
+    GROUP BY 1
 ),
+{%- endif %}
 
 promo_quality AS (
-    -- 2. 클릭한 유저들의 점수와 구매 여부 결합
+    -- 2. 클릭한 세션의 점수와 구매 여부 결합 (세션 단위 조인)
     SELECT
         p.promotion_name,
-        COUNT(DISTINCT p.session_unique_id) AS click_sessions,
-        ROUND(AVG(s.engagement_score), 1) AS avg_session_score, -- 클릭한 사람들의 평균 점수
+        {{ 'MAX(c.click_sessions)' if hll else 'COUNT(*)' }} AS click_sessions,
+        ROUND(AVG(s.engagement_score), 1) AS avg_session_score, -- 클릭한 세션들의 평균 점수
         COUNTIF(s.engagement_grade = 'High Intent') AS high_intent_session_count,
-        -- 배너 클릭 후 구매 전환율 (Conversion)
-        ROUND(COUNTIF(path.is_converted = 1) / COUNT(DISTINCT p.session_unique_id) * 100, 2) AS promo_cvr
+        -- 배너 클릭 후 구매 전환율 (구매 세션 / 클릭 세션)
+        ROUND(COUNTIF(p.has_purchase = 1) / COUNT(*) * 100, 2) AS promo_cvr
     FROM promo_clicks p
     LEFT JOIN {{ ref('int_engage_lift_score') }} s ON p.session_unique_id = s.session_unique_id
-    LEFT JOIN {{ ref('int_session_paths') }} path ON p.session_unique_id = path.session_unique_id
+    {%- if hll %}
+    LEFT JOIN click_sketches c ON p.promotion_name = c.promotion_name
+    {%- endif %}
     GROUP BY 1
 )
 
@@ -0,0 +1,39 @@
+{{ config(
+    materialized='table',
+    partition_by={'field': 'session_date', 'data_type': 'date'},
+    cluster_by=['device_category', 'session_source']
+) }}
+
+-- 세션 단위 교차 필터(cross-filter) / 세그먼트 자동 탐색용 마트
+-- 대시보드가 세션별 범주 인덱스를 만들어 클릭한 값으로 다른 차트를 바로 다시 집계한다.
+-- 세션 ID 는 쓰지 않으므로 빼고, 차원의 NULL 은 마트와 같은 기본값으로 채운다.
+-- 구매 금액 / 소요 시간은 KPI 신뢰구간(세션 단위 재표본) 계산용 (구매 세션만 값, 나머지는 NULL).
+SELECT
+    -- 1. 차원
+    f.session_date,
+    f.session_hour,
+    f.session_day_of_week,
+    IFNULL(f.device_category, '(not set)') AS device_category,
+    IFNULL(f.session_source, '(direct)') AS session_source,
+    IFNULL(f.session_medium, '(none)') AS session_medium,
+    f.is_member,
+    IFNULL(b.browsing_style, 'No View') AS browsing_style,
+    s.engagement_grade,
+
+    -- 2. 퍼널 도달 여부
+    f.has_view_item,
+    f.has_search,
+    f.has_add_to_cart,
+    f.has_begin_checkout,
+    f.has_add_payment_info,
+    f.has_purchase,
+
+    -- 3. 구매 세션 (mart_time_to_conversion 과 같은 기준)
+    CASE WHEN f.has_purchase = 1 THEN f.item_revenue END AS purchase_revenue,
+    CASE WHEN f.has_purchase = 1 THEN TIMESTAMP_DIFF(f.purchased_at, f.session_start_at, MINUTE) END AS minutes_to_buy
+
+FROM {{ ref('int_session_funnel') }} f
+LEFT JOIN {{ ref('int_browsing_style') }} b
+    ON f.session_unique_id = b.session_unique_id
+LEFT JOIN {{ ref('int_engage_lift_score') }} s
+    ON f.session_unique_id = s.session_unique_id
@@ -1,14 +1,15 @@
 {{ config(materialized='table') }}
 
+-- 고정 구간 요약. 임의 분위수 / 구간 / 기간 합산은 ga4_engine.quantile_sketch 의 mart_conversion_sketch 를 쓴다.
+
 WITH purchase_sessions AS (
     SELECT
         session_unique_id,
-        MIN(event_timestamp) AS session_start_at,
-        MAX(CASE WHEN event_name = 'purchase' THEN event_timestamp END) AS purchased_at,
-        SUM(item_revenue_calc) AS total_revenue
-    FROM {{ ref('stg_events') }}
-    GROUP BY 1
-    HAVING MAX(CASE WHEN event_name = 'purchase' THEN 1 ELSE 0 END) = 1 -- 구매 세션만
+        session_start_at,
+        purchased_at,
+        item_revenue AS total_revenue
+    FROM {{ ref('fct_sessions') }}
+    WHERE has_purchase = 1 -- 구매 세션만
 )
 
 SELECT
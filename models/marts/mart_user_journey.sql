@@ -0,0 +1,82 @@
+{{ config(
+    materialized='incremental',
+    incremental_strategy='merge',
+    unique_key='master_id',
+    partition_by={'field': 'first_session_date', 'data_type': 'date'},
+    cluster_by=['master_id']
+) }}
+
+-- 사용자(master_id) 단위 여정 테이블
+-- fct_sessions 의 세션들을 사용자별로 이어서 세션 수, 세션 간 간격, 첫/마지막 유입 경로,
+-- 첫 구매까지 걸린 세션 수·일수를 한 행으로 정리한다.
+-- 증분 실행에서는 재처리 구간(lookback)에 세션이 있는 사용자만 골라 그 사용자의 전체 세션 이력으로
+-- 다시 집계하고 master_id 로 merge 한다. (나머지 사용자 행은 건드리지 않음)
+
+WITH sessions AS (
+    SELECT
+        master_id,
+        session_unique_id,
+        is_member,
+        session_date,
+        session_start_at,
+        session_end_at,
+        IFNULL(session_source, '(direct)') AS session_source,
+        has_purchase,
+        purchased_at,
+        item_revenue
+    FROM {{ ref('fct_sessions') }}
+    {% if is_incremental() %}
+    WHERE master_id IN (
+        SELECT master_id
+        FROM {{ ref('fct_sessions') }}
+        WHERE session_date >= {{ incremental_window_start('last_session_date') }}
+    )
+    {% endif %}
+),
+
+ordered AS (
+    SELECT
+        *,
+        ROW_NUMBER() OVER (PARTITION BY master_id ORDER BY session_start_at, session_unique_id) AS session_number,
+        LAG(session_end_at) OVER (PARTITION BY master_id ORDER BY session_start_at, session_unique_id) AS prev_session_end_at,
+        FIRST_VALUE(session_source) OVER (
+            PARTITION BY master_id ORDER BY session_start_at, session_unique_id
+            ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+        ) AS first_touch_source,
+        LAST_VALUE(session_source) OVER (
+            PARTITION BY master_id ORDER BY session_start_at, session_unique_id
+            ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+        ) AS last_touch_source,
+        MIN(CASE WHEN has_purchase = 1 THEN purchased_at END) OVER (PARTITION BY master_id) AS first_purchase_at
+    FROM sessions
+)
+
+SELECT
+    master_id,
+    MAX(is_member) AS is_member,
+
+    -- 1. 방문 이력
+    COUNT(*) AS sessions,
+    MIN(session_date) AS first_session_date,
+    MAX(session_date) AS last_session_date,
+    MIN(session_start_at) AS first_session_at,
+    MAX(session_start_at) AS last_session_at,
+
+    -- 2. 세션 간 간격 (이전 세션 종료 ~ 다음 세션 시작, 분 단위 / 세션이 1개면 NULL)
+    ROUND(AVG(TIMESTAMP_DIFF(session_start_at, prev_session_end_at, MINUTE)), 1) AS avg_gap_minutes,
+    MAX(TIMESTAMP_DIFF(session_start_at, prev_session_end_at, MINUTE)) AS max_gap_minutes,
+
+    -- 3. 유입 경로 (첫 세션 / 마지막 세션 / 첫 구매 세션)
+    MAX(first_touch_source) AS first_touch_source,
+    MAX(last_touch_source) AS last_touch_source,
+    MAX(CASE WHEN purchased_at = first_purchase_at THEN session_source END) AS purchase_touch_source,
+
+    -- 4. 구매 여정 (구매 이력이 없으면 NULL)
+    SUM(has_purchase) AS purchase_sessions,
+    MAX(first_purchase_at) AS first_purchase_at,
+    MAX(CASE WHEN purchased_at = first_purchase_at THEN session_number END) AS sessions_to_purchase,
+    ROUND(TIMESTAMP_DIFF(MAX(first_purchase_at), MIN(session_start_at), MINUTE) / 1440, 2) AS days_to_purchase,
+    SUM(CASE WHEN has_purchase = 1 THEN item_revenue ELSE 0 END) AS total_revenue
+
+FROM ordered
+GROUP BY master_id
@@ -1,10 +1,49 @@
 {{ config(
-    materialized='table' 
+    materialized='incremental',
+    incremental_strategy='insert_overwrite',
+    partition_by={'field': 'event_date', 'data_type': 'date'},
+    cluster_by=['session_unique_id']
 ) }}
 
+-- event_params 에서 꺼낼 키 (key, 타입, 컬럼명) → 배열을 한 번만 펼쳐 피벗
+{% set event_params = [
+    ('source', 'string', 'session_source'),
+    ('medium', 'string', 'session_medium'),
+    ('campaign', 'string', 'session_campaign'),
+    ('ga_session_id', 'int', 'session_id'),
+    ('session_engaged', 'int', 'is_engaged'),
+    ('engagement_time_msec', 'int', 'engagement_time_msec'),
+    ('page_title', 'string', 'page_title'),
+    ('page_location', 'string', 'page_url')
+] %}
+
+WITH events AS (
+  SELECT
+    event_date,
+    event_timestamp,
+    event_name,
+    user_pseudo_id,
+    user_id,
+    ecommerce,
+    items,
+    device,
+    geo,
+    {{ extract_event_params(event_params) }} AS params
+  FROM
+    -- sources.yml에서 정의한 이름을 불러옵니다 (매우 중요!)
+    {{ source('ga4', 'events') }}
+  WHERE
+    -- 분석 기간 (기본: 2020년 12월, dbt_project.yml vars)
+    _TABLE_SUFFIX BETWEEN '{{ var("ga4_start_date") }}' AND '{{ var("ga4_end_date") }}'
+    {% if is_incremental() %}
+    -- 증분 실행: 마지막 적재 파티션 - lookback 일부터만 스캔 (해당 파티션은 insert_overwrite 로 교체)
+    AND _TABLE_SUFFIX >= FORMAT_DATE('%Y%m%d', DATE_SUB(_dbt_max_partition, INTERVAL {{ var('incremental_lookback_days') }} DAY))
+    {% endif %}
+)
+
 SELECT
-  -- 1. 시간 정보
-  event_date,
+  -- 1. 시간 정보 (파티션 컬럼이므로 DATE 로 변환)
+  PARSE_DATE('%Y%m%d', event_date) AS event_date,
   TIMESTAMP_MICROS(event_timestamp) AS event_timestamp,
 
   -- 2. 사용자 식별
@@ -14,19 +53,19 @@ SELECT
   IF(user_id IS NOT NULL, 1, 0) AS is_member,
 
   -- 3. 트래픽 소스 (세션 기준)
-  (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'source') AS session_source,
-  (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'medium') AS session_medium,
-  (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'campaign') AS session_campaign,
+  params.session_source,
+  params.session_medium,
+  params.session_campaign,
 
   -- 4. 세션 및 참여 정보
-  CONCAT(user_pseudo_id, '-', (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id')) AS session_unique_id,
-  (SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'ga_session_id') AS session_id,
-  COALESCE((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'session_engaged'), 0) AS is_engaged,
-  COALESCE((SELECT value.int_value FROM UNNEST(event_params) WHERE key = 'engagement_time_msec'), 0) AS engagement_time_msec,
+  CONCAT(user_pseudo_id, '-', params.session_id) AS session_unique_id,
+  params.session_id,
+  COALESCE(params.is_engaged, 0) AS is_engaged,
+  COALESCE(params.engagement_time_msec, 0) AS engagement_time_msec,
 
   -- 5. 페이지 및 프로모션 정보
-  (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'page_title') AS page_title,
-  (SELECT value.string_value FROM UNNEST(event_params) WHERE key = 'page_location') AS page_url,
+  params.page_title,
+  params.page_url,
   
   -- [핵심] 프로모션 배너 이름 (items 안에 숨어있음)
   COALESCE(item.promotion_name, '(not set)') AS promotion_name,
@@ -58,9 +97,5 @@ SELECT
   device.category AS device_category,  -- mobile, desktop, tablet
   geo.country
 FROM
-  -- sources.yml에서 정의한 이름을 불러옵니다 (매우 중요!)
-  {{ source('ga4', 'events') }}
+  events
   LEFT JOIN UNNEST(items) AS item
-WHERE
-  -- 2020년 12월 데이터만 추출
-  _TABLE_SUFFIX BETWEEN '20201201' AND '20201231'
\ No newline at end of file
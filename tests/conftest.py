@@ -0,0 +1,20 @@
+# ga4_engine 을 설치 없이 import (저장소 루트를 경로에 추가)
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ga4_engine.synthetic import SyntheticConfig, SyntheticGA4  # noqa: E402
+
+# dbt 모델 테스트용 작은 합성 export (3일, 자정을 넘긴 세션의 이월 샤드 포함)
+SYNTHETIC = SyntheticConfig(sessions=3000, days=3, catalog_size=60, categories=6, promo_click_rate=0.3, chunk_sessions=1000)
+
+
+@pytest.fixture(scope="session")
+def events_dir(tmp_path_factory):
+    """SYNTHETIC 설정의 events_YYYYMMDD-<part>.parquet 샤드 디렉터리"""
+    out = tmp_path_factory.mktemp("events")
+    SyntheticGA4(SYNTHETIC).write(str(out))
+    return out
@@ -0,0 +1,79 @@
+"""ga4_engine.basket_miner: FP-Growth 결과 vs 모든 조합을 직접 센 결과"""
+import collections
+import itertools
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from ga4_engine.basket_miner import BasketMiner, association_rules
+
+MIN_SUPPORT, MAX_LEN = 4, 4
+
+
+@pytest.fixture(scope="module")
+def baskets(tmp_path_factory):
+    """상품 30개, 거래 600개. 중복 라인 / 구매 외 이벤트 / NULL 상품을 섞어 둔 Parquet 두 조각"""
+    rng = np.random.default_rng(11)
+    popularity = rng.dirichlet(np.full(30, 0.4))
+    rows = []
+    for t in range(600):
+        size = rng.integers(1, 7)
+        items = rng.choice(30, size=size, replace=False, p=popularity)
+        for item in items:
+            rows.append(("purchase", f"T{t}", f"item{item:02d}"))
+        rows.append(("purchase", f"T{t}", f"item{items[0]:02d}"))
+        rows.append(("add_to_cart", f"T{t}", "item99"))
+        rows.append(("purchase", f"T{t}", None))
+    frame = pd.DataFrame(rows, columns=["event_name", "transaction_id", "item_name"])
+    directory = tmp_path_factory.mktemp("baskets")
+    half = len(frame) // 2
+    for i, part in enumerate((frame.iloc[:half], frame.iloc[half:])):
+        pq.write_table(pa.Table.from_pandas(part, preserve_index=False), directory / f"part-{i}.parquet")
+    purchases = frame[(frame["event_name"] == "purchase") & frame["item_name"].notna()]
+    return str(directory / "*.parquet"), purchases.groupby("transaction_id")["item_name"].agg(lambda s: sorted(set(s)))
+
+
+def brute_force(transactions, min_count, max_len):
+    counts = collections.Counter()
+    for items in transactions:
+        for size in range(1, min(max_len, len(items)) + 1):
+            counts.update(itertools.combinations(items, size))
+    return {frozenset(itemset): n for itemset, n in counts.items() if n >= min_count}
+
+
+@pytest.mark.parametrize("workers, memory_budget", [(1, 512 << 20), (2, 4 << 10)])
+def test_itemsets_match_brute_force(baskets, workers, memory_budget):
+    # 작은 memory_budget 은 스필 파티션 / 그룹 샤드를 여러 개로 나누는 경로
+    paths, transactions = baskets
+    itemsets, info = BasketMiner(MIN_SUPPORT, MAX_LEN, memory_budget=memory_budget, workers=workers).mine(paths)
+    assert info["n_transactions"] == len(transactions)
+    got = {frozenset(itemset): n for itemset, n in zip(itemsets["itemset"], itemsets["transactions"])}
+    assert got == brute_force(transactions, MIN_SUPPORT, MAX_LEN)
+
+
+def test_relative_min_support(baskets):
+    paths, transactions = baskets
+    itemsets, info = BasketMiner(0.02, 2, workers=1).mine(paths)
+    assert info["min_count"] == int(np.ceil(0.02 * len(transactions)))
+    assert itemsets["transactions"].min() >= info["min_count"]
+
+
+def test_association_rules(baskets):
+    paths, transactions = baskets
+    itemsets, info = BasketMiner(MIN_SUPPORT, 3, workers=1).mine(paths)
+    rules = association_rules(itemsets, info["n_transactions"], min_confidence=0.3, min_lift=1.0)
+    assert len(rules)
+    sets = [set(items) for items in transactions]
+    n = len(sets)
+    for row in rules.itertuples():
+        antecedent = set(row.antecedent)
+        both = sum(antecedent | {row.consequent} <= s for s in sets)
+        having = sum(antecedent <= s for s in sets)
+        consequent = sum(row.consequent in s for s in sets)
+        assert (row.rule_transactions, row.antecedent_transactions, row.consequent_transactions) == (both, having, consequent)
+        assert row.confidence == pytest.approx(both / having)
+        assert row.lift == pytest.approx(both / having * n / consequent)
+        assert row.confidence >= 0.3 and row.lift >= 1.0
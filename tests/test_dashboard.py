@@ -0,0 +1,117 @@
+"""ga4_analysis_dashboard: 합성 마트로 페이지를 실제로 실행 (streamlit AppTest)"""
+import datetime
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from ga4_engine.funnel_cube import DIMENSIONS, FunnelCube
+
+DASHBOARD = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ga4_analysis_dashboard.py")
+OVERVIEW = "📊 데이터 개요"
+
+
+def funnel_cube(n=400, seed=10):
+    rng = np.random.default_rng(seed)
+    sessions = rng.integers(1, 50, n)
+    purchased = rng.binomial(sessions, 0.05)
+    return pd.DataFrame({
+        "session_date": [datetime.date(2020, 12, 1) + datetime.timedelta(days=int(d)) for d in rng.integers(0, 7, n)],
+        "session_hour": rng.integers(0, 24, n),
+        "session_day_of_week": rng.integers(1, 8, n),
+        "device_category": rng.choice(["desktop", "mobile", "tablet"], n),
+        "session_source": rng.choice(["google", "(direct)", None], n),
+        "session_medium": rng.choice(["organic", "cpc"], n),
+        "session_campaign": rng.choice(["(none)", "sale"], n),
+        "is_member": rng.integers(0, 2, n),
+        "sessions": sessions,
+        "session_started": sessions,
+        "viewed": purchased * 3,
+        "carted": purchased * 2,
+        "checkout": purchased,
+        "payment": purchased,
+        "purchased": purchased,
+        "revenue": purchased * 50.0,
+    })
+
+
+@pytest.fixture
+def dashboard(tmp_path, monkeypatch):
+    """마트 {이름: DataFrame} 만 있는 mart_tables 에서 page 를 실행한 AppTest"""
+    def run(marts, page):
+        (tmp_path / "mart_tables").mkdir()
+        for name, frame in marts.items():
+            pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), tmp_path / "mart_tables" / f"{name}.parquet")
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.delenv("GA4_MART_SOURCE", raising=False)
+        # load_data 는 cache_resource 라 이전 테스트의 마트 저장소가 남아 있음
+        st.cache_resource.clear()
+        at = AppTest.from_file(DASHBOARD, default_timeout=60).run()
+        at.sidebar.radio[0].set_value(page).run()
+        assert not at.exception, [e.value for e in at.exception]
+        return at
+    return run
+
+
+@pytest.fixture
+def app(dashboard):
+    return dashboard({"mart_funnel_cube": funnel_cube()}, OVERVIEW)
+
+
+def group_by_widget(at):
+    return next(widget for widget in at.multiselect if widget.label == "그룹 기준")
+
+
+def test_slicer_rolls_up_every_offered_dimension(app):
+    widget = group_by_widget(app)
+    cube_dims = FunnelCube(funnel_cube()).dimensions
+    # 큐브에 없는 차원(브라우징 스타일 / 참여 등급)은 고를 수 없어야 함
+    assert len(widget.options) == len(cube_dims) == len(DIMENSIONS)
+    assert "브라우징 스타일" not in widget.options and "참여 등급" not in widget.options
+
+    for dim in cube_dims:
+        group_by_widget(app).set_value([dim]).run()
+        assert not app.exception, (dim, [e.value for e in app.exception])
+    group_by_widget(app).set_value(cube_dims).run()
+    assert not app.exception
+    table = app.dataframe[-1].value
+    assert table["sessions"].sum() == funnel_cube()["sessions"].sum()
+
+
+def session_funnel(n=3000, seed=11):
+    rng = np.random.default_rng(seed)
+    device = rng.choice(["desktop", "mobile", "tablet"], n)
+    grade = rng.choice(["High Intent", "Medium Intent", "Low Intent"], n, p=[0.2, 0.3, 0.5])
+    # High Intent 세션은 전환율이 높도록
+    purchase = (rng.random(n) < np.where(grade == "High Intent", 0.3, 0.03)).astype(np.int8)
+    return pd.DataFrame({
+        "session_date": [datetime.date(2020, 12, 1)] * n,
+        "session_hour": rng.integers(0, 24, n).astype(np.int8),
+        "session_day_of_week": rng.integers(1, 8, n).astype(np.int8),
+        "device_category": device,
+        "session_source": rng.choice(["google", "(direct)", None], n),
+        "session_medium": rng.choice(["organic", "cpc"], n),
+        "is_member": rng.integers(0, 2, n).astype(np.int8),
+        "browsing_style": rng.choice(["Deep Specialist", "Variety Seeker"], n),
+        "engagement_grade": grade,
+        "has_view_item": np.maximum(purchase, rng.random(n) < 0.5).astype(np.int8),
+        "has_search": (rng.random(n) < 0.1).astype(np.int8),
+        "has_add_to_cart": np.maximum(purchase, rng.random(n) < 0.1).astype(np.int8),
+        "has_begin_checkout": purchase,
+        "has_add_payment_info": purchase,
+        "has_purchase": purchase,
+        "purchase_revenue": np.where(purchase == 1, 80.0, np.nan),
+        "minutes_to_buy": pd.Series(rng.integers(0, 90, n), dtype="Int64").where(purchase == 1),
+    })
+
+
+def test_segment_scan_uses_its_own_labels(dashboard):
+    at = dashboard({"mart_session_funnel": session_funnel()}, "🔍 세그먼트 분석")
+    segments = next(frame.value for frame in at.dataframe if "q (BH)" in frame.value.columns)["세그먼트"]
+    assert segments.str.contains("참여 등급=High Intent").any()
+    assert not segments.str.contains("engagement_grade").any()
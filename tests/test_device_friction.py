@@ -0,0 +1,52 @@
+"""mart_device_friction: 세션 단위 집계 vs stg_events 에서 세션별로 직접 센 값 (이벤트 행 복제 없음, DuckDB 로컬 실행)"""
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ga4_engine.duckdb_runner import DuckDBRunner
+
+
+@pytest.fixture(scope="module")
+def runner(events_dir):
+    runner = DuckDBRunner(str(events_dir / "events_*.parquet"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        runner.run()
+    return runner
+
+
+def expected_friction(events, grades):
+    """이벤트 행 → 세션 1행 (기기 / 구매 여부) → 등급 붙여 기기별 집계"""
+    sessions = events.groupby("session_unique_id").agg(
+        device_category=("device_category", "max"),
+        has_purchase=("event_name", lambda names: (names == "purchase").any()),
+    ).join(grades, how="inner")
+    high = sessions["engagement_grade"] == "High Intent"
+    stats = pd.DataFrame({
+        "total_sessions": sessions.groupby("device_category").size(),
+        "high_intent_users": high.groupby(sessions["device_category"]).sum(),
+        "high_intent_converters": (high & sessions["has_purchase"]).groupby(sessions["device_category"]).sum(),
+    })
+    stats = stats[stats["high_intent_users"] > 0]
+    cvr = stats["high_intent_converters"] / stats["high_intent_users"]
+    stats["high_intent_ratio"] = (stats["high_intent_users"] / stats["total_sessions"] * 100).round(1)
+    stats["high_intent_cvr_percent"] = (cvr * 100).round(1)
+    stats["efficiency_index_vs_pc"] = (cvr / cvr.get("desktop", np.nan) * 100).round(0)
+    return stats.drop(columns="high_intent_converters")
+
+
+def test_friction_matches_session_counts(runner):
+    grades = runner.table("int_engage_lift_score").set_index("session_unique_id")["engagement_grade"]
+    expected = expected_friction(runner.table("stg_events"), grades)
+    mart = runner.table("mart_device_friction").set_index("device_category").loc[expected.index]
+    pd.testing.assert_frame_equal(mart[expected.columns], expected, check_dtype=False, check_names=False)
+    # 이벤트 행 복제가 없으면 High Intent 는 세션 수를 넘지 않고, 기기별 세션 합 = 전체 세션
+    assert (mart["high_intent_users"] <= mart["total_sessions"]).all()
+    assert mart["total_sessions"].sum() == len(grades)
+    assert mart["high_intent_users"].sum() == (grades == "High Intent").sum()
+
+
+def test_friction_reads_session_grain_only(runner):
+    assert runner.models["mart_device_friction"].refs == {"fct_sessions", "int_engage_lift_score"}
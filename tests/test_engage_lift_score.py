@@ -0,0 +1,88 @@
+"""int_engage_lift_score: approx 등급 경계 vs exact PERCENT_RANK 등급 (DuckDB 로컬 실행)"""
+import contextlib
+import datetime
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ga4_engine.duckdb_runner import DuckDBRunner, ModelError
+
+GRADES = ["High Intent", "Medium Intent", "Low Intent"]
+WEIGHTS = ["weight_view", "weight_search", "weight_cart", "weight_checkout", "weight_payment"]
+
+
+def build(events_dir, **vars):
+    runner = DuckDBRunner(str(events_dir / "events_*.parquet"), vars=vars)
+    with contextlib.redirect_stdout(io.StringIO()):
+        runner.run()
+    return runner.table("int_engage_lift_score").set_index("session_unique_id")
+
+
+def misgraded_within_bound(approx, exact, rank_error):
+    """경계마다 등급이 다른 세션 수 <= ε x n + 그 세션들 점수의 최대 동점 세션 수"""
+    joined = approx.join(exact[["engagement_grade"]], rsuffix="_exact")
+    assert len(joined) == len(exact)
+    ties = joined["engagement_score"].value_counts()
+    rank = {grade: i for i, grade in enumerate(GRADES)}
+    for boundary in (1, 2):
+        # boundary 위 / 아래 등급이 서로 다르게 매겨진 세션
+        above = joined["engagement_grade"].map(rank) < boundary
+        above_exact = joined["engagement_grade_exact"].map(rank) < boundary
+        wrong = joined[above != above_exact]
+        tie = ties[wrong["engagement_score"].unique()].max() if len(wrong) else 0
+        assert len(wrong) <= rank_error * len(joined) + tie, (boundary, len(wrong), tie)
+    # 인접 등급끼리만 엇갈림
+    gap = (joined["engagement_grade"].map(rank) - joined["engagement_grade_exact"].map(rank)).abs()
+    assert gap.max() <= 1
+
+
+@pytest.mark.parametrize("rank_error", [0.001, 0.05])
+def test_approx_grades_match_exact(events_dir, rank_error):
+    exact = build(events_dir, engagement_grade_method="exact")
+    approx = build(events_dir, engagement_grade_method="approx", engagement_grade_rank_error=rank_error)
+    pd.testing.assert_series_equal(approx["engagement_score"].sort_index(), exact["engagement_score"].sort_index())
+    misgraded_within_bound(approx, exact, rank_error)
+
+
+def scored_runner(rank_error, method="approx", n=50_000):
+    """점수가 모두 다른 세션 n 개 (fct_sessions / int_lift_weight 를 직접 채움, 동점 없음)"""
+    runner = DuckDBRunner("unused/events_*.parquet", vars={
+        "engagement_grade_method": method, "engagement_grade_rank_error": rank_error,
+    })
+    sessions = pd.DataFrame({
+        "session_unique_id": np.arange(n).astype(str),
+        "user_pseudo_id": "u",
+        "session_date": datetime.date(2020, 12, 1),
+        "view_item_events": 0,
+        "search_events": 0,
+        "add_to_cart_events": 0,
+        "begin_checkout_events": 0,
+        "add_payment_info_events": 0,
+        "path_length": np.random.default_rng(18).permutation(n) * 7,
+    })
+    weights = pd.DataFrame({name: [1] for name in WEIGHTS})
+    runner.con.execute("CREATE TABLE fct_sessions AS SELECT * FROM sessions")
+    runner.con.execute("CREATE TABLE int_lift_weight AS SELECT * FROM weights")
+    return runner
+
+
+def grade(runner):
+    runner.materialize(runner.models["int_engage_lift_score"])
+    return runner.table("int_engage_lift_score").set_index("session_unique_id")
+
+
+def test_rank_check_without_ties():
+    exact = grade(scored_runner(0.01, method="exact"))
+    approx = grade(scored_runner(0.01))
+    misgraded_within_bound(approx, exact, 0.01)
+    # 분위수 스케치가 못 맞추는 한도면 등급을 쓰지 않고 실패
+    with pytest.raises(ModelError, match="근사 경계"):
+        grade(scored_runner(1e-6))
+
+
+@pytest.mark.parametrize("rank_error", [0, -0.1, 1])
+def test_rank_error_must_be_a_fraction(rank_error):
+    with pytest.raises(ModelError, match="engagement_grade_rank_error"):
+        DuckDBRunner("unused/events_*.parquet", vars={"engagement_grade_rank_error": rank_error})
@@ -0,0 +1,85 @@
+"""fct_sessions: 세션 단위 팩트 vs stg_events 를 pandas 로 세션별 집계한 값, 파생 모델은 stg_events 를 다시 읽지 않음"""
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ga4_engine.duckdb_runner import DuckDBRunner
+
+# fct_sessions 에서 잘라 쓰는 모델 (각자 stg_events 를 세션별로 다시 집계하던 모델)
+DERIVED = ["int_session_funnel", "int_session_paths", "int_engage_lift_score", "int_lift_weight",
+           "int_browsing_style", "mart_time_to_conversion"]
+FLAGS = {
+    "has_session_start": "session_start", "has_view_item": "view_item", "has_search": "view_search_results",
+    "has_add_to_cart": "add_to_cart", "has_begin_checkout": "begin_checkout",
+    "has_add_payment_info": "add_payment_info", "has_purchase": "purchase",
+}
+COUNTS = {
+    "view_item_events": "view_item", "search_events": "view_search_results", "add_to_cart_events": "add_to_cart",
+    "begin_checkout_events": "begin_checkout", "add_payment_info_events": "add_payment_info",
+}
+
+
+@pytest.fixture(scope="module")
+def runner(events_dir):
+    runner = DuckDBRunner(str(events_dir / "events_*.parquet"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        runner.run()
+    return runner
+
+
+def expected_sessions(events):
+    events = events.sort_values(["session_unique_id", "event_timestamp"], kind="stable")
+    grouped = events.groupby("session_unique_id")
+    name = events["event_name"]
+    viewed = events.assign(category=events["item_category"].where(name == "view_item"),
+                           item=events["item_name"].where(name == "view_item"))
+    frame = pd.DataFrame({
+        "user_pseudo_id": grouped["user_pseudo_id"].max(),
+        "master_id": grouped["master_id"].max(),
+        "is_member": grouped["is_member"].max(),
+        "session_source": grouped["session_source"].max(),
+        "device_category": grouped["device_category"].max(),
+        "session_date": grouped["event_date"].min(),
+        "session_start_at": grouped["event_timestamp"].min(),
+        "session_end_at": grouped["event_timestamp"].max(),
+        "purchased_at": events["event_timestamp"].where(name == "purchase").groupby(events["session_unique_id"]).max(),
+        "session_hour": events["event_timestamp"].dt.hour.groupby(events["session_unique_id"]).min(),
+        "revenue": grouped["purchase_revenue"].max(),
+        "item_revenue": grouped["item_revenue_calc"].sum(),
+        "full_path": grouped["event_name"].agg(" > ".join),
+        "path_length": grouped.size(),
+        "distinct_categories_viewed": viewed.groupby("session_unique_id")["category"].nunique(),
+        "total_items_viewed": viewed.groupby("session_unique_id")["item"].count(),
+    })
+    for column, event in FLAGS.items():
+        frame[column] = (name == event).groupby(events["session_unique_id"]).max().astype(int)
+    for column, event in COUNTS.items():
+        frame[column] = (name == event).groupby(events["session_unique_id"]).sum()
+    return frame
+
+
+def test_sessions_match_stg_events(runner):
+    expected = expected_sessions(runner.table("stg_events"))
+    got = runner.table("fct_sessions").set_index("session_unique_id").loc[expected.index]
+    assert len(got) == len(expected) == runner.con.execute(
+        "SELECT COUNT(DISTINCT session_unique_id) FROM stg_events").fetchone()[0]
+    for column in expected.columns:
+        left, right = got[column], expected[column]
+        if pd.api.types.is_float_dtype(right):
+            np.testing.assert_allclose(left.astype(float), right, rtol=1e-9, err_msg=column)
+        else:
+            pd.testing.assert_series_equal(left, right, check_dtype=False, check_names=False, obj=column)
+
+
+def test_derived_models_read_fct_sessions(runner):
+    for name in DERIVED:
+        assert "stg_events" not in runner.models[name].refs, name
+    # 세션 단위 파생 모델은 fct_sessions 와 세션 수가 같음 (browsing_style 은 상품을 본 세션만)
+    sessions = len(runner.table("fct_sessions"))
+    for name in ["int_session_funnel", "int_session_paths", "int_engage_lift_score"]:
+        assert len(runner.table(name)) == sessions, name
+    viewed = runner.con.execute("SELECT COUNT(*) FROM fct_sessions WHERE total_items_viewed > 0").fetchone()[0]
+    assert len(runner.table("int_browsing_style")) == viewed
@@ -0,0 +1,154 @@
+"""ga4_engine.markov_attribution: Sherman-Morrison 제거 효과 vs 상태마다 다시 푼 흡수 확률, 경로 → 전이 건수"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from ga4_engine import markov_attribution
+from ga4_engine.markov_attribution import MarkovAttribution, channel_paths, event_paths, fit
+from ga4_engine.sessionizer import EVENTS
+
+LABELS = ["a", "b", "c", "d", "e"]
+
+
+def random_paths(rng, n_paths, n_states=len(LABELS)):
+    paths = [rng.integers(0, n_states, int(rng.integers(0, 8))).tolist() for _ in range(n_paths)]
+    # 상태마다 전환율이 다르도록
+    weight = np.linspace(0.05, 0.4, n_states)
+    converted = [bool(path) and rng.random() < weight[path].max() for path in paths]
+    return paths, converted
+
+
+def to_csr(paths):
+    offsets = np.zeros(len(paths) + 1, dtype=np.int64)
+    np.cumsum([len(path) for path in paths], out=offsets[1:])
+    states = np.array([state for path in paths for state in path], dtype=np.int64)
+    return offsets, states
+
+
+def conversion_probability(P, n, removed=None):
+    """밀집 행렬로 (I - Q) x = r 을 직접 풂, removed 상태로 가는 전이는 버림"""
+    Q = P[:n + 1, :n + 1].copy()
+    if removed is not None:
+        Q[:, removed] = 0
+    x = np.linalg.solve(np.eye(n + 1) - Q, P[:n + 1, n + 1])
+    return x[n]
+
+
+@pytest.fixture(scope="module")
+def chain():
+    paths, converted = random_paths(np.random.default_rng(22), 2000)
+    return fit(*to_csr(paths), converted, LABELS)
+
+
+def test_counts_match_paths():
+    paths, converted = random_paths(np.random.default_rng(1), 300)
+    for collapse in (True, False):
+        got = fit(*to_csr(paths), converted, LABELS, collapse_repeats=collapse).counts.toarray()
+        expected = np.zeros_like(got)
+        n = len(LABELS)
+        for path, done in zip(paths, converted):
+            if collapse:
+                path = [s for i, s in enumerate(path) if i == 0 or s != path[i - 1]]
+            chain = [n, *path, n + 1 if done else n + 2]
+            for source, target in zip(chain[:-1], chain[1:]):
+                expected[source, target] += 1
+        np.testing.assert_array_equal(got, expected)
+
+
+def test_removal_effect_matches_direct_resolve(chain):
+    n = chain.n_states
+    P = chain.transition_matrix().toarray()
+    base = conversion_probability(P, n)
+    effects = chain.removal_effects().set_index("state")
+    assert effects["conversion_probability"].iloc[0] == pytest.approx(base, rel=1e-10)
+    for k, label in enumerate(LABELS):
+        expected = max(1 - conversion_probability(P, n, removed=k) / base, 0.0)
+        assert effects.loc[label, "removal_effect"] == pytest.approx(expected, rel=1e-9, abs=1e-12)
+
+
+def test_attribution_adds_up(chain):
+    effects = chain.removal_effects()
+    counts = chain.counts.toarray()
+    n = chain.n_states
+    assert effects["attribution_share"].sum() == pytest.approx(1.0)
+    assert effects["attributed_conversions"].sum() == pytest.approx(counts[:, n + 1].sum())
+    assert effects["attributed_conversions"].is_monotonic_decreasing
+    by_state = effects.set_index("state")
+    for k, label in enumerate(LABELS):
+        assert by_state.loc[label, "visits"] == counts[:, k].sum()
+        assert by_state.loc[label, "last_touch_conversions"] == counts[k, n + 1]
+
+
+def test_state_never_reached_has_no_effect():
+    # 상태 c 는 경로에 없음, 전환은 a 로 끝나는 경로 하나뿐
+    offsets, states = to_csr([[0, 1], [1], [0], [1, 3]])
+    effects = fit(offsets, states, [False, False, True, False], ["a", "b", "c", "d"]).removal_effects().set_index("state")
+    assert effects.loc["c", "removal_effect"] == 0
+    assert effects.loc["d", "removal_effect"] == 0
+    assert effects.loc["b", "removal_effect"] == pytest.approx(0.0, abs=1e-12)
+    assert effects.loc["a", "removal_effect"] == pytest.approx(1.0)
+    assert effects.loc["a", "attributed_conversions"] == pytest.approx(1.0)
+
+
+def test_merge_and_save_load(tmp_path):
+    paths, converted = random_paths(np.random.default_rng(2), 500)
+    whole = fit(*to_csr(paths), converted, LABELS)
+    merged = fit(*to_csr(paths[:200]), converted[:200], LABELS).merge(fit(*to_csr(paths[200:]), converted[200:], LABELS))
+    np.testing.assert_array_equal(merged.counts.toarray(), whole.counts.toarray())
+    whole.save(tmp_path / "chain.npz")
+    loaded = MarkovAttribution.load(tmp_path / "chain.npz")
+    assert loaded.labels == LABELS
+    pd.testing.assert_frame_equal(loaded.removal_effects(), whole.removal_effects())
+    with pytest.raises(ValueError):
+        whole.merge(MarkovAttribution(LABELS[:-1]))
+
+
+def test_event_paths_stop_at_first_purchase():
+    code = {name: i for i, name in enumerate(EVENTS)}
+    sessions = [
+        ["session_start", "view_item", "view_item", "add_to_cart", "purchase", "view_item", "purchase"],
+        ["page_view", "view_item", "scroll"],
+        [],
+        ["purchase", "add_to_cart"],
+    ]
+    offsets, states, converted, labels = event_paths(pa.array([[code[name] for name in s] for s in sessions], pa.list_(pa.uint8())))
+    assert "purchase" not in labels and "page_view" not in labels
+    got = [[labels[s] for s in states[offsets[i]:offsets[i + 1]]] for i in range(len(sessions))]
+    assert got == [["view_item", "view_item", "add_to_cart"], ["view_item"], [], []]
+    assert converted.tolist() == [True, False, False, True]
+
+
+def test_channel_paths_per_user():
+    sessions = pd.DataFrame({
+        "master_id": ["u1", "u1", "u1", "u2", "u2", "u3"],
+        "session_source": ["google", None, "email", "email", "google", "naver"],
+        "session_start_at": pd.to_datetime(["2021-01-03", "2021-01-01", "2021-01-05", "2021-01-02", "2021-01-01", "2021-01-01"]),
+        "has_purchase": [1, 0, 0, 0, 0, 1],
+    })
+    offsets, states, converted, labels = channel_paths(sessions)
+    got = [[labels[s] for s in states[offsets[i]:offsets[i + 1]]] for i in range(len(offsets) - 1)]
+    # u1 은 첫 구매 세션(google)까지, NULL 채널은 (direct)
+    assert got == [[markov_attribution.DIRECT, "google"], ["google", "email"], ["naver"]]
+    assert converted.tolist() == [True, False, True]
+    _, _, _, capped = channel_paths(sessions, max_states=2)
+    assert capped == ["(other)", "google"]
+
+
+def test_main_reads_glob(tmp_path):
+    rng = np.random.default_rng(3)
+    code = {name: i for i, name in enumerate(EVENTS)}
+    names = ["view_item", "add_to_cart", "begin_checkout", "purchase", "scroll"]
+    paths = [[code[str(name)] for name in rng.choice(names, int(rng.integers(1, 6)))] for _ in range(400)]
+    for i, part in enumerate((paths[:150], paths[150:])):
+        pq.write_table(pa.table({"path": pa.array(part, pa.list_(pa.uint8()))}), tmp_path / f"session_paths-{i}.parquet")
+    out, cache = tmp_path / "marts", tmp_path / "cache"
+    markov_attribution.main(["--paths", str(tmp_path / "session_paths-*.parquet"), "--out", str(out),
+                             "--cache", str(cache), "--format", "parquet"])
+    table = pq.read_table(out / "mart_markov_attribution.parquet").to_pandas()
+    expected = fit(*event_paths(pa.array(paths, pa.list_(pa.uint8())))).removal_effects()
+    pd.testing.assert_frame_equal(table.drop(columns="model"), expected)
+    assert (cache / "markov_event.npz").exists()
+    with pytest.raises(FileNotFoundError):
+        markov_attribution.main(["--paths", str(tmp_path / "missing-*.parquet"), "--out", str(out)])
@@ -0,0 +1,149 @@
+"""ga4_engine.path_flow: 경로 요약 / 전이 vs 세션 경로를 파이썬으로 직접 압축해 센 결과"""
+import collections
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from ga4_engine import path_flow
+from ga4_engine.path_flow import END, LABELS, MORE, OTHER, PathFlow, sankey
+from ga4_engine.path_index import PATH_SEPARATOR
+from ga4_engine.sessionizer import event_codes
+
+EVENTS = ["session_start", "page_view", "view_item", "add_to_cart", "begin_checkout", "purchase",
+          "scroll", "user_engagement"]
+CODES = event_codes()
+MAX_STEPS = 4
+
+
+@pytest.fixture(scope="module")
+def paths():
+    rng = np.random.default_rng(21)
+    # 반복 / 노이즈 이벤트가 많도록 적은 종류에서 뽑음, 빈 경로 포함
+    return [[str(name) for name in rng.choice(EVENTS, int(rng.integers(0, 12)), p=[.1, .2, .25, .1, .05, .05, .15, .1])]
+            for _ in range(3000)]
+
+
+def to_array(paths):
+    return pa.array([[CODES[name] for name in path] for path in paths], pa.list_(pa.uint8()))
+
+
+def collapse(path):
+    flow = [name for name in path if name not in path_flow.IGNORED]
+    return [name for i, name in enumerate(flow) if i == 0 or name != flow[i - 1]]
+
+
+def expected_paths(paths, max_steps):
+    counts = collections.Counter()
+    for path in paths:
+        flow = collapse(path)
+        end = LABELS[MORE] if len(flow) > max_steps else LABELS[END]
+        counts[PATH_SEPARATOR.join([*flow[:max_steps], end])] += 1
+    return counts
+
+
+def expected_transitions(paths):
+    counts = collections.Counter()
+    for path in paths:
+        flow = ["(시작)", *collapse(path), LABELS[END]]
+        counts.update(zip(flow[:-1], flow[1:]))
+    return counts
+
+
+def build(paths, batch_size=500, **kwargs):
+    flow = PathFlow(max_steps=MAX_STEPS, **kwargs)
+    array = to_array(paths)
+    for start in range(0, len(array), batch_size):
+        flow.add(array[start:start + batch_size])
+    return flow
+
+
+def test_exact_paths_and_transitions(paths):
+    flow = build(paths)
+    assert flow.max_error == 0
+    assert flow.n_sessions == len(paths)
+    table = flow.paths(top_n=10_000)
+    assert not table["is_other"].any()
+    expected = expected_paths(paths, MAX_STEPS)
+    assert dict(zip(table["path"], table["sessions"])) == expected
+    assert (table["steps"] == table["path"].str.count(PATH_SEPARATOR)).all()
+    assert table["path_rank"].tolist() == list(range(1, len(table) + 1))
+    transitions = flow.transitions()
+    assert dict(zip(zip(transitions["source"], transitions["target"]), transitions["transitions"])) == expected_transitions(paths)
+
+
+def test_top_n_other_buckets_keep_every_session(paths):
+    flow = build(paths)
+    table = flow.paths(top_n=5)
+    top = table[~table["is_other"]]
+    assert len(top) == 5
+    assert top["sessions"].tolist() == [n for _, n in expected_paths(paths, MAX_STEPS).most_common(5)]
+    # 기타 버킷 = 첫 이벤트별 나머지 세션 (흐름 이벤트가 없는 세션은 상위 경로에 없으면 빠짐)
+    empty = sum(not collapse(path) for path in paths)
+    top_empty = top.loc[top["path"] == LABELS[END], "sessions"].sum()
+    assert table["sessions"].sum() == len(paths) - empty + top_empty
+    other = table[table["is_other"]]
+    assert other["path"].str.endswith(PATH_SEPARATOR + OTHER).all()
+    assert (other["path_rank"] == 0).all()
+
+
+@pytest.mark.parametrize("capacity", [5, 20])
+def test_capacity_bounds_error(paths, capacity):
+    flow = build(paths, batch_size=200, capacity=capacity)
+    assert len(flow.keys) <= capacity
+    assert flow.max_error > 0
+    expected = expected_paths(paths, MAX_STEPS)
+    table = flow.paths(top_n=capacity)
+    for path, sessions in zip(table.loc[~table["is_other"], "path"], table.loc[~table["is_other"], "sessions"]):
+        assert expected[path] - flow.max_error <= sessions <= expected[path]
+    # max_error 보다 많이 나온 경로는 요약에서 빠지지 않음
+    kept = set(table["path"])
+    assert all(path in kept for path, n in expected.items() if n > flow.max_error)
+    # 전이 / 첫 이벤트 집계는 capacity 와 무관하게 정확
+    assert flow.transitions()["transitions"].sum() == sum(expected_transitions(paths).values())
+
+
+def test_merge_matches_single_pass(paths):
+    whole = build(paths)
+    left, right = build(paths[:1700]), build(paths[1700:])
+    merged = left.merge(right)
+    assert merged.n_sessions == whole.n_sessions
+    assert merged.paths(top_n=10_000).equals(whole.paths(top_n=10_000))
+    np.testing.assert_array_equal(merged.transition_counts, whole.transition_counts)
+
+
+def test_full_path_strings_and_max_steps(paths):
+    table = pa.table({"full_path": [PATH_SEPARATOR.join(path) if path else None for path in paths]})
+    flow = PathFlow(max_steps=2).add(table)
+    got = flow.paths(top_n=10_000)
+    assert dict(zip(got["path"], got["sessions"])) == expected_paths(paths, 2)
+    with pytest.raises(ValueError):
+        PathFlow(max_steps=path_flow.MAX_STEPS + 1)
+
+
+def test_sankey_links_conserve_sessions(paths):
+    table = build(paths).paths(top_n=10_000)
+    nodes, links = sankey(table, top_n=8)
+    # 시작 단계 노드에서 나가는 세션 = 단계가 1개 이상인 경로의 세션 수
+    first_step = nodes.loc[nodes["step"] == 1, "node"]
+    assert links.loc[links["source"].isin(first_step), "sessions"].sum() == table.loc[table["steps"] > 0, "sessions"].sum()
+    labels = dict(zip(nodes["node"], nodes["label"]))
+    assert OTHER in set(labels.values())
+    # 끝 표시 노드는 라벨 하나당 하나
+    terminals = nodes[nodes["label"].isin([OTHER, *LABELS.values()])]
+    assert terminals["label"].is_unique and terminals["step"].isna().all()
+    # 끝 표시 노드로 들어오는 세션 = 단계가 1개 이상인 경로의 세션 수
+    assert links.loc[links["target"].isin(terminals["node"]), "sessions"].sum() == table.loc[table["steps"] > 0, "sessions"].sum()
+
+
+def test_main_reads_glob(tmp_path, paths):
+    for i, part in enumerate((paths[:1000], paths[1000:])):
+        pq.write_table(pa.table({"path": to_array(part)}), tmp_path / f"session_paths-{i}.parquet")
+    out = tmp_path / "marts"
+    path_flow.main(["--paths", str(tmp_path / "session_paths-*.parquet"), "--max-steps", str(MAX_STEPS),
+                    "--top-n", "10000", "--out", str(out), "--format", "parquet"])
+    table = pq.read_table(out / "mart_path_flow.parquet").to_pandas()
+    assert dict(zip(table["path"], table["sessions"])) == expected_paths(paths, MAX_STEPS)
+    with pytest.raises(FileNotFoundError):
+        path_flow.main(["--paths", str(tmp_path / "missing-*.parquet"), "--out", str(out)])
@@ -0,0 +1,111 @@
+"""ga4_engine.path_index: 색인 질의 vs 세션 경로를 파이썬으로 직접 훑은 결과"""
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from ga4_engine.path_index import PathIndex, encode_paths
+from ga4_engine.sessionizer import event_codes
+
+EVENTS = ["session_start", "page_view", "view_item", "add_to_cart", "begin_checkout", "purchase", "scroll"]
+CODES = event_codes()
+
+
+@pytest.fixture(scope="module")
+def paths():
+    rng = np.random.default_rng(9)
+    # 빈 경로 / 이벤트 1개 경로를 포함해 세션 400개
+    return [[str(name) for name in rng.choice(EVENTS, int(rng.integers(0, 14)))] for _ in range(400)]
+
+
+@pytest.fixture(scope="module", params=[1, 2, 3])
+def index(request, paths):
+    codes = pa.array([[CODES[name] for name in path] for path in paths], pa.list_(pa.uint8()))
+    ids = pa.array([f"s{i}" for i in range(len(paths))])
+    return PathIndex(codes, ids, max_gram=request.param)
+
+
+def min_span(path, events):
+    """events 를 순서대로 포함하는 가장 짧은 (끝 - 시작) 위치 차 (없으면 None), 모든 시작 위치를 직접 시도"""
+    best = None
+    for start, name in enumerate(path):
+        if name != events[0]:
+            continue
+        position = start
+        for event in events[1:]:
+            position = next((j for j in range(position + 1, len(path)) if path[j] == event), None)
+            if position is None:
+                break
+        if position is not None and (best is None or position - start < best):
+            best = position - start
+    return best
+
+
+def contains_run(path, events):
+    n = len(events)
+    return any(path[i:i + n] == list(events) for i in range(len(path) - n + 1))
+
+
+QUERIES = [
+    ["view_item"],
+    ["view_item", "add_to_cart"],
+    ["add_to_cart", "begin_checkout", "purchase"],
+    ["page_view", "page_view", "view_item"],
+    ["view_item", "add_to_cart", "view_item", "purchase"],
+    ["scroll", "scroll", "scroll", "scroll"],
+]
+
+
+@pytest.mark.parametrize("events", QUERIES)
+@pytest.mark.parametrize("within", [None, 0, 3, 6])
+def test_followed_by(index, paths, events, within):
+    expected = [i for i, path in enumerate(paths)
+                if (span := min_span(path, events)) is not None and (within is None or span <= within)]
+    assert index.followed_by(events, within).tolist() == expected
+
+
+@pytest.mark.parametrize("events", QUERIES)
+def test_sequence(index, paths, events):
+    expected = [i for i, path in enumerate(paths) if contains_run(path, events)]
+    assert index.sequence(events).tolist() == expected
+
+
+def test_contains_and_positions(index, paths):
+    expected = [i for i, path in enumerate(paths) if {"purchase", "scroll"} <= set(path)]
+    assert index.contains("purchase", "scroll").tolist() == expected
+    flat = [name for path in paths for name in path]
+    assert index.positions("add_to_cart").tolist() == [i for i, name in enumerate(flat) if name == "add_to_cart"]
+
+
+def test_frequent_counts_sessions(index, paths):
+    top = index.frequent(index.max_gram, top_k=5)
+    assert len(top) == 5
+    for ngram, sessions in zip(top["ngram"], top["sessions"]):
+        events = ngram.split(" > ")
+        assert len(events) == index.max_gram
+        assert sessions == sum(contains_run(path, events) for path in paths)
+    with pytest.raises(ValueError):
+        index.frequent(index.max_gram + 1)
+
+
+def test_ids_and_mask(index):
+    rows = index.sequence(["view_item", "add_to_cart"])
+    assert index.ids(rows).to_pylist() == [f"s{i}" for i in rows]
+    assert np.flatnonzero(index.mask(rows)).tolist() == rows.tolist()
+
+
+def test_from_full_path_strings(paths):
+    table = pa.table({
+        "session_unique_id": [f"s{i}" for i in range(len(paths))],
+        "full_path": [" > ".join(path) if path else None for path in paths],
+    })
+    index = PathIndex.from_table(table)
+    assert index.n_sessions == len(paths)
+    expected = [i for i, path in enumerate(paths) if contains_run(path, ["view_item", "add_to_cart"])]
+    assert index.sequence(["view_item", "add_to_cart"]).tolist() == expected
+    # 코드표에 없는 이벤트는 0 으로
+    assert encode_paths(pa.array(["session_start > unknown_event"])).to_pylist() == [[CODES["session_start"], 0]]
+
+
+def test_unknown_event(index):
+    with pytest.raises(KeyError):
+        index.followed_by(["view_item", "no_such_event"])
@@ -0,0 +1,114 @@
+"""int_product_association / int_product_triples: 정렬 배열에서 펼친 조합 수 vs 원본 구매 이벤트를 itertools 로 센 값 (DuckDB 로컬 실행)"""
+import collections
+import contextlib
+import io
+import itertools
+
+import pyarrow.dataset as ds
+import pytest
+
+from ga4_engine.duckdb_runner import DuckDBRunner
+from ga4_engine.synthetic import SyntheticConfig, SyntheticGA4
+
+MIN_SUPPORT = 3
+TOP_K = 3
+# 구매가 많고 카탈로그가 작아 2개 / 3개 조합이 support 를 넘도록
+BASKETS = SyntheticConfig(sessions=3000, days=2, catalog_size=40, categories=3, view_rate=0.9, cart_rate=0.9,
+                          checkout_rate=0.9, payment_rate=0.9, purchase_rate=0.9, avg_basket_size=4.0)
+
+
+@pytest.fixture(scope="module")
+def events_dir(tmp_path_factory):
+    out = tmp_path_factory.mktemp("baskets")
+    SyntheticGA4(BASKETS).write(str(out))
+    return out
+
+
+def build(events_dir, **vars):
+    runner = DuckDBRunner(str(events_dir / "events_*.parquet"), vars={
+        "bundle_min_support": MIN_SUPPORT, "bundle_mine_triples": True, **vars,
+    })
+    with contextlib.redirect_stdout(io.StringIO()):
+        runner.run()
+    return runner
+
+
+@pytest.fixture(scope="module")
+def runner(events_dir):
+    return build(events_dir)
+
+
+@pytest.fixture(scope="module")
+def baskets(events_dir):
+    """원본 구매 이벤트 → {거래 ID: (세션 ID, 정렬된 상품 튜플)}"""
+    table = ds.dataset(str(events_dir), format="parquet").to_table(
+        columns=["event_name", "user_pseudo_id", "event_params", "ecommerce", "items"])
+    items, sessions = collections.defaultdict(set), {}
+    for event in table.to_pylist():
+        if event["event_name"] != "purchase":
+            continue
+        transaction = event["ecommerce"]["transaction_id"]
+        session_id = next(p["value"]["int_value"] for p in event["event_params"] if p["key"] == "ga_session_id")
+        sessions.setdefault(transaction, f"{event['user_pseudo_id']}-{session_id}")
+        items[transaction].update(item["item_name"] for item in event["items"])
+    return {transaction: (sessions[transaction], tuple(sorted(names))) for transaction, names in items.items()}
+
+
+def itemset_counts(baskets, size):
+    counts = collections.Counter()
+    for _, names in baskets.values():
+        counts.update(itertools.combinations(names, size))
+    return counts
+
+
+def test_pair_counts_match_brute_force(runner, baskets):
+    singles, pairs = itemset_counts(baskets, 1), itemset_counts(baskets, 2)
+    expected = {pair: n for pair, n in pairs.items() if n >= MIN_SUPPORT}
+    assert len(expected) > 20
+    got = runner.table("int_product_association")
+    assert dict(zip(zip(got["product_A"], got["product_B"]), got["pair_transactions"])) == expected
+    n = len(baskets)
+    for row in got.itertuples():
+        a, b = singles[(row.product_A,)], singles[(row.product_B,)]
+        assert (row.item_A_transactions, row.item_B_transactions, row.n_transactions) == (a, b, n)
+        assert row.lift == pytest.approx(row.pair_transactions * n / (a * b))
+        assert row.confidence_A_to_B == pytest.approx(row.pair_transactions / a)
+
+
+def test_pair_buyer_scores(runner, baskets):
+    scores = runner.table("int_engage_lift_score").set_index("session_unique_id")
+    got = runner.table("int_product_association").set_index(["product_A", "product_B"])
+    score_sum, high = collections.Counter(), collections.Counter()
+    for session, names in baskets.values():
+        for pair in itertools.combinations(names, 2):
+            score_sum[pair] += scores.loc[session, "engagement_score"]
+            high[pair] += scores.loc[session, "engagement_grade"] == "High Intent"
+    for pair, row in got.iterrows():
+        assert row["buyer_score_sum"] == pytest.approx(score_sum[pair])
+        assert row["high_intent_transactions"] == high[pair]
+
+
+def test_triple_counts_match_brute_force(runner, baskets):
+    singles, pairs, triples = (itemset_counts(baskets, size) for size in (1, 2, 3))
+    expected = {triple: n for triple, n in triples.items() if n >= MIN_SUPPORT}
+    assert len(expected) > 5
+    got = runner.table("int_product_triples")
+    assert dict(zip(zip(got["product_A"], got["product_B"], got["product_C"]), got["triple_transactions"])) == expected
+    n = len(baskets)
+    for row in got.itertuples():
+        a, b, c = (singles[(name,)] for name in (row.product_A, row.product_B, row.product_C))
+        assert row.lift == pytest.approx(row.triple_transactions * n * n / (a * b * c))
+        assert row.confidence_AB_to_C == pytest.approx(row.triple_transactions / pairs[(row.product_A, row.product_B)])
+        assert row.confidence_BC_to_A == pytest.approx(row.triple_transactions / pairs[(row.product_B, row.product_C)])
+
+
+def test_top_k_keeps_pairs_ranked_by_either_product(events_dir, runner):
+    every = runner.table("int_product_association")
+    ranks = collections.defaultdict(list)
+    for row in every.itertuples():
+        ranks[row.product_A].append((-row.lift, -row.pair_transactions, row.product_B, (row.product_A, row.product_B)))
+        ranks[row.product_B].append((-row.lift, -row.pair_transactions, row.product_A, (row.product_A, row.product_B)))
+    expected = {pair for entries in ranks.values() for *_, pair in sorted(entries)[:TOP_K]}
+    got = build(events_dir, bundle_top_k=TOP_K).table("int_product_association")
+    assert set(zip(got["product_A"], got["product_B"])) == expected
+    assert len(expected) < len(every)
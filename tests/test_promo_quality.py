@@ -0,0 +1,51 @@
+"""mart_promo_quality: 세션 단위 클릭 집계 vs stg_events 클릭 행에서 직접 센 세션 수 / 전환율 (DuckDB 로컬 실행)"""
+import contextlib
+import io
+import math
+
+import pytest
+
+from ga4_engine.duckdb_runner import DuckDBRunner
+
+# 클릭 이벤트 행 → (프로모션, 세션) 중복 제거 후 세션 단위로 센 값
+BRUTE_FORCE = """
+    SELECT
+        c.promotion_name,
+        COUNT(*) AS click_sessions,
+        ROUND(COUNTIF(f.has_purchase = 1) / COUNT(*) * 100, 2) AS promo_cvr,
+        COUNTIF(s.engagement_grade = 'High Intent') AS high_intent_session_count
+    FROM (
+        SELECT DISTINCT promotion_name, session_unique_id
+        FROM stg_events
+        WHERE event_name = 'select_promotion' AND promotion_name != '(not set)'
+    ) c
+    JOIN fct_sessions f ON c.session_unique_id = f.session_unique_id
+    JOIN int_engage_lift_score s ON c.session_unique_id = s.session_unique_id
+    GROUP BY 1
+"""
+
+
+def build(events_dir, method):
+    runner = DuckDBRunner(str(events_dir / "events_*.parquet"), vars={"distinct_count_method": method})
+    with contextlib.redirect_stdout(io.StringIO()):
+        runner.run()
+    return runner
+
+
+@pytest.mark.parametrize("method", ["hll", "exact"])
+def test_promo_sessions_match_click_rows(events_dir, method):
+    runner = build(events_dir, method)
+    # 클릭 이벤트 행은 다시 읽지 않음 (세션 단위 fct_sessions + 스케치)
+    assert "stg_events" not in runner.models["mart_promo_quality"].refs
+    mart = runner.table("mart_promo_quality").set_index("promotion_name").sort_index()
+    expected = runner.con.execute(BRUTE_FORCE).df().set_index("promotion_name").sort_index()
+    assert mart.index.equals(expected.index)
+    assert (mart["promo_cvr"] == expected["promo_cvr"]).all()
+    assert (mart["high_intent_session_count"] == expected["high_intent_session_count"]).all()
+    if method == "exact":
+        assert (mart["click_sessions"] == expected["click_sessions"]).all()
+    else:
+        # 상대 표준 오차의 4배 이내
+        error = 1.04 / math.sqrt(2 ** runner.vars["distinct_count_precision"])
+        relative = (mart["click_sessions"] - expected["click_sessions"]).abs() / expected["click_sessions"]
+        assert (relative <= 4 * error).all()
@@ -0,0 +1,143 @@
+"""ga4_engine.quantile_sketch: 스케치 순위 / 분위수 vs 정렬한 원본 값, 오차는 max_error 이내"""
+import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from ga4_engine import quantile_sketch
+from ga4_engine.mart_store import MartStore
+from ga4_engine.quantile_sketch import QuantileSketch, build
+
+K = 32
+
+
+def true_rank(values, x):
+    return np.searchsorted(np.sort(values), x, side="left")
+
+
+def assert_rank_within(sketch, values, probes):
+    error = np.abs(sketch.rank(probes) - true_rank(values, probes))
+    assert error.max() <= sketch.max_error
+
+
+def probes_for(values):
+    # 표본 값 자체 / 값 사이 / 범위 밖을 모두 찍어 봄
+    values = np.unique(values)
+    return np.concatenate([values, (values[1:] + values[:-1]) / 2, [values[0] - 1, values[-1] + 1]])
+
+
+@pytest.mark.parametrize("n", [1, K, K + 1, 1000, 12_345])
+@pytest.mark.parametrize("ties", [False, True])
+def test_rank_error_within_max_error(n, ties):
+    rng = np.random.default_rng(n)
+    values = rng.integers(0, 40, n).astype(float) if ties else rng.lognormal(3, 1, n)
+    sketch = QuantileSketch.from_values(values, k=K)
+    assert sketch.count == n
+    assert len(sketch.items) <= K
+    assert sketch.max_error <= n / K
+    if n <= K:
+        assert sketch.max_error == 0
+    assert_rank_within(sketch, values, probes_for(values))
+    assert sketch.mean == pytest.approx(values.mean())
+    assert (sketch.min, sketch.max) == (values.min(), values.max())
+
+
+@pytest.mark.parametrize("n", [20, 5000])
+def test_quantile_brackets_target_rank(n):
+    rng = np.random.default_rng(7)
+    values = rng.integers(0, 300, n).astype(float)
+    sketch = QuantileSketch.from_values(values, k=K)
+    qs = np.linspace(0, 1, 41)
+    got = sketch.quantile(qs)
+    if n <= K:
+        # 정확한 경우는 PERCENTILE_DISC 와 같음
+        np.testing.assert_array_equal(got, np.quantile(values, qs, method="inverted_cdf"))
+    ordered = np.sort(values)
+    for q, v in zip(qs, got):
+        target = max(np.ceil(q * n), 1)
+        below = np.searchsorted(ordered, v, side="left")
+        at_most = np.searchsorted(ordered, v, side="right")
+        assert below < target + sketch.max_error
+        assert at_most >= target - sketch.max_error
+
+
+def test_merge_adds_errors():
+    rng = np.random.default_rng(8)
+    parts = [rng.normal(i * 10, 5, size) for i, size in enumerate([10, 500, 3000])]
+    sketches = [QuantileSketch.from_values(part, k=K) for part in parts]
+    merged = sketches[0].merge(*sketches[1:])
+    values = np.concatenate(parts)
+    assert merged.count == len(values)
+    assert merged.max_error == sum(s.max_error for s in sketches)
+    assert merged.max_error <= len(values) / K
+    assert_rank_within(merged, values, probes_for(values))
+    assert merged.mean == pytest.approx(values.mean())
+    edges = np.linspace(values.min(), values.max() + 1, 9)
+    counts = merged.histogram(edges)
+    assert counts.sum() == len(values)
+    expected = np.diff(true_rank(values, edges))
+    assert np.abs(counts - expected).max() <= 2 * merged.max_error
+
+
+@pytest.fixture(scope="module")
+def sessions():
+    rng = np.random.default_rng(24)
+    n = 20_000
+    purchased = rng.random(n) < 0.3
+    return pd.DataFrame({
+        "session_date": [datetime.date(2021, 1, 1) + datetime.timedelta(days=int(d)) for d in rng.integers(0, 5, n)],
+        "device_category": rng.choice(["desktop", "mobile", "tablet"], n),
+        "session_source": rng.choice(["google", "(direct)", "email"], n),
+        "minutes_to_buy": pd.Series(rng.integers(0, 180, n), dtype="Int64").where(purchased),
+        "purchase_revenue": np.where(purchased, np.round(rng.lognormal(4, 0.8, n), 2), np.nan),
+    })
+
+
+def test_build_rows_match_groups(sessions):
+    frame = build(sessions, k=K)
+    for metric, column in quantile_sketch.METRICS.items():
+        rows = frame[frame["metric"] == metric]
+        for key, group in sessions[sessions[column].notna()].groupby(quantile_sketch.DIMENSIONS):
+            row = rows[(rows[quantile_sketch.DIMENSIONS] == key).all(axis=1)]
+            assert len(row) == 1
+            values = group[column].to_numpy(dtype=float)
+            sketch = QuantileSketch.from_rows(row)
+            assert row["n"].iloc[0] == sketch.count == len(values)
+            assert sketch.total == pytest.approx(values.sum())
+            assert_rank_within(sketch, values, probes_for(values))
+        # 여러 그룹을 합친 스케치 (대시보드의 기간 / 필터 합산)
+        mobile = rows[rows["device_category"] == "mobile"]
+        values = sessions.loc[(sessions["device_category"] == "mobile") & sessions[column].notna(), column].to_numpy(dtype=float)
+        sketch = QuantileSketch.from_rows(mobile)
+        assert sketch.count == len(values)
+        assert sketch.max_error <= len(values) / K
+        assert_rank_within(sketch, values, probes_for(values))
+    assert QuantileSketch.from_rows(frame.iloc[:0]).count == 0
+
+
+def write(sessions, path):
+    pq.write_table(pa.Table.from_pandas(sessions, preserve_index=False), path)
+
+
+def test_main_glob_and_append(tmp_path, sessions):
+    first = sessions["session_date"] < datetime.date(2021, 1, 4)
+    write(sessions[first].iloc[::2], tmp_path / "sessions-0.parquet")
+    write(sessions[first].iloc[1::2], tmp_path / "sessions-1.parquet")
+    out = tmp_path / "marts"
+    quantile_sketch.main(["--sessions", str(tmp_path / "sessions-*.parquet"), "-k", str(K), "--out", str(out)])
+    assert set(MartStore(out)["conversion_sketch"]["session_date"]) == {datetime.date(2021, 1, d) for d in (1, 2, 3)}
+
+    # 새 일자 + 이미 있는 1월 3일을 다시 넣으면 1월 3일 행만 바뀌고 1~2일 행은 유지
+    later = sessions[sessions["session_date"] >= datetime.date(2021, 1, 3)]
+    write(later, tmp_path / "later.parquet")
+    quantile_sketch.main(["--sessions", str(tmp_path / "later.parquet"), "-k", str(K), "--append", "--out", str(out)])
+    frame = MartStore(out)["conversion_sketch"]
+    assert sorted(set(frame["session_date"])) == sorted(set(sessions["session_date"]))
+    expected = build(sessions, k=K)
+    assert len(frame) == len(expected)
+    assert frame["n"].sum() == expected["n"].sum()
+    with pytest.raises(FileNotFoundError):
+        quantile_sketch.main(["--sessions", str(tmp_path / "missing-*.parquet"), "--out", str(out)])
@@ -0,0 +1,83 @@
+"""ga4_engine.segment_scan: 슬라이스 집계 vs pandas groupby, 검정 값 vs 스칼라 호출"""
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from ga4_engine import segment_scan, segment_stats
+from ga4_engine.segment_scan import SegmentScanner
+
+
+@pytest.fixture(scope="module")
+def sessions():
+    rng = np.random.default_rng(3)
+    n = 6000
+    device = rng.choice(["desktop", "mobile", "tablet"], n, p=[0.5, 0.4, 0.1])
+    source = rng.choice(["google", "(direct)", "email", None], n)
+    hour = rng.integers(0, 24, n)
+    # mobile · email 은 전환율이 높도록
+    rate = np.where((device == "mobile") & (source == "email"), 0.35, 0.08)
+    purchase = (rng.random(n) < rate).astype(int)
+    return pd.DataFrame({
+        "device_category": device,
+        "session_source": source,
+        "session_hour": hour,
+        "has_view_item": np.maximum(purchase, rng.random(n) < 0.5).astype(int),
+        "has_purchase": purchase,
+    })
+
+
+def expected_slices(sessions, dims, target, min_sessions):
+    """pandas groupby 로 센 슬라이스 → {라벨: (세션 수, 전환 수)} (NULL 도 하나의 값)"""
+    grouped = sessions.groupby(list(dims), dropna=False)[target].agg(["size", "sum"]).reset_index()
+    grouped = grouped[grouped["size"] >= min_sessions]
+    labels = [
+        " · ".join(f"{dim}={'(null)' if pd.isna(value) else value}" for dim, value in zip(dims, values))
+        for values in grouped[list(dims)].itertuples(index=False)
+    ]
+    return dict(zip(labels, zip(grouped["size"], grouped["sum"])))
+
+
+@pytest.mark.parametrize("dense_keys", [segment_scan._DENSE_KEYS, 1])
+def test_slices_match_groupby(sessions, monkeypatch, dense_keys):
+    # dense_keys=1 은 셀 번호를 np.unique(axis=0) 로 붙이는 경로
+    monkeypatch.setattr(segment_scan, "_DENSE_KEYS", dense_keys)
+    scanner = SegmentScanner(pa.Table.from_pandas(sessions, preserve_index=False))
+    assert scanner.n_sessions == len(sessions)
+    slices = scanner.slices("has_purchase", max_depth=2, min_sessions=50)
+    assert slices["segment"].notna().all()
+    got = dict(zip(slices["segment"], zip(slices["sessions"], slices["conversions"])))
+    expected = {}
+    for depth in (1, 2):
+        for dims in combinations(scanner.dimensions, depth):
+            expected.update(expected_slices(sessions, dims, "has_purchase", 50))
+    assert got == expected
+    assert "session_source=(null)" in got
+
+
+def test_scan_statistics_match_scalar_calls(sessions):
+    scanner = SegmentScanner(sessions)
+    result = scanner.scan("has_purchase", max_depth=2, min_sessions=100, top_k=None)
+    total, converted = len(sessions), int(sessions["has_purchase"].sum())
+    for row in result.sample(20, random_state=0).itertuples():
+        z, p = segment_stats.two_proportion_ztest(row.conversions, row.sessions, converted - row.conversions, total - row.sessions)
+        assert row.z == pytest.approx(float(z))
+        assert row.p_value == pytest.approx(float(p))
+        assert row.lift == pytest.approx(row.conversions / row.sessions / (converted / total))
+    np.testing.assert_allclose(result["q_value"], segment_stats.p_adjust(result["p_value"].to_numpy(), "bh"))
+
+
+def test_scan_ranks_significant_segments_by_effect_size(sessions):
+    scanner = SegmentScanner(sessions)
+    top = scanner.scan("has_purchase", max_depth=2, min_sessions=100, top_k=5)
+    assert len(top) == 5
+    assert top["significant"].all()
+    assert (top["cohens_h"].abs().diff().dropna() <= 0).all()
+    assert top.iloc[0]["segment"] == "device_category=mobile · session_source=email"
+
+
+def test_unknown_target(sessions):
+    with pytest.raises(KeyError):
+        SegmentScanner(sessions).slices("has_add_to_cart")
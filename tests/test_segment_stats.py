@@ -0,0 +1,111 @@
+"""ga4_engine.segment_stats: 배열 검정 vs scipy 스칼라 검정 / 보정 참조 구현"""
+import numpy as np
+import pytest
+from scipy import stats
+
+from ga4_engine import segment_stats
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(5)
+
+
+def test_chi2_2x2_matches_scipy(rng):
+    n1, n2 = rng.integers(20, 2000, 300), rng.integers(20, 2000, 300)
+    s1, s2 = rng.binomial(n1, 0.1), rng.binomial(n2, 0.12)
+    for correction in (True, False):
+        chi2, p = segment_stats.chi2_2x2(s1, n1, s2, n2, correction=correction)
+        for i in range(len(n1)):
+            table = [[s1[i], n1[i] - s1[i]], [s2[i], n2[i] - s2[i]]]
+            expected = stats.chi2_contingency(table, correction=correction)
+            assert chi2[i] == pytest.approx(expected.statistic, rel=1e-9, abs=1e-12)
+            assert p[i] == pytest.approx(expected.pvalue, rel=1e-9)
+
+
+def test_chi2_2x2_undefined_without_conversions():
+    chi2, p = segment_stats.chi2_2x2([0, 5], [100, 100], [0, 5], [80, 80])
+    assert np.isnan(chi2[0]) and np.isnan(p[0])
+    assert not np.isnan(chi2[1])
+
+
+def test_chi2_2xk_matches_scipy(rng):
+    totals = rng.integers(50, 3000, (100, 6))
+    successes = rng.binomial(totals, rng.uniform(0.05, 0.3, (100, 6)))
+    chi2, p, dof = segment_stats.chi2_2xk(successes, totals)
+    for i in range(len(totals)):
+        expected = stats.chi2_contingency(np.column_stack([successes[i], totals[i] - successes[i]]))
+        assert chi2[i] == pytest.approx(expected.statistic, rel=1e-9)
+        assert p[i] == pytest.approx(expected.pvalue, rel=1e-9)
+        assert dof[i] == expected.dof
+
+
+def test_chi2_2xk_skips_empty_groups():
+    chi2, p, dof = segment_stats.chi2_2xk([[10, 0, 30]], [[100, 0, 200]])
+    expected = stats.chi2_contingency([[10, 90], [30, 170]])
+    assert dof[0] == 1
+    assert chi2[0] == pytest.approx(expected.statistic)
+
+
+def test_ztest_squared_is_uncorrected_chi2(rng):
+    n1, n2 = rng.integers(100, 5000, 200), rng.integers(100, 5000, 200)
+    s1, s2 = rng.binomial(n1, 0.2), rng.binomial(n2, 0.25)
+    z, p = segment_stats.two_proportion_ztest(s1, n1, s2, n2)
+    chi2, chi2_p = segment_stats.chi2_2x2(s1, n1, s2, n2, correction=False)
+    np.testing.assert_allclose(z**2, chi2, rtol=1e-9)
+    np.testing.assert_allclose(p, chi2_p, rtol=1e-9)
+
+
+def test_wilson_interval_matches_scipy():
+    successes, totals = np.array([0, 3, 50, 999]), np.array([10, 20, 200, 1000])
+    rate, low, high = segment_stats.wilson_interval(successes, totals, confidence=0.9)
+    for i in range(len(totals)):
+        expected = stats.binomtest(successes[i], totals[i]).proportion_ci(confidence_level=0.9, method="wilson")
+        assert rate[i] == successes[i] / totals[i]
+        assert low[i] == pytest.approx(expected.low, abs=1e-12)
+        assert high[i] == pytest.approx(expected.high, abs=1e-12)
+    assert segment_stats.wilson_interval(0, 0) == (0, 0, 0)
+
+
+def test_cohens_h():
+    assert segment_stats.cohens_h(0.5, 0.5) == 0
+    assert segment_stats.cohens_h(0.3, 0.1) == pytest.approx(2 * np.arcsin(np.sqrt(0.3)) - 2 * np.arcsin(np.sqrt(0.1)))
+    assert segment_stats.cohens_h(0.1, 0.3) < 0
+
+
+def reference_adjust(p_values, method):
+    """NaN 을 뺀 p 값에 교과서 정의를 그대로 적용"""
+    p = np.asarray(p_values, dtype=np.float64)
+    valid = np.flatnonzero(~np.isnan(p))
+    m = len(valid)
+    order = valid[np.argsort(p[valid], kind="stable")]
+    adjusted = np.full(len(p), np.nan)
+    if method == "holm":
+        running = 0.0
+        for rank, i in enumerate(order, 1):
+            running = max(running, min(1.0, (m - rank + 1) * p[i]))
+            adjusted[i] = running
+    else:
+        running = 1.0
+        for rank in range(m, 0, -1):
+            i = order[rank - 1]
+            running = min(running, p[i] * m / rank)
+            adjusted[i] = running
+    return adjusted
+
+
+@pytest.mark.parametrize("method", ["holm", "bh"])
+def test_p_adjust_matches_reference(rng, method):
+    for _ in range(50):
+        p = rng.uniform(0, 0.2, 40)
+        p[rng.random(40) < 0.1] = np.nan
+        np.testing.assert_allclose(segment_stats.p_adjust(p, method), reference_adjust(p, method), equal_nan=True)
+
+
+def test_p_adjust_along_axis(rng):
+    p = rng.uniform(0, 0.1, (5, 12))
+    rows = np.array([reference_adjust(row, "bh") for row in p])
+    np.testing.assert_allclose(segment_stats.p_adjust(p, "bh", axis=-1), rows)
+    np.testing.assert_allclose(segment_stats.p_adjust(p.T, "bh", axis=0), rows.T)
+    with pytest.raises(ValueError):
+        segment_stats.p_adjust(p, "bonferroni")
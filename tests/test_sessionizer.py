@@ -0,0 +1,172 @@
+"""ga4_engine.sessionizer: 스트리밍 세션화 결과 vs pandas 로 세션별로 직접 모은 결과"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from ga4_engine.sessionizer import EVENTS, FLAGS, STEPS, Sessionizer, decode, event_codes
+
+PARAMS = pa.list_(pa.struct([
+    ("key", pa.string()),
+    ("value", pa.struct([("string_value", pa.string()), ("int_value", pa.int64())])),
+]))
+NAMES = ["session_start", "page_view", "view_item", "view_item", "add_to_cart", "scroll", "begin_checkout",
+         "add_payment_info", "purchase", "view_promotion", "custom_event"]
+MINUTE = 60_000_000
+
+
+def make_events(n_users=40, seed=0):
+    """사용자마다 세션 1~3개 (세션 사이 2시간), 세션 안 이벤트 간격 0~5분, 같은 시각 이벤트 포함"""
+    rng = np.random.default_rng(seed)
+    base = 1_606_780_800_000_000  # 2020-12-01 00:00 UTC
+    rows = []
+    for user in range(n_users):
+        start = base + int(rng.integers(0, 600)) * MINUTE
+        for session in range(int(rng.integers(1, 4))):
+            ts = start + session * 120 * MINUTE
+            for i in range(int(rng.integers(1, 12))):
+                name = "session_start" if i == 0 else str(rng.choice(NAMES))
+                rows.append((f"u{user}", 1000 + session, ts, name))
+                ts += int(rng.integers(0, 6)) * MINUTE
+    frame = pd.DataFrame(rows, columns=["user_pseudo_id", "ga_session_id", "event_timestamp", "event_name"])
+    return frame.sort_values("event_timestamp", kind="stable", ignore_index=True)
+
+
+def to_table(frame):
+    params = [
+        [{"key": "page_location", "value": {"string_value": "/", "int_value": None}},
+         {"key": "ga_session_id", "value": {"string_value": None, "int_value": int(sid)}}]
+        for sid in frame["ga_session_id"]
+    ]
+    dates = pd.to_datetime(frame["event_timestamp"], unit="us", utc=True).dt.strftime("%Y%m%d")
+    return pa.table({
+        "event_date": pa.array(dates.to_numpy(), pa.string()),
+        "event_timestamp": pa.array(frame["event_timestamp"].to_numpy(), pa.int64()),
+        "event_name": pa.array(frame["event_name"].to_numpy(), pa.string()),
+        "user_pseudo_id": pa.array(frame["user_pseudo_id"].to_numpy(), pa.string()),
+        "event_params": pa.array(params, PARAMS),
+    })
+
+
+def reference(frame):
+    """세션별 (시각, 도착 순) 정렬 경로 / 플래그 / 시각"""
+    codes = event_codes()
+    frame = frame.assign(
+        session_unique_id=frame["user_pseudo_id"] + "-" + frame["ga_session_id"].astype(str),
+        arrival=np.arange(len(frame)),
+    ).sort_values(["event_timestamp", "arrival"], kind="stable")
+    rows = {}
+    for key, group in frame.groupby("session_unique_id", sort=False):
+        names = group["event_name"].tolist()
+        ts = group["event_timestamp"].to_numpy()
+        row = {
+            "path": [codes.get(name, 0) for name in names],
+            "path_length": len(names),
+            "start": ts.min(),
+            "end": ts.max(),
+            "purchased": ts[group["event_name"].to_numpy() == "purchase"].max(initial=-1),
+        }
+        for flag, event in FLAGS.items():
+            row[flag] = int(event in names)
+        for step in STEPS:
+            hit = ts[group["event_name"].to_numpy() == step]
+            row[f"seconds_to_{step}"] = (hit.min() - ts.min()) // 1_000_000 if len(hit) else None
+        rows[key] = row
+    return rows
+
+
+def collect(tables):
+    table = pa.concat_tables(tables)
+    result = {}
+    for row in table.to_pylist():
+        key = row["session_unique_id"]
+        assert key not in result, f"세션이 두 번 나옴: {key}"
+        result[key] = row
+    return result
+
+
+def assert_same(got, expected, max_path_events=None):
+    assert set(got) == set(expected)
+    for key, row in expected.items():
+        out = got[key]
+        path = row["path"] if max_path_events is None else row["path"][:max_path_events]
+        assert out["path"] == path, key
+        assert out["path_length"] == row["path_length"]
+        assert out["session_start_at"] == pd.Timestamp(row["start"], unit="us", tz="UTC")
+        assert out["session_end_at"] == pd.Timestamp(row["end"], unit="us", tz="UTC")
+        if row["purchased"] < 0:
+            assert out["purchased_at"] is None
+        else:
+            assert out["purchased_at"] == pd.Timestamp(row["purchased"], unit="us", tz="UTC")
+        for column in [*FLAGS, *(f"seconds_to_{step}" for step in STEPS)]:
+            assert out[column] == row[column], (key, column)
+
+
+def run_batches(sessionizer, table, batch_size):
+    tables = []
+    for batch in table.to_batches(max_chunksize=batch_size):
+        closed = sessionizer.push(batch)
+        if closed is not None:
+            tables.append(closed)
+    tables.append(sessionizer.flush())
+    return [t for t in tables if t is not None]
+
+
+@pytest.mark.parametrize("batch_size", [10_000, 7])
+def test_matches_reference_on_ordered_input(batch_size):
+    frame = make_events()
+    sessionizer = Sessionizer(idle_minutes=30)
+    tables = run_batches(sessionizer, to_table(frame), batch_size)
+    assert_same(collect(tables), reference(frame))
+    assert sessionizer.stats["events"] == len(frame)
+    assert sessionizer.stats["late_events"] == 0
+    assert sessionizer.stats["other_events"] == int((frame["event_name"] == "custom_event").sum())
+    if batch_size == 7:
+        # 작은 배치면 입력 도중에 닫힌 세션이 나오고, 열린 세션 수는 전체보다 훨씬 적다
+        assert len(tables) > 2
+        assert sessionizer.stats["max_open_sessions"] < sessionizer.stats["sessions"]
+
+
+def test_lateness_absorbs_out_of_order_input():
+    frame = make_events(seed=1)
+    # 시간순을 1시간 단위 안에서 뒤섞음 (일 단위 샤드 안이 정렬되지 않은 원본과 같은 상황)
+    rng = np.random.default_rng(2)
+    hour = frame["event_timestamp"] // (60 * MINUTE)
+    shuffled = frame.assign(noise=rng.random(len(frame)), hour=hour).sort_values(["hour", "noise"]).drop(columns=["noise", "hour"])
+    sessionizer = Sessionizer(idle_minutes=30, lateness_minutes=60)
+    got = collect(run_batches(sessionizer, to_table(shuffled.reset_index(drop=True)), 11))
+    # 같은 시각 이벤트는 도착 순으로 정렬되므로 기대값도 뒤섞인 입력 순서 기준
+    assert_same(got, reference(shuffled.reset_index(drop=True)))
+    assert sessionizer.stats["late_events"] == 0
+
+
+def test_late_events_are_counted():
+    frame = make_events(n_users=5, seed=3)
+    late = frame.iloc[[0]].assign(event_timestamp=frame["event_timestamp"].iloc[0] + MINUTE)
+    table = to_table(pd.concat([frame, late], ignore_index=True))
+    sessionizer = Sessionizer(idle_minutes=30)
+    run_batches(sessionizer, table, len(frame))
+    assert sessionizer.stats["late_events"] == 1
+
+
+def test_max_path_events_truncates_path_only():
+    frame = make_events(seed=4)
+    sessionizer = Sessionizer(max_path_events=3)
+    got = collect(run_batches(sessionizer, to_table(frame), 5))
+    expected = reference(frame)
+    assert_same(got, expected, max_path_events=3)
+    assert sessionizer.stats["truncated_sessions"] == sum(row["path_length"] > 3 for row in expected.values())
+
+
+def test_run_writes_parquet(tmp_path):
+    frame = make_events(seed=5)
+    half = len(frame) // 2
+    pq.write_table(to_table(frame.iloc[:half]), tmp_path / "events_20201201-0.parquet")
+    pq.write_table(to_table(frame.iloc[half:].reset_index(drop=True)), tmp_path / "events_20201201-1.parquet")
+    out = tmp_path / "session_paths.parquet"
+    Sessionizer(batch_size=16).run(str(tmp_path / "events_*.parquet"), str(out))
+    table = pq.read_table(out)
+    assert_same(collect([table]), reference(frame))
+    first = table.column("path")[0].as_py()
+    assert decode(first)[0] == EVENTS[first[0]]
@@ -0,0 +1,77 @@
+"""stg_events: 한 번에 피벗한 event_params 컬럼 vs 원본 event_params 를 파이썬으로 직접 찾은 값 (DuckDB 로컬 실행)"""
+import contextlib
+import io
+import re
+
+import pyarrow.dataset as ds
+import pytest
+
+from ga4_engine.duckdb_runner import DuckDBRunner, ModelError
+
+# event_params 키 → (값 필드, stg_events 컬럼, 키가 없을 때 값)
+PARAMS = {
+    "source": ("string_value", "session_source", None),
+    "medium": ("string_value", "session_medium", None),
+    "campaign": ("string_value", "session_campaign", None),
+    "ga_session_id": ("int_value", "session_id", None),
+    "session_engaged": ("int_value", "is_engaged", 0),
+    "engagement_time_msec": ("int_value", "engagement_time_msec", 0),
+    "page_title": ("string_value", "page_title", None),
+    "page_location": ("string_value", "page_url", None),
+}
+KEYS = ["user_pseudo_id", "event_timestamp", "event_name"]
+
+
+@pytest.fixture(scope="module")
+def runner(events_dir):
+    runner = DuckDBRunner(str(events_dir / "events_*.parquet"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        runner.run(select=["stg_events"])
+    return runner
+
+
+def expected_rows(events_dir):
+    """이벤트마다 event_params 를 파이썬 dict 로 찾아 만든 (키..., 파라미터 컬럼...) 집합"""
+    events = ds.dataset(str(events_dir), format="parquet").to_table(columns=KEYS + ["event_params"]).to_pylist()
+    rows = set()
+    for event in events:
+        params = {p["key"]: p["value"] for p in event["event_params"]}
+        values = []
+        for key, (field, _, default) in PARAMS.items():
+            value = params[key][field] if key in params else None
+            values.append(default if value is None else value)
+        rows.add((event["user_pseudo_id"], event["event_timestamp"], event["event_name"], *values))
+    return rows
+
+
+def test_params_match_event_params(runner, events_dir):
+    columns = [column for _, column, _ in PARAMS.values()]
+    got = runner.con.execute(f"""
+        SELECT DISTINCT user_pseudo_id, epoch_us(event_timestamp), event_name, {", ".join(columns)}
+        FROM stg_events
+    """).fetchall()
+    expected = expected_rows(events_dir)
+    # 이벤트 x 상품 행을 이벤트 단위로 줄이면 원본 이벤트와 1:1
+    assert len(got) == len(set(got)) == len(expected)
+    assert set(got) == expected
+    # 첫 이벤트 외에는 source 가 빠진 이벤트가 섞여 있어야 NULL 처리까지 확인됨
+    assert any(row[3] is None for row in got) and any(row[3] is not None for row in got)
+
+
+def test_session_id_looked_up_once(runner):
+    sql = runner.render(runner.models["stg_events"], incremental=False)
+    # ga_session_id 는 피벗 구조체에서 한 번만 꺼내고 session_unique_id / session_id 는 그 값을 재사용
+    assert sql.count("'ga_session_id'") == 1
+    assert "CONCAT(user_pseudo_id, '-', params.session_id)" in sql
+
+
+def test_bigquery_macro_unnests_once(runner):
+    keys = [(key, field.split("_")[0], column) for key, (field, column, _) in PARAMS.items()]
+    sql = str(runner.env.globals["default__extract_event_params"](keys, "event_params"))
+    assert len(re.findall(r"UNNEST\(", sql)) == 1
+    assert all(f"key = '{key}'" in sql and f"AS {column}" in sql for key, _, column in keys)
+
+
+def test_unknown_param_type_is_a_compiler_error(runner):
+    with pytest.raises(ModelError, match="지원하지 않는 타입"):
+        runner.env.globals["default__extract_event_params"]([("source", "bytes", "session_source")], "event_params")
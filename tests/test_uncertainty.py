@@ -0,0 +1,122 @@
+"""ga4_engine.uncertainty: 압축 셀 부트스트랩 vs 단순 인덱스 재표본, Beta 사후분포 vs scipy"""
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from ga4_engine.uncertainty import (
+    UncertaintyEngine, beta_interval, beta_lift_interval, bootstrap_lift, bootstrap_ratio, compress,
+)
+
+
+@pytest.fixture(scope="module")
+def sessions():
+    rng = np.random.default_rng(7)
+    n = 4000
+    purchased = rng.random(n) < 0.2
+    return pd.DataFrame({
+        "revenue": np.where(purchased, rng.choice([10.0, 25.0, 40.0, 99.0], n), np.nan),
+        "bucket": rng.choice(["a", "b", "c"], n),
+        "has_purchase": purchased.astype(int),
+        "view": (rng.random(n) < np.where(purchased, 0.9, 0.4)).astype(int),
+        "cart": (rng.random(n) < np.where(purchased, 0.7, 0.1)).astype(int),
+    })
+
+
+def test_compress_keeps_group_sums(sessions):
+    values = sessions[["revenue", "view"]].to_numpy()
+    cells, counts, codes, labels = compress(values, sessions["bucket"])
+    assert counts.sum() == sessions["revenue"].notna().sum()
+    assert np.all(np.diff(codes) >= 0)
+    expected = sessions.dropna(subset=["revenue"]).groupby("bucket")[["revenue", "view"]].sum().astype(float)
+    got = pd.DataFrame(cells * counts[:, None], columns=["revenue", "view"]).groupby(labels[codes]).sum()
+    pd.testing.assert_frame_equal(got, expected, check_names=False)
+
+
+def test_bootstrap_ratio_matches_naive_resampling(sessions):
+    result = bootstrap_ratio(sessions["revenue"], groups=sessions["bucket"], n_resamples=4000, seed=1)
+    rng = np.random.default_rng(2)
+    for _, row in result.iterrows():
+        values = sessions.loc[(sessions["bucket"] == row["group"]) & sessions["revenue"].notna(), "revenue"].to_numpy()
+        assert row["estimate"] == pytest.approx(values.mean())
+        assert row["n"] == len(values)
+        naive = values[rng.integers(0, len(values), size=(4000, len(values)))].mean(axis=1)
+        low, high = np.quantile(naive, [0.025, 0.975])
+        # 두 방법 모두 몬테카를로 오차가 있으므로 구간 폭의 10% 이내면 같은 구간으로 본다
+        width = high - low
+        assert row["ci_low"] == pytest.approx(low, abs=0.1 * width)
+        assert row["ci_high"] == pytest.approx(high, abs=0.1 * width)
+        assert row["std_error"] == pytest.approx(naive.std(), rel=0.1)
+
+
+def test_bootstrap_ratio_resamples_whole_sessions():
+    # 이탈 세션 x 상품 행: 세션마다 같은 상품이 여러 줄, 금액은 세션 안에서 강하게 상관
+    rng = np.random.default_rng(16)
+    n_sessions = 600
+    session_value = rng.lognormal(3, 1, n_sessions)
+    lines = rng.integers(1, 8, n_sessions)
+    session = np.repeat(np.arange(n_sessions), lines)
+    lines_df = pd.DataFrame({
+        "session": session.astype(str),
+        "item": rng.choice(["bag", "cap"], n_sessions)[session],
+        "revenue": session_value[session] * rng.uniform(0.9, 1.1, len(session)),
+    })
+    result = bootstrap_ratio(lines_df["revenue"], groups=lines_df["item"], clusters=lines_df["session"],
+                             n_resamples=4000, seed=1).set_index("group")
+    rows = bootstrap_ratio(lines_df["revenue"], groups=lines_df["item"], n_resamples=4000, seed=1).set_index("group")
+    for item, group in lines_df.groupby("item"):
+        row = result.loc[item]
+        assert row["estimate"] == pytest.approx(group["revenue"].mean())
+        assert row["n"] == len(group)
+        # 세션을 통째로 복원 추출한 재표본과 비교
+        per_session = group.groupby("session")["revenue"].agg(["sum", "count"]).to_numpy()
+        picks = per_session[np.random.default_rng(2).integers(0, len(per_session), size=(4000, len(per_session)))]
+        naive = picks[..., 0].sum(axis=1) / picks[..., 1].sum(axis=1)
+        low, high = np.quantile(naive, [0.025, 0.975])
+        width = high - low
+        assert row["ci_low"] == pytest.approx(low, abs=0.1 * width)
+        assert row["ci_high"] == pytest.approx(high, abs=0.1 * width)
+        # 행 단위로 뽑으면 세션 안 상관을 무시해 구간이 좁아짐
+        assert rows.loc[item, "std_error"] < 0.8 * row["std_error"]
+
+
+def test_bootstrap_lift_estimate(sessions):
+    signals = {"view": sessions["view"], "cart": sessions["cart"]}
+    result = bootstrap_lift(sessions["has_purchase"], signals, n_resamples=500).set_index("signal")
+    base = sessions["has_purchase"].mean()
+    for name, flag in signals.items():
+        expected = sessions.loc[flag == 1, "has_purchase"].mean() / base
+        assert result.loc[name, "estimate"] == pytest.approx(expected)
+        assert result.loc[name, "n"] == flag.sum()
+        assert result.loc[name, "ci_low"] < expected < result.loc[name, "ci_high"]
+
+
+def test_beta_interval_matches_scipy():
+    successes, totals = np.array([0, 3, 50, 400]), np.array([10, 20, 200, 1000])
+    mean, low, high = beta_interval(successes, totals, confidence=0.9, prior=(0.5, 0.5))
+    a, b = 0.5 + successes, 0.5 + totals - successes
+    np.testing.assert_allclose(mean, a / (a + b))
+    np.testing.assert_allclose(low, stats.beta.ppf(0.05, a, b), rtol=1e-10)
+    np.testing.assert_allclose(high, stats.beta.ppf(0.95, a, b), rtol=1e-10)
+
+
+def test_beta_lift_interval_brackets_point_lift(sessions):
+    n = len(sessions)
+    flag = sessions["cart"].to_numpy()
+    purchase = sessions["has_purchase"].to_numpy()
+    median, low, high = beta_lift_interval(n, flag.sum(), (flag * purchase).sum(), purchase.sum())
+    point = purchase[flag == 1].mean() / purchase.mean()
+    assert low < point < high
+    assert median == pytest.approx(point, rel=0.05)
+
+
+def test_engine_is_reproducible_across_workers(sessions):
+    def run(workers):
+        engine = UncertaintyEngine(n_resamples=300, workers=workers, seed=3)
+        engine.add_ratio("aov", sessions["revenue"], groups=sessions["bucket"])
+        engine.add_lift("lift", sessions["has_purchase"], {"view": sessions["view"]})
+        return engine.run()
+
+    serial, pooled = run(1), run(2)
+    for name in serial:
+        pd.testing.assert_frame_equal(serial[name], pooled[name])
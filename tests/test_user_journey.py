@@ -0,0 +1,74 @@
+"""mart_user_journey: 사용자 단위 여정 vs fct_sessions 를 master_id 별로 파이썬에서 이어 붙여 센 값 (DuckDB 로컬 실행)"""
+import contextlib
+import decimal
+import io
+
+import pandas as pd
+import pytest
+
+from ga4_engine.duckdb_runner import DuckDBRunner
+
+MINUTE_US = 60_000_000
+
+
+@pytest.fixture(scope="module")
+def runner(events_dir):
+    runner = DuckDBRunner(str(events_dir / "events_*.parquet"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        runner.run()
+    return runner
+
+
+def minutes(later, earlier):
+    # BigQuery TIMESTAMP_DIFF(..., MINUTE): 경과 시간을 0 방향으로 절사
+    return int((later - earlier) / pd.Timedelta(microseconds=1) / MINUTE_US)
+
+
+def rounded(value, places):
+    # BigQuery ROUND: 0.5 는 0 에서 먼 쪽으로 (파이썬 round 는 짝수 쪽)
+    return float(decimal.Decimal(value).quantize(decimal.Decimal(10) ** -places, decimal.ROUND_HALF_UP))
+
+
+def expected_journey(sessions):
+    rows = {}
+    sessions = sessions.assign(session_source=sessions["session_source"].fillna("(direct)"))
+    for master_id, user in sessions.sort_values(["session_start_at", "session_unique_id"]).groupby("master_id", sort=False):
+        user = user.reset_index(drop=True)
+        gaps = [minutes(start, end) for start, end in zip(user["session_start_at"][1:], user["session_end_at"][:-1])]
+        bought = user[user["has_purchase"] == 1]
+        first = bought.loc[bought["purchased_at"].idxmin()] if len(bought) else None
+        rows[master_id] = {
+            "sessions": len(user),
+            "first_session_date": user["session_date"].min(),
+            "last_session_date": user["session_date"].max(),
+            "first_session_at": user["session_start_at"].iloc[0],
+            "last_session_at": user["session_start_at"].iloc[-1],
+            "avg_gap_minutes": rounded(decimal.Decimal(sum(gaps)) / len(gaps), 1) if gaps else None,
+            "max_gap_minutes": max(gaps) if gaps else None,
+            "first_touch_source": user["session_source"].iloc[0],
+            "last_touch_source": user["session_source"].iloc[-1],
+            "purchase_touch_source": None if first is None else first["session_source"],
+            "purchase_sessions": len(bought),
+            "sessions_to_purchase": None if first is None else first.name + 1,
+            "days_to_purchase": None if first is None else rounded(
+                decimal.Decimal(minutes(first["purchased_at"], user["session_start_at"].iloc[0])) / 1440, 2),
+            "total_revenue": bought["item_revenue"].sum(),
+        }
+    return rows
+
+
+def test_journey_matches_sessions(runner):
+    expected = expected_journey(runner.table("fct_sessions"))
+    got = runner.table("mart_user_journey").set_index("master_id")
+    assert len(got) == len(expected)
+    # 여러 날에 걸쳐 재방문 / 두 번째 세션 이후 구매한 사용자가 있어야 간격 / 구매 여정까지 확인됨
+    assert (got["sessions"] > 1).sum() > 100 and (got["sessions_to_purchase"] > 1).sum() > 5
+    for master_id, row in expected.items():
+        actual = got.loc[master_id]
+        for column, value in row.items():
+            if value is None:
+                assert pd.isna(actual[column]), (master_id, column)
+            elif column in ("avg_gap_minutes", "days_to_purchase", "total_revenue"):
+                assert actual[column] == pytest.approx(value)
+            else:
+                assert actual[column] == value, (master_id, column)